@@ -0,0 +1,347 @@
+import argparse
+import importlib
+import json
+import sys
+import tempfile
+import time
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+# Suites are imported only when selected, name -> module with a run(context) function
+SUITES = {
+    "storage": "benchmarks.storage",
+    "operations": "benchmarks.operations",
+    "queries": "benchmarks.queries",
+    "startup": "benchmarks.startup",
+}
+
+console = Console()
+error_console = Console(stderr=True)
+
+
+def display_results(results):
+    table = Table(show_header=True)
+    table.add_column("Case", style="cyan", overflow="fold")
+    table.add_column("Rows", style="green", justify="right")
+    table.add_column("Median", style="yellow", justify="right")
+    table.add_column("Min", style="yellow", justify="right")
+    table.add_column("Stdev", style="magenta", justify="right")
+    table.add_column("Ops/s", style="magenta", justify="right")
+
+    for result in results:
+        table.add_row(
+            escape(result.name),
+            str(result.rows),
+            f"{result.median * 1e3:.3f}ms",
+            f"{result.min * 1e3:.3f}ms",
+            f"{result.stdev * 1e3:.3f}ms",
+            f"{result.ops_per_second:,.0f}",
+        )
+    console.print(table)
+
+
+def display_statement_cache(statistics):
+    if statistics is None:
+        return
+
+    console.print(
+        f"Statement cache: {statistics['hits']:,} hits, {statistics['misses']:,} "
+        f"misses ({statistics['hit_rate']:.1%} hit rate)"
+    )
+
+
+def handle_run(args):
+    with tempfile.TemporaryDirectory(prefix="teilnahme-benchmarks-") as workdir:
+        run_suites(args, workdir)
+
+
+def run_suites(args, workdir):
+    database_url = args.database_url or f"sqlite:///{workdir}/benchmarks.db"
+
+    from benchmarks.data import Scale, prepare_database
+    from benchmarks.harness import (
+        BenchmarkContext,
+        BenchmarkRun,
+        compare,
+        environment_metadata,
+    )
+
+    scale = Scale.from_rows(args.rows)
+    started = time.perf_counter()
+    engine = prepare_database(database_url, scale, seed=args.seed)
+    console.print(
+        f"[green]Populated {scale.total:,} rows in {time.perf_counter() - started:.1f}s[/green]"
+    )
+
+    run = BenchmarkRun(
+        metadata=environment_metadata(
+            rows=args.rows,
+            scale=vars(scale),
+            database=engine.dialect.name,
+            suites=args.suite,
+        )
+    )
+    context = BenchmarkContext(
+        engine=engine,
+        scale=scale,
+        workdir=workdir,
+        repeat=args.repeat,
+        metadata=run.metadata,
+    )
+
+    for suite in args.suite:
+        module = importlib.import_module(SUITES[suite])
+        for result in module.run(context):
+            run.add(result)
+
+    engine.dispose()
+    display_results(run.results)
+    display_statement_cache(run.metadata.get("statement_cache"))
+
+    if args.output:
+        run.save(args.output)
+        console.print(f"[green]Results saved to {args.output}[/green]")
+
+    if args.baseline:
+        regressions = compare(BenchmarkRun.load(args.baseline), run, args.threshold)
+        display_regressions(regressions)
+        if regressions:
+            sys.exit(1)
+
+
+def handle_compare(args):
+    from benchmarks.harness import BenchmarkRun, compare
+
+    regressions = compare(
+        BenchmarkRun.load(args.baseline),
+        BenchmarkRun.load(args.current),
+        args.threshold,
+    )
+    display_regressions(regressions)
+    if regressions:
+        sys.exit(1)
+
+
+def handle_load(args):
+    with tempfile.TemporaryDirectory(prefix="teilnahme-load-") as workdir:
+        run_load_test(args, workdir)
+
+
+def run_load_test(args, workdir):
+    import asyncio
+
+    from benchmarks.data import Scale, prepare_database
+    from benchmarks.load import parse_mix, run_load, serve
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        error_console.print(f"[red]{e}[/red]")
+        sys.exit(2)
+
+    scale = Scale.from_rows(args.rows)
+
+    if args.url:
+        # Somebody else's server, ids are picked from the ranges the dataset would have
+        report = asyncio.run(
+            run_load(
+                args.url,
+                scale,
+                mix,
+                args.concurrency,
+                args.duration,
+                args.warmup,
+                args.seed,
+            )
+        )
+    else:
+        database_url = args.database_url or f"sqlite:///{workdir}/load.db"
+        prepare_database(database_url, scale, seed=args.seed).dispose()
+        with serve(database_url, workers=args.workers) as base_url:
+            report = asyncio.run(
+                run_load(
+                    base_url,
+                    scale,
+                    mix,
+                    args.concurrency,
+                    args.duration,
+                    args.warmup,
+                    args.seed,
+                )
+            )
+
+    summary = report.summary()
+    display_load_summary(summary)
+
+    if args.output:
+        with open(args.output, mode="w") as file:
+            json.dump(
+                {
+                    "metadata": environment_metadata_for_load(args, scale),
+                    "summary": summary,
+                },
+                file,
+                indent=2,
+            )
+        console.print(f"[green]Results saved to {args.output}[/green]")
+
+
+def environment_metadata_for_load(args, scale):
+    from benchmarks.harness import environment_metadata
+
+    return environment_metadata(
+        rows=args.rows,
+        scale=vars(scale),
+        url=args.url,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        mix=args.mix,
+    )
+
+
+def display_load_summary(summary):
+    table = Table(show_header=True)
+    table.add_column("Operation", style="cyan", overflow="fold")
+    table.add_column("Requests", style="green", justify="right")
+    table.add_column("Errors", style="red", justify="right")
+    table.add_column("Req/s", style="green", justify="right")
+    table.add_column("p50", style="yellow", justify="right")
+    table.add_column("p95", style="yellow", justify="right")
+    table.add_column("p99", style="magenta", justify="right")
+    table.add_column("Max", style="magenta", justify="right")
+
+    for name, row in summary.items():
+        table.add_row(
+            name,
+            str(row["requests"]),
+            str(row["errors"]),
+            f"{row['rps']:,.1f}",
+            f"{row['p50']:.2f}ms",
+            f"{row['p95']:.2f}ms",
+            f"{row['p99']:.2f}ms",
+            f"{row['max']:.2f}ms",
+        )
+    console.print(table)
+
+
+def display_regressions(regressions):
+    if not regressions:
+        console.print("[green]No regressions found[/green]")
+        return
+
+    for regression in regressions:
+        error_console.print(f"[red]Regression {regression}[/red]")
+
+
+def setup_parsers():
+    parser = argparse.ArgumentParser(description="Teilnahme benchmarks ⏱️")
+    subparser = parser.add_subparsers(dest="command")
+
+    run_parser = subparser.add_parser("run", help="Run benchmark suites")
+    run_parser.add_argument(
+        "--rows",
+        type=int,
+        default=1_000,
+        help="Attendance records in the dataset, other tables scale with it (1k - 10M)",
+    )
+    run_parser.add_argument(
+        "--suite",
+        action="append",
+        choices=list(SUITES),
+        help="Suite to run, can be repeated (default: all)",
+    )
+    run_parser.add_argument(
+        "--repeat", type=int, default=5, help="Repeats of every case"
+    )
+    run_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the dataset generators"
+    )
+    run_parser.add_argument(
+        "--database-url",
+        help="Database to run against, it is wiped first (default: temporary SQLite)",
+    )
+    run_parser.add_argument("--output", help="Save results as JSON to this path")
+    run_parser.add_argument("--baseline", help="Compare results with this JSON file")
+    run_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown against the baseline, 0.1 means 10%%",
+    )
+    run_parser.set_defaults(func=handle_run)
+
+    compare_parser = subparser.add_parser(
+        "compare", help="Compare two saved benchmark runs"
+    )
+    compare_parser.add_argument("baseline", help="JSON file of the baseline run")
+    compare_parser.add_argument("current", help="JSON file of the new run")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown against the baseline, 0.1 means 10%%",
+    )
+    compare_parser.set_defaults(func=handle_compare)
+
+    load_parser = subparser.add_parser(
+        "load", help="Load test the HTTP server with concurrent clients"
+    )
+    load_parser.add_argument(
+        "--url",
+        help="Server to test, its dataset must match --rows (default: start one)",
+    )
+    load_parser.add_argument(
+        "--database-url",
+        help="Database of the started server, it is wiped first (default: temporary SQLite)",
+    )
+    load_parser.add_argument(
+        "--rows",
+        type=int,
+        default=10_000,
+        help="Attendance records in the dataset, other tables scale with it",
+    )
+    load_parser.add_argument(
+        "--mix",
+        default="checkin=20,roster=60,classroom_attendance=20",
+        help="Weights of the operations: checkin, roster, classroom_attendance",
+    )
+    load_parser.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent clients"
+    )
+    load_parser.add_argument(
+        "--duration", type=float, default=10, help="Measured seconds"
+    )
+    load_parser.add_argument(
+        "--warmup", type=float, default=2, help="Seconds of traffic before measuring"
+    )
+    load_parser.add_argument(
+        "--workers", type=int, default=1, help="Uvicorn workers of the started server"
+    )
+    load_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the dataset and the requests"
+    )
+    load_parser.add_argument("--output", help="Save the summary as JSON to this path")
+    load_parser.set_defaults(func=handle_load)
+
+    return parser
+
+
+def main():
+    parser = setup_parsers()
+    args = parser.parse_args()
+
+    if not hasattr(args, "func"):
+        parser.print_help()
+        return
+
+    if getattr(args, "suite", ()) is None:
+        args.suite = list(SUITES)
+
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+from sqlalchemy import Engine
+from sqlmodel import Session, SQLModel, create_engine, insert
+
+from src.common.models import (
+    AttendenceRecord,
+    Classroom,
+    DegreeName,
+    Student,
+    StudentClassroomLink,
+    Subject,
+)
+
+FIRST_NAMES = ["Anna", "Jan", "Maria", "Piotr", "Eva", "Lukas", "Sofia", "Noah"]
+SURNAMES = ["Nowak", "Kowalski", "Müller", "Schmidt", "Wiśniewska", "Fischer"]
+SEMESTERS = {DegreeName.bachelor: 6, DegreeName.master: 4}
+
+
+@dataclass
+class Scale:
+    """Row counts for every table of a synthetic dataset.
+
+    Attributes:
+        students (int): Number of students
+        subjects (int): Number of subjects
+        classrooms (int): Number of classrooms
+        enrollments (int): Number of student/classroom links
+        attendence (int): Number of attendance records
+    """
+
+    students: int
+    subjects: int
+    classrooms: int
+    enrollments: int
+    attendence: int
+
+    @classmethod
+    def from_rows(cls, rows: int) -> "Scale":
+        """Derive table sizes from the size of the biggest table.
+
+        Attendance is the biggest table, the other tables keep roughly the proportions
+        of a real university (10 check-ins per student, 20 students per classroom etc.).
+
+        Args:
+            rows (int): Number of attendance records, e.g. 1_000 up to 10_000_000
+
+        Returns:
+            Scale: Row counts for every table
+        """
+        students = max(rows // 10, 10)
+        classrooms = max(rows // 500, 2)
+        return cls(
+            students=students,
+            subjects=max(classrooms // 4, 1),
+            classrooms=classrooms,
+            enrollments=min(rows // 2, students * classrooms),
+            attendence=rows,
+        )
+
+    @property
+    def total(self) -> int:
+        return (
+            self.students
+            + self.subjects
+            + self.classrooms
+            + self.enrollments
+            + self.attendence
+        )
+
+
+def generate_students(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Generate student rows with ids starting from 1.
+
+    Args:
+        count (int): Number of rows to generate
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Yields:
+        Dict[str, Any]: Column values of a single student
+    """
+    rng = random.Random(seed)
+    for id in range(1, count + 1):
+        degree = rng.choice(list(SEMESTERS))
+        yield {
+            "id": id,
+            "name": f"{rng.choice(FIRST_NAMES)}{id}",
+            "surname": rng.choice(SURNAMES),
+            "degree": degree,
+            "semester": rng.randint(1, SEMESTERS[degree]),
+        }
+
+
+def generate_subjects(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Generate subject rows with ids starting from 1.
+
+    Args:
+        count (int): Number of rows to generate
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Yields:
+        Dict[str, Any]: Column values of a single subject
+    """
+    rng = random.Random(seed)
+    for id in range(1, count + 1):
+        degree = rng.choice(list(SEMESTERS))
+        yield {
+            "id": id,
+            "name": f"Subject {id}",
+            "degree": degree,
+            "semester": rng.randint(1, SEMESTERS[degree]),
+        }
+
+
+def generate_classrooms(
+    count: int, subjects: int, seed: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """Generate classroom rows pointing at existing subjects.
+
+    Args:
+        count (int): Number of rows to generate
+        subjects (int): Number of subjects to pick from
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Yields:
+        Dict[str, Any]: Column values of a single classroom
+    """
+    rng = random.Random(seed)
+    for id in range(1, count + 1):
+        yield {"id": id, "subject_id": rng.randint(1, subjects)}
+
+
+def generate_enrollments(
+    count: int, students: int, classrooms: int
+) -> Iterator[Dict[str, Any]]:
+    """Generate unique student/classroom links.
+
+    Every student joins consecutive classrooms starting at their own id, so pairs never
+    repeat as long as count <= students * classrooms.
+
+    Args:
+        count (int): Number of rows to generate
+        students (int): Number of students to pick from
+        classrooms (int): Number of classrooms to pick from
+
+    Yields:
+        Dict[str, Any]: Column values of a single link
+    """
+    for n in range(count):
+        yield {
+            "student_id": n % students + 1,
+            "classroom_id": (n // students + n % students) % classrooms + 1,
+        }
+
+
+def generate_attendence(
+    count: int,
+    students: int,
+    classrooms: int,
+    start: datetime = datetime(2024, 10, 1, 8, 0),
+    seed: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    """Generate attendance records spread over one semester.
+
+    Args:
+        count (int): Number of rows to generate
+        students (int): Number of students to pick from
+        classrooms (int): Number of classrooms to pick from
+        start (datetime, optional): Date of the first lecture. Defaults to 2024-10-01 08:00.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Yields:
+        Dict[str, Any]: Column values of a single attendance record
+    """
+    rng = random.Random(seed)
+    for id in range(1, count + 1):
+        yield {
+            "id": id,
+            "student_id": rng.randint(1, students),
+            "classroom_id": rng.randint(1, classrooms),
+            # The microseconds keep (student_id, classroom_id, date) unique
+            "date": start
+            + timedelta(
+                days=rng.randint(0, 120), hours=rng.randint(0, 10), microseconds=id
+            ),
+        }
+
+
+def chunked(
+    rows: Iterable[Dict[str, Any]], size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Split an iterable of rows into lists of at most size rows."""
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def populate_database(
+    session: Session, scale: Scale, seed: int = 0, chunk_size: int = 10_000
+):
+    """Insert a synthetic dataset using executemany inserts.
+
+    Rows never become ORM objects, so 10M rows fit in memory one chunk at a time.
+
+    Args:
+        session (Session): Session bound to an empty database with all tables created
+        scale (Scale): Row counts for every table
+        seed (int, optional): Seed of the random generators. Defaults to 0.
+        chunk_size (int, optional): Rows per insert statement. Defaults to 10_000.
+    """
+    tables = [
+        (Student, generate_students(scale.students, seed)),
+        (Subject, generate_subjects(scale.subjects, seed)),
+        (Classroom, generate_classrooms(scale.classrooms, scale.subjects, seed)),
+        (
+            StudentClassroomLink,
+            generate_enrollments(scale.enrollments, scale.students, scale.classrooms),
+        ),
+        (
+            AttendenceRecord,
+            generate_attendence(
+                scale.attendence, scale.students, scale.classrooms, seed=seed
+            ),
+        ),
+    ]
+
+    for model_type, rows in tables:
+        for chunk in chunked(rows, chunk_size):
+            session.execute(insert(model_type), chunk)
+        session.commit()
+
+
+def prepare_database(database_url: str, scale: Scale, seed: int = 0) -> Engine:
+    """Recreate all tables of a database and fill them with a synthetic dataset.
+
+    Args:
+        database_url (str): Database to use, all existing data is dropped
+        scale (Scale): Row counts for every table
+        seed (int, optional): Seed of the random generators. Defaults to 0.
+
+    Returns:
+        Engine: Engine connected to the populated database
+    """
+    engine = create_engine(database_url)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        populate_database(session, scale, seed=seed)
+
+    return engine
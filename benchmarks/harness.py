@@ -0,0 +1,220 @@
+import json
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import Engine
+
+from benchmarks.data import Scale
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of a single benchmark case.
+
+    All times are in seconds and describe a single call of the measured function.
+
+    Attributes:
+        name (str): Unique name of the case, e.g. "db.get_by_id"
+        rows (int): Size of the dataset the case ran against
+        calls (int): Number of calls per repeat
+        min (float): Fastest repeat
+        median (float): Median repeat
+        mean (float): Mean repeat
+        stdev (float): Standard deviation between repeats
+    """
+
+    name: str
+    rows: int
+    calls: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1 / self.median if self.median else float("inf")
+
+
+@dataclass
+class Regression:
+    """A benchmark case that got slower between two runs."""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.baseline * 1e3:.3f}ms -> {self.current * 1e3:.3f}ms "
+            f"({(self.ratio - 1) * 100:+.1f}%)"
+        )
+
+
+@dataclass
+class BenchmarkContext:
+    """Everything a benchmark suite needs to run.
+
+    Attributes:
+        engine (Engine): Engine of a database already populated with the dataset
+        scale (Scale): Row counts of the dataset
+        workdir (str): Directory for files created by the suite, e.g. CSV files
+        repeat (int): Number of repeats of every case
+        metadata (Dict[str, Any]): Details a suite reports next to its timings, e.g.
+            cache hit rates, stored with the run
+    """
+
+    engine: Engine
+    scale: Scale
+    workdir: str
+    repeat: int = 5
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BenchmarkRun:
+    """Results of one benchmark run together with the environment it ran in."""
+
+    results: List[BenchmarkResult] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def add(self, result: BenchmarkResult):
+        self.results.append(result)
+
+    def save(self, path: str):
+        """Store the run as JSON so it can be compared with later runs.
+
+        Args:
+            path (str): Path of the JSON file to write
+        """
+        with open(path, mode="w") as file:
+            json.dump(
+                {
+                    "metadata": self.metadata,
+                    "results": [asdict(result) for result in self.results],
+                },
+                file,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "BenchmarkRun":
+        """Load a run previously stored with save.
+
+        Args:
+            path (str): Path of the JSON file to read
+
+        Returns:
+            BenchmarkRun: The stored run
+        """
+        with open(path, mode="r") as file:
+            data = json.load(file)
+
+        return cls(
+            results=[BenchmarkResult(**result) for result in data["results"]],
+            metadata=data.get("metadata", {}),
+        )
+
+
+def environment_metadata(**extra: Any) -> Dict[str, Any]:
+    """Describe the machine and interpreter a run is executed on.
+
+    Args:
+        **extra: Additional entries, e.g. the dataset size or the database URL
+
+    Returns:
+        Dict[str, Any]: Metadata to store next to the results
+    """
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        **extra,
+    }
+
+
+def measure(
+    name: str,
+    function: Callable[[], Any],
+    rows: int,
+    calls: int = 1,
+    repeat: int = 5,
+    warmup: int = 1,
+) -> BenchmarkResult:
+    """Time a function.
+
+    The function is called warmup times without measuring to fill caches, then
+    repeat times calls times in a row. Every repeat yields the time of a single call.
+
+    Args:
+        name (str): Name of the case
+        function (Callable[[], Any]): Function to measure
+        rows (int): Size of the dataset the function runs against
+        calls (int, optional): Calls per repeat. Defaults to 1.
+        repeat (int, optional): Number of repeats. Defaults to 5.
+        warmup (int, optional): Calls before measuring. Defaults to 1.
+
+    Returns:
+        BenchmarkResult: Timings of the function
+    """
+    for _ in range(warmup):
+        function()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        timings.append((time.perf_counter() - start) / calls)
+
+    return BenchmarkResult(
+        name=name,
+        rows=rows,
+        calls=calls,
+        min=min(timings),
+        median=statistics.median(timings),
+        mean=statistics.mean(timings),
+        stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    )
+
+
+def compare(
+    baseline: BenchmarkRun, current: BenchmarkRun, threshold: float = 0.1
+) -> List[Regression]:
+    """Find cases that got slower than the baseline by more than the threshold.
+
+    Cases are matched by name and dataset size, the median of both runs is compared.
+    Cases missing in one of the runs are ignored.
+
+    Args:
+        baseline (BenchmarkRun): Run to compare against
+        current (BenchmarkRun): New run
+        threshold (float, optional): Allowed slowdown, 0.1 means 10%. Defaults to 0.1.
+
+    Returns:
+        List[Regression]: Cases slower than the threshold allows
+    """
+    baseline_results = {
+        (result.name, result.rows): result for result in baseline.results
+    }
+
+    regressions = []
+    for result in current.results:
+        previous = baseline_results.get((result.name, result.rows))
+        if previous is None or previous.median == 0:
+            continue
+
+        if result.median > previous.median * (1 + threshold):
+            regressions.append(Regression(result.name, previous.median, result.median))
+
+    return regressions
@@ -0,0 +1,263 @@
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List
+
+import httpx
+
+from benchmarks.data import SEMESTERS, Scale
+
+
+def checkin_request(client: httpx.AsyncClient, rng: random.Random, scale: Scale):
+    return client.post(
+        "/attendance/",
+        json={
+            "student_id": rng.randint(1, scale.students),
+            "classroom_id": rng.randint(1, scale.classrooms),
+            "date": datetime.now().isoformat(),
+        },
+    )
+
+
+def roster_request(client: httpx.AsyncClient, rng: random.Random, scale: Scale):
+    degree = rng.choice(list(SEMESTERS))
+    return client.get(
+        f"/students/{degree.value}",
+        params={"semester": rng.randint(1, SEMESTERS[degree])},
+    )
+
+
+def classroom_attendance_request(
+    client: httpx.AsyncClient, rng: random.Random, scale: Scale
+):
+    return client.get(f"/attendance/classrooms/{rng.randint(1, scale.classrooms)}")
+
+
+# Operation name -> function sending a single request, writes first
+OPERATIONS: Dict[str, Callable] = {
+    "checkin": checkin_request,
+    "roster": roster_request,
+    "classroom_attendance": classroom_attendance_request,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse a traffic mix like "checkin=20,roster=70,classroom_attendance=10".
+
+    Args:
+        mix (str): Comma separated operation=weight pairs
+
+    Returns:
+        Dict[str, int]: Weight of every operation
+
+    Raises:
+        ValueError: When an operation is unknown or a weight is not a positive integer
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(
+                f"Unknown operation {name}, choose from: {', '.join(OPERATIONS)}"
+            )
+        if not weight.strip().isdigit() or int(weight) <= 0:
+            raise ValueError(f"Weight of {name} must be a positive integer")
+        weights[name] = int(weight)
+
+    return weights
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values (List[float]): Values sorted ascending
+        percent (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, 0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+@dataclass
+class LoadReport:
+    """Latencies and errors collected during a load test.
+
+    Attributes:
+        duration (float): Length of the measured window in seconds
+        latencies (Dict[str, List[float]]): Latencies in seconds per operation
+        errors (Dict[str, int]): Failed requests per operation
+    """
+
+    duration: float = 0.0
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, operation: str, latency: float, ok: bool):
+        self.latencies.setdefault(operation, []).append(latency)
+        if not ok:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Throughput and latency percentiles per operation and in total.
+
+        Returns:
+            Dict[str, Dict[str, float]]: operation -> requests, errors, rps, p50, p95,
+                p99 and max, latencies in milliseconds
+        """
+        rows = {name: values for name, values in sorted(self.latencies.items())}
+        rows["total"] = [value for values in rows.values() for value in values]
+
+        summary = {}
+        for name, values in rows.items():
+            values = sorted(values)
+            errors = (
+                sum(self.errors.values())
+                if name == "total"
+                else self.errors.get(name, 0)
+            )
+            summary[name] = {
+                "requests": len(values),
+                "errors": errors,
+                "rps": len(values) / self.duration if self.duration else 0.0,
+                "p50": percentile(values, 50) * 1e3,
+                "p95": percentile(values, 95) * 1e3,
+                "p99": percentile(values, 99) * 1e3,
+                "max": (values[-1] if values else 0.0) * 1e3,
+            }
+
+        return summary
+
+
+async def run_load(
+    base_url: str,
+    scale: Scale,
+    mix: Dict[str, int],
+    concurrency: int = 16,
+    duration: float = 10.0,
+    warmup: float = 2.0,
+    seed: int = 0,
+) -> LoadReport:
+    """Drive a running server with concurrent clients.
+
+    Every client sends its next request as soon as the previous one finished (closed
+    loop), so throughput shows how much the server sustains at that concurrency.
+
+    Args:
+        base_url (str): URL of the server, e.g. http://127.0.0.1:8000
+        scale (Scale): Row counts of the dataset, ids are picked from these ranges
+        mix (Dict[str, int]): Weight of every operation
+        concurrency (int, optional): Number of concurrent clients. Defaults to 16.
+        duration (float, optional): Measured seconds. Defaults to 10.0.
+        warmup (float, optional): Seconds of traffic before measuring. Defaults to 2.0.
+        seed (int, optional): Seed of the request generator. Defaults to 0.
+
+    Returns:
+        LoadReport: Latencies and errors of the measured window
+    """
+    report = LoadReport()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def client_loop(client: httpx.AsyncClient, rng: random.Random):
+        while (now := time.perf_counter()) < stop_at:
+            operation = rng.choices(names, weights)[0]
+            try:
+                response = await OPERATIONS[operation](client, rng, scale)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+
+            if now >= measure_from:
+                report.record(operation, time.perf_counter() - now, ok)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30
+    ) as client:
+        await asyncio.gather(
+            *(client_loop(client, random.Random(seed + n)) for n in range(concurrency))
+        )
+
+    report.duration = time.perf_counter() - measure_from
+    return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(database_url: str, workers: int = 1, timeout: float = 30) -> Iterator[str]:
+    """Run src.server.server:app with uvicorn in a subprocess.
+
+    Args:
+        database_url (str): Database the server connects to
+        workers (int, optional): Number of uvicorn workers. Defaults to 1.
+        timeout (float, optional): Seconds to wait for the server to start. Defaults to 30.
+
+    Yields:
+        str: Base URL of the running server
+
+    Raises:
+        RuntimeError: When the server doesn't answer in time
+    """
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": database_url}
+    # ENVIRONMENT=development forces the local SQLite file instead of DATABASE_URL
+    env.pop("ENVIRONMENT", None)
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.server.server:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                httpx.get(base_url, timeout=1)
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Server didn't start in {timeout}s")
+                time.sleep(0.1)
+
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
@@ -0,0 +1,171 @@
+import random
+from datetime import timedelta
+from itertools import count, cycle
+from typing import Iterator
+
+from sqlmodel import Session, select
+
+from benchmarks.harness import BenchmarkContext, BenchmarkResult, measure
+from src.common.models import AttendenceRecord, Classroom, DegreeName, Student
+from src.common.storage.db_storage import DBStorageHandler
+from src.modules.attendence_operations import AttendenceOperations
+from src.modules.classrooms_operations import ClassroomsOperations
+from src.modules.students_operations import StudentsOperations
+from src.modules.subjects_operations import SubjectsOperations
+
+
+def run(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """Benchmark the most used methods of the *Operations classes over a database.
+
+    Args:
+        context (BenchmarkContext): Populated database and run settings
+
+    Yields:
+        BenchmarkResult: Timings of every case
+    """
+    scale = context.scale
+    rows = scale.total
+    rng = random.Random(0)
+    student_ids = cycle(
+        rng.sample(range(1, scale.students + 1), min(scale.students, 1000))
+    )
+
+    with Session(context.engine) as session:
+        storage_handler = DBStorageHandler(session)
+        students_operations = StudentsOperations(storage_handler)
+        subjects_operations = SubjectsOperations(storage_handler)
+        classrooms_operations = ClassroomsOperations(
+            storage_handler, students_operations
+        )
+        attendence_operations = AttendenceOperations(storage_handler)
+        first_date = session.exec(select(AttendenceRecord.date)).first()
+
+        def case(name, function, calls=1):
+            def wrapper():
+                function()
+                # Every request gets a new session, don't let the identity map serve reads
+                session.expunge_all()
+
+            return measure(name, wrapper, rows, calls=calls, repeat=context.repeat)
+
+        yield case(
+            "students.get_students_in_degree",
+            lambda: students_operations.get_students_in_degree(DegreeName.master, 2),
+        )
+        yield case(
+            "students.get_student",
+            lambda: students_operations.get_student(next(student_ids)),
+            calls=100,
+        )
+        yield case(
+            "subjects.get_subjects_in_degree",
+            lambda: subjects_operations.get_subjects_in_degree(DegreeName.bachelor, 3),
+            calls=10,
+        )
+        yield case(
+            "classrooms.get_classrooms_for_subject",
+            lambda: classrooms_operations.get_classrooms_for_subject(
+                rng.randint(1, scale.subjects)
+            ),
+            calls=10,
+        )
+        yield case(
+            "classrooms.get_classrooms_where_student",
+            lambda: classrooms_operations.get_classrooms_where_student(
+                next(student_ids)
+            ),
+            calls=10,
+        )
+        yield case(
+            "attendence.get_attendence_records_by_classroom",
+            lambda: attendence_operations.get_attendence_records_by_classroom(
+                rng.randint(1, scale.classrooms)
+            ),
+            calls=10,
+        )
+        yield case(
+            "attendence.get_attendence_records_by_student",
+            lambda: attendence_operations.get_attendence_records_by_student(
+                next(student_ids)
+            ),
+            calls=10,
+        )
+        yield case(
+            "attendence.get_attendence_records_by_date",
+            lambda: attendence_operations.get_attendence_records_by_date(first_date),
+            calls=10,
+        )
+
+        yield case(
+            "attendence.add_attendence_record",
+            lambda: attendence_operations.add_attendence_record(
+                AttendenceRecord(
+                    student_id=next(student_ids),
+                    classroom_id=rng.randint(1, scale.classrooms),
+                    date=first_date + timedelta(seconds=rng.randint(1, 3600)),
+                )
+            ),
+            calls=100,
+        )
+        yield case(
+            "students.add_student",
+            lambda: students_operations.add_student(
+                Student(
+                    name="Anna", surname="Nowak", degree=DegreeName.master, semester=1
+                )
+            ),
+            calls=100,
+        )
+
+        # Enroll the students added above into a fresh classroom, one at a time
+        classroom_id = classrooms_operations.add_classroom(Classroom(subject_id=1)).id
+        new_student_ids = count(scale.students + 1)
+        yield case(
+            "classrooms.add_student_to_classroom",
+            lambda: classrooms_operations.add_student_to_classroom(
+                classroom_id, next(new_student_ids)
+            ),
+            calls=10,
+        )
+
+        yield case(
+            "classrooms.get_classroom",
+            lambda: (
+                classrooms_operations.get_classroom(
+                    rng.randint(1, scale.classrooms)
+                ).students
+            ),
+            calls=10,
+        )
+
+        # Open a classroom, enroll students and record the first lecture, once with a
+        # commit per call and once in one transaction
+        def open_classroom(student_count):
+            classroom = classrooms_operations.add_classroom(Classroom(subject_id=1))
+            students = [
+                students_operations.get_student(next(student_ids))
+                for _ in range(student_count)
+            ]
+            classrooms_operations.add_students_to_classroom(classroom.id, students)
+            for student in students:
+                attendence_operations.add_attendence_record(
+                    AttendenceRecord(
+                        student_id=student.id,
+                        classroom_id=classroom.id,
+                        date=first_date,
+                    )
+                )
+
+        def open_classroom_in_transaction(student_count):
+            with storage_handler.transaction():
+                open_classroom(student_count)
+
+        student_count = min(300, scale.students)
+        yield case(
+            f"classrooms.open_classroom[{student_count} students]",
+            lambda: open_classroom(student_count),
+        )
+        yield case(
+            f"classrooms.open_classroom[{student_count} students, transaction]",
+            lambda: open_classroom_in_transaction(student_count),
+        )
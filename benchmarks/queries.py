@@ -0,0 +1,81 @@
+import random
+from itertools import cycle
+from typing import Iterator
+
+from sqlmodel import Session, select
+
+from benchmarks.harness import BenchmarkContext, BenchmarkResult, measure
+from src.common.models import AttendenceRecord, DegreeName, Subject
+from src.common.storage.db_storage import DBStorageHandler
+from src.common.storage.statement_cache import StatementCache
+
+
+def run(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """Benchmark the per-call overhead of ad hoc and cached statements.
+
+    Every lookup runs once with conditions built on every call (get_all_where) and
+    once with a cached statement (get_all_by). The lookups return few rows, so the
+    time spent building and compiling the statement dominates.
+
+    Args:
+        context (BenchmarkContext): Populated database and run settings
+
+    Yields:
+        BenchmarkResult: Timings of every case
+    """
+    scale = context.scale
+    rows = scale.total
+    rng = random.Random(0)
+    student_ids = cycle(
+        rng.sample(range(1, scale.students + 1), min(scale.students, 1000))
+    )
+    statement_cache = StatementCache()
+
+    with Session(context.engine) as session:
+        storage_handler = DBStorageHandler(session, statement_cache=statement_cache)
+        first_date = session.exec(select(AttendenceRecord.date)).first()
+
+        def case(name, function):
+            def wrapper():
+                function()
+                # Every request gets a new session, don't let the identity map serve reads
+                session.expunge_all()
+
+            return measure(name, wrapper, rows, calls=100, repeat=context.repeat)
+
+        lookups = {
+            "subjects_in_degree": (
+                lambda: storage_handler.get_all_where(
+                    Subject,
+                    [Subject.degree == DegreeName.bachelor, Subject.semester == 3],
+                ),
+                lambda: storage_handler.get_all_by(
+                    Subject, degree=DegreeName.bachelor, semester=3
+                ),
+            ),
+            "attendence_by_student": (
+                lambda: storage_handler.get_all_where(
+                    AttendenceRecord,
+                    [AttendenceRecord.student_id == next(student_ids)],
+                ),
+                lambda: storage_handler.get_all_by(
+                    AttendenceRecord, student_id=next(student_ids)
+                ),
+            ),
+            "attendence_by_date": (
+                lambda: storage_handler.get_all_where(
+                    AttendenceRecord, [AttendenceRecord.date == first_date]
+                ),
+                lambda: storage_handler.get_all_by(AttendenceRecord, date=first_date),
+            ),
+        }
+
+        for name, (adhoc, cached) in lookups.items():
+            yield case(f"queries.adhoc[{name}]", adhoc)
+            yield case(f"queries.cached[{name}]", cached)
+
+    context.metadata["statement_cache"] = {
+        "hits": statement_cache.hits,
+        "misses": statement_cache.misses,
+        "hit_rate": statement_cache.hit_rate,
+    }
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from typing import Iterator
+
+from benchmarks.harness import BenchmarkContext, BenchmarkResult, measure
+
+# Name of the case -> command line of the CLI
+COMMAND_LINES = {
+    "cli.startup[--help]": ["--help"],
+    "cli.startup[students --help]": ["students", "--help"],
+    "cli.startup[students get --id 1]": ["students", "get", "--id", "1"],
+}
+
+
+def run(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """Benchmark how long the teilnahme CLI takes from start to exit.
+
+    Every case starts a new interpreter, exactly like a script calling the CLI in a loop.
+
+    Args:
+        context (BenchmarkContext): Populated database and run settings
+
+    Yields:
+        BenchmarkResult: Timings of every case
+    """
+    env = {
+        **os.environ,
+        "DATABASE_URL": context.engine.url.render_as_string(hide_password=False),
+    }
+    # ENVIRONMENT=development forces the local SQLite file instead of DATABASE_URL
+    env.pop("ENVIRONMENT", None)
+
+    for name, argv in COMMAND_LINES.items():
+        yield measure(
+            name,
+            lambda: subprocess.run(
+                [sys.executable, "-m", "src.cli.cli", *argv],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            ),
+            context.scale.total,
+            repeat=context.repeat,
+        )
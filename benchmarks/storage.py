@@ -0,0 +1,195 @@
+import csv
+import os
+import random
+from datetime import datetime
+from itertools import count, cycle
+from typing import Iterator
+
+from sqlmodel import Session, delete
+
+from benchmarks.data import generate_students
+from benchmarks.harness import BenchmarkContext, BenchmarkResult, measure
+from src.common.models import AttendenceRecord, DegreeName, Student
+from src.common.storage.csv_storage import CSVStorageHandler
+from src.common.storage.db_storage import DBStorageHandler, WriteMode
+
+# CSVStorageHandler rewrites the whole file on every call, bigger files only take longer
+CSV_MAX_ROWS = 100_000
+
+
+def run(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """Benchmark DBStorageHandler and CSVStorageHandler.
+
+    Args:
+        context (BenchmarkContext): Populated database and run settings
+
+    Yields:
+        BenchmarkResult: Timings of every case
+    """
+    yield from run_db_storage(context)
+    yield from run_csv_storage(context)
+
+
+def run_db_storage(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    scale = context.scale
+    rows = scale.total
+    rng = random.Random(0)
+    student_ids = cycle(
+        rng.sample(range(1, scale.students + 1), min(scale.students, 1000))
+    )
+
+    with Session(context.engine) as session:
+        storage_handler = DBStorageHandler(session)
+
+        def clean(function):
+            # Every request gets a new session, don't let the identity map serve reads
+            def wrapper():
+                function()
+                session.expunge_all()
+
+            return wrapper
+
+        yield measure(
+            "db.get_all[Student]",
+            clean(lambda: storage_handler.get_all(Student)),
+            rows,
+            repeat=context.repeat,
+        )
+        yield measure(
+            "db.get_by_id[Student]",
+            clean(lambda: storage_handler.get_by_id(next(student_ids), Student)),
+            rows,
+            calls=100,
+            repeat=context.repeat,
+        )
+        yield measure(
+            "db.get_all_where[Student]",
+            clean(
+                lambda: storage_handler.get_all_where(
+                    Student,
+                    [Student.degree == DegreeName.master, Student.semester == 2],
+                )
+            ),
+            rows,
+            repeat=context.repeat,
+        )
+        yield measure(
+            "db.get_all_where[AttendenceRecord]",
+            clean(
+                lambda: storage_handler.get_all_where(
+                    AttendenceRecord,
+                    [AttendenceRecord.classroom_id == rng.randint(1, scale.classrooms)],
+                )
+            ),
+            rows,
+            calls=10,
+            repeat=context.repeat,
+        )
+
+        created_ids = []
+
+        def create(handler):
+            def create_record():
+                record = handler.create(
+                    AttendenceRecord(
+                        student_id=next(student_ids),
+                        classroom_id=rng.randint(1, scale.classrooms),
+                        date=datetime.now(),
+                    )
+                )
+                created_ids.append(record.id)
+
+            return create_record
+
+        def update(handler):
+            def update_student():
+                id = next(student_ids)
+                handler.update(id, Student(id=id, semester=rng.randint(1, 4)))
+
+            return update_student
+
+        # The refresh cases keep their original names, so they compare with older runs
+        for write_mode, suffix in [
+            (WriteMode.refresh, ""),
+            (WriteMode.returning, ", returning"),
+        ]:
+            handler = DBStorageHandler(session, write_mode=write_mode)
+            yield measure(
+                f"db.create[AttendenceRecord{suffix}]",
+                clean(create(handler)),
+                rows,
+                calls=100,
+                repeat=context.repeat,
+            )
+            yield measure(
+                f"db.update[Student{suffix}]",
+                clean(update(handler)),
+                rows,
+                calls=100,
+                repeat=context.repeat,
+            )
+
+        yield measure(
+            "db.delete[AttendenceRecord]",
+            clean(lambda: storage_handler.delete(created_ids.pop(), AttendenceRecord)),
+            rows,
+            calls=100,
+            repeat=context.repeat,
+        )
+
+        # Delete the rest of the records created above, so the dataset stays the same
+        # between runs
+        session.exec(
+            delete(AttendenceRecord).where(AttendenceRecord.id.in_(created_ids))
+        )
+        session.commit()
+
+
+def run_csv_storage(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    rows = min(context.scale.students, CSV_MAX_ROWS)
+    file_path = os.path.join(context.workdir, "students.csv")
+
+    with open(file_path, mode="w", newline="") as file:
+        writer = csv.DictWriter(
+            file, fieldnames=["id", "name", "surname", "degree", "semester"]
+        )
+        writer.writeheader()
+        for student in generate_students(rows):
+            writer.writerow({**student, "degree": student["degree"].value})
+
+    storage_handler = CSVStorageHandler(file_path)
+    new_ids = count(rows + 1)
+    existing_ids = cycle(random.Random(0).sample(range(1, rows + 1), min(rows, 1000)))
+
+    yield measure("csv.load", storage_handler.load, rows, repeat=context.repeat)
+    yield measure(
+        "csv.generate_id", storage_handler.generate_id, rows, repeat=context.repeat
+    )
+
+    def save():
+        id = next(new_ids)
+        storage_handler.save(
+            {
+                "id": id,
+                "name": f"Anna{id}",
+                "surname": "Nowak",
+                "degree": DegreeName.bachelor.value,
+                "semester": 1,
+            }
+        )
+
+    yield measure("csv.save", save, rows, calls=10, repeat=context.repeat)
+    yield measure(
+        "csv.update",
+        lambda: storage_handler.update(next(existing_ids), {"semester": "3"}),
+        rows,
+        calls=10,
+        repeat=context.repeat,
+    )
+    yield measure(
+        "csv.delete",
+        lambda: storage_handler.delete(next(existing_ids)),
+        rows,
+        calls=10,
+        repeat=context.repeat,
+    )
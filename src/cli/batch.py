@@ -0,0 +1,161 @@
+import argparse
+import os
+import shlex
+import sys
+import time
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple
+
+from rich.console import Console
+from rich.markup import escape
+from sqlmodel import Session
+
+
+class CommandFailed(Exception):
+    """A command handler reported an error and returned a non-zero status."""
+
+
+@dataclass
+class BatchSummary:
+    """Outcome of a batch run.
+
+    Attributes:
+        commands (int): Number of commands executed
+        commits (int): Number of commits issued
+        elapsed (float): Seconds the batch took
+        failures (List[Tuple[int, str, str]]): Line number, command and error of every
+            command that failed
+    """
+
+    commands: int = 0
+    commits: int = 0
+    elapsed: float = 0.0
+    failures: List[Tuple[int, str, str]] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return self.commands - len(self.failures)
+
+    @property
+    def throughput(self) -> float:
+        return self.commands / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class BatchRunner:
+    """Run many CLI commands in one process over one database session.
+
+    Every command runs in its own savepoint, so a failing command is rolled back
+    alone and the commands around it still get committed. A command fails when it
+    raises or when its handler returns a non-zero status after printing an error,
+    e.g. for a student that doesn't exist.
+
+    Attributes:
+        parser (argparse.ArgumentParser): Parser with all commands set up over a storage
+            handler that shares session and doesn't commit on its own
+        session (Session): The shared database session
+        commit_every (int): Commit after this many commands, 0 commits once at the end
+        stop_on_error (bool): Stop at the first failing command
+        quiet (bool): Hide the regular output of the commands, errors are still shown
+    """
+
+    parser: argparse.ArgumentParser
+    session: Session
+    commit_every: int = 1
+    stop_on_error: bool = False
+    quiet: bool = False
+
+    def run(self, lines: Iterable[str]) -> BatchSummary:
+        """Execute commands, one per line.
+
+        Empty lines and lines starting with # are skipped. A line is split like a shell
+        would, e.g. `students add --name "Anna Maria" --surname Nowak ...`.
+
+        Args:
+            lines (Iterable[str]): Command lines without the program name
+
+        Returns:
+            BatchSummary: Number of commands, commits, failures and timing
+        """
+        summary = BatchSummary()
+        pending = 0
+        started = time.perf_counter()
+        output = open(os.devnull, "w") if self.quiet else nullcontext(sys.stdout)
+
+        with output as stdout:
+            for line_number, line in enumerate(lines, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+
+                summary.commands += 1
+                error = self._execute(line, stdout)
+                if error is not None:
+                    summary.failures.append((line_number, line, error))
+                    if self.stop_on_error:
+                        break
+                    continue
+
+                pending += 1
+                if self.commit_every and pending >= self.commit_every:
+                    self.session.commit()
+                    summary.commits += 1
+                    pending = 0
+
+        if pending:
+            self.session.commit()
+            summary.commits += 1
+
+        summary.elapsed = time.perf_counter() - started
+        return summary
+
+    def _execute(self, line: str, stdout) -> str | None:
+        """Execute a single command line.
+
+        Args:
+            line (str): The command line
+            stdout: File the regular output of the command goes to
+
+        Returns:
+            str | None: Error message when the command failed, None otherwise
+        """
+        try:
+            args = self.parser.parse_args(shlex.split(line))
+        except SystemExit as e:
+            # argparse already printed the usage error
+            return None if e.code == 0 else "invalid command"
+        except ValueError as e:
+            return str(e)
+
+        if not hasattr(args, "func"):
+            return "no command to execute"
+
+        try:
+            with redirect_stdout(stdout), self.session.begin_nested():
+                status = args.func(args)
+                if status:
+                    # Leaving the savepoint with an exception rolls it back
+                    raise CommandFailed(f"exit status {status}")
+        except CommandFailed as e:
+            # The handler already printed the error
+            return f"command failed with {e}"
+        except Exception as e:
+            # Database errors carry the SQL on the next lines, the first one is enough
+            message = str(e).splitlines()[0] if str(e) else ""
+            return f"{type(e).__name__}: {message}" if message else type(e).__name__
+
+        return None
+
+
+def display_summary(console: Console, summary: BatchSummary):
+    console.print(
+        f"[green]{summary.succeeded}/{summary.commands} commands succeeded[/green] "
+        f"in {summary.elapsed:.2f}s ({summary.throughput:,.0f} commands/s, "
+        f"{summary.commits} commits)"
+    )
+
+    for line_number, line, error in summary.failures:
+        console.print(
+            f"[red]Line {line_number}: {escape(line)} -> {escape(error)}[/red]"
+        )
@@ -1,51 +1,309 @@
 import argparse
+import os
+import sys
 
-from sqlmodel import Session
+# Only the standard library is imported up front. Parsers, operations, rich and SQLModel
+# are imported by the command that needs them, so `teilnahme --help` starts instantly.
 
-from src.cli.parsers.attendence_parser import AttendenceParser
-from src.cli.parsers.classrooms_parser import ClassroomsParser
-from src.cli.parsers.students_parser import StudentsParser
-from src.cli.parsers.subjects_parser import SubjectsParser
-from src.common.storage.db_storage import DBStorageHandler, create_db_and_tables, engine
-from src.common.storage.storage import NewStorageHandler
-from src.modules.attendence_operations import AttendenceOperations
-from src.modules.classrooms_operations import ClassroomsOperations
-from src.modules.students_operations import StudentsOperations
-from src.modules.subjects_operations import SubjectsOperations
 
+def setup_students_commands(subparser, storage_handler):
+    from src.cli.parsers.students_parser import StudentsParser
 
-def setup_parsers(storage_handler: NewStorageHandler):
-    parser = argparse.ArgumentParser(description="Attendance Management System 🏫")
-    subparser = parser.add_subparsers(dest="command")
+    def create_students_operations():
+        from src.modules.students_operations import StudentsOperations
+
+        return StudentsOperations(storage_handler)
 
-    students_operations = StudentsOperations(storage_handler)
-    students_parser = StudentsParser(students_operations)
+    # The operations pull in SQLModel, `teilnahme students --help` doesn't need them
+    students_parser = StudentsParser(LazyProxy(create_students_operations))
     students_parser.setup_students_parsers(subparser)
 
+
+def setup_subjects_commands(subparser, storage_handler):
+    from src.cli.parsers.subjects_parser import SubjectsParser
+    from src.modules.subjects_operations import SubjectsOperations
+
     subjects_parser = SubjectsParser(SubjectsOperations(storage_handler))
     subjects_parser.setup_subjects_parsers(subparser)
 
+
+def setup_classrooms_commands(subparser, storage_handler):
+    from src.cli.parsers.classrooms_parser import ClassroomsParser
+    from src.modules.classrooms_operations import ClassroomsOperations
+    from src.modules.students_operations import StudentsOperations
+
     classrooms_parser = ClassroomsParser(
-        ClassroomsOperations(storage_handler, students_operations)
+        ClassroomsOperations(storage_handler, StudentsOperations(storage_handler))
     )
     classrooms_parser.setup_classrooms_parsers(subparser)
 
-    attendence_parser = AttendenceParser(AttendenceOperations(storage_handler))
+
+def setup_attendence_commands(subparser, storage_handler):
+    from src.cli.parsers.attendence_parser import AttendenceParser
+    from src.common.dedup import DedupWindow
+    from src.modules.attendence_operations import AttendenceOperations
+
+    # One window for every command of a batch or shell, like one per server worker
+    attendence_parser = AttendenceParser(
+        AttendenceOperations(storage_handler, DedupWindow())
+    )
     attendence_parser.setup_attendence_parsers(subparser)
 
+
+def setup_lectures_commands(subparser, storage_handler):
+    from src.cli.parsers.lectures_parser import LecturesParser
+    from src.modules.lectures_operations import LecturesOperations
+
+    lectures_parser = LecturesParser(LecturesOperations(storage_handler))
+    lectures_parser.setup_lectures_parsers(subparser)
+
+
+def setup_changes_commands(subparser, storage_handler):
+    from src.cli.parsers.changes_parser import ChangesParser
+    from src.modules.changes_operations import ChangesOperations
+
+    changes_parser = ChangesParser(ChangesOperations(storage_handler))
+    changes_parser.setup_changes_parsers(subparser)
+
+
+def setup_batch_commands(subparser, storage_handler):
+    batch_parser = subparser.add_parser(
+        "batch", help="Run many commands from a file in one session"
+    )
+    batch_parser.add_argument(
+        "file",
+        nargs="?",
+        default="-",
+        help="File with one command per line, e.g. `students get --id 1` (default: stdin)",
+    )
+    batch_parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=100,
+        help="Commit after this many commands, 0 commits once at the end",
+    )
+    batch_parser.add_argument(
+        "--stop-on-error", action="store_true", help="Stop at the first failing command"
+    )
+    batch_parser.add_argument(
+        "--quiet", action="store_true", help="Only print errors and the summary"
+    )
+    batch_parser.set_defaults(func=lambda args: handle_batch(args, storage_handler))
+
+
+def handle_batch(args, storage_handler):
+    from rich.console import Console
+
+    from src.cli.batch import BatchRunner, display_summary
+
+    # Commands only flush, the runner decides when to commit
+    storage_handler.autocommit = False
+    runner = BatchRunner(
+        parser=setup_parsers(storage_handler, commands=SESSION_COMMANDS),
+        session=storage_handler.session,
+        commit_every=args.commit_every,
+        stop_on_error=args.stop_on_error,
+        quiet=args.quiet,
+    )
+
+    if args.file == "-":
+        summary = runner.run(sys.stdin)
+    else:
+        with open(args.file) as file:
+            summary = runner.run(file)
+
+    display_summary(Console(stderr=True), summary)
+    if summary.failures:
+        sys.exit(1)
+
+
+def setup_shell_commands(subparser, storage_handler):
+    shell_parser = subparser.add_parser(
+        "shell", help="Interactive shell keeping the database connection warm"
+    )
+    shell_parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=60,
+        help="Seconds lookups stay cached (default: 60)",
+    )
+    shell_parser.add_argument(
+        "--no-cache", action="store_true", help="Always read from the database"
+    )
+    shell_parser.add_argument(
+        "--timing", action="store_true", help="Print how long every command took"
+    )
+    shell_parser.set_defaults(func=lambda args: handle_shell(args, storage_handler))
+
+
+def handle_shell(args, storage_handler):
+    from src.cli.shell import Shell
+    from src.common.storage.cached_storage import CachedStorageHandler
+    from src.common.storage.invalidation import InvalidationBus, latest_seq
+
+    session = storage_handler.session
+    cache = None
+    # Changes of other processes, e.g. the server, are read before every command
+    bus = InvalidationBus(latest_seq(storage_handler))
+    if not args.no_cache:
+        # Writes invalidate the cache, keep the cached models loaded after a commit
+        # instead of reloading them on the next access
+        session.expire_on_commit = False
+        cache = CachedStorageHandler(storage_handler, ttl=args.cache_ttl)
+        bus.subscribe(cache.invalidate_changes)
+
+    shell = Shell(
+        parser=setup_parsers(cache or storage_handler, commands=SESSION_COMMANDS),
+        session=session,
+        cache=cache,
+        bus=bus,
+        timing=args.timing,
+    )
+    try:
+        shell.cmdloop()
+    except KeyboardInterrupt:
+        print()
+
+
+# Command name -> (help shown in the command list, function setting up its parsers)
+COMMANDS = {
+    "students": ("Manage students", setup_students_commands),
+    "subjects": ("Manage subjects", setup_subjects_commands),
+    "classrooms": ("Manage classrooms", setup_classrooms_commands),
+    "attendance": ("Manage attendance records", setup_attendence_commands),
+    "lectures": ("Manage lectures of classrooms", setup_lectures_commands),
+    "changes": ("Show the changes after a sequence number", setup_changes_commands),
+    "batch": ("Run many commands from a file in one session", setup_batch_commands),
+    "shell": (
+        "Interactive shell keeping the database connection warm",
+        setup_shell_commands,
+    ),
+}
+
+# Commands available inside a batch or the shell
+SESSION_COMMANDS = {
+    "students",
+    "subjects",
+    "classrooms",
+    "attendance",
+    "lectures",
+    "changes",
+}
+
+
+def setup_parsers(storage_handler, commands=None):
+    """Set up the argument parser.
+
+    Args:
+        storage_handler (NewStorageHandler): Storage handler used by the commands
+        commands (set[str] | None, optional): Commands to set up completely, the other
+            ones are only listed with their help and nothing is imported for them.
+            Defaults to None, which sets up every command.
+
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(description="Attendance Management System 🏫")
+    subparser = parser.add_subparsers(dest="command")
+
+    for name, (help, setup_commands) in COMMANDS.items():
+        if commands is None or name in commands:
+            setup_commands(subparser, storage_handler)
+        else:
+            subparser.add_parser(name, help=help)
+
     return parser
 
 
-def main():
-    create_db_and_tables()
-    session = Session(engine)
-    storage_handler = DBStorageHandler(session=session)
-    parser = setup_parsers(storage_handler)
+def find_command(argv):
+    """Find the command (e.g. "students") a command line is about.
+
+    Args:
+        argv (list[str]): Command line arguments without the program name
+
+    Returns:
+        str | None: Name of the command, None when there is no known command
+    """
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg if arg in COMMANDS else None
+
+    return None
 
-    args = parser.parse_args()
+
+def create_storage_handler():
+    from src.common.storage.db_storage import DBStorageHandler, create_session
+
+    return DBStorageHandler(session=create_session())
+
+
+class LazyProxy:
+    """Object created by a factory on first use.
+
+    Attributes are read from and written to the created object.
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_handler", None)
+
+    @property
+    def handler(self):
+        if self._handler is None:
+            object.__setattr__(self, "_handler", self._factory())
+        return self._handler
+
+    def __getattr__(self, name):
+        return getattr(self.handler, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.handler, name, value)
+
+
+class LazyStorageHandler(LazyProxy):
+    """Storage handler connecting to the database on first use.
+
+    The parsers are set up with it, so `teilnahme students --help` and usage errors
+    exit before a session is created. Attributes are read from and written to the
+    real handler.
+    """
+
+    def __init__(self, factory=create_storage_handler):
+        super().__init__(factory)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = find_command(argv)
+
+    # Without a known command argparse only prints help or an error, skip the database
+    storage_handler = LazyStorageHandler() if command else None
+    parser = setup_parsers(storage_handler, commands={command} if command else set())
+
+    args = parser.parse_args(argv)
 
     if hasattr(args, "func"):
-        args.func(args)
+        from src.common.storage.db_storage import (
+            OutdatedSchemaError,
+            create_db_and_tables,
+        )
+
+        # The schema is created before the handler opens its session on first use
+        try:
+            create_db_and_tables()
+        except OutdatedSchemaError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        try:
+            # Handlers return a non-zero status after printing an error
+            status = args.func(args)
+        except BrokenPipeError:
+            # Output piped into e.g. `head` was closed early, stop writing to it quietly
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            sys.exit(1)
+        if status:
+            sys.exit(status)
     else:
         parser.print_help()
 
@@ -4,9 +4,18 @@ from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 
+from src.cli.rendering import Column, RowsRenderer, add_output_arguments
 from src.common.errors import NotFoundError
 from src.common.models import AttendenceRecord
-from src.modules.attendence_operations import AttendenceOperations
+from src.modules.attendence_operations import AttendenceDataError, AttendenceOperations
+
+ATTENDENCE_COLUMNS = [
+    Column("id", "ID", "cyan"),
+    Column("date", "Date", "green"),
+    Column("classroom_id", "Classroom ID", "yellow"),
+    Column("student_id", "Student ID", "magenta"),
+    Column("lecture_id", "Lecture ID", "blue"),
+]
 
 
 @dataclass
@@ -21,83 +30,60 @@ class AttendenceParser:
         table.add_column("Date", style="green")
         table.add_column("Classroom ID", style="yellow")
         table.add_column("Student ID", style="magenta")
+        table.add_column("Lecture ID", style="blue")
 
         table.add_row(
             str(attendence_record.id),
             str(attendence_record.date),
             str(attendence_record.classroom_id),
             str(attendence_record.student_id),
+            str(attendence_record.lecture_id),
         )
         self.console.print(table)
 
-    def _display_attendence_records(self, attendence_records):
-        if len(attendence_records) == 0:
-            self.error_console.print("[red]No attendence records found[/red]")
-            return
-
-        table = Table(show_header=True)
-        table.add_column("ID", style="cyan")
-        table.add_column("Date", style="green")
-        table.add_column("Classroom ID", style="yellow")
-        table.add_column("Student ID", style="magenta")
-
-        for attendence_record in attendence_records:
-            table.add_row(
-                str(attendence_record.id),
-                str(attendence_record.date),
-                str(attendence_record.classroom_id),
-                str(attendence_record.student_id),
-            )
-        self.console.print(table)
-
     def handle_attendence_records_get(self, args):
-        if args.classroom_id is None and args.student_id is None and args.date is None:
+        if (
+            args.lecture_id is None
+            and args.classroom_id is None
+            and args.student_id is None
+            and args.date is None
+            and args.since is None
+            and args.until is None
+        ):
             self.console.print(
-                "[green] You must pass one of the following arguments: --classroom-id, --student-id, --date[/green]"
+                "[green] You must pass one of the following arguments: --lecture-id, --classroom-id, --student-id, --date, --since, --until[/green]"
             )
             return
 
-        if args.classroom_id is not None:
-            attendence_records = (
-                self.attendence_operations.get_attendence_records_by_classroom(
-                    args.classroom_id
-                )
+        if args.lecture_id is not None:
+            filters = {"lecture_id": args.lecture_id}
+            not_found = (
+                f"No attendence records found for lecture with ID: {args.lecture_id}"
             )
-
-            if len(attendence_records) == 0:
-                self.error_console.print(
-                    f"[red]No attendence records found for classroom with ID: {args.classroom_id}[/red]"
-                )
-            else:
-                self._display_attendence_records(attendence_records)
-            return
-
-        if args.student_id is not None:
-            attendence_records = (
-                self.attendence_operations.get_attendence_records_by_student(
-                    args.student_id
-                )
+        elif args.classroom_id is not None:
+            filters = {"classroom_id": args.classroom_id}
+            not_found = f"No attendence records found for classroom with ID: {args.classroom_id}"
+        elif args.student_id is not None:
+            filters = {"student_id": args.student_id}
+            not_found = (
+                f"No attendence records found for student with ID: {args.student_id}"
             )
+        elif args.date is not None:
+            filters = {"date": args.date}
+            not_found = f"No attendence records found for date {args.date}"
+        else:
+            filters = {}
+            not_found = "No attendence records found in the date range"
 
-            if len(attendence_records) == 0:
-                self.error_console.print(
-                    f"[red]No attendence records found for student with ID: {args.student_id}[/red]"
-                )
-            else:
-                self._display_attendence_records(attendence_records)
-            return
-
-        if args.date is not None:
-            attendence_records = (
-                self.attendence_operations.get_attendence_records_by_date(args.date)
-            )
+        # Raw column values are streamed to the output while they are fetched, no
+        # AttendenceRecord models are built
+        renderer = RowsRenderer(ATTENDENCE_COLUMNS, self.console, args.page_size)
+        rows = self.attendence_operations.iter_attendence_record_values(
+            renderer.fields, since=args.since, until=args.until, **filters
+        )
 
-            if len(attendence_records) == 0:
-                self.error_console.print(
-                    f"[red]No attendence records found for date {args.date}[/red]"
-                )
-            else:
-                self._display_attendence_records(attendence_records)
+        if renderer.render_rows(rows, args.output) == 0:
+            self.error_console.print(f"[red]{not_found}[/red]")
 
     def handle_attendence_records_add(self, args):
         attendence_record = AttendenceRecord(
@@ -106,7 +92,15 @@ class AttendenceParser:
             student_id=args.student_id,
         )
 
-        self.attendence_operations.add_attendence_record(attendence_record)
+        try:
+            attendence_record = self.attendence_operations.add_attendence_record(
+                attendence_record
+            )
+        except AttendenceDataError as e:
+            # Missing student or classroom, or the attendance is already stored
+            self.error_console.print(f"[red]{e}[/red]")
+            return 1
+
         self.console.print(
             f"[green]Attendence record with ID {attendence_record.id} added[/green]"
         )
@@ -123,6 +117,20 @@ class AttendenceParser:
             self.error_console.print(
                 f"[red]Attendence record with ID {args.id} not found[/red]"
             )
+            return 1
+
+    def handle_attendence_records_archive(self, args):
+        archives = self.attendence_operations.archive_attendence_records(
+            args.before, args.directory
+        )
+        if not archives:
+            self.console.print(
+                f"[yellow]No attendence records before {args.before:%Y-%m} to archive[/yellow]"
+            )
+            return
+
+        for archive in archives:
+            self.console.print(f"[green]{archive}[/green]")
 
     def setup_attendence_parsers(self, subparser):
         attendence_parser = subparser.add_parser(
@@ -136,7 +144,13 @@ class AttendenceParser:
 
         # Get attendance records
         attendence_get_parser = attendence_subparser.add_parser(
-            "get", help="Get attendance records"
+            "get",
+            help="Get attendance records",
+            description="Get attendance records. Archived months are only read when "
+            "--date, --since or --until selects them.",
+        )
+        attendence_get_parser.add_argument(
+            "--lecture-id", type=int, help="Get records for lecture"
         )
         attendence_get_parser.add_argument(
             "--classroom-id", type=int, help="Get records for classroom"
@@ -149,6 +163,17 @@ class AttendenceParser:
             type=lambda s: datetime.strptime(s, "%Y-%m-%d %H:%M:%S"),
             help="Get records for date (format: YYYY-MM-DD HH:MM:SS)",
         )
+        attendence_get_parser.add_argument(
+            "--since",
+            type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+            help="Get records at or after date, archived ones included (format: YYYY-MM-DD)",
+        )
+        attendence_get_parser.add_argument(
+            "--until",
+            type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+            help="Get records before date, archived ones included (format: YYYY-MM-DD)",
+        )
+        add_output_arguments(attendence_get_parser)
         attendence_get_parser.set_defaults(
             func=lambda args: self.handle_attendence_records_get(args)
         )
@@ -182,3 +207,22 @@ class AttendenceParser:
         attendence_delete_parser.set_defaults(
             func=lambda args: self.handle_attendence_records_delete(args)
         )
+
+        # Archive attendance records
+        attendence_archive_parser = attendence_subparser.add_parser(
+            "archive", help="Move records of old months to compressed files"
+        )
+        attendence_archive_parser.add_argument(
+            "--before",
+            required=True,
+            type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+            help="Archive the months ending before date (format: YYYY-MM-DD)",
+        )
+        attendence_archive_parser.add_argument(
+            "--directory",
+            default="archive",
+            help="Directory of the archive files (default: archive)",
+        )
+        attendence_archive_parser.set_defaults(
+            func=lambda args: self.handle_attendence_records_archive(args)
+        )
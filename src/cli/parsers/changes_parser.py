@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+from rich.console import Console
+
+from src.cli.rendering import Column, RowsRenderer, add_output_arguments
+from src.modules.changes_operations import ChangesOperations
+
+CHANGES_COLUMNS = [
+    Column("seq", "Seq", "cyan"),
+    Column("table_name", "Table", "magenta"),
+    Column("operation", "Operation", "yellow"),
+    Column("row_id", "Row ID", "cyan"),
+    Column("changed_at", "Changed at", "blue"),
+    Column("data", "Data", "green"),
+]
+
+
+@dataclass
+class ChangesParser:
+    changes_operations: ChangesOperations
+    console = Console()
+    error_console = Console(stderr=True)
+
+    def handle_changes(self, args):
+        renderer = RowsRenderer(CHANGES_COLUMNS, self.console, args.page_size)
+        changes = self.changes_operations.iter_changes_since(args.since, args.table)
+
+        if renderer.render(changes, args.output) == 0:
+            self.error_console.print(f"[yellow]No changes after {args.since}[/yellow]")
+
+    def handle_changes_prune(self, args):
+        pruned = self.changes_operations.prune_changes(args.before_seq)
+        self.console.print(
+            f"[green]Pruned {pruned} changes before {args.before_seq}[/green]"
+        )
+
+    def setup_changes_parsers(self, subparser):
+        changes_parser = subparser.add_parser(
+            "changes", help="Show the changes after a sequence number"
+        )
+        changes_parser.add_argument(
+            "--since",
+            type=int,
+            default=0,
+            help="Sequence number of the last seen change (default: 0, every change)",
+        )
+        changes_parser.add_argument(
+            "--table", type=str, help="Only changes of this table, e.g. student"
+        )
+        add_output_arguments(changes_parser)
+        changes_parser.set_defaults(func=lambda args: self.handle_changes(args))
+        changes_subparser = changes_parser.add_subparsers(
+            title="Changes Commands",
+            help="Commands for managing the change log",
+            dest="changes_command",
+        )
+
+        # Prune changes
+        changes_prune_parser = changes_subparser.add_parser(
+            "prune", help="Delete the changes before a sequence number"
+        )
+        changes_prune_parser.add_argument(
+            "--before-seq",
+            required=True,
+            type=int,
+            help="Sequence number of the first change to keep, the lowest one every "
+            "consumer has seen",
+        )
+        changes_prune_parser.set_defaults(
+            func=lambda args: self.handle_changes_prune(args)
+        )
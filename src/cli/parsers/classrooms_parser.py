@@ -3,10 +3,23 @@ from dataclasses import dataclass
 from rich.console import Console
 from rich.table import Table
 
+from src.cli.rendering import Column, RowsRenderer, add_output_arguments
 from src.common.errors import NotFoundError
 from src.common.models import Classroom
 from src.modules.classrooms_operations import ClassroomsOperations
 
+CLASSROOM_COLUMNS = [
+    Column("id", "ID", "cyan"),
+    Column("subject_id", "Subject ID", "green"),
+    Column("students", "Students", "magenta"),
+]
+
+CLASSROOMS_COLUMNS = [
+    Column("id", "ID", "cyan"),
+    Column("subject_id", "Subject ID", "green"),
+    Column("student_count", "Students", "magenta"),
+]
+
 
 @dataclass
 class ClassroomsParser:
@@ -23,65 +36,55 @@ class ClassroomsParser:
         )  # Allow wrapping for student list
 
         # Format students list as comma-separated names
-        students_str = ", ".join(sorted(student.name for student in classroom.students))
+        names = sorted(student.name for student in classroom.students)
+        students_str = ", ".join(names)
 
         table.add_row(
             str(classroom.id),
             str(classroom.subject_id),
-            f"{len(classroom.students)} students: {students_str}",
+            f"{len(names)} students: {students_str}",
         )
         self.console.print(table)
 
-    def _display_classrooms(self, classrooms):
-        if len(classrooms) == 0:
-            self.error_console.print("[red]No classrooms found[/red]")
-            return
-
-        table = Table(show_header=True)
-        table.add_column("ID", style="cyan")
-        table.add_column("Subject ID", style="green")
-        table.add_column("Students", style="magenta")
-        for classroom in classrooms:
-            table.add_row(
-                str(classroom.id),
-                str(classroom.subject_id),
-                str(len(classroom.students)),
-            )
-        self.console.print(table)
-
     def handle_classrooms_get(self, args):
         if args.id is not None:
             try:
                 classroom = self.classrooms_operations.get_classroom(args.id)
-                self._display_classroom(classroom)
             except NotFoundError as e:
                 self.error_console.print(f"[red]{e}[/red]")
+                return 1
+
+            renderer = RowsRenderer(CLASSROOM_COLUMNS, self.console, args.page_size)
+            if renderer.resolve(args.output) == "table":
+                self._display_classroom(classroom)
+            else:
+                students = sorted(student.name for student in classroom.students)
+                renderer.render_rows(
+                    [(classroom.id, classroom.subject_id, students)], args.output
+                )
             return
 
         if args.subject_id is not None:
-            classrooms = self.classrooms_operations.get_classrooms_for_subject(
-                args.subject_id
-            )
-
-            if len(classrooms) == 0:
-                self.error_console.print(
-                    f"[red]No classrooms found for subject with id: {args.subject_id}[/red]"
-                )
-                return
+            not_found = f"No classrooms found for subject with id: {args.subject_id}"
         elif args.student_id is not None:
-            classrooms = self.classrooms_operations.get_classrooms_where_student(
-                args.student_id
-            )
-
-            if len(classrooms) == 0:
-                self.error_console.print(
-                    f"[red]No classrooms found for student with id: {args.student_id}[/red]"
-                )
-                return
+            not_found = f"No classrooms found for student with id: {args.student_id}"
         else:
-            classrooms = self.classrooms_operations.get_classrooms()
+            not_found = "No classrooms found"
+
+        # Two queries for the whole list: the classroom columns and the student counts
+        # grouped by classroom, no Classroom models or student lists are loaded
+        filters = {"subject_id": args.subject_id, "student_id": args.student_id}
+        counts = self.classrooms_operations.count_students_by_classroom(**filters)
+        rows = (
+            (id, subject_id, counts.get(id, 0))
+            for id, subject_id in self.classrooms_operations.iter_classroom_values(
+                ["id", "subject_id"], **filters
+            )
+        )
 
-        self._display_classrooms(classrooms)
+        renderer = RowsRenderer(CLASSROOMS_COLUMNS, self.console, args.page_size)
+        if renderer.render_rows(rows, args.output) == 0:
+            self.error_console.print(f"[red]{not_found}[/red]")
 
     def handle_classrooms_add(self, args):
         classroom = Classroom(subject_id=args.subject_id)
@@ -94,6 +97,7 @@ class ClassroomsParser:
             self.console.print(f"[green]Deleted classroom with id: {args.id}[/green]")
         except NotFoundError as e:
             self.error_console.print(f"[red]{e}[/red]")
+            return 1
 
     def handle_classrooms_update(self, args):
         update_data = {}
@@ -107,6 +111,7 @@ class ClassroomsParser:
                 )
             except NotFoundError as e:
                 self.error_console.print(f"[red]{e}[/red]")
+                return 1
 
     def add_student_to_classroom(self, args):
         try:
@@ -118,6 +123,7 @@ class ClassroomsParser:
             )
         except NotFoundError as e:
             self.error_console.print(f"[red]{e}[/red]")
+            return 1
 
     def delete_student_from_classroom(self, args):
         try:
@@ -129,6 +135,7 @@ class ClassroomsParser:
             )
         except NotFoundError as e:
             self.error_console.print(f"[red]{e}[/red]")
+            return 1
 
     def setup_classrooms_parsers(self, subparser):
         classrooms_parser = subparser.add_parser("classrooms", help="Manage classrooms")
@@ -149,6 +156,7 @@ class ClassroomsParser:
         classrooms_get_parser.add_argument(
             "--student-id", type=int, help="Get classrooms containing student"
         )
+        add_output_arguments(classrooms_get_parser)
         classrooms_get_parser.set_defaults(
             func=lambda args: self.handle_classrooms_get(args)
         )
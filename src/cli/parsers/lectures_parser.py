@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from rich.console import Console
+
+from src.cli.rendering import Column, RowsRenderer, add_output_arguments
+from src.common.errors import NotFoundError
+from src.common.models import Lecture
+from src.modules.lectures_operations import LecturesOperations, LectureValidationError
+
+LECTURES_COLUMNS = [
+    Column("id", "ID", "cyan"),
+    Column("classroom_id", "Classroom ID", "yellow"),
+    Column("start", "Start", "green"),
+    Column("end", "End", "green"),
+]
+
+
+def _datetime(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class LecturesParser:
+    lectures_operations: LecturesOperations
+    console = Console()
+    error_console = Console(stderr=True)
+
+    def handle_lectures_get(self, args):
+        renderer = RowsRenderer(LECTURES_COLUMNS, self.console, args.page_size)
+
+        if args.id is not None:
+            try:
+                lectures = [self.lectures_operations.get_lecture(args.id)]
+            except NotFoundError as e:
+                self.error_console.print(f"[red]{e}[/red]")
+                return 1
+        elif args.classroom_id is not None:
+            lectures = self.lectures_operations.get_lectures_for_classroom(
+                args.classroom_id
+            )
+        else:
+            self.error_console.print(
+                "[red]You must pass one of the following arguments: --id, --classroom-id[/red]"
+            )
+            return 1
+
+        if renderer.render(lectures, args.output) == 0:
+            self.error_console.print("[red]No lectures found[/red]")
+
+    def handle_lectures_add(self, args):
+        try:
+            lecture = self.lectures_operations.add_lecture(
+                Lecture(classroom_id=args.classroom_id, start=args.start, end=args.end)
+            )
+        except LectureValidationError as e:
+            self.error_console.print(f"[red]{e}[/red]")
+            return 1
+
+        self.console.print(
+            f"[green]Added lecture with ID {lecture.id}: {lecture}[/green]"
+        )
+
+    def handle_lectures_delete(self, args):
+        try:
+            self.lectures_operations.delete_lecture(args.id)
+            self.console.print(f"[green]Deleted lecture with id: {args.id}[/green]")
+        except NotFoundError as e:
+            self.error_console.print(f"[red]{e}[/red]")
+            return 1
+
+    def setup_lectures_parsers(self, subparser):
+        lectures_parser = subparser.add_parser(
+            "lectures", help="Manage lectures of classrooms"
+        )
+        lectures_subparser = lectures_parser.add_subparsers(
+            title="Lectures Commands",
+            help="Commands for managing lectures",
+            dest="lectures_command",
+        )
+
+        # Get lectures
+        lectures_get_parser = lectures_subparser.add_parser("get", help="Get lectures")
+        lectures_get_parser.add_argument("--id", type=int, help="Lecture ID")
+        lectures_get_parser.add_argument(
+            "--classroom-id", type=int, help="Get lectures of classroom"
+        )
+        add_output_arguments(lectures_get_parser)
+        lectures_get_parser.set_defaults(
+            func=lambda args: self.handle_lectures_get(args)
+        )
+
+        # Add lecture
+        lectures_add_parser = lectures_subparser.add_parser(
+            "add", help="Add a lecture, linking the records taken during it"
+        )
+        lectures_add_parser.add_argument(
+            "--classroom-id", required=True, type=int, help="Classroom ID"
+        )
+        lectures_add_parser.add_argument(
+            "--start",
+            required=True,
+            type=_datetime,
+            help="Start of the lecture (format: YYYY-MM-DD HH:MM:SS)",
+        )
+        lectures_add_parser.add_argument(
+            "--end",
+            required=True,
+            type=_datetime,
+            help="End of the lecture (format: YYYY-MM-DD HH:MM:SS)",
+        )
+        lectures_add_parser.set_defaults(
+            func=lambda args: self.handle_lectures_add(args)
+        )
+
+        # Delete lecture
+        lectures_delete_parser = lectures_subparser.add_parser(
+            "delete", help="Delete a lecture, its records are kept"
+        )
+        lectures_delete_parser.add_argument(
+            "--id", required=True, type=int, help="Lecture ID"
+        )
+        lectures_delete_parser.set_defaults(
+            func=lambda args: self.handle_lectures_delete(args)
+        )
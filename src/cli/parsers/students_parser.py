@@ -1,85 +1,107 @@
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from rich.console import Console
-from rich.table import Table
 
+from src.cli.query import (
+    add_query_arguments,
+    has_query_arguments,
+    query_spec_from_args,
+    selected_columns,
+)
+from src.cli.rendering import Column, RowsRenderer, add_output_arguments
+from src.common.degrees import DegreeName
 from src.common.errors import NotFoundError, SemesterError
-from src.common.models import DegreeName, Student
-from src.modules.students_operations import StudentsOperations
+
+# Models, operations and query specs pull in SQLModel, they are imported by the
+# handlers so `teilnahme students --help` doesn't load it
+if TYPE_CHECKING:
+    from src.modules.students_operations import StudentsOperations
+
+STUDENTS_COLUMNS = [
+    Column("id", "ID", "cyan"),
+    Column("name", "Name", "green"),
+    Column("surname", "Surname", "green"),
+    Column("degree", "Degree", "yellow"),
+    Column("semester", "Semester", "magenta"),
+]
 
 
 @dataclass
 class StudentsParser:
-    students_operations: StudentsOperations
+    students_operations: "StudentsOperations"
     console = Console()
     error_console = Console(stderr=True)
 
-    def _display_student(self, student):
-        table = Table(show_header=True)
-        table.add_column("ID", style="cyan")
-        table.add_column("Name", style="green")
-        table.add_column("Surname", style="green")
-        table.add_column("Degree", style="yellow")
-        table.add_column("Semester", style="magenta")
-
-        table.add_row(
-            str(student.id),
-            student.name,
-            student.surname,
-            str(student.degree),
-            str(student.semester),
-        )
-        self.console.print(table)
-
-    def _display_students(self, students):
-        if len(students) == 0:
-            self.error_console.print("[red]No students found[/red]")
-            return
-
-        table = Table(show_header=True)
-        table.add_column("ID", style="cyan")
-        table.add_column("Name", style="green")
-        table.add_column("Surname", style="green")
-        table.add_column("Degree", style="yellow")
-        table.add_column("Semester", style="magenta")
-
-        for student in students:
-            table.add_row(
-                str(student.id),
-                student.name,
-                student.surname,
-                student.degree.value,
-                str(student.semester),
-            )
-        self.console.print(table)
+    def _renderer(self, args) -> RowsRenderer:
+        return RowsRenderer(STUDENTS_COLUMNS, self.console, args.page_size)
 
     def handle_students_get(self, args):
+        if args.id is None and has_query_arguments(args):
+            return self._handle_students_query(args)
+
+        renderer = self._renderer(args)
+
         if args.id is not None:
             try:
                 student = self.students_operations.get_student(args.id)
-                self._display_student(student)
             except NotFoundError:
                 self.error_console.print(
                     f"[red]Student with id {args.id} doesn't exist[/red]"
                 )
+                return 1
+
+            renderer.render([student], args.output)
             return
 
-        if args.degree is not None and args.semester is not None:
-            try:
-                students = self.students_operations.get_students_in_degree(
-                    args.degree, args.semester
-                )
-            except SemesterError as e:
-                self.error_console.print(f"[red]{e}[/red]")
-                return
-        elif args.degree is not None:
-            students = self.students_operations.get_students_in_degree(args.degree)
-        else:
-            students = self.students_operations.get_students()
+        try:
+            # Raw column values are streamed to the output, no Student models are built
+            rows = self.students_operations.iter_student_values(
+                renderer.fields, args.degree, args.semester
+            )
+        except SemesterError as e:
+            self.error_console.print(f"[red]{e}[/red]")
+            return 1
 
-        self._display_students(students)
+        if renderer.render_rows(rows, args.output) == 0:
+            self.error_console.print("[red]No students found[/red]")
+
+    def handle_students_search(self, args):
+        students = self.students_operations.search_students(args.query, args.limit)
+        if self._renderer(args).render(students, args.output) == 0:
+            self.error_console.print(
+                f"[red]No students found matching '{args.query}'[/red]"
+            )
+
+    def _handle_students_query(self, args):
+        from src.common.query_spec import QuerySpecError
+
+        # --degree and --semester narrow the query like any other filter
+        filters = [
+            f"{name}={getattr(value, 'value', value)}"
+            for name, value in [("degree", args.degree), ("semester", args.semester)]
+            if value is not None
+        ]
+        try:
+            result = self.students_operations.query_students(
+                query_spec_from_args(args, filters)
+            )
+        except QuerySpecError as e:
+            self.error_console.print(f"[red]{e}[/red]")
+            return 1
+
+        # Only the selected columns are fetched and shown
+        renderer = RowsRenderer(
+            selected_columns(STUDENTS_COLUMNS, result.fields),
+            self.console,
+            args.page_size,
+        )
+        if renderer.render_rows(result.rows, args.output) == 0:
+            self.error_console.print("[red]No students found[/red]")
 
     def handle_students_add(self, args):
+        from src.common.models import Student
+
         student = Student(
             name=args.name,
             surname=args.surname,
@@ -97,8 +119,11 @@ class StudentsParser:
             self.error_console.print(
                 f"[red]Student with id {args.id} doesn't exist[/red]"
             )
+            return 1
 
     def handle_students_update(self, args):
+        from src.common.models import Student
+
         # Create update dict with only provided fields
         update_data = {}
         if args.name is not None:
@@ -116,8 +141,10 @@ class StudentsParser:
                 self.console.print(f"[green]Updated student with id: {args.id}[/green]")
             except Exception as e:
                 self.error_console.print(f"[red]{e}[/red]")
+                return 1
         else:
             self.error_console.print("[red]No updates provided[/red]")
+            return 1
 
     def setup_students_parsers(self, subparser):
         students_parser = subparser.add_parser("students", help="Manage students")
@@ -157,10 +184,27 @@ class StudentsParser:
             "--semester", type=int, help="Get students by semester"
         )
 
+        add_query_arguments(students_get_parser)
+        add_output_arguments(students_get_parser)
         students_get_parser.set_defaults(
             func=lambda args: self.handle_students_get(args)
         )
 
+        # Search students
+        students_search_parser = students_subparser.add_parser(
+            "search", help="Find students by the start of their name or surname"
+        )
+        students_search_parser.add_argument(
+            "query", type=str, help='Words to search for, e.g. "jo do"'
+        )
+        students_search_parser.add_argument(
+            "--limit", type=int, default=20, help="Maximum number of students"
+        )
+        add_output_arguments(students_search_parser)
+        students_search_parser.set_defaults(
+            func=lambda args: self.handle_students_search(args)
+        )
+
         # Delete student
         students_delete_parser = students_subparser.add_parser(
             "delete", help="Delete a student"
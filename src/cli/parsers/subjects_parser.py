@@ -1,12 +1,26 @@
 from dataclasses import dataclass
 
 from rich.console import Console
-from rich.table import Table
 
+from src.cli.query import (
+    add_query_arguments,
+    has_query_arguments,
+    query_spec_from_args,
+    selected_columns,
+)
+from src.cli.rendering import Column, RowsRenderer, add_output_arguments
 from src.common.errors import NotFoundError, SemesterError
 from src.common.models import DegreeName, Subject
+from src.common.query_spec import QuerySpecError
 from src.modules.subjects_operations import SubjectsOperations
 
+SUBJECTS_COLUMNS = [
+    Column("id", "ID", "cyan"),
+    Column("name", "Name", "green"),
+    Column("semester", "Semester", "yellow"),
+    Column("degree", "Degree", "magenta"),
+]
+
 
 @dataclass
 class SubjectsParser:
@@ -14,63 +28,62 @@ class SubjectsParser:
     console = Console()
     error_console = Console(stderr=True)
 
-    def _display_subject(self, subject):
-        table = Table(show_header=True)
-        table.add_column("ID", style="cyan")
-        table.add_column("Name", style="green")
-        table.add_column("Semester", style="yellow")
-        table.add_column("Degree", style="magenta")
+    def _renderer(self, args) -> RowsRenderer:
+        return RowsRenderer(SUBJECTS_COLUMNS, self.console, args.page_size)
 
-        table.add_row(
-            str(subject.id), subject.name, str(subject.semester), subject.degree.value
-        )
-        self.console.print(table)
+    def handle_subjects_get(self, args):
+        if args.id is None and has_query_arguments(args):
+            return self._handle_subjects_query(args)
 
-    def _display_subjects(self, subjects):
-        if len(subjects) == 0:
-            self.error_console.print("[red]No subjects found[/red]")
-            return
+        renderer = self._renderer(args)
 
-        table = Table(show_header=True)
-        table.add_column("ID", style="cyan")
-        table.add_column("Name", style="green")
-        table.add_column("Semester", style="yellow")
-        table.add_column("Degree", style="magenta")
-
-        for subject in subjects:
-            table.add_row(
-                str(subject.id),
-                subject.name,
-                str(subject.semester),
-                subject.degree.value,
-            )
-        self.console.print(table)
-
-    def handle_subjects_get(self, args):
         if args.id is not None:
             try:
                 subject = self.subjects_operations.get_subject(args.id)
-                self._display_subject(subject)
             except NotFoundError:
                 self.error_console.print(
                     f"[red]Subject with id {args.id} doesn't exist[/red]"
                 )
+                return 1
+
+            renderer.render([subject], args.output)
             return
 
-        if args.degree is not None and args.semester is not None:
-            try:
-                subjects = self.subjects_operations.get_subjects_in_degree(
-                    args.degree, args.semester
-                )
-            except SemesterError as e:
-                self.error_console.print(f"[red]{e}[/red]")
-                return
-        elif args.degree is not None:
-            subjects = self.subjects_operations.get_subjects_in_degree(args.degree)
-        else:
-            subjects = self.subjects_operations.get_subjects()
+        try:
+            # Raw column values are streamed to the output, no Subject models are built
+            rows = self.subjects_operations.iter_subject_values(
+                renderer.fields, args.degree, args.semester
+            )
+        except SemesterError as e:
+            self.error_console.print(f"[red]{e}[/red]")
+            return 1
+
+        if renderer.render_rows(rows, args.output) == 0:
+            self.error_console.print("[red]No subjects found[/red]")
 
-        self._display_subjects(subjects)
+    def _handle_subjects_query(self, args):
+        # --degree and --semester narrow the query like any other filter
+        filters = [
+            f"{name}={getattr(value, 'value', value)}"
+            for name, value in [("degree", args.degree), ("semester", args.semester)]
+            if value is not None
+        ]
+        try:
+            result = self.subjects_operations.query_subjects(
+                query_spec_from_args(args, filters)
+            )
+        except QuerySpecError as e:
+            self.error_console.print(f"[red]{e}[/red]")
+            return 1
+
+        # Only the selected columns are fetched and shown
+        renderer = RowsRenderer(
+            selected_columns(SUBJECTS_COLUMNS, result.fields),
+            self.console,
+            args.page_size,
+        )
+        if renderer.render_rows(result.rows, args.output) == 0:
+            self.error_console.print("[red]No subjects found[/red]")
 
     def handle_subjects_add(self, args):
         subject = Subject(name=args.name, semester=args.semester, degree=args.degree)
@@ -85,6 +98,7 @@ class SubjectsParser:
             self.error_console.print(
                 f"[red]Subject with id {args.id} doesn't exist[/red]"
             )
+            return 1
 
     def handle_subjects_update(self, args):
         # Create update dict with only provided fields
@@ -102,8 +116,10 @@ class SubjectsParser:
                 self.console.print(f"[green]Updated subject with id: {args.id}[/green]")
             except Exception as e:
                 self.error_console.print(f"[red]{e}[/red]")
+                return 1
         else:
             self.error_console.print("[red]No updates provided[/red]")
+            return 1
 
     def setup_subjects_parsers(self, subparser):
         subjects_parser = subparser.add_parser("subjects", help="Manage subjects")
@@ -124,6 +140,8 @@ class SubjectsParser:
         subjects_get_parser.add_argument(
             "--semester", type=int, help="Subject semester"
         )
+        add_query_arguments(subjects_get_parser)
+        add_output_arguments(subjects_get_parser)
         subjects_get_parser.set_defaults(
             func=lambda args: self.handle_subjects_get(args)
         )
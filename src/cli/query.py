@@ -0,0 +1,74 @@
+from typing import TYPE_CHECKING, List
+
+from src.cli.rendering import Column
+
+if TYPE_CHECKING:
+    from src.common.query_spec import QuerySpec
+
+
+def add_query_arguments(parser):
+    """Add the --filter, --sort, --fields and --limit arguments to a `get` command.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of a `get` command
+    """
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help="Filter like 'semester>=2', one of = != < <= > >=, can be repeated",
+    )
+    parser.add_argument(
+        "--sort",
+        help="Comma separated fields to sort by, '--sort=-field' sorts descending",
+    )
+    parser.add_argument("--fields", help="Comma separated fields to show")
+    parser.add_argument("--limit", type=int, help="Maximum number of rows")
+
+
+def has_query_arguments(args) -> bool:
+    """Check whether any of the query arguments was given.
+
+    Args:
+        args (argparse.Namespace): Arguments parsed by a parser with query arguments
+
+    Returns:
+        bool: True when the rows have to be fetched with a query spec
+    """
+    return bool(args.filter or args.sort or args.fields or args.limit is not None)
+
+
+def query_spec_from_args(args, filters: List[str] | None = None) -> "QuerySpec":
+    """Build the query spec of the parsed query arguments.
+
+    Args:
+        args (argparse.Namespace): Arguments parsed by a parser with query arguments
+        filters (List[str] | None, optional): More filters, e.g. of other arguments.
+            Defaults to None.
+
+    Returns:
+        QuerySpec: The spec
+
+    Raises:
+        QuerySpecError: If a filter isn't of the form field<operator>value
+    """
+    # Imported here, query specs pull in SQLModel and `--help` doesn't need them
+    from src.common.query_spec import QuerySpec
+
+    return QuerySpec.parse(
+        [*args.filter, *(filters or [])], args.sort, args.fields, args.limit
+    )
+
+
+def selected_columns(columns: List[Column], fields: List[str]) -> List[Column]:
+    """Get the columns of the selected fields, in the order of the fields.
+
+    Args:
+        columns (List[Column]): Every column of the model
+        fields (List[str]): Fields selected by a query spec
+
+    Returns:
+        List[Column]: Columns to render
+    """
+    by_field = {column.field: column for column in columns}
+    return [by_field.get(field, Column(field, field)) for field in fields]
@@ -0,0 +1,213 @@
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from itertools import islice
+from typing import Any, Iterable, List, Sequence
+
+from rich.console import Console
+from rich.table import Table
+
+# Tabs and line breaks inside values would break the TSV columns and rows
+_TSV_ESCAPES = str.maketrans({"\t": " ", "\n": " ", "\r": " "})
+
+# `auto` renders tables in a terminal and TSV when the output is piped or redirected
+OUTPUT_FORMATS = ["auto", "table", "tsv", "csv", "ndjson", "json"]
+
+
+@dataclass
+class Column:
+    """Column of a rendered model.
+
+    Attributes:
+        field (str): Attribute of the model shown in the column
+        header (str): Header of the column in tables
+        style (str | None): Rich style of the column in tables
+    """
+
+    field: str
+    header: str
+    style: str | None = None
+
+
+@dataclass
+class RowsRenderer:
+    """Render rows as they are fetched, without keeping all of them in memory.
+
+    Tables are printed page by page. TSV, CSV and JSON are written row by row straight
+    to the output file, skipping rich entirely.
+
+    Attributes:
+        columns (List[Column]): Columns to render
+        console (Console): Console to render to
+        page_size (int): Rows per printed table
+    """
+
+    columns: List[Column]
+    console: Console
+    page_size: int = 500
+
+    @property
+    def fields(self) -> List[str]:
+        return [column.field for column in self.columns]
+
+    def resolve(self, output: str) -> str:
+        """Resolve `auto` to the output format used for the console.
+
+        Args:
+            output (str): One of OUTPUT_FORMATS
+
+        Returns:
+            str: The output format, never `auto`
+        """
+        if output == "auto":
+            return "table" if self.console.is_terminal else "tsv"
+        return output
+
+    def render(self, models: Iterable[Any], output: str = "auto") -> int:
+        """Render models in the given format.
+
+        Args:
+            models (Iterable[Any]): Models to render, consumed lazily
+            output (str, optional): One of OUTPUT_FORMATS. Defaults to "auto".
+
+        Returns:
+            int: Number of rendered models
+        """
+        fields = self.fields
+        rows = (tuple(getattr(model, field) for field in fields) for model in models)
+        return self.render_rows(rows, output)
+
+    def render_rows(self, rows: Iterable[Sequence[Any]], output: str = "auto") -> int:
+        """Render rows of raw values, one value per column, in the given format.
+
+        Args:
+            rows (Iterable[Sequence[Any]]): Rows to render, consumed lazily
+            output (str, optional): One of OUTPUT_FORMATS. Defaults to "auto".
+
+        Returns:
+            int: Number of rendered rows
+        """
+        output = self.resolve(output)
+        if output == "table":
+            return self._render_table(rows)
+        if output == "tsv":
+            return self._render_tsv(rows)
+        if output == "csv":
+            return self._render_csv(rows)
+        if output == "ndjson":
+            return self._render_ndjson(rows)
+        if output == "json":
+            return self._render_json(rows)
+
+        raise ValueError(f"Unknown output format: {output}")
+
+    def _render_table(self, rows: Iterable[Sequence[Any]]) -> int:
+        count = 0
+        rows = iter(rows)
+        while page := list(islice(rows, self.page_size)):
+            table = Table(show_header=True)
+            for column in self.columns:
+                table.add_column(column.header, style=column.style)
+            for row in page:
+                table.add_row(*(_text(value) for value in row))
+
+            self.console.print(table)
+            count += len(page)
+
+        return count
+
+    def _render_tsv(self, rows: Iterable[Sequence[Any]]) -> int:
+        file = self.console.file
+        file.write("\t".join(self.fields) + "\n")
+
+        count = 0
+        for row in rows:
+            file.write(
+                "\t".join(_text(value).translate(_TSV_ESCAPES) for value in row) + "\n"
+            )
+            count += 1
+
+        return count
+
+    def _render_csv(self, rows: Iterable[Sequence[Any]]) -> int:
+        writer = csv.writer(self.console.file)
+        writer.writerow(self.fields)
+
+        count = 0
+        for row in rows:
+            writer.writerow([_text(value) for value in row])
+            count += 1
+
+        return count
+
+    def _render_ndjson(self, rows: Iterable[Sequence[Any]]) -> int:
+        file = self.console.file
+        fields = self.fields
+
+        count = 0
+        for row in rows:
+            file.write(_json(fields, row) + "\n")
+            count += 1
+
+        return count
+
+    def _render_json(self, rows: Iterable[Sequence[Any]]) -> int:
+        # A single array, still written row by row
+        file = self.console.file
+        fields = self.fields
+
+        count = 0
+        file.write("[")
+        for row in rows:
+            file.write(("," if count else "") + "\n  " + _json(fields, row))
+            count += 1
+        file.write("\n]\n" if count else "]\n")
+
+        return count
+
+
+def add_output_arguments(parser):
+    """Add the --output and --page-size arguments to a parser of a `get` command.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of a `get` command
+    """
+    parser.add_argument(
+        "--output",
+        choices=OUTPUT_FORMATS,
+        default="auto",
+        help="Output format, tables in a terminal and TSV otherwise (default: auto)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=500,
+        help="Rows per printed table (default: 500)",
+    )
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return str(value)
+    return value
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(_text(item) for item in value)
+    # JSON instead of the Python repr, so the column can be parsed again
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return str(_plain(value))
+
+
+def _json(fields: List[str], row: Sequence[Any]) -> str:
+    return json.dumps(
+        {field: _plain(value) for field, value in zip(fields, row)}, default=str
+    )
@@ -0,0 +1,168 @@
+import argparse
+import cmd
+import shlex
+import time
+from typing import List
+
+from rich.console import Console
+from sqlmodel import Session
+
+from src.common.models import ChangeLogEntry
+from src.common.storage.cached_storage import CachedStorageHandler
+from src.common.storage.db_storage import DBStorageHandler
+from src.common.storage.invalidation import InvalidationBus
+from src.common.storage.statement_cache import statement_cache
+
+
+class Shell(cmd.Cmd):
+    """Interactive shell running CLI commands over a warm session and cache.
+
+    Every line is parsed by the regular command parsers, e.g. `classrooms get --id 1`,
+    so the shell understands exactly the same commands as the CLI.
+    """
+
+    intro = "Teilnahme shell 🏫 Type a command like `students get`, `help` or `exit`."
+    prompt = "teilnahme> "
+
+    def __init__(
+        self,
+        parser: argparse.ArgumentParser,
+        session: Session,
+        cache: CachedStorageHandler | None = None,
+        bus: InvalidationBus | None = None,
+        timing: bool = False,
+        **kwargs,
+    ):
+        """Initialize the shell.
+
+        Args:
+            parser (argparse.ArgumentParser): Parser with all commands set up
+            session (Session): The database session the commands use
+            cache (CachedStorageHandler | None, optional): Cache used by the commands,
+                None when caching is disabled. Defaults to None.
+            bus (InvalidationBus | None, optional): Bus polled before every command,
+                so changes written by other processes aren't served from the cache or
+                the session. Defaults to None.
+            timing (bool, optional): Print how long every command took. Defaults to False.
+            **kwargs: Passed to cmd.Cmd, e.g. stdin and stdout
+        """
+        super().__init__(**kwargs)
+        self.parser = parser
+        self.session = session
+        self.cache = cache
+        self.bus = bus
+        self.timing = timing
+        self.console = Console()
+        self.error_console = Console(stderr=True)
+        if bus is not None:
+            bus.subscribe(self._expire_changes)
+
+    def precmd(self, line: str) -> str:
+        if self.bus is not None and line.strip():
+            self.bus.poll(DBStorageHandler(self.session))
+        return line
+
+    def default(self, line: str):
+        try:
+            args = self.parser.parse_args(shlex.split(line))
+        except SystemExit:
+            # argparse already printed the help or the usage error
+            return
+        except ValueError as e:
+            self.error_console.print(f"[red]{e}[/red]")
+            return
+
+        if not hasattr(args, "func"):
+            self.parser.print_help()
+            return
+
+        started = time.perf_counter()
+        try:
+            status = args.func(args)
+        except Exception as e:
+            self.error_console.print(f"[red]{type(e).__name__}: {e}[/red]")
+            self._rollback()
+        else:
+            if status:
+                # The handler printed its error, drop what it may have flushed
+                self._rollback()
+
+        if self.timing:
+            self.console.print(
+                f"[dim]{(time.perf_counter() - started) * 1e3:.1f}ms[/dim]"
+            )
+
+    def do_help(self, arg: str):
+        """Show the available commands"""
+        if arg:
+            self.default(f"{arg} --help")
+            return
+
+        self.parser.print_help()
+        self.console.print(
+            "\nShell commands: cache (show cache statistics), refresh (drop cached "
+            "lookups), timing (toggle timing), exit"
+        )
+
+    def do_cache(self, arg: str):
+        """Show cache statistics"""
+        if self.cache is None:
+            self.console.print("Lookups: [yellow]cache is disabled[/yellow]")
+        else:
+            self.console.print(
+                f"Lookups: {self.cache.hits} hits, {self.cache.misses} misses "
+                f"({self.cache.hit_rate:.0%} hit rate), "
+                f"TTL {self.cache.ttl:g}s"
+            )
+
+        self.console.print(
+            f"Statements: {statement_cache.hits} hits, {statement_cache.misses} misses "
+            f"({statement_cache.hit_rate:.0%} hit rate), "
+            f"{len(statement_cache)} statements"
+        )
+
+    def do_refresh(self, arg: str):
+        """Drop cached lookups and reload everything from the database"""
+        if self.cache is not None:
+            self.cache.clear()
+        self.session.expire_all()
+        self.console.print("[green]Cache cleared[/green]")
+
+    def do_timing(self, arg: str):
+        """Toggle printing how long every command took"""
+        self.timing = not self.timing
+        self.console.print(f"Timing {'on' if self.timing else 'off'}")
+
+    def do_exit(self, arg: str):
+        """Exit the shell"""
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg: str):
+        self.console.print()
+        return True
+
+    def emptyline(self):
+        # Don't repeat the last command like cmd.Cmd does by default
+        pass
+
+    def _rollback(self):
+        """Roll back a failed command, so the session stays usable."""
+        self.session.rollback()
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _expire_changes(self, changes: List[ChangeLogEntry]):
+        """Expire the loaded models other processes changed, they reload on next use."""
+        changed = {(change.table_name, change.row_id) for change in changes}
+        # Changes without row ID, e.g. of delete_where or cascades, may touch any row
+        changed_tables = {
+            table_name for table_name, row_id in changed if row_id is None
+        }
+        for model in list(self.session.identity_map.values()):
+            if (
+                model.__tablename__ in changed_tables
+                or (model.__tablename__, getattr(model, "id", None)) in changed
+            ):
+                self.session.expire(model)
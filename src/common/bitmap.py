@@ -0,0 +1,176 @@
+from dataclasses import dataclass
+from typing import Iterable, Set, Tuple
+
+
+@dataclass(frozen=True)
+class RosterBitmap:
+    """Students present at a lecture, one bit per student enrolled in the classroom.
+
+    Bit i is set when the i-th student of the roster, sorted by ID, was present. A
+    classroom of 30 students takes 4 bytes per lecture instead of 30 rows, and set
+    operations across lectures with the same roster are single integer operations.
+
+    Attributes:
+        roster (Tuple[int, ...]): Sorted IDs of the enrolled students
+        present (int): Bits of the present students
+    """
+
+    roster: Tuple[int, ...]
+    present: int = 0
+
+    @classmethod
+    def from_student_ids(
+        cls, roster: Iterable[int], present_ids: Iterable[int]
+    ) -> "RosterBitmap":
+        """Build the bitmap of a lecture.
+
+        Args:
+            roster (Iterable[int]): IDs of the enrolled students
+            present_ids (Iterable[int]): IDs of the present students, students missing
+                from the roster are added to it
+
+        Returns:
+            RosterBitmap: The bitmap
+        """
+        present_ids = set(present_ids)
+        roster = tuple(sorted(set(roster) | present_ids))
+        present = 0
+        for position, student_id in enumerate(roster):
+            if student_id in present_ids:
+                present |= 1 << position
+
+        return cls(roster, present)
+
+    @classmethod
+    def decode(cls, roster: bytes, present: bytes) -> "RosterBitmap":
+        """Build a bitmap from the bytes of encode.
+
+        Args:
+            roster (bytes): The encoded roster
+            present (bytes): The encoded bits
+
+        Returns:
+            RosterBitmap: The bitmap
+        """
+        return cls(_decode_ids(roster), int.from_bytes(present, "little"))
+
+    def encode(self) -> Tuple[bytes, bytes]:
+        """Encode the bitmap to store it.
+
+        Returns:
+            Tuple[bytes, bytes]: The roster as varint deltas between the sorted IDs and
+                the bits, little endian
+        """
+        return (
+            _encode_ids(self.roster),
+            self.present.to_bytes((len(self.roster) + 7) // 8, "little"),
+        )
+
+    @property
+    def all(self) -> int:
+        """Bits of every enrolled student."""
+        return (1 << len(self.roster)) - 1
+
+    @property
+    def absent(self) -> int:
+        """Bits of the enrolled students that weren't present."""
+        return self.all & ~self.present
+
+    def student_ids(self, bits: int | None = None) -> Set[int]:
+        """IDs of the students whose bits are set.
+
+        Args:
+            bits (int | None, optional): Bits over the roster. Defaults to None, the
+                present students.
+
+        Returns:
+            Set[int]: IDs of the students
+        """
+        bits = self.present if bits is None else bits
+        return {
+            student_id
+            for position, student_id in enumerate(self.roster)
+            if bits >> position & 1
+        }
+
+    def count(self) -> int:
+        """Number of present students."""
+        return self.present.bit_count()
+
+    def with_roster(self, roster: Tuple[int, ...]) -> "RosterBitmap":
+        """The same attendance over a larger roster, e.g. the union of many lectures.
+
+        Students of the larger roster that aren't in this one are absent, see
+        enrolled_in to tell them apart from enrolled absent students.
+
+        Args:
+            roster (Tuple[int, ...]): Sorted IDs, containing every ID of this roster
+
+        Returns:
+            RosterBitmap: The bitmap over the given roster
+        """
+        if roster == self.roster:
+            return self
+        return RosterBitmap.from_student_ids(roster, self.student_ids())
+
+    def enrolled_in(self, roster: Tuple[int, ...]) -> int:
+        """Bits of the students of this roster in a larger roster.
+
+        Args:
+            roster (Tuple[int, ...]): Sorted IDs, containing every ID of this roster
+
+        Returns:
+            int: Bits over the given roster
+        """
+        if roster == self.roster:
+            return self.all
+        return RosterBitmap.from_student_ids(roster, self.roster).present
+
+
+def union_roster(bitmaps: Iterable[RosterBitmap]) -> Tuple[int, ...]:
+    """Roster of every student of the bitmaps, to combine them with with_roster.
+
+    Args:
+        bitmaps (Iterable[RosterBitmap]): Bitmaps of lectures, possibly over different
+            rosters when students enrolled or left in between
+
+    Returns:
+        Tuple[int, ...]: Sorted IDs of the students of every roster
+    """
+    rosters = {bitmap.roster for bitmap in bitmaps}
+    if len(rosters) == 1:
+        # The usual case, nobody enrolled or left in between
+        return next(iter(rosters))
+    return tuple(sorted(set().union(*rosters)))
+
+
+def _encode_ids(ids: Tuple[int, ...]) -> bytes:
+    encoded = bytearray()
+    previous = 0
+    for id in ids:
+        delta = id - previous
+        previous = id
+        # Varint, 7 bits per byte and the high bit set while more bytes follow
+        while delta >= 0x80:
+            encoded.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        encoded.append(delta)
+
+    return bytes(encoded)
+
+
+def _decode_ids(encoded: bytes) -> Tuple[int, ...]:
+    ids = []
+    previous = 0
+    delta = 0
+    shift = 0
+    for byte in encoded:
+        delta |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            previous += delta
+            ids.append(previous)
+            delta = 0
+            shift = 0
+
+    return tuple(ids)
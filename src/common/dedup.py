@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Hashable, Tuple
+
+# Card readers fire again within a few seconds, a student checking in twice a minute
+# apart is a repeat as well
+CHECK_IN_WINDOW_SECONDS = 60
+
+
+class DedupWindow:
+    """Recently accepted events, to drop repeats of them before they are stored.
+
+    An event is a repeat when an event with the same key was accepted less than
+    window_seconds before or after it, by the dates of the events themselves. Entries
+    are dropped once a newer event is window_seconds past them, and the least recently
+    accepted ones above max_size, so memory stays bounded however many keys show up.
+
+    The window is kept per process, a repeat reaching another worker is stored.
+    """
+
+    def __init__(
+        self, window_seconds: float = CHECK_IN_WINDOW_SECONDS, max_size: int = 100_000
+    ):
+        """Initialize DedupWindow.
+
+        Args:
+            window_seconds (float, optional): Seconds between events with the same key
+                for the later one to be a repeat. Defaults to CHECK_IN_WINDOW_SECONDS.
+            max_size (int, optional): Maximum number of remembered keys.
+                Defaults to 100_000.
+        """
+        self.window = timedelta(seconds=window_seconds)
+        self.max_size = max_size
+        self.checked = 0
+        self.dropped = 0
+        self._entries: OrderedDict[Hashable, Tuple[datetime, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, date: datetime) -> Any | None:
+        """Get the accepted event an event is a repeat of, counting the check.
+
+        Args:
+            key (Hashable): Key of the event, e.g. (student_id, classroom_id)
+            date (datetime): Date of the event
+
+        Returns:
+            Any | None: The value the earlier event was accepted with, None when the
+                event isn't a repeat
+        """
+        self.checked += 1
+        entry = self._entries.get(key)
+        if entry is None or abs(date - entry[0]) >= self.window:
+            return None
+
+        self.dropped += 1
+        return entry[1]
+
+    def add(self, key: Hashable, date: datetime, value: Any):
+        """Remember an accepted event.
+
+        Args:
+            key (Hashable): Key of the event
+            date (datetime): Date of the event
+            value (Any): Returned by get for repeats of the event, e.g. the stored record
+        """
+        self._entries[key] = (date, value)
+        self._entries.move_to_end(key)
+
+        # Entries are in the order they were accepted, which for live events is the
+        # order of their dates, so the expired ones are at the front
+        while self._entries:
+            oldest_date = next(iter(self._entries.values()))[0]
+            if date - oldest_date < self.window and len(self._entries) <= self.max_size:
+                break
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        """Forget the accepted event of a key, e.g. when its record was deleted.
+
+        Args:
+            key (Hashable): Key of the event
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Forget every accepted event and reset the statistics."""
+        self._entries.clear()
+        self.checked = 0
+        self.dropped = 0
+
+    @property
+    def drop_rate(self) -> float:
+        return self.dropped / self.checked if self.checked else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by every request of the server process
+check_in_window = DedupWindow()
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+# Apart from the models, so the CLI parses degrees without importing SQLModel
+class DegreeName(str, Enum):
+    master = "Master"
+    bachelor = "Bachelor"
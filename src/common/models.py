@@ -1,19 +1,22 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List
 
+from sqlalchemy import DDL, JSON, Index, UniqueConstraint, event
 from sqlmodel import Field, Relationship, SQLModel
 
-
-class DegreeName(str, Enum):
-    master = "Master"
-    bachelor = "Bachelor"
+from src.common.degrees import DegreeName
 
 
+# Rows depending on a student or classroom reference it with ON DELETE CASCADE, the
+# database removes them with it. SQLite only enforces foreign keys on connections that
+# turn them on, see enable_sqlite_foreign_keys.
 class StudentClassroomLink(SQLModel, table=True):
-    student_id: int = Field(default=None, foreign_key="student.id", primary_key=True)
+    student_id: int = Field(
+        default=None, foreign_key="student.id", primary_key=True, ondelete="CASCADE"
+    )
     classroom_id: int = Field(
-        default=None, foreign_key="classroom.id", primary_key=True
+        default=None, foreign_key="classroom.id", primary_key=True, ondelete="CASCADE"
     )
 
 
@@ -31,6 +34,33 @@ class Student(SQLModel, table=True):
         return f"{self.name} {self.surname} - {self.degree.value} (Semester {self.semester})"
 
 
+# Indexes for prefix search of students by name, see DBStorageHandler.search_prefix.
+# SQLite runs `LIKE 'jo%'` as a range scan of a NOCASE index, Postgres runs ILIKE on
+# a trigram index. Existing databases need the statements run once by hand.
+event.listen(
+    Student.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for field in ("name", "surname"):
+    event.listen(
+        Student.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS ix_student_{field}_nocase "
+            f"ON student ({field} COLLATE NOCASE)"
+        ).execute_if(dialect="sqlite"),
+    )
+    event.listen(
+        Student.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS ix_student_{field}_trgm "
+            f"ON student USING gin ({field} gin_trgm_ops)"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
 class Classroom(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     subject_id: int
@@ -52,11 +82,179 @@ class Subject(SQLModel, table=True):
         return f"{self.name} - for: {self.degree.value} degree at semester: {self.semester}"
 
 
-class AttendenceRecord(SQLModel, table=True):
+class Lecture(SQLModel, table=True):
+    """A lecture of a classroom, attendance records of the lecture reference it."""
+
     id: int = Field(default=None, primary_key=True)
+    classroom_id: int = Field(
+        foreign_key="classroom.id", index=True, ondelete="CASCADE"
+    )
+    start: datetime
+    end: datetime
+
+    def __str__(self) -> str:
+        return (
+            f"Lecture of classroom: {self.classroom_id} from {self.start} to {self.end}"
+        )
+
+
+class AttendenceRecordBase(SQLModel):
     student_id: int
     classroom_id: int
     date: datetime
 
+
+# A student is recorded once per lecture, syncs match existing records by these fields
+ATTENDENCE_RECORD_NATURAL_KEY = ("student_id", "classroom_id", "date")
+
+
+class AttendenceRecord(AttendenceRecordBase, table=True):
+    __table_args__ = (
+        UniqueConstraint(*ATTENDENCE_RECORD_NATURAL_KEY),
+        # Date ranges are how records are archived and looked up in archives
+        Index("ix_attendencerecord_date", "date"),
+    )
+
+    id: int = Field(default=None, primary_key=True)
+    student_id: int = Field(foreign_key="student.id", ondelete="CASCADE")
+    classroom_id: int = Field(foreign_key="classroom.id", ondelete="CASCADE")
+    # Set from the lecture of the classroom at the date when the record is added
+    lecture_id: int | None = Field(
+        default=None, foreign_key="lecture.id", index=True, ondelete="SET NULL"
+    )
+
     def __str__(self) -> str:
         return f"Attendance: {self.student_id} in classroom: {self.classroom_id} on {self.date}"
+
+
+class AttendenceBitmap(SQLModel, table=True):
+    """Attendance of one lecture as a bitmap over the enrolled students.
+
+    roster and present are the encoded RosterBitmap, see src.common.bitmap.
+    """
+
+    __table_args__ = (UniqueConstraint("classroom_id", "date"),)
+
+    id: int = Field(default=None, primary_key=True)
+    classroom_id: int = Field(
+        foreign_key="classroom.id", index=True, ondelete="CASCADE"
+    )
+    date: datetime
+    roster: bytes
+    present: bytes
+
+    def __str__(self) -> str:
+        return f"Attendance bitmap of classroom: {self.classroom_id} on {self.date}"
+
+
+class AttendenceArchive(SQLModel, table=True):
+    """A file with the attendance records of one month, moved out of the database.
+
+    Records of a month that were added after it was archived go to another file, so a
+    month may have several archives.
+    """
+
+    id: int = Field(default=None, primary_key=True)
+    period: str = Field(index=True)
+    path: str = Field(unique=True)
+    records: int
+    first_date: datetime
+    last_date: datetime
+    archived_at: datetime = Field(default_factory=datetime.now)
+
+    def __str__(self) -> str:
+        return f"Archive {self.period}: {self.records} records in {self.path}"
+
+
+class ChangeOperation(str, Enum):
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+
+
+class ChangeLogEntry(SQLModel, table=True):
+    """A change of a row, written in the same transaction as the change itself.
+
+    seq grows with every entry, consumers remember the last one they've seen and ask
+    for the changes after it. Seqs are handed out when a transaction writes, not when
+    it commits, so a lower seq may show up after higher ones, see settled_changes.
+    """
+
+    # AUTOINCREMENT keeps SQLite from reusing the seq of deleted entries
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: int = Field(default=None, primary_key=True)
+    table_name: str
+    row_id: int | None
+    operation: ChangeOperation
+    data: Dict[str, Any] | None = Field(default=None, sa_type=JSON)
+    changed_at: datetime = Field(default_factory=datetime.now)
+
+    def __str__(self) -> str:
+        return f"#{self.seq} {self.table_name} {self.row_id} {self.operation.value}"
+
+
+# How long a missing seq may still be committed by a running transaction. Gaps older
+# than this are left behind by rolled back transactions and are skipped.
+CHANGE_GAP_TIMEOUT = timedelta(seconds=10)
+
+
+def settled_changes(
+    changes: Iterable[ChangeLogEntry],
+    seq: int,
+    gap_timeout: timedelta = CHANGE_GAP_TIMEOUT,
+    now: datetime | None = None,
+) -> Iterator[ChangeLogEntry]:
+    """Take the changes after a seq up to the first gap that may still be filled.
+
+    On Postgres concurrent transactions commit out of seq order, so right after seq 7
+    is visible, seq 6 may still be on its way. A consumer moving past 6 would never
+    see it. A gap is waited for until the change after it is gap_timeout old, then
+    the missing seq is taken to be rolled back.
+
+    Args:
+        changes (Iterable[ChangeLogEntry]): Changes after seq of every table, ordered by seq
+        seq (int): Sequence number of the last seen change
+        gap_timeout (timedelta, optional): How long a gap is waited for.
+            Defaults to CHANGE_GAP_TIMEOUT.
+        now (datetime | None, optional): Current time. Defaults to None, datetime.now().
+
+    Returns:
+        Iterator[ChangeLogEntry]: The changes it is safe to move past, oldest first
+    """
+    now = now or datetime.now()
+    expected = seq + 1
+    for change in changes:
+        if change.seq != expected and now - change.changed_at < gap_timeout:
+            return
+        yield change
+        expected = change.seq + 1
+
+
+def cascaded_tables(model_type: type[SQLModel]) -> List[str]:
+    """Names of the tables the database deletes rows of along with rows of a model.
+
+    Follows ON DELETE CASCADE foreign keys, including those of the cascaded tables.
+
+    Args:
+        model_type (type[SQLModel]): The model class rows are deleted of
+
+    Returns:
+        List[str]: Names of the tables, sorted
+    """
+    found = set()
+    pending = [model_type.__tablename__]
+    while pending:
+        referenced = pending.pop()
+        for table in SQLModel.metadata.tables.values():
+            if table.name in found:
+                continue
+            if any(
+                foreign_key.ondelete == "CASCADE"
+                and foreign_key.column.table.name == referenced
+                for foreign_key in table.foreign_keys
+            ):
+                found.add(table.name)
+                pending.append(table.name)
+
+    return sorted(found)
@@ -0,0 +1,274 @@
+import operator
+import re
+from contextlib import closing
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+    Type,
+)
+
+from pydantic import TypeAdapter, ValidationError
+from sqlmodel import SQLModel
+
+from src.common.storage.storage import NewStorageHandler
+
+# Operators of filters, longest first so "<=" isn't read as "<"
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "!=": operator.ne,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+_FILTER_PATTERN = re.compile(
+    r"^(\w+)(" + "|".join(map(re.escape, FILTER_OPERATORS)) + r")(.*)$"
+)
+
+
+class QuerySpecError(Exception):
+    """Exception raised when a query spec is invalid.
+
+    This includes cases where:
+    - A filter, sort or field names a field the query doesn't allow
+    - A filter isn't of the form field<operator>value
+    - A filter value can't be converted to the type of its field
+    """
+
+    pass
+
+
+class Filter(NamedTuple):
+    field: str
+    operator: str
+    value: Any
+
+
+class QueryResult(NamedTuple):
+    """Rows of a query spec, with the fields their values belong to."""
+
+    fields: List[str]
+    rows: Iterator[Tuple[Any, ...]]
+
+
+@dataclass
+class QuerySpec:
+    """Filters, sort order, fields and number of rows a client asks a list query for.
+
+    A spec is checked against the fields a query allows before it is compiled into
+    conditions and a SELECT of only the asked columns. Field names are only looked up
+    in that allow list and values are converted to the type of their field and bound
+    as parameters, so a spec from a request can't reach other columns or inject SQL.
+
+    Attributes:
+        filters (List[Filter]): Conditions every row matches
+        sort (List[str]): Fields to sort by, with a leading "-" for descending order.
+            Unsorted when empty.
+        fields (List[str] | None): Fields of the rows, every allowed one when None
+        limit (int | None): Maximum number of rows, all of them when None
+    """
+
+    filters: List[Filter] = field(default_factory=list)
+    sort: List[str] = field(default_factory=list)
+    fields: List[str] | None = None
+    limit: int | None = None
+
+    @classmethod
+    def parse(
+        cls,
+        filters: Iterable[str] = (),
+        sort: str | None = None,
+        fields: str | None = None,
+        limit: int | None = None,
+    ) -> "QuerySpec":
+        """Build a spec from strings, e.g. query parameters or CLI arguments.
+
+        Example:
+            QuerySpec.parse(["degree=Master", "semester>=2"], "-semester,name", "id,name")
+
+        Args:
+            filters (Iterable[str], optional): Filters like "semester>=2", one of
+                FILTER_OPERATORS between field and value. Defaults to ().
+            sort (str | None, optional): Comma separated fields to sort by.
+                Defaults to None.
+            fields (str | None, optional): Comma separated fields of the rows.
+                Defaults to None.
+            limit (int | None, optional): Maximum number of rows. Defaults to None.
+
+        Returns:
+            QuerySpec: The spec, not checked against any fields yet
+
+        Raises:
+            QuerySpecError: If a filter isn't of the form field<operator>value
+        """
+        parsed_filters = []
+        for expression in filters:
+            match = _FILTER_PATTERN.match(expression.strip())
+            if match is None:
+                raise QuerySpecError(
+                    f"Invalid filter '{expression}', expected e.g. 'semester>=2'"
+                )
+            parsed_filters.append(Filter(*match.groups()))
+
+        return cls(
+            filters=parsed_filters,
+            sort=_split(sort) or [],
+            fields=_split(fields),
+            limit=limit,
+        )
+
+    def run(
+        self,
+        storage_handler: NewStorageHandler,
+        model_type: Type[SQLModel],
+        allowed_fields: List[str],
+        batch_size: int = 1000,
+    ) -> QueryResult:
+        """Run the spec, selecting only the asked columns.
+
+        Args:
+            storage_handler (NewStorageHandler): Handler to query
+            model_type (Type[SQLModel]): The model class to query
+            allowed_fields (List[str]): Fields clients may filter, sort and select
+            batch_size (int, optional): Rows fetched at once. Defaults to 1000.
+
+        Returns:
+            QueryResult: The selected fields and an iterator over the rows
+
+        Raises:
+            QuerySpecError: If the spec uses a field that isn't allowed or a filter
+                value doesn't fit its field
+        """
+        fields = self.fields or allowed_fields
+        self._check_fields(
+            [*fields, *(sort.removeprefix("-") for sort in self.sort)], allowed_fields
+        )
+        if self.limit is not None and self.limit < 0:
+            raise QuerySpecError("Limit must not be negative")
+
+        rows = storage_handler.iter_values_where(
+            model_type,
+            fields,
+            self.conditions(model_type, allowed_fields),
+            batch_size,
+            self.sort,
+        )
+        if self.limit is not None:
+            rows = _limited(rows, self.limit)
+
+        return QueryResult(fields, rows)
+
+    def count(
+        self,
+        storage_handler: NewStorageHandler,
+        model_type: Type[SQLModel],
+        allowed_fields: List[str],
+    ) -> int:
+        """Count the rows matching the filters, without fetching them.
+
+        Sort, fields and limit don't change the number of matching rows, they are
+        ignored.
+
+        Args:
+            storage_handler (NewStorageHandler): Handler to query
+            model_type (Type[SQLModel]): The model class to count
+            allowed_fields (List[str]): Fields clients may filter
+
+        Returns:
+            int: Number of matching rows
+
+        Raises:
+            QuerySpecError: If a filter uses a field that isn't allowed or its value
+                doesn't fit the field
+        """
+        return storage_handler.count_where(
+            model_type, self.conditions(model_type, allowed_fields)
+        )
+
+    def exists(
+        self,
+        storage_handler: NewStorageHandler,
+        model_type: Type[SQLModel],
+        allowed_fields: List[str],
+    ) -> bool:
+        """Check whether any row matches the filters, without fetching it.
+
+        Args:
+            storage_handler (NewStorageHandler): Handler to query
+            model_type (Type[SQLModel]): The model class to look for
+            allowed_fields (List[str]): Fields clients may filter
+
+        Returns:
+            bool: True when at least one row matches
+
+        Raises:
+            QuerySpecError: If a filter uses a field that isn't allowed or its value
+                doesn't fit the field
+        """
+        return storage_handler.exists_where(
+            model_type, self.conditions(model_type, allowed_fields)
+        )
+
+    def conditions(self, model_type: Type[SQLModel], allowed_fields: List[str]) -> list:
+        """Compile the filters into conditions, e.g. for get_all_where.
+
+        Args:
+            model_type (Type[SQLModel]): The model class the filters apply to
+            allowed_fields (List[str]): Fields clients may filter
+
+        Returns:
+            list: SQLAlchemy conditions, one per filter
+
+        Raises:
+            QuerySpecError: If a filter uses a field that isn't allowed or its value
+                doesn't fit the field
+        """
+        self._check_fields(
+            [spec_filter.field for spec_filter in self.filters], allowed_fields
+        )
+
+        conditions = []
+        for spec_filter in self.filters:
+            annotation = model_type.model_fields[spec_filter.field].annotation
+            try:
+                value = TypeAdapter(annotation).validate_python(spec_filter.value)
+            except ValidationError:
+                raise QuerySpecError(
+                    f"Invalid value '{spec_filter.value}' for field '{spec_filter.field}'"
+                )
+
+            conditions.append(
+                FILTER_OPERATORS[spec_filter.operator](
+                    getattr(model_type, spec_filter.field), value
+                )
+            )
+
+        return conditions
+
+    def _check_fields(self, fields: Iterable[str], allowed_fields: List[str]):
+        for name in fields:
+            if name not in allowed_fields:
+                raise QuerySpecError(
+                    f"Unknown field '{name}', expected one of: {', '.join(allowed_fields)}"
+                )
+
+
+def _split(value: str | None) -> List[str] | None:
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _limited(rows: Iterator[Tuple[Any, ...]], limit: int) -> Iterator[Tuple[Any, ...]]:
+    # Closes the query once enough rows were read
+    with closing(rows):
+        yield from islice(rows, limit)
@@ -0,0 +1,75 @@
+import heapq
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlmodel import SQLModel
+
+
+class PrefixIndex:
+    """Sorted array of the lowercased field values of models, for prefix search.
+
+    Finding the models whose field starts with a prefix is a binary search for the
+    first matching value and a scan over the matching ones, so typeahead lookups stay
+    fast however many models there are. Meant for models held in memory, databases
+    answer the same search with their own indexes, see NewStorageHandler.search_prefix.
+    """
+
+    def __init__(self, models: Iterable[SQLModel], fields: List[str]):
+        """Initialize PrefixIndex.
+
+        Args:
+            models (Iterable[SQLModel]): Models to index, all with their ID set
+            fields (List[str]): Fields to search, results are sorted by them
+        """
+        self.fields = fields
+        self._models: Dict[int, SQLModel] = {model.id: model for model in models}
+        self._values: List[Tuple[str, int]] = sorted(
+            (str(value).lower(), id)
+            for id, model in self._models.items()
+            for field in fields
+            if (value := getattr(model, field)) is not None
+        )
+
+    def search(self, query: str, limit: int = 20) -> List[SQLModel]:
+        """Find the models where every word of the query starts one of the fields.
+
+        Args:
+            query (str): Words to search for, case is ignored, e.g. "jo do"
+            limit (int, optional): Maximum number of models. Defaults to 20.
+
+        Returns:
+            List[SQLModel]: Matching models sorted by the fields
+        """
+        ids = None
+        for term in query.lower().split():
+            matching = self._ids_with_prefix(term)
+            ids = matching if ids is None else ids & matching
+            if not ids:
+                return []
+
+        if ids is None:
+            return []
+
+        return heapq.nsmallest(
+            limit,
+            (self._models[id] for id in ids),
+            key=lambda model: (
+                *(getattr(model, field) for field in self.fields),
+                model.id,
+            ),
+        )
+
+    def _ids_with_prefix(self, prefix: str) -> Set[int]:
+        ids = set()
+        position = bisect_left(self._values, (prefix,))
+        while position < len(self._values):
+            value, id = self._values[position]
+            if not value.startswith(prefix):
+                break
+            ids.add(id)
+            position += 1
+
+        return ids
+
+    def __len__(self) -> int:
+        return len(self._models)
@@ -0,0 +1,50 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+def write_archive(path: str, rows: Iterable[Dict[str, Any]]) -> int:
+    """Write rows to a gzip compressed file with one JSON object per line.
+
+    The file is written next to its final path and renamed once it is complete and
+    on disk, so a crash never leaves a truncated archive behind.
+
+    Args:
+        path (str): Path of the archive, e.g. "archive/attendence-2024-01.ndjson.gz"
+        rows (Iterable[Dict[str, Any]]): Rows to write, dates are written as ISO strings
+
+    Returns:
+        int: Number of written rows
+    """
+    partial_path = f"{path}.partial"
+    count = 0
+    with open(partial_path, "wb") as file:
+        with gzip.open(file, "wt", encoding="utf-8") as archive:
+            for row in rows:
+                archive.write(json.dumps(row, default=datetime.isoformat) + "\n")
+                count += 1
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(partial_path, path)
+    return count
+
+
+def read_archive(path: str, date_fields: List[str]) -> Iterator[Dict[str, Any]]:
+    """Read the rows of an archive written by write_archive.
+
+    Args:
+        path (str): Path of the archive
+        date_fields (List[str]): Fields parsed back to datetimes
+
+    Yields:
+        Dict[str, Any]: Rows in the order they were written
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            row = json.loads(line)
+            for field in date_fields:
+                row[field] = datetime.fromisoformat(row[field])
+            yield row
@@ -0,0 +1,300 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, Tuple, Type
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import SQLModel
+
+from src.common.models import ChangeLogEntry, cascaded_tables
+from src.common.search import PrefixIndex
+from src.common.storage.storage import NewStorageHandler
+
+
+class CachedStorageHandler(NewStorageHandler):
+    """Storage handler that keeps lookup results of another handler in memory.
+
+    Results of get_by_id, get_all, get_all_by, get_all_where, count_where, exists_where
+    and the prefix indexes of search_prefix are cached for ttl seconds, the least
+    recently used entries are dropped above max_size. Writes go straight to the
+    wrapped handler and invalidate the written model and every cached query, because a
+    query on one model may depend on another one (e.g. classrooms of a student).
+    """
+
+    def __init__(
+        self, storage_handler: NewStorageHandler, ttl: float = 60, max_size: int = 1024
+    ):
+        """Initialize CachedStorageHandler.
+
+        Args:
+            storage_handler (NewStorageHandler): Handler to cache the results of
+            ttl (float, optional): Seconds an entry stays valid. Defaults to 60.
+            max_size (int, optional): Maximum number of cached entries. Defaults to 1024.
+        """
+        self.storage_handler = storage_handler
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get_all(self, model_type: Type[SQLModel]) -> List[SQLModel]:
+        return list(
+            self._cached(
+                ("all", model_type), lambda: self.storage_handler.get_all(model_type)
+            )
+        )
+
+    def get_all_where(self, model_type: Type[SQLModel], conditions) -> List[SQLModel]:
+        key = _conditions_key(conditions)
+        if key is None:
+            self.misses += 1
+            return self.storage_handler.get_all_where(model_type, conditions)
+
+        return list(
+            self._cached(
+                ("where", model_type, key),
+                lambda: self.storage_handler.get_all_where(model_type, conditions),
+            )
+        )
+
+    def get_all_by(self, model_type: Type[SQLModel], **filters: Any) -> List[SQLModel]:
+        return list(
+            self._cached(
+                ("by", model_type, tuple(sorted(filters.items()))),
+                lambda: self.storage_handler.get_all_by(model_type, **filters),
+            )
+        )
+
+    def iter_all_where(
+        self,
+        model_type: Type[SQLModel],
+        conditions,
+        batch_size: int = 1000,
+        order_by: List[str] | None = None,
+    ) -> Iterator[SQLModel]:
+        # Streamed results are meant to be too large to keep, they are never cached
+        return self.storage_handler.iter_all_where(
+            model_type, conditions, batch_size, order_by
+        )
+
+    def iter_values_where(
+        self,
+        model_type: Type[SQLModel],
+        fields: List[str],
+        conditions,
+        batch_size: int = 1000,
+        order_by: List[str] | None = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        return self.storage_handler.iter_values_where(
+            model_type, fields, conditions, batch_size, order_by
+        )
+
+    def count_where(self, model_type: Type[SQLModel], conditions) -> int:
+        key = _conditions_key(conditions)
+        if key is None:
+            self.misses += 1
+            return self.storage_handler.count_where(model_type, conditions)
+
+        return self._cached(
+            ("count", model_type, key),
+            lambda: self.storage_handler.count_where(model_type, conditions),
+        )
+
+    def count_by_where(
+        self, model_type: Type[SQLModel], field: str, conditions
+    ) -> Dict[Any, int]:
+        key = _conditions_key(conditions)
+        if key is None:
+            self.misses += 1
+            return self.storage_handler.count_by_where(model_type, field, conditions)
+
+        # Copied, so callers can't change the cached counts
+        return dict(
+            self._cached(
+                ("count_by", model_type, field, key),
+                lambda: self.storage_handler.count_by_where(
+                    model_type, field, conditions
+                ),
+            )
+        )
+
+    def exists_where(self, model_type: Type[SQLModel], conditions) -> bool:
+        key = _conditions_key(conditions)
+        if key is None:
+            self.misses += 1
+            return self.storage_handler.exists_where(model_type, conditions)
+
+        # A cached count of the same conditions answers it as well
+        count = self._entries.get(("count", model_type, key))
+        if count is not None and count[0] > time.monotonic():
+            self.hits += 1
+            return count[1] > 0
+
+        return self._cached(
+            ("exists", model_type, key),
+            lambda: self.storage_handler.exists_where(model_type, conditions),
+        )
+
+    def search_prefix(
+        self, model_type: Type[SQLModel], fields: List[str], query: str, limit: int = 20
+    ) -> List[SQLModel]:
+        # Answered in memory from a prefix index over every model of the type, it is
+        # dropped with the cached queries on writes
+        index = self._cached(
+            ("prefix", model_type, tuple(fields)),
+            lambda: PrefixIndex(self.storage_handler.get_all(model_type), fields),
+        )
+        return index.search(query, limit)
+
+    def get_by_id(self, id: int, model_type: Type[SQLModel]) -> SQLModel:
+        return self._cached(
+            ("id", model_type, id),
+            lambda: self.storage_handler.get_by_id(id, model_type),
+        )
+
+    def create(self, model: SQLModel) -> SQLModel:
+        self._invalidate(type(model))
+        return self.storage_handler.create(model)
+
+    def update(self, id: int, model: SQLModel) -> SQLModel:
+        self._invalidate(type(model), id)
+        return self.storage_handler.update(id, model)
+
+    def delete(self, id: int, model_type: Type[SQLModel]) -> None:
+        self._invalidate(model_type, id, cascaded_tables(model_type))
+        self.storage_handler.delete(id, model_type)
+
+    def update_where(
+        self, model_type: Type[SQLModel], conditions, values: Dict[str, Any]
+    ) -> int:
+        # The IDs of updated rows aren't known, drop everything
+        self.clear()
+        return self.storage_handler.update_where(model_type, conditions, values)
+
+    def delete_where(self, model_type: Type[SQLModel], conditions) -> int:
+        # The IDs of deleted rows aren't known, drop everything
+        self.clear()
+        return self.storage_handler.delete_where(model_type, conditions)
+
+    def upsert_many(
+        self,
+        models: List[SQLModel],
+        conflict_fields: List[str] | None = None,
+        chunk_size: int = 500,
+        update_fields: List[str] | None = None,
+    ) -> int:
+        # The IDs of updated rows aren't known, drop everything
+        self.clear()
+        return self.storage_handler.upsert_many(
+            models, conflict_fields, chunk_size, update_fields
+        )
+
+    @contextmanager
+    def transaction(self) -> Iterator["CachedStorageHandler"]:
+        try:
+            with self.storage_handler.transaction():
+                yield self
+        except BaseException:
+            # Lookups inside may have cached rows that were just rolled back
+            self.clear()
+            raise
+
+    def invalidate_changes(self, changes: List[ChangeLogEntry]):
+        """Drop the entries affected by changes written elsewhere, e.g. by another process.
+
+        Meant as a listener of an InvalidationBus.
+
+        Args:
+            changes (List[ChangeLogEntry]): Changes read from the change log
+        """
+        changed = {(change.table_name, change.row_id) for change in changes}
+        # Changes without row ID, e.g. of delete_where, may touch any row of the table
+        changed_tables = {
+            table_name for table_name, row_id in changed if row_id is None
+        }
+        for key in list(self._entries):
+            if (
+                key[0] != "id"
+                or key[1].__tablename__ in changed_tables
+                or (key[1].__tablename__, key[2]) in changed
+            ):
+                del self._entries[key]
+
+    def clear(self):
+        """Drop every cached entry."""
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _cached(self, key: Hashable, load):
+        """Get a cached value, or load and cache it when missing or expired.
+
+        Args:
+            key (Hashable): Key of the entry
+            load (Callable[[], Any]): Function loading the value
+
+        Returns:
+            Any: The cached or loaded value
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = load()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        return value
+
+    def _invalidate(
+        self,
+        model_type: Type[SQLModel],
+        id: int | None = None,
+        cascaded: List[str] | None = None,
+    ):
+        """Drop the cached queries and, if given, the cached model with the id.
+
+        Args:
+            model_type (Type[SQLModel]): The written model class
+            id (int | None, optional): ID of the written model. Defaults to None.
+            cascaded (List[str] | None, optional): Tables the write cascades to, every
+                cached model of them is dropped. Defaults to None.
+        """
+        for key in list(self._entries):
+            if (
+                key[0] != "id"
+                or (key[1] is model_type and key[2] == id)
+                or key[1].__tablename__ in (cascaded or [])
+            ):
+                del self._entries[key]
+
+
+def _conditions_key(conditions) -> Hashable | None:
+    """Build a cache key from SQLAlchemy conditions.
+
+    Args:
+        conditions: Conditions as passed to get_all_where
+
+    Returns:
+        Hashable | None: The SQL of every condition with its parameters, None when a
+            condition can't be used as a key
+    """
+    try:
+        key = []
+        for condition in conditions:
+            compiled = condition.compile()
+            key.append((str(compiled), tuple(sorted(compiled.params.items()))))
+        key = tuple(key)
+        hash(key)
+        return key
+    except (SQLAlchemyError, TypeError):
+        return None
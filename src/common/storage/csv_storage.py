@@ -100,6 +100,45 @@ class CSVStorageHandler(StorageHandler):
             writer.writeheader()
             writer.writerows(rows)
 
+    def upsert_many(self, rows: List[Dict[str, Any]], key_fields: List[str]) -> int:
+        """Save many entries at once, updating the entries with the same key.
+
+        The file is read and written once, however many entries are saved.
+
+        Args:
+            rows: Dictionaries containing the data to save, like for save
+            key_fields: Fields identifying an entry, e.g. ["id"]
+
+        Returns:
+            int: Number of saved entries
+        """
+        try:
+            existing_rows = self.load()
+        except FileNotFoundError:
+            existing_rows = []
+
+        # CSV values are read back as strings, compare keys as strings too
+        rows_by_key = {
+            tuple(str(row[field]) for field in key_fields): row for row in existing_rows
+        }
+        for data in rows:
+            key = tuple(str(data[field]) for field in key_fields)
+            if key in rows_by_key:
+                rows_by_key[key].update(data)
+            else:
+                rows_by_key[key] = dict(data)
+
+        all_rows = list(rows_by_key.values())
+        if len(all_rows) == 0:
+            return 0
+
+        with open(self.file_path, mode="w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=all_rows[0].keys())
+            writer.writeheader()
+            writer.writerows(all_rows)
+
+        return len(rows)
+
     def generate_id(self) -> int:
         """Generate a new ID for a new entry.
 
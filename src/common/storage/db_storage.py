@@ -1,17 +1,157 @@
 import os
-from typing import Annotated, List, Type
+import random
+from contextlib import contextmanager
+from datetime import date, datetime
+from enum import Enum
+from functools import cache
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Tuple, Type
 
-from fastapi import Depends
+from sqlalchemy import (
+    Engine,
+    UniqueConstraint,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    literal_column,
+    or_,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import RelationshipProperty
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
 from sqlmodel import Session, SQLModel, create_engine, select
 
+from src.common.models import ChangeLogEntry, ChangeOperation, cascaded_tables
+from src.common.storage.statement_cache import StatementCache, statement_cache
 from src.common.storage.storage import NewStorageHandler
 
-# SQLite database configuration
-if os.getenv("ENVIRONMENT") == "development":
-    DATABASE_URL = "sqlite:///./database.db"
-else:
-    DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL)
+
+def get_database_url() -> str:
+    """Get the URL of the database to use.
+
+    Returns:
+        str: Local SQLite database in development, DATABASE_URL otherwise
+    """
+    if os.getenv("ENVIRONMENT") == "development":
+        return "sqlite:///./database.db"
+    return os.getenv("DATABASE_URL")
+
+
+@cache
+def get_engine() -> Engine:
+    """Get the database engine, it is created on first use.
+
+    Returns:
+        Engine: Engine connected to the configured database
+    """
+    engine = create_engine(get_database_url())
+    enable_sqlite_foreign_keys(engine)
+    return engine
+
+
+@cache
+def get_replica_engines() -> List[Engine]:
+    """Get the engines of the read replicas, they are created on first use.
+
+    Returns:
+        List[Engine]: Engines connected to the comma separated DATABASE_REPLICA_URLS,
+            none in development
+    """
+    if os.getenv("ENVIRONMENT") == "development":
+        return []
+
+    urls = os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    return [create_engine(url.strip()) for url in urls if url.strip()]
+
+
+def enable_sqlite_foreign_keys(engine: Engine):
+    """Turn on foreign keys for every connection of an SQLite engine.
+
+    SQLite ignores foreign keys, and with them ON DELETE CASCADE, unless every
+    connection asks for them. Engines of other databases are left as they are.
+
+    Args:
+        engine (Engine): Engine to turn foreign keys on for
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _foreign_keys_on(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+class RoutingSession(Session):
+    """Session reading from a read replica and writing to the primary database.
+
+    Once the session has written something, everything goes to the primary, so the
+    session reads its own writes even when the replica lags behind. Writes that are
+    rolled back don't count. A session lives for one request in the server, or for
+    one command line run.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], **kwargs):
+        """Initialize RoutingSession.
+
+        Args:
+            primary (Engine): Engine of the primary database, gets every write
+            replicas (List[Engine]): Engines of the read replicas
+            **kwargs: Passed to Session
+        """
+        super().__init__(bind=primary, **kwargs)
+        self.primary = primary
+        # One replica for the whole session, so its reads don't go back in time
+        self.replica = random.choice(replicas)
+        # Whether the running transaction has written, its writes are only visible on
+        # the connection to the primary
+        self.writing = False
+        # Whether a committed transaction has written, the replica may not have it yet
+        self.sticky = False
+        event.listen(self, "before_flush", self._start_writing)
+        event.listen(self, "after_commit", self._commit_writes)
+        event.listen(self, "after_rollback", self._roll_back_writes)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        # Core statements like INSERT ... ON CONFLICT don't go through a flush
+        if isinstance(clause, UpdateBase):
+            self.writing = True
+        if self.writing or self.sticky or not isinstance(clause, Select):
+            return self.primary
+        return self.replica
+
+    def _start_writing(self, session, flush_context, instances):
+        self.writing = True
+
+    def _commit_writes(self, session):
+        self.sticky = self.sticky or self.writing
+        self.writing = False
+
+    def _roll_back_writes(self, session):
+        # The writes are gone, reads of earlier committed ones still stick
+        self.writing = False
+
+
+def create_session() -> Session:
+    """Create a new database session, reading from a replica when there are any.
+
+    Returns:
+        Session: SQLModel database session
+    """
+    replicas = get_replica_engines()
+    if not replicas:
+        return Session(get_engine())
+    return RoutingSession(get_engine(), replicas)
 
 
 def get_session():
@@ -20,18 +160,237 @@ def get_session():
     Yields:
         Session: SQLModel database session
     """
-    with Session(engine) as session:
+    with create_session() as session:
         yield session
 
 
+class OutdatedSchemaError(Exception):
+    """Raised when tables of an existing database lack parts of the models.
+
+    Attributes:
+        missing (List[str]): Every missing part, e.g.
+            "attendencerecord (student_id) -> student (id) ON DELETE CASCADE"
+    """
+
+    def __init__(self, missing: List[str]):
+        super().__init__(
+            "The database was created by an older version and can't be upgraded "
+            "automatically, it lacks: "
+            + "; ".join(missing)
+            + '. See "Upgrading databases" in the README.'
+        )
+        self.missing = missing
+
+
+def upgrade_schema(engine: Engine):
+    """Add what the models gained since the tables were created to existing tables.
+
+    create_all only creates missing tables and never alters existing ones. Nullable
+    columns the models gained are added with their foreign keys, and missing indexes
+    are created, and unique indexes for missing unique constraints, unless rows
+    violate them. Everything else is left to check_schema to report.
+
+    Args:
+        engine (Engine): Engine of the database to upgrade
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {table.name} ADD COLUMN "
+                        f"{_column_definition(column, engine)}"
+                    )
+                )
+
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    for table in SQLModel.metadata.sorted_tables:
+        existing = _unique_column_sets(inspector, table.name)
+        for constraint in _unique_constraints(table):
+            columns = [column.name for column in constraint.columns]
+            if frozenset(columns) in existing:
+                continue
+            try:
+                # Its own transaction, duplicates only leave this constraint out
+                with engine.begin() as connection:
+                    connection.execute(
+                        text(
+                            f"CREATE UNIQUE INDEX IF NOT EXISTS "
+                            f"uq_{table.name}_{'_'.join(columns)} "
+                            f"ON {table.name} ({', '.join(columns)})"
+                        )
+                    )
+            except IntegrityError:
+                # Reported by check_schema, the duplicates have to go first
+                pass
+
+
+def check_schema(engine: Engine):
+    """Check that the tables in the database have everything the models declare.
+
+    Tables created before a foreign key was added to the models don't have it, and
+    the database wouldn't keep the references consistent, e.g. deletes would silently
+    keep the rows that should cascade.
+
+    Args:
+        engine (Engine): Engine of the database to check
+
+    Raises:
+        OutdatedSchemaError: If any column, unique constraint, foreign key or its
+            ON DELETE action is missing
+    """
+    inspector = inspect(engine)
+    missing = []
+    with engine.connect() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            missing.extend(
+                f"column {table.name}.{column.name}"
+                for column in table.columns
+                if column.name not in columns
+            )
+
+            unique = _unique_column_sets(inspector, table.name)
+            missing.extend(
+                f"unique {table.name} "
+                f"({', '.join(column.name for column in constraint.columns)}), "
+                "delete the duplicate rows"
+                for constraint in _unique_constraints(table)
+                if frozenset(column.name for column in constraint.columns) not in unique
+            )
+
+            existing = _foreign_keys(connection, inspector, table.name)
+            for constraint in table.foreign_key_constraints:
+                key = _foreign_key(
+                    constraint.column_keys,
+                    constraint.referred_table.name,
+                    [element.column.name for element in constraint.elements],
+                    constraint.ondelete,
+                )
+                if key not in existing:
+                    missing.append(_describe_foreign_key(table.name, key))
+
+    if missing:
+        raise OutdatedSchemaError(missing)
+
+
+def _unique_constraints(table) -> List[UniqueConstraint]:
+    return [
+        constraint
+        for constraint in table.constraints
+        if isinstance(constraint, UniqueConstraint)
+    ]
+
+
+def _unique_column_sets(inspector, table_name: str) -> set:
+    """Column sets of the unique constraints and unique indexes of a table."""
+    return {
+        frozenset(constraint["column_names"])
+        for constraint in inspector.get_unique_constraints(table_name)
+    } | {
+        frozenset(index["column_names"])
+        for index in inspector.get_indexes(table_name)
+        if index["unique"]
+    }
+
+
+def _column_definition(column, engine: Engine) -> str:
+    """DDL of a column to add, with its foreign keys."""
+    definition = str(CreateColumn(column).compile(dialect=engine.dialect))
+    for foreign_key in column.foreign_keys:
+        definition += (
+            f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+        )
+        if foreign_key.ondelete:
+            definition += f" ON DELETE {foreign_key.ondelete}"
+
+    return definition
+
+
+def _foreign_key(columns, referred_table: str, referred_columns, ondelete) -> tuple:
+    ondelete = (ondelete or "").upper()
+    return (
+        tuple(columns),
+        referred_table,
+        tuple(referred_columns),
+        "" if ondelete == "NO ACTION" else ondelete,
+    )
+
+
+def _foreign_keys(connection, inspector, table_name: str) -> set:
+    """Foreign keys of a table in the database, see _foreign_key."""
+    if connection.dialect.name == "sqlite":
+        # The inspector only finds ON DELETE of table constraints, not of columns
+        # added with ALTER TABLE, the pragma knows both
+        constraints: Dict[int, list] = {}
+        for row in connection.exec_driver_sql(
+            f"PRAGMA foreign_key_list({table_name})"
+        ):
+            constraints.setdefault(row.id, []).append(row)
+        return {
+            _foreign_key(
+                # "from" is a keyword, the column is read by position
+                [row[3] for row in rows],
+                rows[0].table,
+                [row.to for row in rows],
+                rows[0].on_delete,
+            )
+            for rows in constraints.values()
+        }
+
+    return {
+        _foreign_key(
+            foreign_key["constrained_columns"],
+            foreign_key["referred_table"],
+            foreign_key["referred_columns"],
+            foreign_key.get("options", {}).get("ondelete"),
+        )
+        for foreign_key in inspector.get_foreign_keys(table_name)
+    }
+
+
+def _describe_foreign_key(table_name: str, key: tuple) -> str:
+    columns, referred_table, referred_columns, ondelete = key
+    return (
+        f"{table_name} ({', '.join(columns)}) -> "
+        f"{referred_table} ({', '.join(referred_columns)})"
+        + (f" ON DELETE {ondelete}" if ondelete else "")
+    )
+
+
 def create_db_and_tables():
-    """Create database and tables based on SQLModel metadata."""
+    """Create database and tables based on SQLModel metadata, upgrading existing ones.
+
+    Raises:
+        OutdatedSchemaError: If existing tables lack parts of the models that can't
+            be added automatically
+    """
+    # Tables are registered in the metadata when their models are imported
+    import src.common.models  # noqa: F401
+
+    engine = get_engine()
     SQLModel.metadata.create_all(engine)
+    upgrade_schema(engine)
+    check_schema(engine)
 
 
-# Type alias for dependency injection of SQLModel Session using FastAPI's Depends
-# This allows us to inject database sessions into route handlers
-SessionDep = Annotated[Session, Depends(get_session)]
+class WriteMode(str, Enum):
+    """How DBStorageHandler gets generated values of written models.
+
+    refresh: Reload the model with a SELECT after every commit.
+    returning: Take generated values from the INSERT itself (RETURNING or the row ID of
+        the driver) and keep the in-session state after the commit, saving a SELECT per
+        write. Values changed in the database by triggers are not seen.
+    """
+
+    refresh = "refresh"
+    returning = "returning"
 
 
 class DBStorageHandler(NewStorageHandler):
@@ -40,13 +399,33 @@ class DBStorageHandler(NewStorageHandler):
     This class implements the NewStorageHandler interface using SQLModel for database operations.
     """
 
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Session,
+        autocommit: bool = True,
+        statement_cache: StatementCache = statement_cache,
+        write_mode: WriteMode = WriteMode.refresh,
+        change_log: bool = True,
+    ):
         """Initialize DBStorageHandler with a database session.
 
         Args:
             session (Session): SQLModel database session
+            autocommit (bool, optional): Commit after every create, update and delete.
+                When False changes are only flushed and the owner of the session decides
+                when to commit. Defaults to True.
+            statement_cache (StatementCache, optional): Cache of the statements used by
+                get_all_by. Defaults to the cache shared by every handler.
+            write_mode (WriteMode, optional): How created and updated models get their
+                generated values. Defaults to WriteMode.refresh.
+            change_log (bool, optional): Record every create, update and delete in the
+                ChangeLogEntry table, in the same transaction. Defaults to True.
         """
         self.session = session
+        self.autocommit = autocommit
+        self.statement_cache = statement_cache
+        self.write_mode = write_mode
+        self.change_log = change_log
 
     def get_all(self, model_type: Type[SQLModel]) -> List[SQLModel]:
         """Get all models of the specified type.
@@ -60,6 +439,124 @@ class DBStorageHandler(NewStorageHandler):
         result = self.session.exec(select(model_type)).all()
         return list(result)
 
+    def count_where(self, model_type: Type[SQLModel], conditions) -> int:
+        """Count the models of given type that match the conditions.
+
+        The database counts the rows with SELECT COUNT, no rows are fetched.
+
+        Example:
+            # Number of students in semester 3
+            count = storage.count_where(Student, [Student.semester == 3])
+
+        Args:
+            model_type (Type[SQLModel]): The model class to count
+            conditions: SQLAlchemy conditions the models have to match
+
+        Returns:
+            int: Number of matching models
+        """
+        statement = select(func.count()).select_from(model_type).where(*conditions)
+        return self.session.exec(statement).one()
+
+    def count_by_where(
+        self, model_type: Type[SQLModel], field: str, conditions
+    ) -> Dict[Any, int]:
+        """Count the models matching the conditions per value of a field.
+
+        One SELECT ... GROUP BY answers the counts of all values at once, instead of
+        counting or loading the models once per value.
+
+        Example:
+            # Number of students in every classroom
+            counts = storage.count_by_where(StudentClassroomLink, "classroom_id", [])
+
+        Args:
+            model_type (Type[SQLModel]): The model class to count
+            field (str): Field to group the models by
+            conditions: SQLAlchemy conditions the models have to match
+
+        Returns:
+            Dict[Any, int]: Number of matching models per value of the field, values
+                without any matching model are left out
+        """
+        column = getattr(model_type, field)
+        statement = (
+            select(column, func.count())
+            .select_from(model_type)
+            .where(*conditions)
+            .group_by(column)
+        )
+        return dict(self.session.exec(statement).all())
+
+    def exists_where(self, model_type: Type[SQLModel], conditions) -> bool:
+        """Check whether any model of given type matches the conditions.
+
+        The database stops at the first matching row of the EXISTS subquery, which
+        is cheaper than counting them all.
+
+        Args:
+            model_type (Type[SQLModel]): The model class to look for
+            conditions: SQLAlchemy conditions the model has to match
+
+        Returns:
+            bool: True when at least one model matches
+        """
+        subquery = select(literal(1)).select_from(model_type).where(*conditions)
+        return bool(self.session.exec(select(subquery.exists())).one())
+
+    def search_prefix(
+        self, model_type: Type[SQLModel], fields: List[str], query: str, limit: int = 20
+    ) -> List[SQLModel]:
+        """Find models where every word of the query starts one of the fields.
+
+        Case is ignored. On SQLite LIKE does that by itself and a NOCASE index turns the
+        prefix into a range scan, on Postgres ILIKE is served by a trigram index, see
+        the search indexes of the models.
+
+        Example:
+            # John Doe, Joanna Doyle, ...
+            students = storage.search_prefix(Student, ["surname", "name"], "jo do")
+
+        Args:
+            model_type (Type[SQLModel]): The model class to search
+            fields (List[str]): Fields to search, results are sorted by them
+            query (str): Words to search for
+            limit (int, optional): Maximum number of models. Defaults to 20.
+
+        Returns:
+            List[SQLModel]: Matching models sorted by the fields
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        # ILIKE would wrap the columns in lower() on SQLite, hiding them from the index
+        case_sensitive = self.session.get_bind().dialect.name != "sqlite"
+        conditions = []
+        for term in terms:
+            pattern = _escape_like(term) + "%"
+            conditions.append(
+                or_(
+                    *(
+                        getattr(model_type, field).ilike(pattern, escape="\\")
+                        if case_sensitive
+                        else getattr(model_type, field).like(pattern, escape="\\")
+                        for field in fields
+                    )
+                )
+            )
+
+        statement = (
+            select(model_type)
+            .where(*conditions)
+            .order_by(
+                *(getattr(model_type, field) for field in fields),
+                *model_type.__table__.primary_key.columns,
+            )
+            .limit(limit)
+        )
+        return list(self.session.exec(statement).all())
+
     def get_by_id(self, id: int, model_type: Type[SQLModel]) -> SQLModel:
         """Get a model by its ID.
 
@@ -101,6 +598,91 @@ class DBStorageHandler(NewStorageHandler):
         result = self.session.exec(select(model_type).where(*conditions)).all()
         return list(result)
 
+    def get_all_by(self, model_type: Type[SQLModel], **filters: Any) -> List[SQLModel]:
+        """Get all models of given type whose fields equal the given values.
+
+        Unlike get_all_where the statement is built once per model type and set of
+        fields, which makes this the cheapest way to run frequent lookups.
+
+        Example:
+            # Get all students in semester 4 of the master degree
+            students = storage.get_all_by(Student, degree=DegreeName.master, semester=4)
+
+        Args:
+            model_type (Type[SQLModel]): The model class to query
+            **filters (Any): Field=value pairs, values must not be None
+
+        Returns:
+            List[SQLModel]: List of matching models
+        """
+        statement = self.statement_cache.select_where_equal(model_type, tuple(filters))
+        return list(self.session.exec(statement, params=filters).all())
+
+    def iter_all_where(
+        self,
+        model_type: Type[SQLModel],
+        conditions,
+        batch_size: int = 1000,
+        order_by: List[str] | None = None,
+    ) -> Iterator[SQLModel]:
+        """Iterate over the models of given type that match the conditions.
+
+        Rows are fetched from the database batch_size at a time while iterating, so
+        large results don't have to fit in memory.
+
+        Args:
+            model_type (Type[SQLModel]): The model class to query
+            conditions: SQLAlchemy conditions the models have to match, e.g.
+                [Student.semester == 4]
+            batch_size (int, optional): Rows fetched at once. Defaults to 1000.
+            order_by (List[str] | None, optional): Fields to sort the models by, with
+                a leading "-" for descending order, e.g. ["-seq"]. Unsorted when None.
+                Defaults to None.
+
+        Yields:
+            SQLModel: Matching models
+        """
+        statement = (
+            select(model_type)
+            .where(*conditions)
+            .order_by(*(_order_by(model_type, field) for field in order_by or []))
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.session.exec(statement)
+
+    def iter_values_where(
+        self,
+        model_type: Type[SQLModel],
+        fields: List[str],
+        conditions,
+        batch_size: int = 1000,
+        order_by: List[str] | None = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Iterate over the values of some fields of the models matching the conditions.
+
+        Only the given columns are selected and no models are built, which makes this
+        the fastest way to export many rows.
+
+        Args:
+            model_type (Type[SQLModel]): The model class to query
+            fields (List[str]): Fields to select, e.g. ["id", "name"]
+            conditions: SQLAlchemy conditions the models have to match
+            batch_size (int, optional): Rows fetched at once. Defaults to 1000.
+            order_by (List[str] | None, optional): Fields to sort the rows by, with
+                a leading "-" for descending order. Defaults to None.
+
+        Yields:
+            Tuple[Any, ...]: Values of the fields, in the order of fields
+        """
+        columns = [getattr(model_type, field) for field in fields]
+        statement = (
+            select(*columns)
+            .where(*conditions)
+            .order_by(*(_order_by(model_type, field) for field in order_by or []))
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.session.execute(statement).tuples()
+
     def create(self, model: SQLModel) -> SQLModel:
         """Create a new model in the database.
 
@@ -111,8 +693,7 @@ class DBStorageHandler(NewStorageHandler):
             SQLModel: The created model with updated fields (e.g. ID)
         """
         self.session.add(model)
-        self.session.commit()
-        self.session.refresh(model)
+        self._write(model, ChangeOperation.created)
         return model
 
     def update(self, id: int, model: SQLModel) -> SQLModel:
@@ -136,8 +717,7 @@ class DBStorageHandler(NewStorageHandler):
         model_data = model.model_dump(exclude_unset=True)
         db_model.sqlmodel_update(model_data)
         self.session.add(db_model)
-        self.session.commit()
-        self.session.refresh(db_model)
+        self._write(db_model, ChangeOperation.updated)
         return db_model
 
     def delete(self, id: int, model_type: Type[SQLModel]) -> None:
@@ -155,20 +735,458 @@ class DBStorageHandler(NewStorageHandler):
         if not db_model:
             raise ValueError(f"Model with id {id} not found")
 
+        # The values tell consumers what was deleted, e.g. the classroom of a record
+        self._log_changes(
+            model_type, [(id, _model_data(db_model))], ChangeOperation.deleted
+        )
+        self._log_cascaded_deletes(model_type)
         self.session.delete(db_model)
-        self.session.commit()
+        self._commit()
+
+    def update_where(
+        self, model_type: Type[SQLModel], conditions, values: Dict[str, Any]
+    ) -> int:
+        """Set values of every model of given type that matches the conditions.
+
+        Like delete_where, the whole statement gets a single change log entry.
+
+        Args:
+            model_type (Type[SQLModel]): The model class to update
+            conditions: SQLAlchemy conditions the updated models match
+            values (Dict[str, Any]): New values by field name
+
+        Returns:
+            int: Number of updated models
+        """
+        updated = self.session.execute(
+            update(model_type).where(*conditions).values(**values)
+        ).rowcount
+        if updated:
+            self._log_changes(model_type, [(None, None)], ChangeOperation.updated)
+        self._commit()
+        return updated
+
+    def delete_where(self, model_type: Type[SQLModel], conditions) -> int:
+        """Delete every model of given type that matches the conditions, in one statement.
+
+        Rows referencing the deleted ones with ON DELETE CASCADE, e.g. attendance
+        records of a student, are deleted by the database in the same statement.
+
+        The change log gets a single entry without row ID for the whole statement and
+        one for every table rows may have been cascaded to, consumers treat them as a
+        change of any row of the table.
+
+        Args:
+            model_type (Type[SQLModel]): The model class to delete from
+            conditions: SQLAlchemy conditions the deleted models match, e.g.
+                [AttendenceRecord.date < datetime(2024, 1, 1)]
+
+        Returns:
+            int: Number of deleted models
+        """
+        deleted = self.session.execute(delete(model_type).where(*conditions)).rowcount
+        if deleted:
+            self._log_changes(model_type, [(None, None)], ChangeOperation.deleted)
+            self._log_cascaded_deletes(model_type)
+        self._commit()
+        return deleted
+
+    def upsert_many(
+        self,
+        models: List[SQLModel],
+        conflict_fields: List[str] | None = None,
+        chunk_size: int = 500,
+        update_fields: List[str] | None = None,
+    ) -> int:
+        """Insert models, updating the existing rows they conflict with.
+
+        Every chunk is a single INSERT ... ON CONFLICT DO UPDATE statement, so syncing
+        data that is mostly there already needs no lookups in Python. Models are not
+        added to the session, query them again to get generated IDs.
+
+        Inserted rows are logged as created, updated ones as updated. Postgres tells
+        them apart in RETURNING, on SQLite the existing rows are looked up first when
+        rows may be updated.
+
+        Example:
+            # Re-sending the same records changes nothing
+            storage.upsert_many(
+                records,
+                conflict_fields=["student_id", "classroom_id", "date"],
+                update_fields=[],
+            )
+
+        Args:
+            models (List[SQLModel]): Models of one type to write, all of them setting
+                the same fields
+            conflict_fields (List[str] | None, optional): Fields of a primary key or
+                unique constraint identifying existing rows. Defaults to None, which
+                uses the primary key.
+            chunk_size (int, optional): Models per statement. Defaults to 500.
+            update_fields (List[str] | None, optional): Fields set on existing rows, an
+                empty list leaves them alone. Defaults to None, which sets every field
+                but the conflict fields.
+
+        Returns:
+            int: Number of inserted or updated rows
+
+        Raises:
+            NotImplementedError: When the database is neither SQLite nor PostgreSQL
+        """
+        if not models:
+            return 0
+
+        insert = self._dialect_insert()
+        model_type = type(models[0])
+        table = model_type.__table__
+        primary_key = [column.name for column in table.primary_key]
+        conflict_fields = conflict_fields or primary_key
 
+        written = 0
+        models = iter(models)
+        while chunk := list(islice(models, chunk_size)):
+            rows = [_insert_values(model, primary_key) for model in chunk]
+            statement = insert(table).values(rows)
+            if update_fields is None:
+                update_fields = [
+                    field for field in rows[0] if field not in conflict_fields
+                ]
+            if update_fields:
+                statement = statement.on_conflict_do_update(
+                    index_elements=conflict_fields,
+                    set_={field: statement.excluded[field] for field in update_fields},
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(
+                    index_elements=conflict_fields
+                )
 
-def get_db_storage_handler(session: SessionDep) -> DBStorageHandler:
-    """Create a DBStorageHandler instance with a database session.
+            returning = list(table.c)
+            postgres = self.session.get_bind().dialect.name == "postgresql"
+            existing = set()
+            if update_fields and postgres:
+                # xmax is 0 for rows the statement inserted, set for the updated ones
+                returning.append(literal_column("xmax = 0").label("_inserted"))
+            elif update_fields:
+                existing = self._existing_keys(table, conflict_fields, rows)
+
+            # Rows left alone by DO NOTHING aren't returned
+            written_rows = self.session.execute(statement.returning(*returning)).all()
+            written += len(written_rows)
+
+            changes = {ChangeOperation.created: [], ChangeOperation.updated: []}
+            for row in written_rows:
+                values = row._mapping
+                if not update_fields:
+                    inserted = True
+                elif postgres:
+                    inserted = values["_inserted"]
+                else:
+                    inserted = (
+                        tuple(values[field] for field in conflict_fields)
+                        not in existing
+                    )
+                operation = (
+                    ChangeOperation.created if inserted else ChangeOperation.updated
+                )
+                data = _json_data(
+                    {column.name: values[column.name] for column in table.c}
+                )
+                changes[operation].append((_row_id(row, primary_key), data))
+            for operation, operation_changes in changes.items():
+                self._log_changes(model_type, operation_changes, operation)
+
+        self._commit()
+        return written
+
+    def _existing_keys(
+        self, table, conflict_fields: List[str], rows: List[Dict[str, Any]]
+    ) -> set:
+        """Values of the conflict fields of the rows that already exist."""
+        columns = [table.c[field] for field in conflict_fields]
+        keys = {tuple(row.get(field) for field in conflict_fields) for row in rows}
+        statement = select(*columns).where(tuple_(*columns).in_(keys))
+        return {tuple(row) for row in self.session.execute(statement)}
+
+    @contextmanager
+    def transaction(self) -> Iterator["DBStorageHandler"]:
+        """Run many writes as one atomic unit, committed once at the end.
+
+        Writes inside only flush. When the block raises everything since the start of
+        the transaction is rolled back. Transactions can be nested, an inner one is a
+        savepoint, and so is a transaction on a handler without autocommit, whose owner
+        still decides when to commit.
+
+        Example:
+            with storage.transaction():
+                classroom = storage.create(Classroom(subject_id=1))
+                storage.create(AttendenceRecord(classroom_id=classroom.id, ...))
+
+        Yields:
+            DBStorageHandler: This handler
+        """
+        if not self.autocommit:
+            with self.session.begin_nested():
+                yield self
+            return
+
+        self.autocommit = False
+        try:
+            yield self
+            self.session.commit()
+        except BaseException:
+            self.session.rollback()
+            raise
+        finally:
+            self.autocommit = True
+
+    def _dialect_insert(self):
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            return sqlite.insert
+        if dialect == "postgresql":
+            return postgresql.insert
+
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+
+    def _commit(self):
+        """Commit the session, or only flush it when autocommit is disabled."""
+        if self.autocommit:
+            self.session.commit()
+        else:
+            self.session.flush()
+
+    def _write(self, model: SQLModel, operation: ChangeOperation):
+        """Commit a created or updated model and load its generated values.
+
+        Args:
+            model (SQLModel): The written model
+            operation (ChangeOperation): What happened to the model, for the change log
+        """
+        # Read before the flush, it resets what was added to and removed from collections
+        link_changes = _link_changes(model)
+        # The flush sets the generated ID
+        self.session.flush()
+        self._log_changes(
+            type(model),
+            [(getattr(model, "id", None), _model_data(model))],
+            operation,
+        )
+        self._log_link_changes(model, link_changes)
+
+        if self.write_mode == WriteMode.refresh:
+            self._commit()
+            self.session.refresh(model)
+            return
+
+        # Keep the flushed state instead of expiring it
+        with self._keep_state_on_commit():
+            self._commit()
+
+    def _log_changes(
+        self,
+        model_type: Type[SQLModel],
+        changes: List[Tuple[int | None, Dict[str, Any] | None]],
+        operation: ChangeOperation,
+    ):
+        """Record changes of rows in the change log, in the current transaction.
+
+        Args:
+            model_type (Type[SQLModel]): The model class of the changed rows
+            changes (List[Tuple[int | None, Dict[str, Any] | None]]): ID and JSON data
+                of every changed row
+            operation (ChangeOperation): What happened to the rows
+        """
+        # Pruning the log isn't a change consumers have to apply
+        if not self.change_log or not changes or model_type is ChangeLogEntry:
+            return
+
+        changed_at = datetime.now()
+        self.session.execute(
+            insert(ChangeLogEntry),
+            [
+                {
+                    "table_name": model_type.__tablename__,
+                    "row_id": row_id,
+                    "operation": operation,
+                    "data": data,
+                    "changed_at": changed_at,
+                }
+                for row_id, data in changes
+            ],
+        )
+
+    def _log_link_changes(
+        self,
+        model: SQLModel,
+        link_changes: List[Tuple[RelationshipProperty, SQLModel, ChangeOperation]],
+    ):
+        """Record the link rows written for many-to-many collections of a model.
+
+        E.g. enrolling a student records a created studentclassroomlink entry with the
+        IDs of both sides, unenrolling a deleted one. Link rows have no single ID, so
+        the entries carry no row_id.
+
+        Args:
+            model (SQLModel): The flushed model owning the collections
+            link_changes (List[Tuple[RelationshipProperty, SQLModel, ChangeOperation]]):
+                Relationship, linked model and operation of every link, see _link_changes
+        """
+        if not self.change_log or not link_changes:
+            return
+
+        changed_at = datetime.now()
+        self.session.execute(
+            insert(ChangeLogEntry),
+            [
+                {
+                    "table_name": relationship.secondary.name,
+                    "row_id": None,
+                    "operation": operation,
+                    "data": _link_data(model, relationship, linked),
+                    "changed_at": changed_at,
+                }
+                for relationship, linked, operation in link_changes
+            ],
+        )
+
+    def _log_cascaded_deletes(self, model_type: Type[SQLModel]):
+        """Record that rows of the tables deletes of a model cascade to may be gone."""
+        table_names = cascaded_tables(model_type)
+        if not self.change_log or not table_names:
+            return
+
+        changed_at = datetime.now()
+        self.session.execute(
+            insert(ChangeLogEntry),
+            [
+                {
+                    "table_name": table_name,
+                    "row_id": None,
+                    "operation": ChangeOperation.deleted,
+                    "data": None,
+                    "changed_at": changed_at,
+                }
+                for table_name in table_names
+            ],
+        )
+
+    @contextmanager
+    def _keep_state_on_commit(self):
+        expire_on_commit = self.session.expire_on_commit
+        self.session.expire_on_commit = False
+        try:
+            yield
+        finally:
+            self.session.expire_on_commit = expire_on_commit
+
+
+def _insert_values(model: SQLModel, primary_key: List[str]) -> Dict[str, Any]:
+    """Column values of a model to insert, leaving out a primary key still to generate.
 
     Args:
-        session (SessionDep): Database session dependency
+        model (SQLModel): Model to insert
+        primary_key (List[str]): Fields of the primary key
 
     Returns:
-        DBStorageHandler: New DBStorageHandler instance configured with the session
+        Dict[str, Any]: Field=value pairs
+    """
+    values = model.model_dump()
+    for field in primary_key:
+        if values.get(field) is None:
+            values.pop(field, None)
+    return values
+
+
+def _escape_like(term: str) -> str:
+    """Escape the wildcards of LIKE in a search term, with backslashes."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _order_by(model_type: Type[SQLModel], field: str):
+    """Sort clause of a field, "-field" sorts descending."""
+    if field.startswith("-"):
+        return getattr(model_type, field[1:]).desc()
+    return getattr(model_type, field)
+
+
+def _row_id(row, primary_key: List[str]) -> int | None:
+    """ID of a row for the change log, None for composite primary keys."""
+    return row._mapping[primary_key[0]] if len(primary_key) == 1 else None
+
+
+def _link_changes(
+    model: SQLModel,
+) -> List[Tuple[RelationshipProperty, SQLModel, ChangeOperation]]:
+    """Models added to and removed from the many-to-many collections of a model.
+
+    Must be called before the session is flushed.
     """
-    return DBStorageHandler(session)
+    state = inspect(model)
+    changes = []
+    for relationship in state.mapper.relationships:
+        if relationship.secondary is None:
+            continue
+        history = state.attrs[relationship.key].history
+        changes.extend(
+            (relationship, linked, ChangeOperation.created) for linked in history.added
+        )
+        changes.extend(
+            (relationship, linked, ChangeOperation.deleted)
+            for linked in history.deleted
+        )
+    return changes
+
+
+def _link_data(
+    model: SQLModel, relationship: RelationshipProperty, linked: SQLModel
+) -> Dict[str, Any]:
+    """Values of the link row between a model and a model in its collection."""
+    data = {
+        link_column.key: getattr(model, column.key)
+        for column, link_column in relationship.synchronize_pairs
+    }
+    data.update(
+        {
+            link_column.key: getattr(linked, column.key)
+            for column, link_column in relationship.secondary_synchronize_pairs
+        }
+    )
+    return data
+
+
+def _model_data(model: SQLModel) -> Dict[str, Any]:
+    """Column values of a model as JSON compatible data."""
+    return _json_data(
+        {column.key: getattr(model, column.key) for column in model.__table__.columns}
+    )
+
+
+def _json_data(values) -> Dict[str, Any]:
+    """Column values of a row as JSON compatible data, e.g. dates as strings."""
+    return {key: _json_value(value) for key, value in values.items()}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+# Names that moved, kept importable from here. The FastAPI dependencies live in
+# src.server.dependencies and are only imported when asked for.
+_SERVER_DEPENDENCIES = {"SessionDep", "get_db_storage_handler", "DBStorageHandlerDep"}
+
 
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    if name in _SERVER_DEPENDENCIES:
+        from src.server import dependencies
 
-DBStorageHandlerDep = Annotated[DBStorageHandler, Depends(get_db_storage_handler)]
+        return getattr(dependencies, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
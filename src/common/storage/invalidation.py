@@ -0,0 +1,98 @@
+from contextlib import closing
+from itertools import islice
+from typing import Callable, List
+
+from src.common.models import ChangeLogEntry, settled_changes
+from src.common.storage.storage import NewStorageHandler
+
+ChangeListener = Callable[[List[ChangeLogEntry]], None]
+
+
+class InvalidationBus:
+    """Broadcast changes of the storage to every process using it.
+
+    Every write is recorded in the change log in the same transaction, so the log is
+    the bus: each process keeps its own bus, polls the log for the entries after the
+    last one it has seen and hands them to its listeners, e.g. caches dropping the
+    changed rows. It works the same on SQLite and Postgres, across worker processes,
+    CLI shells and hosts, and nothing is lost while a process is busy.
+
+    Changes committed out of seq order aren't skipped either: the bus stops before a
+    missing seq until it shows up or is CHANGE_GAP_TIMEOUT old, see settled_changes.
+    Only a change of a transaction running longer than that can still be missed.
+    """
+
+    def __init__(self, last_seq: int = 0, batch_size: int = 1000):
+        """Initialize InvalidationBus.
+
+        Args:
+            last_seq (int, optional): Sequence number of the last seen change, see
+                latest_seq to skip the existing ones. Defaults to 0.
+            batch_size (int, optional): Changes read from the log at once.
+                Defaults to 1000.
+        """
+        self.last_seq = last_seq
+        self.batch_size = batch_size
+        self._listeners: List[ChangeListener] = []
+
+    def subscribe(self, listener: ChangeListener):
+        """Call a listener with every batch of new changes.
+
+        Args:
+            listener (ChangeListener): Function getting the new changes, oldest first
+        """
+        self._listeners.append(listener)
+
+    def poll(self, storage_handler: NewStorageHandler) -> List[ChangeLogEntry]:
+        """Read the changes after the last seen one and pass them to the listeners.
+
+        Args:
+            storage_handler (NewStorageHandler): Handler to read the change log with
+
+        Returns:
+            List[ChangeLogEntry]: The new changes, oldest first
+        """
+        changes = []
+        while True:
+            batch = self._read(storage_handler)
+            # The changes after a gap are read again by the next poll
+            settled = list(settled_changes(batch, self.last_seq))
+            changes.extend(settled)
+            if settled:
+                self.last_seq = settled[-1].seq
+            if len(settled) < self.batch_size:
+                break
+
+        if changes:
+            for listener in self._listeners:
+                listener(changes)
+
+        return changes
+
+    def _read(self, storage_handler: NewStorageHandler) -> List[ChangeLogEntry]:
+        with closing(
+            storage_handler.iter_all_where(
+                ChangeLogEntry,
+                [ChangeLogEntry.seq > self.last_seq],
+                self.batch_size,
+                order_by=["seq"],
+            )
+        ) as changes:
+            return list(islice(changes, self.batch_size))
+
+
+def latest_seq(storage_handler: NewStorageHandler) -> int:
+    """Get the sequence number of the latest change, 0 when nothing changed yet.
+
+    Args:
+        storage_handler (NewStorageHandler): Handler to read the change log with
+
+    Returns:
+        int: Sequence number to start a bus at, skipping the existing changes
+    """
+    with closing(
+        storage_handler.iter_all_where(ChangeLogEntry, [], 1, order_by=["-seq"])
+    ) as changes:
+        latest = next(changes, None)
+
+    return latest.seq if latest is not None else 0
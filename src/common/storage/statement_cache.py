@@ -0,0 +1,67 @@
+from typing import Dict, Tuple, Type
+
+from sqlalchemy import bindparam
+from sqlalchemy.sql import Select
+from sqlmodel import SQLModel, select
+
+
+class StatementCache:
+    """Registry of parameterized select statements, built once and reused.
+
+    Building `select(...).where(...)` costs about as much as running a simple query on
+    SQLite. A cached statement uses bound parameters for the values, so the same object
+    serves every call and SQLAlchemy finds its compiled SQL by the memoized cache key.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._statements: Dict[Tuple[Type[SQLModel], Tuple[str, ...]], Select] = {}
+
+    def select_where_equal(
+        self, model_type: Type[SQLModel], fields: Tuple[str, ...]
+    ) -> Select:
+        """Get the statement selecting models whose fields equal bound parameters.
+
+        Example:
+            statement = cache.select_where_equal(Student, ("degree", "semester"))
+            session.exec(statement, params={"degree": "Master", "semester": 2})
+
+        Args:
+            model_type (Type[SQLModel]): The model class to query
+            fields (Tuple[str, ...]): Fields to compare, each one gets a parameter
+                with the same name
+
+        Returns:
+            Select: The statement
+        """
+        key = (model_type, fields)
+        statement = self._statements.get(key)
+        if statement is not None:
+            self.hits += 1
+            return statement
+
+        self.misses += 1
+        statement = select(model_type).where(
+            *(getattr(model_type, field) == bindparam(field) for field in fields)
+        )
+        self._statements[key] = statement
+        return statement
+
+    def clear(self):
+        """Drop every cached statement and reset the statistics."""
+        self._statements.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+
+# Shared by every DBStorageHandler, the server creates a new one for every request
+statement_cache = StatementCache()
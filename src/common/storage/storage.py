@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Type
+from contextlib import AbstractContextManager
+from typing import Any, Dict, Iterator, List, Tuple, Type
 
 from sqlmodel import SQLModel
 
@@ -25,6 +26,10 @@ class StorageHandler(ABC):
     def generate_id(self) -> int:
         pass
 
+    @abstractmethod
+    def upsert_many(self, rows: List[Dict[str, Any]], key_fields: List[str]) -> int:
+        pass
+
 
 # NewStorageHandler is a a new more generic storage handler interface, to make use of databases
 # and other types of storage backends.
@@ -37,6 +42,51 @@ class NewStorageHandler(ABC):
     def get_all_where(self, model_type: Type[SQLModel], conditions) -> List[SQLModel]:
         pass
 
+    @abstractmethod
+    def get_all_by(self, model_type: Type[SQLModel], **filters: Any) -> List[SQLModel]:
+        pass
+
+    @abstractmethod
+    def iter_all_where(
+        self,
+        model_type: Type[SQLModel],
+        conditions,
+        batch_size: int = 1000,
+        order_by: List[str] | None = None,
+    ) -> Iterator[SQLModel]:
+        pass
+
+    @abstractmethod
+    def iter_values_where(
+        self,
+        model_type: Type[SQLModel],
+        fields: List[str],
+        conditions,
+        batch_size: int = 1000,
+        order_by: List[str] | None = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        pass
+
+    @abstractmethod
+    def count_where(self, model_type: Type[SQLModel], conditions) -> int:
+        pass
+
+    @abstractmethod
+    def count_by_where(
+        self, model_type: Type[SQLModel], field: str, conditions
+    ) -> Dict[Any, int]:
+        pass
+
+    @abstractmethod
+    def exists_where(self, model_type: Type[SQLModel], conditions) -> bool:
+        pass
+
+    @abstractmethod
+    def search_prefix(
+        self, model_type: Type[SQLModel], fields: List[str], query: str, limit: int = 20
+    ) -> List[SQLModel]:
+        pass
+
     @abstractmethod
     def get_by_id(self, id: int, model_type: Type[SQLModel]) -> SQLModel:
         pass
@@ -52,3 +102,27 @@ class NewStorageHandler(ABC):
     @abstractmethod
     def delete(self, id: int, model_type: Type[SQLModel]) -> None:
         pass
+
+    @abstractmethod
+    def update_where(
+        self, model_type: Type[SQLModel], conditions, values: Dict[str, Any]
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def delete_where(self, model_type: Type[SQLModel], conditions) -> int:
+        pass
+
+    @abstractmethod
+    def upsert_many(
+        self,
+        models: List[SQLModel],
+        conflict_fields: List[str] | None = None,
+        chunk_size: int = 500,
+        update_fields: List[str] | None = None,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def transaction(self) -> AbstractContextManager["NewStorageHandler"]:
+        pass
@@ -1,6 +1,14 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Sequence
+
 from src.common.errors import SemesterError
 from src.common.models import DegreeName
 
+# Number of semesters of every degree
+MAX_SEMESTERS = {DegreeName.bachelor: 6, DegreeName.master: 4}
+MIN_NAME_LENGTH = 2
+
 
 def validate_semester(degree_name: DegreeName, semester: int):
     """Validate that a semester number is valid for a given degree.
@@ -12,9 +20,132 @@ def validate_semester(degree_name: DegreeName, semester: int):
     Raises:
         SemesterError: If semester number is invalid for the degree
     """
-    if degree_name == DegreeName.bachelor and semester > 6:
-        raise SemesterError("Bachelor degree has only 6 semesters")
-    elif degree_name == DegreeName.master and semester > 4:
-        raise SemesterError("Master degree has only 4 semesters")
+    max_semester = MAX_SEMESTERS.get(degree_name)
+    if max_semester is not None and semester > max_semester:
+        raise SemesterError(
+            f"{degree_name.value} degree has only {max_semester} semesters"
+        )
     elif semester <= 0:
         raise SemesterError("Semester number must be greater than 0")
+
+
+@dataclass
+class ValidationReport:
+    """Errors of a batch of rows, e.g. an import, by the index of the row.
+
+    Attributes:
+        rows (int): Number of validated rows
+        errors (Dict[int, List[str]]): Every error of every invalid row
+    """
+
+    rows: int
+    errors: Dict[int, List[str]] = field(default_factory=dict)
+
+    def add_error(self, indices: Iterable[int], message: str):
+        """Record the same error for many rows.
+
+        Args:
+            indices (Iterable[int]): Indices of the rows failing a check
+            message (str): Description of the error
+        """
+        for index in indices:
+            self.errors.setdefault(index, []).append(message)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def valid_indices(self) -> List[int]:
+        """Get the indices of the rows without errors."""
+        return [index for index in range(self.rows) if index not in self.errors]
+
+    def summary(self, limit: int = 5) -> str:
+        """Describe the errors of the first invalid rows in one line.
+
+        Args:
+            limit (int, optional): Invalid rows to describe. Defaults to 5.
+
+        Returns:
+            str: E.g. "2 of 100 rows are invalid: row 3: ...; row 7: ..."
+        """
+        described = "; ".join(
+            f"row {index}: {', '.join(self.errors[index])}"
+            for index in sorted(self.errors)[:limit]
+        )
+        more = len(self.errors) - limit
+        return f"{len(self.errors)} of {self.rows} rows are invalid: {described}" + (
+            f"; and {more} more" if more > 0 else ""
+        )
+
+
+def check_semesters(
+    report: ValidationReport, degrees: Sequence[Any], semesters: Sequence[Any]
+):
+    """Check the semester numbers of whole columns against the degrees.
+
+    The rows are grouped by degree once and every bound is one pass over a group,
+    instead of calling validate_semester and catching its error for every row.
+
+    Args:
+        report (ValidationReport): Report the errors are added to
+        degrees (Sequence[Any]): Degree of every row
+        semesters (Sequence[Any]): Semester number of every row
+    """
+    missing = {index for index, semester in enumerate(semesters) if semester is None}
+    report.add_error(sorted(missing), "Semester number is missing")
+    # E.g. "3" read from a CSV file, comparing it to the bounds would raise
+    not_numbers = {
+        index
+        for index, semester in enumerate(semesters)
+        if index not in missing
+        and (not isinstance(semester, int) or isinstance(semester, bool))
+    }
+    report.add_error(sorted(not_numbers), "Semester number must be a whole number")
+    skipped = missing | not_numbers
+
+    rows_by_degree: Dict[Any, List[int]] = defaultdict(list)
+    for index, degree in enumerate(degrees):
+        if index not in skipped:
+            rows_by_degree[degree].append(index)
+
+    for degree, indices in rows_by_degree.items():
+        max_semester = MAX_SEMESTERS.get(degree)
+        if max_semester is None:
+            report.add_error(indices, f"Unknown degree {degree}")
+            continue
+
+        report.add_error(
+            (index for index in indices if semesters[index] > max_semester),
+            f"{DegreeName(degree).value} degree has only {max_semester} semesters",
+        )
+
+    report.add_error(
+        (
+            index
+            for index, semester in enumerate(semesters)
+            if index not in skipped and semester <= 0
+        ),
+        "Semester number must be greater than 0",
+    )
+
+
+def check_min_length(
+    report: ValidationReport, values: Sequence[str | None], min_length: int, name: str
+):
+    """Check that the strings of a whole column are long enough.
+
+    Args:
+        report (ValidationReport): Report the errors are added to
+        values (Sequence[str | None]): Value of every row, values that aren't strings
+            are too short
+        min_length (int): Minimum number of characters
+        name (str): Name of the column used in the error, e.g. "Name"
+    """
+    report.add_error(
+        (
+            index
+            for index, value in enumerate(values)
+            if not isinstance(value, str) or len(value) < min_length
+        ),
+        f"{name} must be at least {min_length} characters long",
+    )
@@ -0,0 +1,285 @@
+from dataclasses import dataclass
+from datetime import datetime, time
+from functools import reduce
+from typing import Dict, List, Set, Tuple
+
+from src.common.bitmap import RosterBitmap, union_roster
+from src.common.models import (
+    AttendenceBitmap,
+    AttendenceRecord,
+    Lecture,
+    StudentClassroomLink,
+)
+from src.common.storage.storage import NewStorageHandler
+
+
+@dataclass
+class AttendenceBitmapOperations:
+    """Class for attendance stored as one bitmap per lecture.
+
+    Its bitmap has a bit for every student enrolled in the classroom at the lecture,
+    set when the student was present. Questions across lectures, like who was at all
+    of them or who missed several in a row, become integer operations over the
+    bitmaps instead of scans over attendance records.
+
+    Attributes:
+        storage_handler (NewStorageHandler): Handler for bitmap storage operations
+    """
+
+    storage_handler: NewStorageHandler
+
+    def build_bitmaps(self, classroom_id: int) -> int:
+        """Build the bitmaps of every lecture of a classroom from its attendance records.
+
+        Records are grouped by their Lecture, every lecture gets a bitmap even when
+        nobody came. Records without a lecture, e.g. taken before lectures existed,
+        are grouped by day. Existing bitmaps of the classroom are replaced, keeping
+        their rosters: a lecture's roster is the one stored when its bitmap was first
+        built, see build_lecture_bitmap, so later enrollments don't change the past.
+
+        Args:
+            classroom_id (int): ID of the classroom
+
+        Returns:
+            int: Number of lectures
+        """
+        lectures = {
+            lecture.id: lecture
+            for lecture in self.storage_handler.get_all_by(
+                Lecture, classroom_id=classroom_id
+            )
+        }
+        present_by_date: Dict[datetime, Set[int]] = {
+            lecture.start: set() for lecture in lectures.values()
+        }
+        for student_id, date, lecture_id in self.storage_handler.iter_values_where(
+            AttendenceRecord,
+            ["student_id", "date", "lecture_id"],
+            [AttendenceRecord.classroom_id == classroom_id],
+        ):
+            if lecture_id in lectures:
+                date = lectures[lecture_id].start
+            else:
+                date = datetime.combine(date.date(), time())
+            present_by_date.setdefault(date, set()).add(student_id)
+
+        rosters = {
+            bitmap.date: RosterBitmap.decode(bitmap.roster, bitmap.present).roster
+            for bitmap in self.storage_handler.get_all_by(
+                AttendenceBitmap, classroom_id=classroom_id
+            )
+        }
+        current_roster = self._current_roster(classroom_id)
+
+        with self.storage_handler.transaction():
+            # Bitmaps of deleted lectures, or of dates records no longer group by
+            self.storage_handler.delete_where(
+                AttendenceBitmap,
+                [
+                    AttendenceBitmap.classroom_id == classroom_id,
+                    AttendenceBitmap.date.notin_(list(present_by_date)),
+                ],
+            )
+            if not present_by_date:
+                return 0
+
+            return self.storage_handler.upsert_many(
+                [
+                    self.to_attendence_bitmap(
+                        classroom_id,
+                        date,
+                        RosterBitmap.from_student_ids(
+                            rosters.get(date, current_roster), present
+                        ),
+                    )
+                    for date, present in sorted(present_by_date.items())
+                ],
+                conflict_fields=["classroom_id", "date"],
+            )
+
+    def build_lecture_bitmap(self, lecture: Lecture) -> AttendenceBitmap:
+        """Build the bitmap of a lecture with the students enrolled right now.
+
+        Called when a lecture is added, so its roster is the one valid at the lecture
+        and build_bitmaps keeps it.
+
+        Args:
+            lecture (Lecture): The lecture, with its attendance records linked
+
+        Returns:
+            AttendenceBitmap: The stored bitmap
+        """
+        present = [
+            student_id
+            for (student_id,) in self.storage_handler.iter_values_where(
+                AttendenceRecord,
+                ["student_id"],
+                [AttendenceRecord.lecture_id == lecture.id],
+            )
+        ]
+        bitmap = self.to_attendence_bitmap(
+            lecture.classroom_id,
+            lecture.start,
+            RosterBitmap.from_student_ids(
+                self._current_roster(lecture.classroom_id), present
+            ),
+        )
+        self.storage_handler.upsert_many(
+            [bitmap], conflict_fields=["classroom_id", "date"]
+        )
+        return bitmap
+
+    def get_bitmaps(
+        self,
+        classroom_id: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> List[Tuple[datetime, RosterBitmap]]:
+        """Get the bitmaps of the lectures of a classroom, oldest first.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            since (datetime | None, optional): Only lectures at or after this date.
+                Defaults to None.
+            until (datetime | None, optional): Only lectures before this date.
+                Defaults to None.
+
+        Returns:
+            List[Tuple[datetime, RosterBitmap]]: Date and bitmap of every lecture
+        """
+        conditions = [AttendenceBitmap.classroom_id == classroom_id]
+        if since is not None:
+            conditions.append(AttendenceBitmap.date >= since)
+        if until is not None:
+            conditions.append(AttendenceBitmap.date < until)
+
+        return [
+            (bitmap.date, RosterBitmap.decode(bitmap.roster, bitmap.present))
+            for bitmap in self.storage_handler.iter_all_where(
+                AttendenceBitmap, conditions, order_by=["date"]
+            )
+        ]
+
+    def get_students_present_at_all(
+        self,
+        classroom_id: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Set[int]:
+        """Get the students present at every lecture of a classroom.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            since (datetime | None, optional): Only lectures at or after this date.
+                Defaults to None.
+            until (datetime | None, optional): Only lectures before this date.
+                Defaults to None.
+
+        Returns:
+            Set[int]: IDs of the students
+        """
+        bitmaps = [bitmap for _, bitmap in self.get_bitmaps(classroom_id, since, until)]
+        if not bitmaps:
+            return set()
+
+        roster = union_roster(bitmaps)
+        present = reduce(
+            int.__and__, (bitmap.with_roster(roster).present for bitmap in bitmaps)
+        )
+        return RosterBitmap(roster).student_ids(present)
+
+    def get_students_absent_in_a_row(
+        self,
+        classroom_id: int,
+        times: int = 3,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Set[int]:
+        """Get the enrolled students that missed several lectures in a row.
+
+        Lectures before a student enrolled don't count as missed.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            times (int, optional): Number of lectures in a row. Defaults to 3.
+            since (datetime | None, optional): Only lectures at or after this date.
+                Defaults to None.
+            until (datetime | None, optional): Only lectures before this date.
+                Defaults to None.
+
+        Returns:
+            Set[int]: IDs of the students
+        """
+        bitmaps = [bitmap for _, bitmap in self.get_bitmaps(classroom_id, since, until)]
+        if len(bitmaps) < times:
+            return set()
+
+        roster = union_roster(bitmaps)
+        # Students who weren't enrolled at a lecture didn't miss it
+        absent = [
+            bitmap.enrolled_in(roster) & ~bitmap.with_roster(roster).present
+            for bitmap in bitmaps
+        ]
+
+        missed = 0
+        for start in range(len(absent) - times + 1):
+            missed |= reduce(int.__and__, absent[start : start + times])
+
+        return RosterBitmap(roster).student_ids(missed)
+
+    def _current_roster(self, classroom_id: int) -> List[int]:
+        """IDs of the students enrolled in a classroom right now."""
+        return [
+            link.student_id
+            for link in self.storage_handler.get_all_by(
+                StudentClassroomLink, classroom_id=classroom_id
+            )
+        ]
+
+    def to_attendence_bitmap(
+        self, classroom_id: int, date: datetime, bitmap: RosterBitmap
+    ) -> AttendenceBitmap:
+        """Convert a bitmap to its stored form.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            date (datetime): Date of the lecture
+            bitmap (RosterBitmap): Students present at the lecture
+
+        Returns:
+            AttendenceBitmap: The bitmap to store
+        """
+        roster, present = bitmap.encode()
+        return AttendenceBitmap(
+            classroom_id=classroom_id, date=date, roster=roster, present=present
+        )
+
+    def to_attendence_records(
+        self, classroom_id: int, date: datetime, bitmap: RosterBitmap
+    ) -> List[AttendenceRecord]:
+        """Convert a bitmap to one attendance record per present student.
+
+        The records are linked to the lecture starting at the date. Bitmaps of days
+        without a lecture give records without one.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            date (datetime): Date of the lecture
+            bitmap (RosterBitmap): Students present at the lecture
+
+        Returns:
+            List[AttendenceRecord]: Attendance records, ordered by student ID
+        """
+        lectures = self.storage_handler.get_all_by(
+            Lecture, classroom_id=classroom_id, start=date
+        )
+        lecture_id = lectures[0].id if lectures else None
+        return [
+            AttendenceRecord(
+                student_id=student_id,
+                classroom_id=classroom_id,
+                date=date,
+                lecture_id=lecture_id,
+            )
+            for student_id in sorted(bitmap.student_ids())
+        ]
@@ -1,16 +1,68 @@
+import os
+from collections import defaultdict
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from itertools import chain
+from typing import Any, Dict, Hashable, Iterator, List, Set, Tuple
 
+from sqlalchemy.exc import IntegrityError
+
+from src.common.dedup import DedupWindow
 from src.common.errors import NotFoundError
-from src.common.models import AttendenceRecord
+from src.common.models import (
+    ATTENDENCE_RECORD_NATURAL_KEY,
+    AttendenceArchive,
+    AttendenceRecord,
+    Classroom,
+    Lecture,
+    Student,
+    StudentClassroomLink,
+)
+from src.common.storage.archive import read_archive, write_archive
 from src.common.storage.storage import NewStorageHandler
 
+# IDs per DELETE when archiving, below the parameter limit of old SQLite versions
+ARCHIVE_DELETE_CHUNK_SIZE = 500
+# Records validated at once, their distinct IDs stay below the same parameter limit
+VALIDATION_CHUNK_SIZE = 500
+
+
+@dataclass
+class InvalidAttendenceRecord:
+    """An attendance record that failed validation.
+
+    Attributes:
+        index (int): Position of the record in the validated records
+        attendence_record (AttendenceRecord): The record
+        errors (List[str]): Every reason the record is invalid
+    """
+
+    index: int
+    attendence_record: AttendenceRecord
+    errors: List[str]
+
 
 class AttendenceDataError(Exception):
-    """Exception raised for errors in attendence data."""
+    """Exception raised for errors in attendence data.
+
+    Attributes:
+        invalid_records (List[InvalidAttendenceRecord]): Every invalid record, when
+            many records were validated at once
+    """
+
+    def __init__(
+        self, message: str, invalid_records: List[InvalidAttendenceRecord] | None = None
+    ):
+        super().__init__(message)
+        self.invalid_records = invalid_records or []
+
 
-    pass
+class DuplicateAttendenceError(AttendenceDataError):
+    """Exception raised when records repeat stored ones, or each other.
+
+    Records are the same when their student, classroom and date are.
+    """
 
 
 @dataclass
@@ -22,15 +74,22 @@ class AttendenceOperations:
 
     Attributes:
         storage_handler (NewStorageHandler): Handler for attendance data storage operations
+        dedup_window (DedupWindow | None): Recently added records, repeats of them by
+            the same student in the same classroom within the window aren't stored
+            again. None to store every record.
     """
 
     storage_handler: NewStorageHandler
+    dedup_window: DedupWindow | None = None
 
     def get_attendence_records_by_classroom(
         self, classroom_id: int
     ) -> List[AttendenceRecord]:
         """Get list of attendance records for a specific classroom.
 
+        Only records in the database are returned. Archived records are left out,
+        ask iter_attendence_records with since and until for archived months.
+
         Args:
             classroom_id (int): ID of the classroom to filter by
 
@@ -40,22 +99,25 @@ class AttendenceOperations:
         Raises:
             NotFoundError: When classroom with given ID is not found
         """
-        conditions = [AttendenceRecord.classroom_id == classroom_id]
-        return self.storage_handler.get_all_where(AttendenceRecord, conditions)
+        return self.storage_handler.get_all_by(
+            AttendenceRecord, classroom_id=classroom_id
+        )
 
     def get_attendence_records_by_student(
         self, student_id: int
     ) -> List[AttendenceRecord]:
         """Get list of attendance records for a specific student.
 
+        Only records in the database are returned. Archived records are left out,
+        ask iter_attendence_records with since and until for archived months.
+
         Args:
             student_id (int): ID of the student to filter by
 
         Returns:
             List[AttendenceRecord]: List of attendance records for the student
         """
-        conditions = [AttendenceRecord.student_id == student_id]
-        return self.storage_handler.get_all_where(AttendenceRecord, conditions)
+        return self.storage_handler.get_all_by(AttendenceRecord, student_id=student_id)
 
     def get_attendence_records_by_date(self, date: datetime) -> List[AttendenceRecord]:
         """Get list of attendance records for a specific date.
@@ -64,10 +126,108 @@ class AttendenceOperations:
             date (datetime): Date to filter by
 
         Returns:
-            List[AttendenceRecord]: List of attendance records for the date
+            List[AttendenceRecord]: List of attendance records for the date, archived
+                ones included
+        """
+        return self.storage_handler.get_all_by(AttendenceRecord, date=date) + list(
+            self._iter_archived_records(date=date)
+        )
+
+    def iter_attendence_records(
+        self,
+        classroom_id: int | None = None,
+        student_id: int | None = None,
+        date: datetime | None = None,
+        batch_size: int = 1000,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        lecture_id: int | None = None,
+    ) -> Iterator[AttendenceRecord]:
+        """Iterate over attendance records, fetching them lazily from storage.
+
+        Archived records are included when a date filter selects archived months.
+        Without date, since or until only records in the database are returned, the
+        archives aren't read.
+
+        Args:
+            classroom_id (int | None, optional): ID of the classroom to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of the student to filter by.
+                Defaults to None.
+            date (datetime | None, optional): Date to filter by. Defaults to None.
+            batch_size (int, optional): Records fetched from storage at once.
+                Defaults to 1000.
+            since (datetime | None, optional): Only records at or after this date.
+                Defaults to None.
+            until (datetime | None, optional): Only records before this date.
+                Defaults to None.
+            lecture_id (int | None, optional): ID of the lecture to filter by.
+                Defaults to None.
+
+        Returns:
+            Iterator[AttendenceRecord]: Attendance records matching every given filter
         """
-        conditions = [AttendenceRecord.date == date]
-        return self.storage_handler.get_all_where(AttendenceRecord, conditions)
+        conditions = self._filter_conditions(
+            classroom_id, student_id, date, since, until, lecture_id
+        )
+        return chain(
+            self.storage_handler.iter_all_where(
+                AttendenceRecord, conditions, batch_size
+            ),
+            self._iter_archived_records(
+                classroom_id, student_id, date, since, until, lecture_id
+            ),
+        )
+
+    def iter_attendence_record_values(
+        self,
+        fields: List[str],
+        classroom_id: int | None = None,
+        student_id: int | None = None,
+        date: datetime | None = None,
+        batch_size: int = 1000,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        lecture_id: int | None = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Iterate over raw field values of attendance records, without building models.
+
+        Archived records are included when a date filter selects archived months.
+        Without date, since or until only records in the database are returned, the
+        archives aren't read.
+
+        Args:
+            fields (List[str]): Fields of AttendenceRecord to get, e.g. ["id", "date"]
+            classroom_id (int | None, optional): ID of the classroom to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of the student to filter by.
+                Defaults to None.
+            date (datetime | None, optional): Date to filter by. Defaults to None.
+            batch_size (int, optional): Rows fetched from storage at once.
+                Defaults to 1000.
+            since (datetime | None, optional): Only records at or after this date.
+                Defaults to None.
+            until (datetime | None, optional): Only records before this date.
+                Defaults to None.
+            lecture_id (int | None, optional): ID of the lecture to filter by.
+                Defaults to None.
+
+        Returns:
+            Iterator[Tuple[Any, ...]]: Values of the fields of every matching record
+        """
+        conditions = self._filter_conditions(
+            classroom_id, student_id, date, since, until, lecture_id
+        )
+        archived = self._iter_archived_rows(
+            classroom_id, student_id, date, since, until, lecture_id
+        )
+        return chain(
+            self.storage_handler.iter_values_where(
+                AttendenceRecord, fields, conditions, batch_size
+            ),
+            # Records archived before lectures existed have no lecture_id
+            (tuple(row.get(field) for field in fields) for row in archived),
+        )
 
     def add_attendence_record(
         self, attendence_record: AttendenceRecord
@@ -78,23 +238,751 @@ class AttendenceOperations:
             attendence_record (AttendenceRecord): Attendance record data to add
 
         Returns:
-            AttendenceRecord: The newly created attendance record with generated ID
+            AttendenceRecord: The newly created attendance record with generated ID, or
+                the earlier one when the record repeats it within the dedup window
 
         Raises:
-            AttendenceDataError: If the attendance record data is invalid
+            DuplicateAttendenceError: If the student's attendance in the classroom at
+                the date is already stored
+            AttendenceDataError: If the record references a missing student or
+                classroom, or a student not enrolled in the classroom
         """
-        return self.storage_handler.create(attendence_record)
+        # Repeats are answered from memory, before any query
+        if self.dedup_window is not None:
+            earlier = self.dedup_window.get(
+                _dedup_key(attendence_record), attendence_record.date
+            )
+            if earlier is not None:
+                return earlier
+
+        invalid = self.validate_attendence_records([attendence_record])
+        if invalid:
+            raise AttendenceDataError("; ".join(invalid[0].errors), invalid)
 
-    def delete_attendence_record(self, id: int):
+        self._assign_lectures([attendence_record])
+        try:
+            # Rolled back on errors, so the session stays usable
+            with self.storage_handler.transaction():
+                attendence_record = self.storage_handler.create(attendence_record)
+        except IntegrityError as e:
+            self._raise_for_conflicts([attendence_record], e)
+
+        self._remember([attendence_record])
+        return attendence_record
+
+    def add_attendence_records(
+        self, attendence_records: List[AttendenceRecord]
+    ) -> List[AttendenceRecord]:
+        """Add many attendance records at once, e.g. everyone present at a lecture.
+
+        The records are added in one transaction, either all of them or none. Records
+        repeating another one within the dedup window are dropped.
+
+        Args:
+            attendence_records (List[AttendenceRecord]): Attendance records to add
+
+        Returns:
+            List[AttendenceRecord]: The newly created attendance records with generated IDs
+
+        Raises:
+            DuplicateAttendenceError: If any record repeats a stored one or another
+                record, by student, classroom and date
+            AttendenceDataError: If any record references a missing student or
+                classroom, or a student not enrolled in the classroom
+        """
+        self._raise_for_invalid(attendence_records)
+        self._assign_lectures(attendence_records)
+        attendence_records = self._drop_repeats(attendence_records)
+        try:
+            with self.storage_handler.transaction():
+                created = [
+                    self.storage_handler.create(attendence_record)
+                    for attendence_record in attendence_records
+                ]
+        except BaseException as e:
+            # Nothing was stored, the records must not hide the next attempt
+            self._forget(attendence_records)
+            if isinstance(e, IntegrityError):
+                self._raise_for_conflicts(attendence_records, e)
+            raise
+
+        self._remember(created)
+        return created
+
+    def sync_attendence_records(
+        self, attendence_records: List[AttendenceRecord]
+    ) -> int:
+        """Add the attendance records that don't exist yet.
+
+        Records are matched by student, classroom and date, so sending the same
+        records again changes nothing.
+
+        Args:
+            attendence_records (List[AttendenceRecord]): Attendance records to sync
+
+        Returns:
+            int: Number of added attendance records
+
+        Raises:
+            AttendenceDataError: If any record references a missing student or
+                classroom, or a student not enrolled in the classroom
+        """
+        self._raise_for_invalid(attendence_records)
+        self._assign_lectures(attendence_records)
+        return self.storage_handler.upsert_many(
+            attendence_records,
+            conflict_fields=list(ATTENDENCE_RECORD_NATURAL_KEY),
+            update_fields=[],
+        )
+
+    def validate_attendence_records(
+        self,
+        attendence_records: List[AttendenceRecord],
+        chunk_size: int = VALIDATION_CHUNK_SIZE,
+    ) -> List[InvalidAttendenceRecord]:
+        """Check that the students and classrooms of many records exist and match.
+
+        The distinct IDs of every chunk are looked up with one query for students,
+        one for classrooms and one for the enrollments of the classrooms, instead of
+        separate lookups for every record.
+
+        Args:
+            attendence_records (List[AttendenceRecord]): Attendance records to validate
+            chunk_size (int, optional): Records validated at once.
+                Defaults to VALIDATION_CHUNK_SIZE.
+
+        Returns:
+            List[InvalidAttendenceRecord]: Every invalid record, empty when all of them
+                are valid
+        """
+        invalid = []
+        for start in range(0, len(attendence_records), chunk_size):
+            chunk = attendence_records[start : start + chunk_size]
+            student_ids = {
+                record.student_id for record in chunk if record.student_id is not None
+            }
+            classroom_ids = {
+                record.classroom_id
+                for record in chunk
+                if record.classroom_id is not None
+            }
+            students = self._existing_ids(Student, student_ids)
+            classrooms = self._existing_ids(Classroom, classroom_ids)
+            # Rosters of the classrooms, a chunk spans few of them
+            enrollments = (
+                set(
+                    self.storage_handler.iter_values_where(
+                        StudentClassroomLink,
+                        ["student_id", "classroom_id"],
+                        [StudentClassroomLink.classroom_id.in_(classrooms)],
+                    )
+                )
+                if classrooms
+                else set()
+            )
+
+            for index, record in enumerate(chunk, start):
+                errors = []
+                if record.student_id not in students:
+                    errors.append(f"Student with ID {record.student_id} not found")
+                if record.classroom_id not in classrooms:
+                    errors.append(f"Classroom with ID {record.classroom_id} not found")
+                if not errors and (
+                    (record.student_id, record.classroom_id) not in enrollments
+                ):
+                    errors.append(
+                        f"Student with ID {record.student_id} is not enrolled in "
+                        f"classroom with ID {record.classroom_id}"
+                    )
+                if errors:
+                    invalid.append(InvalidAttendenceRecord(index, record, errors))
+
+        return invalid
+
+    def get_attendence_records_by_lecture(
+        self, lecture_id: int
+    ) -> List[AttendenceRecord]:
+        """Get list of attendance records taken at a lecture.
+
+        Only records in the database are returned. Archived records are left out,
+        ask iter_attendence_records with since and until for archived months.
+
+        Args:
+            lecture_id (int): ID of the lecture to filter by
+
+        Returns:
+            List[AttendenceRecord]: List of attendance records of the lecture
+        """
+        return self.storage_handler.get_all_by(AttendenceRecord, lecture_id=lecture_id)
+
+    def count_attendence_records_by_classroom(self, classroom_id: int) -> int:
+        """Count the attendance records of a classroom, without building models.
+
+        Only records in the database are counted, archived ones are left out. This is
+        the count the live counters start from.
+
+        Args:
+            classroom_id (int): ID of the classroom to count the records of
+
+        Returns:
+            int: Number of attendance records of the classroom
+        """
+        return self.count_attendence_records(classroom_id=classroom_id)
+
+    def count_attendence_records(
+        self,
+        classroom_id: int | None = None,
+        student_id: int | None = None,
+        date: datetime | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        lecture_id: int | None = None,
+    ) -> int:
+        """Count the attendance records matching every given filter, without loading them.
+
+        Records in the database are counted by the storage. Like
+        iter_attendence_records, archived records are included when a date filter
+        selects archived months. Without one only records in the database are counted.
+
+        Args:
+            classroom_id (int | None, optional): ID of the classroom to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of the student to filter by.
+                Defaults to None.
+            date (datetime | None, optional): Date to filter by. Defaults to None.
+            since (datetime | None, optional): Only records at or after this date.
+                Defaults to None.
+            until (datetime | None, optional): Only records before this date.
+                Defaults to None.
+            lecture_id (int | None, optional): ID of the lecture to filter by.
+                Defaults to None.
+
+        Returns:
+            int: Number of matching attendance records
+        """
+        conditions = self._filter_conditions(
+            classroom_id, student_id, date, since, until, lecture_id
+        )
+        stored = self.storage_handler.count_where(AttendenceRecord, conditions)
+        archived = self._count_archived(
+            classroom_id, student_id, date, since, until, lecture_id
+        )
+        return stored + archived
+
+    def attendence_records_exist(
+        self,
+        classroom_id: int | None = None,
+        student_id: int | None = None,
+        date: datetime | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        lecture_id: int | None = None,
+    ) -> bool:
+        """Check whether any attendance record matches every given filter.
+
+        Archives are only read when no record in the database matches, and only up
+        to the first matching row. Like iter_attendence_records, archived records are
+        only looked at when a date filter selects archived months.
+
+        Args:
+            classroom_id (int | None, optional): ID of the classroom to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of the student to filter by.
+                Defaults to None.
+            date (datetime | None, optional): Date to filter by. Defaults to None.
+            since (datetime | None, optional): Only records at or after this date.
+                Defaults to None.
+            until (datetime | None, optional): Only records before this date.
+                Defaults to None.
+            lecture_id (int | None, optional): ID of the lecture to filter by.
+                Defaults to None.
+
+        Returns:
+            bool: True when at least one record matches
+        """
+        conditions = self._filter_conditions(
+            classroom_id, student_id, date, since, until, lecture_id
+        )
+        if self.storage_handler.exists_where(AttendenceRecord, conditions):
+            return True
+
+        archived = self._iter_archived_rows(
+            classroom_id, student_id, date, since, until, lecture_id
+        )
+        with closing(archived):
+            return next(archived, None) is not None
+
+    def delete_attendence_record(self, id: int) -> AttendenceRecord:
         """Delete an attendance record by ID.
 
         Args:
             id (int): ID of the attendance record to delete
 
+        Returns:
+            AttendenceRecord: The deleted attendance record
+
         Raises:
             NotFoundError: When attendance record with given ID is not found
         """
         try:
+            attendence_record = self.storage_handler.get_by_id(id, AttendenceRecord)
             self.storage_handler.delete(id, AttendenceRecord)
         except ValueError:
             raise NotFoundError(f"Attendence record with ID {id} not found")
+
+        # A check-in after a deleted one is stored again
+        self._forget([attendence_record])
+        return attendence_record
+
+    def archive_attendence_records(
+        self, before: datetime, directory: str
+    ) -> List[AttendenceArchive]:
+        """Move the attendance records of whole months before a date to archive files.
+
+        Every month goes to a gzip compressed file in the directory and is deleted from
+        the database in the same transaction as its archive is registered. Archived
+        records are still found by lookups filtering by date, lookups only by student,
+        classroom or lecture don't read the archives.
+
+        Archive files are history: deleting a student or classroom later doesn't
+        cascade to them, their archived records stay in the files.
+
+        Args:
+            before (datetime): Months ending before this date are archived, the month
+                containing it is kept
+            directory (str): Directory the archive files are written to
+
+        Returns:
+            List[AttendenceArchive]: The new archives, oldest month first
+        """
+        cutoff = datetime(before.year, before.month, 1)
+        os.makedirs(directory, exist_ok=True)
+
+        archives = []
+        month = self._first_month_before(cutoff)
+        while month is not None and month < cutoff:
+            next_month = _next_month(month)
+            archive = self._archive_month(month, next_month, directory)
+            if archive is not None:
+                archives.append(archive)
+            month = next_month
+
+        return archives
+
+    def get_archives(self) -> List[AttendenceArchive]:
+        """Get list of all attendance archives.
+
+        Returns:
+            List[AttendenceArchive]: List of all archives
+        """
+        return self.storage_handler.get_all(AttendenceArchive)
+
+    def _first_month_before(self, cutoff: datetime) -> datetime | None:
+        """First day of the month of the oldest record before the cutoff."""
+        with closing(
+            self.storage_handler.iter_all_where(
+                AttendenceRecord,
+                [AttendenceRecord.date < cutoff],
+                1,
+                order_by=["date"],
+            )
+        ) as records:
+            oldest = next(records, None)
+
+        return datetime(oldest.date.year, oldest.date.month, 1) if oldest else None
+
+    def _archive_month(
+        self, month: datetime, next_month: datetime, directory: str
+    ) -> AttendenceArchive | None:
+        """Move the records of one month to a new archive file."""
+        fields = list(AttendenceRecord.model_fields)
+        ids = []
+        dates = []
+
+        def rows():
+            # Rows are streamed to the file, only their IDs and dates are kept
+            for values in self.storage_handler.iter_values_where(
+                AttendenceRecord,
+                fields,
+                [AttendenceRecord.date >= month, AttendenceRecord.date < next_month],
+            ):
+                row = dict(zip(fields, values))
+                ids.append(row["id"])
+                dates.append(row["date"])
+                yield row
+
+        period = f"{month:%Y-%m}"
+        path = _free_path(directory, f"attendence-{period}")
+        if write_archive(path, rows()) == 0:
+            os.remove(path)
+            return None
+
+        try:
+            with self.storage_handler.transaction():
+                # By ID, records added since they were read stay in the database
+                for start in range(0, len(ids), ARCHIVE_DELETE_CHUNK_SIZE):
+                    chunk = ids[start : start + ARCHIVE_DELETE_CHUNK_SIZE]
+                    self.storage_handler.delete_where(
+                        AttendenceRecord, [AttendenceRecord.id.in_(chunk)]
+                    )
+
+                return self.storage_handler.create(
+                    AttendenceArchive(
+                        period=period,
+                        path=os.path.abspath(path),
+                        records=len(ids),
+                        first_date=min(dates),
+                        last_date=max(dates),
+                    )
+                )
+        except BaseException:
+            # The records are still in the database
+            os.remove(path)
+            raise
+
+    def _iter_archived_records(
+        self,
+        classroom_id: int | None = None,
+        student_id: int | None = None,
+        date: datetime | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        lecture_id: int | None = None,
+    ) -> Iterator[AttendenceRecord]:
+        for row in self._iter_archived_rows(
+            classroom_id, student_id, date, since, until, lecture_id
+        ):
+            yield AttendenceRecord(**row)
+
+    def _iter_archived_rows(
+        self,
+        classroom_id: int | None,
+        student_id: int | None,
+        date: datetime | None,
+        since: datetime | None,
+        until: datetime | None,
+        lecture_id: int | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Read the archived records matching the filters.
+
+        Only archives overlapping the date filters are opened.
+        """
+        for archive in self._archives_overlapping(date, since, until):
+            yield from self._read_archived_rows(
+                archive, classroom_id, student_id, date, since, until, lecture_id
+            )
+
+    def _count_archived(
+        self,
+        classroom_id: int | None,
+        student_id: int | None,
+        date: datetime | None,
+        since: datetime | None,
+        until: datetime | None,
+        lecture_id: int | None = None,
+    ) -> int:
+        """Count the archived records matching the filters.
+
+        Archives entirely within since and until are counted by the number of records
+        registered with them, only the others are read.
+        """
+        count = 0
+        for archive in self._archives_overlapping(date, since, until):
+            if (
+                classroom_id is None
+                and student_id is None
+                and date is None
+                and lecture_id is None
+                and (since is None or archive.first_date >= since)
+                and (until is None or archive.last_date < until)
+            ):
+                count += archive.records
+            else:
+                count += sum(
+                    1
+                    for _ in self._read_archived_rows(
+                        archive,
+                        classroom_id,
+                        student_id,
+                        date,
+                        since,
+                        until,
+                        lecture_id,
+                    )
+                )
+
+        return count
+
+    def _archives_overlapping(
+        self,
+        date: datetime | None,
+        since: datetime | None,
+        until: datetime | None,
+    ) -> List[AttendenceArchive]:
+        """Get the archives that may hold records of the date filters.
+
+        Without any date filter there are none, archives are cold storage for lookups
+        of old dates.
+        """
+        if date is None and since is None and until is None:
+            return []
+
+        conditions = []
+        if date is not None:
+            conditions += [
+                AttendenceArchive.first_date <= date,
+                AttendenceArchive.last_date >= date,
+            ]
+        if since is not None:
+            conditions.append(AttendenceArchive.last_date >= since)
+        if until is not None:
+            conditions.append(AttendenceArchive.first_date < until)
+
+        return self.storage_handler.get_all_where(AttendenceArchive, conditions)
+
+    def _read_archived_rows(
+        self,
+        archive: AttendenceArchive,
+        classroom_id: int | None,
+        student_id: int | None,
+        date: datetime | None,
+        since: datetime | None,
+        until: datetime | None,
+        lecture_id: int | None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Read the rows of an archive matching the filters."""
+        for row in read_archive(archive.path, ["date"]):
+            if (
+                (classroom_id is None or row["classroom_id"] == classroom_id)
+                and (student_id is None or row["student_id"] == student_id)
+                and (date is None or row["date"] == date)
+                and (since is None or row["date"] >= since)
+                and (until is None or row["date"] < until)
+                and (lecture_id is None or row.get("lecture_id") == lecture_id)
+            ):
+                yield row
+
+    def _existing_ids(self, model_type, ids: Set[int]) -> Set[int]:
+        """Get the IDs of the models that exist among the given ones."""
+        if not ids:
+            return set()
+
+        return {
+            id
+            for (id,) in self.storage_handler.iter_values_where(
+                model_type, ["id"], [model_type.id.in_(ids)]
+            )
+        }
+
+    def _raise_for_invalid(self, attendence_records: List[AttendenceRecord]):
+        """Raise an error listing every invalid record, if there are any."""
+        invalid = self.validate_attendence_records(attendence_records)
+        if invalid:
+            raise AttendenceDataError(
+                f"{len(invalid)} of {len(attendence_records)} attendance records are "
+                "invalid",
+                invalid,
+            )
+
+    def _raise_for_conflicts(
+        self, attendence_records: List[AttendenceRecord], error: IntegrityError
+    ):
+        """Raise an error explaining why storing the records violated a constraint.
+
+        Called after the failed transaction was rolled back. The references were
+        validated before, so a violation is a duplicate, or e.g. an explicit ID that
+        is taken, or a student deleted by another process in the meantime.
+        """
+        duplicates = self._find_duplicates(attendence_records)
+        if duplicates:
+            raise DuplicateAttendenceError(
+                duplicates[0].errors[0]
+                if len(attendence_records) == 1
+                else f"{len(duplicates)} of {len(attendence_records)} attendance "
+                "records already exist",
+                duplicates,
+            ) from error
+
+        # Database errors carry the SQL on the next lines, the first one is enough
+        reason = str(error.orig).splitlines()[0]
+        raise AttendenceDataError(
+            f"Attendance records conflict with stored data: {reason}"
+        ) from error
+
+    def _find_duplicates(
+        self,
+        attendence_records: List[AttendenceRecord],
+        chunk_size: int = VALIDATION_CHUNK_SIZE,
+    ) -> List[InvalidAttendenceRecord]:
+        """Find the records repeating a stored one or an earlier record."""
+        duplicates = []
+        seen = set()
+        for start in range(0, len(attendence_records), chunk_size):
+            chunk = attendence_records[start : start + chunk_size]
+            stored = set(
+                self.storage_handler.iter_values_where(
+                    AttendenceRecord,
+                    list(ATTENDENCE_RECORD_NATURAL_KEY),
+                    [
+                        AttendenceRecord.student_id.in_(
+                            {record.student_id for record in chunk}
+                        ),
+                        AttendenceRecord.classroom_id.in_(
+                            {record.classroom_id for record in chunk}
+                        ),
+                        AttendenceRecord.date.in_({record.date for record in chunk}),
+                    ],
+                )
+            )
+
+            for index, record in enumerate(chunk, start):
+                key = (record.student_id, record.classroom_id, record.date)
+                if key in stored or key in seen:
+                    duplicates.append(
+                        InvalidAttendenceRecord(
+                            index,
+                            record,
+                            [
+                                f"Attendance of student with ID {record.student_id} "
+                                f"in classroom with ID {record.classroom_id} at "
+                                f"{record.date} already exists"
+                            ],
+                        )
+                    )
+                seen.add(key)
+
+        return duplicates
+
+    def _assign_lectures(self, attendence_records: List[AttendenceRecord]):
+        """Set the lecture of records without one to the lecture at their date.
+
+        The lectures of every classroom are loaded once for all its records.
+        """
+        records_by_classroom: Dict[int, List[AttendenceRecord]] = defaultdict(list)
+        for record in attendence_records:
+            if record.lecture_id is None:
+                records_by_classroom[record.classroom_id].append(record)
+
+        for classroom_id, records in records_by_classroom.items():
+            lectures = self.storage_handler.get_all_where(
+                Lecture,
+                [
+                    Lecture.classroom_id == classroom_id,
+                    Lecture.start <= max(record.date for record in records),
+                    Lecture.end > min(record.date for record in records),
+                ],
+            )
+            for record in records:
+                record.lecture_id = next(
+                    (
+                        lecture.id
+                        for lecture in lectures
+                        if lecture.start <= record.date < lecture.end
+                    ),
+                    None,
+                )
+
+    def _drop_repeats(
+        self, attendence_records: List[AttendenceRecord]
+    ) -> List[AttendenceRecord]:
+        """Drop the records repeating an earlier one, remembering the others.
+
+        The others are remembered right away, so repeats within the records are
+        dropped as well.
+        """
+        if self.dedup_window is None:
+            return attendence_records
+
+        accepted = []
+        for record in attendence_records:
+            key = _dedup_key(record)
+            if self.dedup_window.get(key, record.date) is None:
+                self.dedup_window.add(key, record.date, record)
+                accepted.append(record)
+
+        return accepted
+
+    def _remember(self, attendence_records: List[AttendenceRecord]):
+        """Add stored records to the dedup window."""
+        if self.dedup_window is None:
+            return
+
+        for record in attendence_records:
+            # A copy, the stored record expires with the session that created it
+            self.dedup_window.add(
+                _dedup_key(record), record.date, AttendenceRecord(**record.model_dump())
+            )
+
+    def _forget(self, attendence_records: List[AttendenceRecord]):
+        """Remove records from the dedup window."""
+        if self.dedup_window is None:
+            return
+
+        for record in attendence_records:
+            self.dedup_window.discard(_dedup_key(record))
+
+    def _filter_conditions(
+        self,
+        classroom_id: int | None,
+        student_id: int | None,
+        date: datetime | None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        lecture_id: int | None = None,
+    ) -> list:
+        """Build the conditions matching every given filter of attendance records."""
+        conditions = []
+        if lecture_id is not None:
+            conditions.append(AttendenceRecord.lecture_id == lecture_id)
+        if classroom_id is not None:
+            conditions.append(AttendenceRecord.classroom_id == classroom_id)
+        if student_id is not None:
+            conditions.append(AttendenceRecord.student_id == student_id)
+        if date is not None:
+            conditions.append(AttendenceRecord.date == date)
+        if since is not None:
+            conditions.append(AttendenceRecord.date >= since)
+        if until is not None:
+            conditions.append(AttendenceRecord.date < until)
+
+        return conditions
+
+
+def _dedup_key(attendence_record: AttendenceRecord) -> Hashable:
+    # Without the lecture, so repeats are found before the lecture is looked up. The
+    # window compares the dates, a check-in a minute after the last one is a repeat
+    # even when a new lecture started in between.
+    return (attendence_record.student_id, attendence_record.classroom_id)
+
+
+def _next_month(month: datetime) -> datetime:
+    if month.month == 12:
+        return datetime(month.year + 1, 1, 1)
+    return datetime(month.year, month.month + 1, 1)
+
+
+def _free_path(directory: str, name: str) -> str:
+    """Path of a new archive file, numbered when the month was archived before."""
+    path = os.path.join(directory, f"{name}.ndjson.gz")
+    number = 1
+    while os.path.exists(path):
+        number += 1
+        path = os.path.join(directory, f"{name}.{number}.ndjson.gz")
+
+    return path
+
+
+# The FastAPI dependencies moved to src.server.dependencies, they are still
+# importable from here and only imported when asked for
+_SERVER_DEPENDENCIES = {
+    "AttendenceOperationsDep",
+    "get_attendence_operations_with_db_storage_handler",
+}
+
+
+def __getattr__(name: str):
+    if name in _SERVER_DEPENDENCIES:
+        from src.server import dependencies
+
+        return getattr(dependencies, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
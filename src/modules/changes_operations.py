@@ -0,0 +1,91 @@
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+
+from src.common.models import ChangeLogEntry, settled_changes
+from src.common.storage.storage import NewStorageHandler
+
+
+@dataclass
+class ChangesOperations:
+    """Class for reading the change log.
+
+    Consumers remember the seq of the last change they've applied and ask for the
+    changes after it, instead of reloading whole tables. Changes after a seq that may
+    still be committed are held back, see settled_changes.
+
+    Attributes:
+        storage_handler (NewStorageHandler): Handler for change log storage operations
+    """
+
+    storage_handler: NewStorageHandler
+
+    def iter_changes_since(
+        self, seq: int = 0, table_name: str | None = None, batch_size: int = 1000
+    ) -> Iterator[ChangeLogEntry]:
+        """Iterate over the changes after a sequence number, oldest first.
+
+        Args:
+            seq (int, optional): Sequence number of the last seen change. Defaults to 0.
+            table_name (str | None, optional): Only changes of this table, e.g.
+                "attendencerecord". Defaults to None.
+            batch_size (int, optional): Rows fetched at once. Defaults to 1000.
+
+        Returns:
+            Iterator[ChangeLogEntry]: Changes, fetched while iterating
+        """
+        # Every table is read, the seqs of the other tables are needed to spot gaps
+        changes = self.storage_handler.iter_all_where(
+            ChangeLogEntry, [ChangeLogEntry.seq > seq], batch_size, order_by=["seq"]
+        )
+        with closing(changes):
+            for change in settled_changes(changes, seq):
+                if table_name is None or change.table_name == table_name:
+                    yield change
+
+    def get_changes_since(
+        self, seq: int = 0, limit: int = 1000, table_name: str | None = None
+    ) -> Tuple[List[ChangeLogEntry], int]:
+        """Get a page of changes after a sequence number, oldest first.
+
+        Args:
+            seq (int, optional): Sequence number of the last seen change. Defaults to 0.
+            limit (int, optional): Maximum number of changes. Defaults to 1000.
+            table_name (str | None, optional): Only changes of this table. Defaults to None.
+
+        Returns:
+            Tuple[List[ChangeLogEntry], int]: Up to limit changes and the seq the next
+                page starts after. It stays seq while a gap is waited for, and moves
+                past changes of other tables.
+        """
+        page = []
+        next_seq = seq
+        changes = self.storage_handler.iter_all_where(
+            ChangeLogEntry, [ChangeLogEntry.seq > seq], limit, order_by=["seq"]
+        )
+        # Close the streamed result right away instead of leaving the cursor open
+        with closing(changes):
+            for change in settled_changes(changes, seq):
+                next_seq = change.seq
+                if table_name is None or change.table_name == table_name:
+                    page.append(change)
+                    if len(page) == limit:
+                        break
+
+        return page, next_seq
+
+    def prune_changes(self, before_seq: int) -> int:
+        """Delete the changes before a sequence number, the log grows with every write.
+
+        Pass the lowest seq every consumer has seen. A consumer that is further behind
+        misses the pruned changes and has to reload the tables instead.
+
+        Args:
+            before_seq (int): Sequence number of the first change to keep
+
+        Returns:
+            int: Number of deleted changes
+        """
+        return self.storage_handler.delete_where(
+            ChangeLogEntry, [ChangeLogEntry.seq < before_seq]
+        )
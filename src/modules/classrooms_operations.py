@@ -1,8 +1,10 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlmodel import select
 
 from src.common.errors import NotFoundError
-from src.common.models import Classroom, Student
+from src.common.models import Classroom, Student, StudentClassroomLink
 from src.common.storage.storage import NewStorageHandler
 from src.modules.students_operations import StudentsOperations
 
@@ -54,9 +56,7 @@ class ClassroomsOperations:
         Returns:
             List[Classroom]: List of classrooms associated with the subject
         """
-        return self.storage_handler.get_all_where(
-            Classroom, [Classroom.subject_id == subject_id]
-        )
+        return self.storage_handler.get_all_by(Classroom, subject_id=subject_id)
 
     def get_classrooms_where_student(self, student_id: int) -> List[Classroom]:
         """Get list of all classrooms that contain a specific student.
@@ -71,6 +71,94 @@ class ClassroomsOperations:
             Classroom, [Classroom.students.any(Student.id == student_id)]
         )
 
+    def count_classrooms(
+        self, subject_id: int | None = None, student_id: int | None = None
+    ) -> int:
+        """Count the classrooms of a subject and/or student, without loading them.
+
+        Args:
+            subject_id (int | None, optional): ID of the subject to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of a student enrolled in the
+                classrooms. Defaults to None.
+
+        Returns:
+            int: Number of matching classrooms
+        """
+        return self.storage_handler.count_where(
+            Classroom, _classroom_conditions(subject_id, student_id)
+        )
+
+    def iter_classroom_values(
+        self,
+        fields: List[str],
+        subject_id: int | None = None,
+        student_id: int | None = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Iterate over some fields of the classrooms, without building Classroom models.
+
+        Args:
+            fields (List[str]): Fields to select, e.g. ["id", "subject_id"]
+            subject_id (int | None, optional): ID of the subject to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of a student enrolled in the
+                classrooms. Defaults to None.
+
+        Yields:
+            Tuple[Any, ...]: Values of the fields of every matching classroom, by ID
+        """
+        return self.storage_handler.iter_values_where(
+            Classroom,
+            fields,
+            _classroom_conditions(subject_id, student_id),
+            order_by=["id"],
+        )
+
+    def count_students_by_classroom(
+        self, subject_id: int | None = None, student_id: int | None = None
+    ) -> Dict[int, int]:
+        """Count the enrolled students of every matching classroom with one query.
+
+        Args:
+            subject_id (int | None, optional): ID of the subject to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of a student enrolled in the
+                classrooms. Defaults to None.
+
+        Returns:
+            Dict[int, int]: Number of students per classroom ID, classrooms without
+                students are left out
+        """
+        conditions = _classroom_conditions(subject_id, student_id)
+        if conditions:
+            conditions = [
+                StudentClassroomLink.classroom_id.in_(
+                    select(Classroom.id).where(*conditions)
+                )
+            ]
+
+        return self.storage_handler.count_by_where(
+            StudentClassroomLink, "classroom_id", conditions
+        )
+
+    def classrooms_exist(
+        self, subject_id: int | None = None, student_id: int | None = None
+    ) -> bool:
+        """Check whether a subject and/or student has any classroom.
+
+        Args:
+            subject_id (int | None, optional): ID of the subject to filter by.
+                Defaults to None.
+            student_id (int | None, optional): ID of a student enrolled in the
+                classrooms. Defaults to None.
+
+        Returns:
+            bool: True when at least one classroom matches
+        """
+        return self.storage_handler.exists_where(
+            Classroom, _classroom_conditions(subject_id, student_id)
+        )
+
     def add_student_to_classroom(self, classroom_id: int, student_id: int):
         """Add a student to a classroom.
 
@@ -144,8 +232,15 @@ class ClassroomsOperations:
     def delete_classroom(self, id: int):
         """Delete a classroom by ID.
 
+        The database deletes the enrollments, lectures and attendance of the classroom
+        with it.
+        Attendance records already moved to archive files stay there.
+
         Args:
             id (int): ID of the classroom to delete
+
+        Raises:
+            NotFoundError: When classroom with given ID is not found
         """
 
         try:
@@ -153,6 +248,23 @@ class ClassroomsOperations:
         except ValueError:
             raise NotFoundError(f"Classroom with ID {id} not found")
 
+    def purge_classrooms(self, subject_id: int) -> int:
+        """Delete every classroom of a subject, in one statement.
+
+        The database deletes their enrollments, lectures and attendance in the same
+        statement, nothing is loaded.
+        Attendance records already moved to archive files stay there.
+
+        Args:
+            subject_id (int): ID of the subject to delete the classrooms of
+
+        Returns:
+            int: Number of deleted classrooms
+        """
+        return self.storage_handler.delete_where(
+            Classroom, [Classroom.subject_id == subject_id]
+        )
+
     def update_classroom(self, id: int, updated_classroom: Classroom) -> Classroom:
         """Update an existing classroom.
 
@@ -170,3 +282,13 @@ class ClassroomsOperations:
             raise NotFoundError(f"Classroom with ID {id} not found")
 
         return updated_classroom
+
+
+def _classroom_conditions(subject_id: int | None, student_id: int | None) -> list:
+    conditions = []
+    if subject_id is not None:
+        conditions.append(Classroom.subject_id == subject_id)
+    if student_id is not None:
+        conditions.append(Classroom.students.any(Student.id == student_id))
+
+    return conditions
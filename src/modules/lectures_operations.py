@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+
+from src.common.errors import NotFoundError
+from src.common.models import AttendenceBitmap, AttendenceRecord, Lecture
+from src.common.storage.storage import NewStorageHandler
+from src.modules.attendence_bitmap_operations import AttendenceBitmapOperations
+
+
+class LectureValidationError(Exception):
+    """Exception raised for errors in lecture data.
+
+    This includes cases where:
+    - Lecture doesn't end after it starts
+    - Lecture overlaps another lecture of the classroom
+    """
+
+    pass
+
+
+@dataclass
+class LecturesOperations:
+    """Class for managing lectures of classrooms.
+
+    Attendance records reference the lecture they were taken at, so per lecture
+    queries are equality lookups on an indexed ID instead of scans over dates.
+
+    Attributes:
+        storage_handler (NewStorageHandler): Handler for lecture data storage operations
+    """
+
+    storage_handler: NewStorageHandler
+
+    def get_lecture(self, id: int) -> Lecture:
+        """Get a lecture by its ID.
+
+        Args:
+            id (int): ID of the lecture to retrieve
+
+        Returns:
+            Lecture: The lecture with the specified ID
+
+        Raises:
+            NotFoundError: When lecture with given ID is not found
+        """
+        try:
+            return self.storage_handler.get_by_id(id, Lecture)
+        except ValueError:
+            raise NotFoundError(f"Lecture with ID {id} not found")
+
+    def get_lectures_for_classroom(self, classroom_id: int) -> List[Lecture]:
+        """Get list of the lectures of a classroom, earliest first.
+
+        Args:
+            classroom_id (int): ID of the classroom
+
+        Returns:
+            List[Lecture]: Lectures of the classroom
+        """
+        return sorted(
+            self.storage_handler.get_all_by(Lecture, classroom_id=classroom_id),
+            key=lambda lecture: lecture.start,
+        )
+
+    def add_lecture(self, lecture: Lecture) -> Lecture:
+        """Add a lecture and link the attendance records taken during it.
+
+        The bitmap of the lecture is built with the students enrolled now.
+
+        Args:
+            lecture (Lecture): Lecture data to add
+
+        Returns:
+            Lecture: The newly created lecture with generated ID
+
+        Raises:
+            LectureValidationError: If the lecture doesn't end after it starts or
+                overlaps another lecture of the classroom
+        """
+        self._validate_lecture(lecture)
+
+        with self.storage_handler.transaction():
+            lecture = self.storage_handler.create(lecture)
+            self.storage_handler.update_where(
+                AttendenceRecord,
+                [
+                    AttendenceRecord.classroom_id == lecture.classroom_id,
+                    AttendenceRecord.date >= lecture.start,
+                    AttendenceRecord.date < lecture.end,
+                ],
+                {"lecture_id": lecture.id},
+            )
+            # Keeps the roster of the lecture, later enrollments don't change it
+            AttendenceBitmapOperations(self.storage_handler).build_lecture_bitmap(
+                lecture
+            )
+
+        return lecture
+
+    def delete_lecture(self, id: int):
+        """Delete a lecture, its attendance records are kept without lecture.
+
+        The bitmap of the lecture is deleted with it.
+
+        Args:
+            id (int): ID of the lecture to delete
+
+        Raises:
+            NotFoundError: When lecture with given ID is not found
+        """
+        with self.storage_handler.transaction():
+            try:
+                lecture = self.storage_handler.get_by_id(id, Lecture)
+            except ValueError:
+                raise NotFoundError(f"Lecture with ID {id} not found")
+
+            # ON DELETE SET NULL unlinks them as well, but only this update is in the
+            # change log for caches and live counters to see
+            self.storage_handler.update_where(
+                AttendenceRecord,
+                [AttendenceRecord.lecture_id == id],
+                {"lecture_id": None},
+            )
+            self.storage_handler.delete_where(
+                AttendenceBitmap,
+                [
+                    AttendenceBitmap.classroom_id == lecture.classroom_id,
+                    AttendenceBitmap.date == lecture.start,
+                ],
+            )
+            self.storage_handler.delete(id, Lecture)
+
+    def find_lecture(self, classroom_id: int, date: datetime) -> Lecture | None:
+        """Find the lecture of a classroom taking place at a date.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            date (datetime): Date during the lecture
+
+        Returns:
+            Lecture | None: The lecture, None when the classroom has none at the date
+        """
+        lectures = self.storage_handler.get_all_where(
+            Lecture,
+            [
+                Lecture.classroom_id == classroom_id,
+                Lecture.start <= date,
+                Lecture.end > date,
+            ],
+        )
+        return lectures[0] if lectures else None
+
+    def _validate_lecture(self, lecture: Lecture):
+        if lecture.end <= lecture.start:
+            raise LectureValidationError("Lecture must end after it starts")
+
+        overlapping = self.storage_handler.get_all_where(
+            Lecture,
+            [
+                Lecture.classroom_id == lecture.classroom_id,
+                Lecture.start < lecture.end,
+                Lecture.end > lecture.start,
+            ],
+        )
+        if overlapping:
+            raise LectureValidationError(
+                f"Lecture overlaps lecture with ID {overlapping[0].id}"
+            )
@@ -1,13 +1,20 @@
 from dataclasses import dataclass
-from typing import Annotated, List
-
-from fastapi import Depends
+from typing import Any, Iterator, List, Tuple
 
 from src.common.errors import NotFoundError
 from src.common.models import DegreeName, Student
-from src.common.storage.db_storage import DBStorageHandlerDep
+from src.common.query_spec import QueryResult, QuerySpec, QuerySpecError
 from src.common.storage.storage import NewStorageHandler
-from src.common.validators import validate_semester
+from src.common.validators import (
+    MIN_NAME_LENGTH,
+    ValidationReport,
+    check_min_length,
+    check_semesters,
+    validate_semester,
+)
+
+# Fields clients may filter, sort and select in query specs
+STUDENT_QUERY_FIELDS = ["id", "name", "surname", "degree", "semester"]
 
 
 class StudentValidationError(Exception):
@@ -16,9 +23,15 @@ class StudentValidationError(Exception):
     This includes cases where:
     - Name is less than 2 characters
     - Surname is less than 2 characters
+
+    Attributes:
+        report (ValidationReport | None): Errors of every invalid student, when many
+            students were validated at once
     """
 
-    pass
+    def __init__(self, message: str, report: ValidationReport | None = None):
+        super().__init__(message)
+        self.report = report
 
 
 @dataclass
@@ -57,12 +70,134 @@ class StudentsOperations:
         Raises:
             SemesterError: If the specified semester is invalid for the degree
         """
-        conditions = [Student.degree == degree_name]
-        if semester is not None:
-            validate_semester(degree_name, semester)
-            conditions.append(Student.semester == semester)
+        if semester is None:
+            return self.storage_handler.get_all_by(Student, degree=degree_name)
+
+        validate_semester(degree_name, semester)
+        return self.storage_handler.get_all_by(
+            Student, degree=degree_name, semester=semester
+        )
+
+    def iter_students(
+        self,
+        degree_name: DegreeName | None = None,
+        semester: int | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Student]:
+        """Iterate over students, fetching them lazily from storage.
+
+        Args:
+            degree_name (DegreeName | None, optional): Name of the degree program to
+                filter by. Defaults to None.
+            semester (int | None, optional): Semester number to filter by, only used
+                together with degree_name. Defaults to None.
+            batch_size (int, optional): Students fetched from storage at once.
+                Defaults to 1000.
+
+        Returns:
+            Iterator[Student]: Students matching the criteria
+
+        Raises:
+            SemesterError: If the specified semester is invalid for the degree
+        """
+        conditions = self._degree_conditions(degree_name, semester)
+        return self.storage_handler.iter_all_where(Student, conditions, batch_size)
+
+    def iter_student_values(
+        self,
+        fields: List[str],
+        degree_name: DegreeName | None = None,
+        semester: int | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Iterate over raw field values of students, without building Student models.
+
+        Args:
+            fields (List[str]): Fields of Student to get, e.g. ["id", "name"]
+            degree_name (DegreeName | None, optional): Name of the degree program to
+                filter by. Defaults to None.
+            semester (int | None, optional): Semester number to filter by, only used
+                together with degree_name. Defaults to None.
+            batch_size (int, optional): Rows fetched from storage at once.
+                Defaults to 1000.
+
+        Returns:
+            Iterator[Tuple[Any, ...]]: Values of the fields of every matching student
+
+        Raises:
+            SemesterError: If the specified semester is invalid for the degree
+        """
+        conditions = self._degree_conditions(degree_name, semester)
+        return self.storage_handler.iter_values_where(
+            Student, fields, conditions, batch_size
+        )
+
+    def query_students(self, spec: QuerySpec) -> QueryResult:
+        """Get the fields and rows of the students a query spec asks for.
 
-        return self.storage_handler.get_all_where(Student, conditions)
+        Only the asked columns are selected and no Student models are built.
+
+        Args:
+            spec (QuerySpec): Filters, sort, fields and limit, over STUDENT_QUERY_FIELDS
+
+        Returns:
+            QueryResult: The selected fields and an iterator over the rows
+
+        Raises:
+            QuerySpecError: If the spec is invalid for students
+        """
+        return spec.run(self.storage_handler, Student, STUDENT_QUERY_FIELDS)
+
+    def count_students(self, spec: QuerySpec | None = None) -> int:
+        """Count the students matching the filters of a query spec, e.g. for totals.
+
+        The storage counts them, no Student models are loaded.
+
+        Args:
+            spec (QuerySpec | None, optional): Filters over STUDENT_QUERY_FIELDS.
+                Defaults to None, every student.
+
+        Returns:
+            int: Number of matching students
+
+        Raises:
+            QuerySpecError: If the spec is invalid for students
+        """
+        return (spec or QuerySpec()).count(
+            self.storage_handler, Student, STUDENT_QUERY_FIELDS
+        )
+
+    def students_exist(self, spec: QuerySpec | None = None) -> bool:
+        """Check whether any student matches the filters of a query spec.
+
+        Args:
+            spec (QuerySpec | None, optional): Filters over STUDENT_QUERY_FIELDS.
+                Defaults to None, any student.
+
+        Returns:
+            bool: True when at least one student matches
+
+        Raises:
+            QuerySpecError: If the spec is invalid for students
+        """
+        return (spec or QuerySpec()).exists(
+            self.storage_handler, Student, STUDENT_QUERY_FIELDS
+        )
+
+    def search_students(self, query: str, limit: int = 20) -> List[Student]:
+        """Find students by the start of their name or surname, e.g. for typeahead.
+
+        Args:
+            query (str): Words to search for, every one has to start the name or
+                the surname, case is ignored, e.g. "jo do" finds John Doe
+            limit (int, optional): Maximum number of students. Defaults to 20.
+
+        Returns:
+            List[Student]: Matching students sorted by surname and name
+        """
+        return self.storage_handler.search_prefix(
+            Student, ["surname", "name"], query, limit
+        )
 
     def get_student(self, id: int) -> Student:
         """Get a student by their ID.
@@ -98,9 +233,64 @@ class StudentsOperations:
         self.storage_handler.create(student)
         return student
 
+    def sync_students(self, students: List[Student]) -> int:
+        """Add or update many students at once, matching existing ones by ID.
+
+        Meant for syncing the full roster from another system, sending the same
+        students again changes nothing.
+
+        Args:
+            students (List[Student]): Students to sync, all with their ID set
+
+        Returns:
+            int: Number of added or updated students
+
+        Raises:
+            StudentValidationError: If data of any student is invalid, its report
+                lists every invalid student
+        """
+        report = self.validate_students(students)
+        if not report.is_valid:
+            raise StudentValidationError(report.summary(), report)
+
+        return self.storage_handler.upsert_many(students)
+
+    def validate_students(self, students: List[Student]) -> ValidationReport:
+        """Validate many students at once, e.g. a whole import.
+
+        Every check runs over a whole column, and every error of every student is
+        reported instead of stopping at the first one.
+
+        Args:
+            students (List[Student]): Students to validate
+
+        Returns:
+            ValidationReport: Errors by index of the student, empty when all are valid
+        """
+        report = ValidationReport(len(students))
+        check_semesters(
+            report,
+            [student.degree for student in students],
+            [student.semester for student in students],
+        )
+        check_min_length(
+            report, [student.name for student in students], MIN_NAME_LENGTH, "Name"
+        )
+        check_min_length(
+            report,
+            [student.surname for student in students],
+            MIN_NAME_LENGTH,
+            "Surname",
+        )
+        return report
+
     def delete_student(self, id: int):
         """Delete a student from storage.
 
+        The database deletes the enrollments and attendance records of the student
+        with it.
+        Attendance records already moved to archive files stay there.
+
         Args:
             id (int): ID of the student to delete
 
@@ -112,6 +302,35 @@ class StudentsOperations:
         except ValueError:
             raise NotFoundError(f"Student with id {id} not found")
 
+    def purge_students(self, spec: QuerySpec) -> int:
+        """Delete the students matching the filters of a query spec, in one statement.
+
+        The database deletes their enrollments and attendance records in the same
+        statement, nothing is loaded.
+        Attendance records already moved to archive files stay there.
+
+        Example:
+            # Students who graduated from the master degree
+            students_operations.purge_students(
+                QuerySpec.parse(["degree=Master", "semester>=4"])
+            )
+
+        Args:
+            spec (QuerySpec): Filters over STUDENT_QUERY_FIELDS, at least one
+
+        Returns:
+            int: Number of deleted students
+
+        Raises:
+            QuerySpecError: If the spec has no filters or is invalid for students
+        """
+        if not spec.filters:
+            raise QuerySpecError("Purging students needs at least one filter")
+
+        return self.storage_handler.delete_where(
+            Student, spec.conditions(Student, STUDENT_QUERY_FIELDS)
+        )
+
     def update_student(self, id: int, updated_student: Student) -> Student:
         """Update an existing student in storage.
 
@@ -183,24 +402,35 @@ class StudentsOperations:
                 "Name and surname must be at least 2 characters long"
             )
 
+    def _degree_conditions(
+        self, degree_name: DegreeName | None, semester: int | None
+    ) -> list:
+        """Build the conditions filtering students by degree and semester.
+
+        Raises:
+            SemesterError: If the specified semester is invalid for the degree
+        """
+        conditions = []
+        if degree_name is not None:
+            conditions.append(Student.degree == degree_name)
+            if semester is not None:
+                validate_semester(degree_name, semester)
+                conditions.append(Student.semester == semester)
 
-def get_students_operations_with_db_storage_handler(
-    db_storage_handler: DBStorageHandlerDep,
-) -> StudentsOperations:
-    """Create a StudentsOperations instance with a database storage handler.
+        return conditions
 
-    This is a FastAPI dependency that creates a StudentsOperations instance
-    configured with a database storage handler.
 
-    Args:
-        db_storage_handler (DBStorageHandlerDep): Database storage handler dependency
+# The FastAPI dependencies moved to src.server.dependencies, they are still
+# importable from here and only imported when asked for
+_SERVER_DEPENDENCIES = {
+    "StudentsOperationsDep",
+    "get_students_operations_with_db_storage_handler",
+}
 
-    Returns:
-        StudentsOperations: New StudentsOperations instance configured with the database handler
-    """
-    return StudentsOperations(db_storage_handler)
 
+def __getattr__(name: str):
+    if name in _SERVER_DEPENDENCIES:
+        from src.server import dependencies
 
-StudentsOperationsDep = Annotated[
-    StudentsOperations, Depends(get_students_operations_with_db_storage_handler)
-]
+        return getattr(dependencies, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
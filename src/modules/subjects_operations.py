@@ -1,10 +1,20 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Iterator, List, Tuple
 
 from src.common.errors import NotFoundError
 from src.common.models import DegreeName, Subject
+from src.common.query_spec import QueryResult, QuerySpec
 from src.common.storage.storage import NewStorageHandler
-from src.common.validators import validate_semester
+from src.common.validators import (
+    MIN_NAME_LENGTH,
+    ValidationReport,
+    check_min_length,
+    check_semesters,
+    validate_semester,
+)
+
+# Fields clients may filter, sort and select in query specs
+SUBJECT_QUERY_FIELDS = ["id", "name", "semester", "degree"]
 
 
 class SubjectValidationError(Exception):
@@ -38,6 +48,112 @@ class SubjectsOperations:
         """
         return self.storage_handler.get_all(Subject)
 
+    def iter_subjects(
+        self,
+        degree_name: DegreeName | None = None,
+        semester: int | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Subject]:
+        """Iterate over subjects, fetching them lazily from storage.
+
+        Args:
+            degree_name (DegreeName | None, optional): Name of the degree program to
+                filter by. Defaults to None.
+            semester (int | None, optional): Semester number to filter by, only used
+                together with degree_name. Defaults to None.
+            batch_size (int, optional): Subjects fetched from storage at once.
+                Defaults to 1000.
+
+        Returns:
+            Iterator[Subject]: Subjects matching the criteria
+
+        Raises:
+            SemesterError: If the specified semester is invalid for the degree
+        """
+        conditions = self._degree_conditions(degree_name, semester)
+        return self.storage_handler.iter_all_where(Subject, conditions, batch_size)
+
+    def iter_subject_values(
+        self,
+        fields: List[str],
+        degree_name: DegreeName | None = None,
+        semester: int | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Iterate over raw field values of subjects, without building Subject models.
+
+        Args:
+            fields (List[str]): Fields of Subject to get, e.g. ["id", "name"]
+            degree_name (DegreeName | None, optional): Name of the degree program to
+                filter by. Defaults to None.
+            semester (int | None, optional): Semester number to filter by, only used
+                together with degree_name. Defaults to None.
+            batch_size (int, optional): Rows fetched from storage at once.
+                Defaults to 1000.
+
+        Returns:
+            Iterator[Tuple[Any, ...]]: Values of the fields of every matching subject
+
+        Raises:
+            SemesterError: If the specified semester is invalid for the degree
+        """
+        conditions = self._degree_conditions(degree_name, semester)
+        return self.storage_handler.iter_values_where(
+            Subject, fields, conditions, batch_size
+        )
+
+    def query_subjects(self, spec: QuerySpec) -> QueryResult:
+        """Get the fields and rows of the subjects a query spec asks for.
+
+        Only the asked columns are selected and no Subject models are built.
+
+        Args:
+            spec (QuerySpec): Filters, sort, fields and limit, over SUBJECT_QUERY_FIELDS
+
+        Returns:
+            QueryResult: The selected fields and an iterator over the rows
+
+        Raises:
+            QuerySpecError: If the spec is invalid for subjects
+        """
+        return spec.run(self.storage_handler, Subject, SUBJECT_QUERY_FIELDS)
+
+    def count_subjects(self, spec: QuerySpec | None = None) -> int:
+        """Count the subjects matching the filters of a query spec, e.g. for totals.
+
+        The storage counts them, no Subject models are loaded.
+
+        Args:
+            spec (QuerySpec | None, optional): Filters over SUBJECT_QUERY_FIELDS.
+                Defaults to None, every subject.
+
+        Returns:
+            int: Number of matching subjects
+
+        Raises:
+            QuerySpecError: If the spec is invalid for subjects
+        """
+        return (spec or QuerySpec()).count(
+            self.storage_handler, Subject, SUBJECT_QUERY_FIELDS
+        )
+
+    def subjects_exist(self, spec: QuerySpec | None = None) -> bool:
+        """Check whether any subject matches the filters of a query spec.
+
+        Args:
+            spec (QuerySpec | None, optional): Filters over SUBJECT_QUERY_FIELDS.
+                Defaults to None, any subject.
+
+        Returns:
+            bool: True when at least one subject matches
+
+        Raises:
+            QuerySpecError: If the spec is invalid for subjects
+        """
+        return (spec or QuerySpec()).exists(
+            self.storage_handler, Subject, SUBJECT_QUERY_FIELDS
+        )
+
     def get_subject(self, id: int) -> Subject:
         """Get a subject by its ID.
 
@@ -70,12 +186,13 @@ class SubjectsOperations:
         Raises:
             SemesterError: If the specified semester is invalid for the degree
         """
-        conditions = [Subject.degree == degree_name]
-        if semester is not None:
-            validate_semester(degree_name, semester)
-            conditions.append(Subject.semester == semester)
+        if semester is None:
+            return self.storage_handler.get_all_by(Subject, degree=degree_name)
 
-        return self.storage_handler.get_all_where(Subject, conditions)
+        validate_semester(degree_name, semester)
+        return self.storage_handler.get_all_by(
+            Subject, degree=degree_name, semester=semester
+        )
 
     def add_subject(self, subject: Subject) -> Subject:
         """Add a new subject to storage.
@@ -94,6 +211,29 @@ class SubjectsOperations:
         self.storage_handler.create(subject)
         return subject
 
+    def validate_subjects(self, subjects: List[Subject]) -> ValidationReport:
+        """Validate many subjects at once, e.g. a whole import.
+
+        Every check runs over a whole column, and every error of every subject is
+        reported instead of stopping at the first one.
+
+        Args:
+            subjects (List[Subject]): Subjects to validate
+
+        Returns:
+            ValidationReport: Errors by index of the subject, empty when all are valid
+        """
+        report = ValidationReport(len(subjects))
+        check_semesters(
+            report,
+            [subject.degree for subject in subjects],
+            [subject.semester for subject in subjects],
+        )
+        check_min_length(
+            report, [subject.name for subject in subjects], MIN_NAME_LENGTH, "Name"
+        )
+        return report
+
     def delete_subject(self, id: int):
         """Delete a subject from storage.
 
@@ -152,3 +292,20 @@ class SubjectsOperations:
             raise SubjectValidationError(
                 "Subject name must be at least 2 characters long"
             )
+
+    def _degree_conditions(
+        self, degree_name: DegreeName | None, semester: int | None
+    ) -> list:
+        """Build the conditions filtering subjects by degree and semester.
+
+        Raises:
+            SemesterError: If the specified semester is invalid for the degree
+        """
+        conditions = []
+        if degree_name is not None:
+            conditions.append(Subject.degree == degree_name)
+            if semester is not None:
+                validate_semester(degree_name, semester)
+                conditions.append(Subject.semester == semester)
+
+        return conditions
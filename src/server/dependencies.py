@@ -0,0 +1,109 @@
+from typing import Annotated
+
+from fastapi import Depends
+from sqlmodel import Session
+
+from src.common.dedup import check_in_window
+from src.common.storage.db_storage import DBStorageHandler, get_session
+from src.modules.attendence_operations import AttendenceOperations
+from src.modules.changes_operations import ChangesOperations
+from src.modules.students_operations import StudentsOperations
+from src.server.live_counters import LiveCounters, live_counters
+
+# FastAPI dependencies live here and not next to the classes they build, so the CLI
+# can import the storage and operations modules without importing FastAPI.
+
+# Type alias for dependency injection of SQLModel Session using FastAPI's Depends
+# This allows us to inject database sessions into route handlers
+SessionDep = Annotated[Session, Depends(get_session)]
+
+
+def get_db_storage_handler(session: SessionDep) -> DBStorageHandler:
+    """Create a DBStorageHandler instance with a database session.
+
+    Args:
+        session (SessionDep): Database session dependency
+
+    Returns:
+        DBStorageHandler: New DBStorageHandler instance configured with the session
+    """
+    return DBStorageHandler(session)
+
+
+DBStorageHandlerDep = Annotated[DBStorageHandler, Depends(get_db_storage_handler)]
+
+
+def get_students_operations_with_db_storage_handler(
+    db_storage_handler: DBStorageHandlerDep,
+) -> StudentsOperations:
+    """Create a StudentsOperations instance with a database storage handler.
+
+    This is a FastAPI dependency that creates a StudentsOperations instance
+    configured with a database storage handler.
+
+    Args:
+        db_storage_handler (DBStorageHandlerDep): Database storage handler dependency
+
+    Returns:
+        StudentsOperations: New StudentsOperations instance configured with the database handler
+    """
+    return StudentsOperations(db_storage_handler)
+
+
+StudentsOperationsDep = Annotated[
+    StudentsOperations, Depends(get_students_operations_with_db_storage_handler)
+]
+
+
+def get_attendence_operations_with_db_storage_handler(
+    db_storage_handler: DBStorageHandlerDep,
+) -> AttendenceOperations:
+    """Create an AttendenceOperations instance with a database storage handler.
+
+    This is a FastAPI dependency that creates an AttendenceOperations instance
+    configured with a database storage handler. Repeated check-ins are dropped by the
+    dedup window shared by every request.
+
+    Args:
+        db_storage_handler (DBStorageHandlerDep): Database storage handler dependency
+
+    Returns:
+        AttendenceOperations: New AttendenceOperations instance configured with the database handler
+    """
+    return AttendenceOperations(db_storage_handler, check_in_window)
+
+
+AttendenceOperationsDep = Annotated[
+    AttendenceOperations, Depends(get_attendence_operations_with_db_storage_handler)
+]
+
+
+def get_changes_operations_with_db_storage_handler(
+    db_storage_handler: DBStorageHandlerDep,
+) -> ChangesOperations:
+    """Create a ChangesOperations instance with a database storage handler.
+
+    Args:
+        db_storage_handler (DBStorageHandlerDep): Database storage handler dependency
+
+    Returns:
+        ChangesOperations: New ChangesOperations instance configured with the database handler
+    """
+    return ChangesOperations(db_storage_handler)
+
+
+ChangesOperationsDep = Annotated[
+    ChangesOperations, Depends(get_changes_operations_with_db_storage_handler)
+]
+
+
+def get_live_counters() -> LiveCounters:
+    """Get the attendance counters shared by every request of the server process.
+
+    Returns:
+        LiveCounters: The shared counters
+    """
+    return live_counters
+
+
+LiveCountersDep = Annotated[LiveCounters, Depends(get_live_counters)]
@@ -0,0 +1,240 @@
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Set
+
+from src.common.models import AttendenceRecord, ChangeLogEntry, ChangeOperation
+
+# Sent when nothing changed for a while, so proxies keep idle connections open
+KEEPALIVE_SECONDS = 15
+# How often every watched classroom is recounted, so a counter that drifted, e.g. by
+# a check-in written while it was recounted, is corrected
+RESYNC_SECONDS = 60
+
+
+@dataclass
+class CountUpdate:
+    """New counts worked out from changes, see LiveCounters.count_changes.
+
+    Attributes:
+        counts (Dict[int, int]): New count of every changed classroom
+        resynced (Set[int]): Classrooms recounted in the database
+    """
+
+    counts: Dict[int, int] = field(default_factory=dict)
+    resynced: Set[int] = field(default_factory=set)
+
+
+class LiveCounters:
+    """In-memory attendance counters per classroom, pushed to every subscriber.
+
+    A counter is loaded from the database once, when the first viewer of a classroom
+    subscribes. Afterwards the check-ins and deletions in the change log add to and
+    subtract from it, the database is only asked again to resync after a change it
+    can't tell the classroom of, or when changes may have been missed. The database
+    load therefore doesn't grow with the number of viewers or check-ins, and writes of
+    every worker process and the CLI are seen.
+    """
+
+    def __init__(self, resync_seconds: float = RESYNC_SECONDS):
+        """Initialize LiveCounters.
+
+        Args:
+            resync_seconds (float, optional): Seconds between recounts of every
+                watched classroom. Defaults to RESYNC_SECONDS.
+        """
+        self.resync_seconds = resync_seconds
+        self._counts: Dict[int, int] = {}
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        # Loaded since the last poll, changes before the load may be in the next one
+        self._stale: Set[int] = set()
+        self._resynced_at = time.monotonic()
+
+    def count(self, classroom_id: int) -> int | None:
+        """Get the current count of a classroom, None when it isn't tracked."""
+        return self._counts.get(classroom_id)
+
+    async def subscribe(
+        self, classroom_id: int, load: Callable[[], int]
+    ) -> asyncio.Queue:
+        """Start following the count of a classroom.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            load (Callable[[], int]): Function counting the attendance records in the
+                database, only called when the classroom isn't tracked yet. It runs in
+                a worker thread, the event loop keeps serving requests.
+
+        Returns:
+            asyncio.Queue: Queue getting the current count and every new one, slow
+                subscribers skip straight to the latest count
+        """
+        if classroom_id not in self._counts:
+            count = await asyncio.to_thread(load)
+            # Another viewer may have loaded it while this one waited
+            if classroom_id not in self._counts:
+                self._counts[classroom_id] = count
+                self._stale.add(classroom_id)
+
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(self._counts[classroom_id])
+        self._subscribers.setdefault(classroom_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, classroom_id: int, queue: asyncio.Queue):
+        """Stop following a classroom, its counter is dropped with the last subscriber.
+
+        Args:
+            classroom_id (int): ID of the classroom
+            queue (asyncio.Queue): Queue returned by subscribe
+        """
+        subscribers = self._subscribers.get(classroom_id, set())
+        subscribers.discard(queue)
+        if not subscribers:
+            # Nobody follows the check-ins anymore, the counter would go stale
+            self._subscribers.pop(classroom_id, None)
+            self._counts.pop(classroom_id, None)
+            self._stale.discard(classroom_id)
+
+    def refresh(
+        self,
+        changes: List[ChangeLogEntry],
+        count: Callable[[int], int],
+        last_seq: int | None = None,
+    ):
+        """Apply changes to the watched classrooms, see count_changes.
+
+        Args:
+            changes (List[ChangeLogEntry]): Changes read from the change log
+            count (Callable[[int], int]): Function counting the attendance records of
+                a classroom in the database
+            last_seq (int | None, optional): Seq of the change read before them.
+                Defaults to None, no gap is looked for.
+        """
+        self.update(self.count_changes(changes, count, last_seq))
+
+    def count_changes(
+        self,
+        changes: List[ChangeLogEntry],
+        count: Callable[[int], int],
+        last_seq: int | None = None,
+    ) -> CountUpdate:
+        """Work out the new counts of the watched classrooms the changes touch.
+
+        A created record adds one to its classroom, a deleted one subtracts one. The
+        watched classrooms are recounted in the database instead when they were just
+        loaded, after an updated record or a change covering many records, e.g.
+        archived ones, when the seqs have a gap the changes of a rolled back or too
+        slow transaction were skipped at, and every resync_seconds.
+
+        Only reads the counters, so it may run in a worker thread while the event loop
+        serves requests. Pass the result to update on the event loop.
+
+        Args:
+            changes (List[ChangeLogEntry]): Changes read from the change log
+            count (Callable[[int], int]): Function counting the attendance records of
+                a classroom in the database
+            last_seq (int | None, optional): Seq of the change read before them.
+                Defaults to None, no gap is looked for.
+
+        Returns:
+            CountUpdate: New count of every changed classroom
+        """
+        counts = dict(self._counts)
+        resync = set(self._stale) & counts.keys()
+        if time.monotonic() - self._resynced_at >= self.resync_seconds or (
+            last_seq is not None and _has_gap(changes, last_seq)
+        ):
+            resync = set(counts)
+
+        deltas: Dict[int, int] = defaultdict(int)
+        for change in changes:
+            if change.table_name != AttendenceRecord.__tablename__:
+                continue
+            if change.operation == ChangeOperation.updated or change.data is None:
+                # The record may have moved away from a classroom the data doesn't
+                # name, or the change covers many records
+                resync = set(counts)
+                continue
+            delta = 1 if change.operation == ChangeOperation.created else -1
+            deltas[change.data["classroom_id"]] += delta
+
+        update = CountUpdate(resynced=resync)
+        for classroom_id, delta in deltas.items():
+            if classroom_id in counts and classroom_id not in resync and delta:
+                update.counts[classroom_id] = counts[classroom_id] + delta
+        # Each classroom is counted once, no matter how many records changed
+        for classroom_id in resync:
+            update.counts[classroom_id] = count(classroom_id)
+
+        return update
+
+    def update(self, update: CountUpdate):
+        """Store new counts and push the ones that changed to the subscribers.
+
+        Args:
+            update (CountUpdate): New counts, see count_changes
+        """
+        if update.resynced >= self._counts.keys():
+            self._resynced_at = time.monotonic()
+        self._stale -= update.resynced
+
+        for classroom_id, count_now in update.counts.items():
+            # Skip classrooms whose last subscriber left while they were counted
+            if classroom_id in self._counts and count_now != self._counts[classroom_id]:
+                self._counts[classroom_id] = count_now
+                self._publish(classroom_id)
+
+    def _publish(self, classroom_id: int):
+        count = self._counts[classroom_id]
+        for queue in self._subscribers.get(classroom_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(count)
+
+
+def _has_gap(changes: List[ChangeLogEntry], last_seq: int) -> bool:
+    """Whether seqs between the changes, or before the first one, were skipped."""
+    expected = last_seq + 1
+    for change in changes:
+        if change.seq != expected:
+            return True
+        expected = change.seq + 1
+
+    return False
+
+
+async def classroom_events(
+    live_counters: LiveCounters,
+    classroom_id: int,
+    queue: asyncio.Queue,
+    keepalive: float = KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """Server-sent events with the count of a classroom, one event per change.
+
+    Args:
+        live_counters (LiveCounters): Counters the queue was subscribed to
+        classroom_id (int): ID of the classroom
+        queue (asyncio.Queue): Queue returned by live_counters.subscribe
+        keepalive (float, optional): Seconds without changes before a comment is sent
+            to keep the connection open. Defaults to KEEPALIVE_SECONDS.
+
+    Yields:
+        str: Events like "event: count\\ndata: 12\\n\\n"
+    """
+    try:
+        while True:
+            try:
+                count = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            yield f"event: count\ndata: {count}\n\n"
+    finally:
+        live_counters.unsubscribe(classroom_id, queue)
+
+
+# Shared by every request of the server process
+live_counters = LiveCounters()
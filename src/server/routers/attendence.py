@@ -0,0 +1,139 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import SQLModel
+
+from src.common.errors import NotFoundError
+from src.common.models import AttendenceRecord, AttendenceRecordBase
+from src.modules.attendence_operations import (
+    AttendenceDataError,
+    DuplicateAttendenceError,
+)
+from src.server.dependencies import AttendenceOperationsDep, LiveCountersDep
+from src.server.live_counters import classroom_events
+
+router = APIRouter(prefix="/attendance", tags=["attendance"])
+
+
+class RecordsCount(SQLModel):
+    count: int
+
+
+class DuplicatesStatistics(SQLModel):
+    checked: int
+    dropped: int
+    drop_rate: float
+
+
+@router.get("/classrooms/{classroom_id}")
+async def get_attendence_records_by_classroom(
+    attendence_operations: AttendenceOperationsDep, classroom_id: int
+) -> list[AttendenceRecord]:
+    """Records of the classroom in the database, archived months are left out."""
+    return attendence_operations.get_attendence_records_by_classroom(classroom_id)
+
+
+@router.get("/classrooms/{classroom_id}/count")
+async def count_attendence_records_by_classroom(
+    attendence_operations: AttendenceOperationsDep,
+    classroom_id: int,
+    lecture_id: int | None = None,
+) -> RecordsCount:
+    """Count the records in the database, archived months are left out."""
+    return RecordsCount(
+        count=attendence_operations.count_attendence_records(
+            classroom_id=classroom_id, lecture_id=lecture_id
+        )
+    )
+
+
+@router.get("/classrooms/{classroom_id}/live")
+async def follow_classroom_count(
+    attendence_operations: AttendenceOperationsDep,
+    live_counters: LiveCountersDep,
+    classroom_id: int,
+) -> StreamingResponse:
+    # The database is only asked when nobody watches the classroom yet
+    queue = await live_counters.subscribe(
+        classroom_id,
+        lambda: attendence_operations.count_attendence_records_by_classroom(
+            classroom_id
+        ),
+    )
+    return StreamingResponse(
+        classroom_events(live_counters, classroom_id, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/duplicates")
+async def get_duplicates_statistics(
+    attendence_operations: AttendenceOperationsDep,
+) -> DuplicatesStatistics:
+    # Counted by this worker process since it started
+    dedup_window = attendence_operations.dedup_window
+    return DuplicatesStatistics(
+        checked=dedup_window.checked,
+        dropped=dedup_window.dropped,
+        drop_rate=dedup_window.drop_rate,
+    )
+
+
+@router.get("/students/{student_id}")
+async def get_attendence_records_by_student(
+    attendence_operations: AttendenceOperationsDep, student_id: int
+) -> list[AttendenceRecord]:
+    """Records of the student in the database, archived months are left out."""
+    return attendence_operations.get_attendence_records_by_student(student_id)
+
+
+@router.post("/", response_model=AttendenceRecord)
+async def add_attendence_record(
+    attendence_operations: AttendenceOperationsDep,
+    attendence_record: AttendenceRecordBase,
+) -> AttendenceRecord:
+    try:
+        return attendence_operations.add_attendence_record(
+            AttendenceRecord.model_validate(attendence_record)
+        )
+    except DuplicateAttendenceError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    except AttendenceDataError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        ) from e
+
+
+@router.post("/batch", response_model=list[AttendenceRecord])
+async def add_attendence_records(
+    attendence_operations: AttendenceOperationsDep,
+    attendence_records: list[AttendenceRecordBase],
+) -> list[AttendenceRecord]:
+    try:
+        return attendence_operations.add_attendence_records(
+            [AttendenceRecord.model_validate(record) for record in attendence_records]
+        )
+    except AttendenceDataError as e:
+        # Every invalid record at once, so the client can fix them in one go
+        raise HTTPException(
+            status_code=(
+                status.HTTP_409_CONFLICT
+                if isinstance(e, DuplicateAttendenceError)
+                else status.HTTP_422_UNPROCESSABLE_ENTITY
+            ),
+            detail=[
+                {"index": invalid.index, "errors": invalid.errors}
+                for invalid in e.invalid_records
+            ]
+            or str(e),
+        ) from e
+
+
+@router.delete("/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_attendence_record(
+    attendence_operations: AttendenceOperationsDep, record_id: int
+):
+    try:
+        attendence_operations.delete_attendence_record(record_id)
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
@@ -0,0 +1,28 @@
+from typing import List
+
+from fastapi import APIRouter, Query
+from sqlmodel import SQLModel
+
+from src.common.models import ChangeLogEntry
+from src.server.dependencies import ChangesOperationsDep
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+class ChangesPage(SQLModel):
+    changes: List[ChangeLogEntry]
+    # Pass as `since` to get the next page, it stays the same when nothing changed or
+    # a change that may still be committed is waited for
+    next_since: int
+
+
+@router.get("/")
+async def get_changes(
+    changes_operations: ChangesOperationsDep,
+    since: int = 0,
+    limit: int = Query(default=1000, ge=1, le=10000),
+    table: str | None = None,
+) -> ChangesPage:
+    # A page instead of a streamed response, the session is closed once the handler returns
+    changes, next_since = changes_operations.get_changes_since(since, limit, table)
+    return ChangesPage(changes=changes, next_since=next_since)
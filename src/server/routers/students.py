@@ -1,18 +1,95 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlmodel import SQLModel
 
 from src.common.errors import SemesterError
 from src.common.models import DegreeName, Student
-from src.modules.students_operations import (
-    StudentsOperationsDep,
-    StudentValidationError,
-)
+from src.common.query_spec import QuerySpec, QuerySpecError
+from src.modules.students_operations import StudentValidationError
+from src.server.dependencies import StudentsOperationsDep
 
 router = APIRouter(prefix="/students", tags=["students"])
 
 
-@router.get("/")
-async def get_students(students_operations: StudentsOperationsDep) -> list[Student]:
-    return students_operations.get_students()
+class StudentsCount(SQLModel):
+    count: int
+
+
+class StudentsExist(SQLModel):
+    exists: bool
+
+
+class StudentsDeleted(SQLModel):
+    deleted: int
+
+
+@router.get("/", response_model=list[Student])
+async def get_students(
+    students_operations: StudentsOperationsDep,
+    filter: list[str] = Query(default=[]),
+    sort: str | None = None,
+    fields: str | None = None,
+    limit: int | None = Query(default=None, ge=0),
+) -> list[dict[str, Any]] | JSONResponse:
+    # e.g. ?filter=degree=Master&filter=semester>=2&sort=-semester,name&fields=id,name
+    try:
+        result = students_operations.query_students(
+            QuerySpec.parse(filter, sort, fields, limit)
+        )
+    except QuerySpecError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+    # Only the asked columns are selected, no Student models are built
+    students = [dict(zip(result.fields, row)) for row in result.rows]
+    if fields is None:
+        return students
+    # Partial students don't fit the Student response model, they skip its validation
+    return JSONResponse(jsonable_encoder(students))
+
+
+@router.get("/count")
+async def count_students(
+    students_operations: StudentsOperationsDep,
+    filter: list[str] = Query(default=[]),
+) -> StudentsCount:
+    # e.g. ?filter=semester=3, counted by the database without loading students
+    try:
+        return StudentsCount(
+            count=students_operations.count_students(QuerySpec.parse(filter))
+        )
+    except QuerySpecError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+
+@router.get("/exists")
+async def students_exist(
+    students_operations: StudentsOperationsDep,
+    filter: list[str] = Query(default=[]),
+) -> StudentsExist:
+    try:
+        return StudentsExist(
+            exists=students_operations.students_exist(QuerySpec.parse(filter))
+        )
+    except QuerySpecError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+
+@router.get("/search")
+async def search_students(
+    students_operations: StudentsOperationsDep,
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+) -> list[Student]:
+    return students_operations.search_students(q, limit)
 
 
 @router.get("/{degree_name}")
@@ -48,6 +125,23 @@ async def update_student(
     return students_operations.update_student(student_id, student)
 
 
+@router.delete("/")
+async def purge_students(
+    students_operations: StudentsOperationsDep,
+    filter: list[str] = Query(min_length=1),
+) -> StudentsDeleted:
+    # e.g. ?filter=degree=Master&filter=semester>=4, enrollments and attendance of
+    # the students are deleted by the database in the same statement
+    try:
+        return StudentsDeleted(
+            deleted=students_operations.purge_students(QuerySpec.parse(filter))
+        )
+    except QuerySpecError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_student(students_operations: StudentsOperationsDep, student_id: int):
     students_operations.delete_student(student_id)
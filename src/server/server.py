@@ -1,21 +1,78 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
 
-from src.common.storage.db_storage import create_db_and_tables
-from src.server.routers import students
+from src.common.storage.db_storage import (
+    DBStorageHandler,
+    create_db_and_tables,
+    get_engine,
+)
+from src.common.storage.invalidation import InvalidationBus, latest_seq
+from src.modules.attendence_operations import AttendenceOperations
+from src.server.live_counters import live_counters
+from src.server.routers import attendence, changes, students
+
+# How often every worker process reads the change log, the staleness of live counts
+CHANGES_POLL_SECONDS = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+async def follow_changes(interval: float = CHANGES_POLL_SECONDS):
+    """Apply the changes written by any process to the state kept by this one.
+
+    Args:
+        interval (float, optional): Seconds between reads of the change log.
+            Defaults to CHANGES_POLL_SECONDS.
+    """
+    # Always the primary, a lagging replica would delay every change
+    with Session(get_engine()) as session:
+        storage_handler = DBStorageHandler(session)
+        attendence_operations = AttendenceOperations(storage_handler)
+        bus = InvalidationBus(latest_seq(storage_handler))
+        session.close()
+
+        def poll():
+            last_seq = bus.last_seq
+            try:
+                return live_counters.count_changes(
+                    bus.poll(storage_handler),
+                    attendence_operations.count_attendence_records_by_classroom,
+                    last_seq,
+                )
+            finally:
+                # Don't keep a transaction open between the polls
+                session.close()
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # The database is read in a worker thread, requests aren't held up
+                update = await asyncio.to_thread(poll)
+            except SQLAlchemyError:
+                logger.exception("Reading the change log failed")
+                continue
+            live_counters.update(update)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    task = asyncio.create_task(follow_changes())
     yield
+    task.cancel()
 
 
 app = FastAPI(lifespan=lifespan)
 
-# Include the students router
+# Include the students, attendance and change feed routers
 app.include_router(students.router)
+app.include_router(attendence.router)
+app.include_router(changes.router)
 
 
 @app.get("/")
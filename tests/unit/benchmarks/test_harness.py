@@ -0,0 +1,63 @@
+from benchmarks.data import Scale, generate_enrollments, generate_students
+from benchmarks.harness import BenchmarkResult, BenchmarkRun, compare, measure
+from src.common.validators import validate_semester
+
+
+def result(name, median, rows=1000):
+    return BenchmarkResult(
+        name=name, rows=rows, calls=1, min=median, median=median, mean=median, stdev=0
+    )
+
+
+class TestData:
+    def test_scale_from_rows(self):
+        scale = Scale.from_rows(10_000)
+
+        assert scale.attendence == 10_000
+        assert scale.students == 1_000
+        assert scale.enrollments <= scale.students * scale.classrooms
+
+    def test_generated_students_are_valid(self):
+        for student in generate_students(100):
+            validate_semester(student["degree"], student["semester"])
+
+    def test_generated_enrollments_are_unique(self):
+        enrollments = [
+            (row["student_id"], row["classroom_id"])
+            for row in generate_enrollments(50, students=10, classrooms=5)
+        ]
+
+        assert len(set(enrollments)) == 50
+
+
+class TestHarness:
+    def test_measure(self):
+        calls = []
+
+        got = measure("append", lambda: calls.append(1), rows=0, calls=3, repeat=2)
+
+        assert len(calls) == 7  # warmup + repeat * calls
+        assert got.calls == 3
+        assert got.min <= got.median
+
+    def test_save_and_load(self, tmp_path):
+        run = BenchmarkRun(results=[result("db.get_all", 0.5)], metadata={"rows": 1})
+        path = str(tmp_path / "results.json")
+
+        run.save(path)
+
+        assert BenchmarkRun.load(path) == run
+
+    def test_compare_finds_regressions(self):
+        baseline = BenchmarkRun(results=[result("fast", 1.0), result("slow", 1.0)])
+        current = BenchmarkRun(results=[result("fast", 1.05), result("slow", 1.5)])
+
+        got = compare(baseline, current, threshold=0.1)
+
+        assert [regression.name for regression in got] == ["slow"]
+
+    def test_compare_ignores_other_dataset_sizes(self):
+        baseline = BenchmarkRun(results=[result("slow", 1.0, rows=1000)])
+        current = BenchmarkRun(results=[result("slow", 2.0, rows=10_000)])
+
+        assert compare(baseline, current) == []
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks.load import LoadReport, parse_mix, percentile
+
+
+class TestLoad:
+    def test_parse_mix(self):
+        assert parse_mix("checkin=20, roster=80") == {"checkin": 20, "roster": 80}
+
+    def test_parse_mix_unknown_operation(self):
+        with pytest.raises(ValueError):
+            parse_mix("checkin=20,teleport=1")
+
+    def test_parse_mix_invalid_weight(self):
+        with pytest.raises(ValueError):
+            parse_mix("checkin=-1")
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([], 50) == 0
+
+    def test_summary(self):
+        report = LoadReport(duration=2)
+        report.record("checkin", 0.010, ok=True)
+        report.record("checkin", 0.030, ok=False)
+        report.record("roster", 0.020, ok=True)
+
+        got = report.summary()
+
+        assert got["checkin"]["requests"] == 2
+        assert got["checkin"]["errors"] == 1
+        assert got["total"]["requests"] == 3
+        assert got["total"]["rps"] == 1.5
+        assert got["total"]["p50"] == pytest.approx(20)
@@ -0,0 +1,162 @@
+import argparse
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.cli.batch import BatchRunner
+from src.cli.cli import SESSION_COMMANDS, setup_parsers
+from src.common.models import AttendenceRecord, Student
+from src.common.storage.db_storage import DBStorageHandler
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+def batch_runner(session, **kwargs):
+    storage_handler = DBStorageHandler(session, autocommit=False)
+    parser = setup_parsers(storage_handler, commands=SESSION_COMMANDS)
+    return BatchRunner(parser=parser, session=session, quiet=True, **kwargs)
+
+
+def student_names(engine):
+    with Session(engine) as session:
+        return [student.name for student in session.exec(select(Student))]
+
+
+class TestBatchRunner:
+    def test_run(self, engine, session):
+        # Given
+        lines = [
+            "# comment",
+            "",
+            "students add --name Anna --surname Nowak --degree Master --semester 2",
+            'students add --name "Jan Maria" --surname Nowak --degree Bachelor --semester 1',
+        ]
+
+        # When
+        summary = batch_runner(session, commit_every=1).run(lines)
+
+        # Then
+        assert summary.commands == 2
+        assert summary.succeeded == 2
+        assert summary.commits == 2
+        assert summary.failures == []
+        assert student_names(engine) == ["Anna", "Jan Maria"]
+
+    def test_failing_command_is_rolled_back_alone(self, engine, session):
+        # Given
+        lines = [
+            "students add --name Anna --surname Nowak --degree Master --semester 2",
+            "students add --name Bad --surname Nowak --degree Bachelor --semester 9",
+            "students unknown",
+            "students add --name Jan --surname Nowak --degree Bachelor --semester 1",
+        ]
+
+        # When
+        summary = batch_runner(session, commit_every=0).run(lines)
+
+        # Then
+        assert summary.commands == 4
+        assert summary.commits == 1
+        assert [failure[0] for failure in summary.failures] == [2, 3]
+        assert (
+            summary.failures[0][2]
+            == "SemesterError: Bachelor degree has only 6 semesters"
+        )
+        assert student_names(engine) == ["Anna", "Jan"]
+
+    def test_stop_on_error(self, engine, session):
+        # Given
+        lines = [
+            "students add --name Anna --surname Nowak --degree Master --semester 2",
+            "students add --name Bad --surname Nowak --degree Bachelor --semester 9",
+            "students add --name Jan --surname Nowak --degree Bachelor --semester 1",
+        ]
+
+        # When
+        summary = batch_runner(session, commit_every=10, stop_on_error=True).run(lines)
+
+        # Then
+        assert summary.commands == 2
+        assert len(summary.failures) == 1
+        assert student_names(engine) == ["Anna"]
+
+    def test_commit_every(self, session):
+        lines = [
+            f"students add --name Anna{i} --surname Nowak --degree Master --semester 2"
+            for i in range(5)
+        ]
+
+        summary = batch_runner(session, commit_every=2).run(lines)
+
+        assert summary.commits == 3
+
+    def test_reported_error_counts_as_failure(self, engine, session):
+        # Given
+        lines = [
+            "students add --name Anna --surname Nowak --degree Master --semester 2",
+            "students delete --id 99",
+            "students get --id 99",
+        ]
+
+        # When
+        summary = batch_runner(session, commit_every=0).run(lines)
+
+        # Then
+        assert summary.succeeded == 1
+        assert [failure[0] for failure in summary.failures] == [2, 3]
+        assert summary.failures[0][2] == "command failed with exit status 1"
+        assert student_names(engine) == ["Anna"]
+
+    def test_reported_error_is_rolled_back(self, engine, session):
+        # Given
+        def add_and_fail(args):
+            session.add(
+                Student(name="Bad", surname="Nowak", degree="Master", semester=1)
+            )
+            session.flush()
+            return 1
+
+        parser = argparse.ArgumentParser()
+        parser.add_argument("name")
+        parser.set_defaults(func=add_and_fail)
+        runner = BatchRunner(parser=parser, session=session, quiet=True)
+
+        # When
+        summary = runner.run(["fail"])
+
+        # Then
+        assert len(summary.failures) == 1
+        assert student_names(engine) == []
+
+    def test_rejected_attendance_record_counts_as_failure(self, engine, session):
+        # Given
+        add = "attendance add --classroom-id 1 --date '2024-10-01 08:00:00'"
+        lines = [
+            "students add --name Anna --surname Nowak --degree Master --semester 2",
+            "classrooms add --subject-id 1",
+            "classrooms add-student --classroom-id 1 --student-id 1",
+            f"{add} --student-id 1",
+            f"{add} --student-id 9",
+            f"{add} --student-id 1",
+        ]
+
+        # When
+        summary = batch_runner(session, commit_every=1).run(lines)
+
+        # Then
+        # The repeated check-in is dropped by the dedup window of the batch
+        assert [failure[0] for failure in summary.failures] == [5]
+        assert summary.failures[0][2] == "command failed with exit status 1"
+        with Session(engine) as other:
+            assert len(other.exec(select(AttendenceRecord)).all()) == 1
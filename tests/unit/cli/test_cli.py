@@ -0,0 +1,179 @@
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.cli import cli
+from src.cli.cli import LazyStorageHandler, find_command, main, setup_parsers
+from src.common.models import Classroom, DegreeName, Student
+from src.common.storage.db_storage import DBStorageHandler
+
+HEAVY_MODULES = ["fastapi", "rich", "sqlalchemy", "sqlmodel"]
+
+
+def imported_heavy_modules(argv):
+    """Run the CLI in a fresh interpreter and list the heavy modules it imported."""
+    code = (
+        "import sys\n"
+        "from src.cli.cli import main\n"
+        "try:\n"
+        f"    main({argv!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    # Help goes to stdout as well, the modules are on the last line
+    last_line = result.stdout.strip().splitlines()[-1]
+    return [module for module in last_line.split(",") if module in HEAVY_MODULES]
+
+
+class TestCLI:
+    def test_find_command(self):
+        assert find_command(["students", "get", "--id", "1"]) == "students"
+        assert find_command(["-h"]) is None
+        assert find_command(["unknown", "get"]) is None
+        assert find_command([]) is None
+
+    def test_lazy_parser_lists_all_commands(self):
+        parser = setup_parsers(None, commands=set())
+
+        help = parser.format_help()
+
+        for command in ["students", "subjects", "classrooms", "attendance"]:
+            assert command in help
+
+    def test_help_exits_successfully(self, capsys):
+        with pytest.raises(SystemExit) as e:
+            main(["--help"])
+
+        assert e.value.code == 0
+        assert "Attendance Management System" in capsys.readouterr().out
+
+    def test_help_does_not_import_heavy_modules(self):
+        assert imported_heavy_modules(["--help"]) == []
+
+    def test_no_command_does_not_import_heavy_modules(self):
+        assert imported_heavy_modules([]) == []
+
+    def test_command_help_does_not_import_fastapi(self):
+        assert "fastapi" not in imported_heavy_modules(["students", "--help"])
+
+    def test_students_help_does_not_import_sqlmodel(self):
+        imported = imported_heavy_modules(["students", "get", "--help"])
+
+        assert "sqlmodel" not in imported
+        assert "sqlalchemy" not in imported
+
+    def test_command_help_does_not_create_storage_handler(self, monkeypatch):
+        def fail():
+            raise AssertionError("storage handler created for --help")
+
+        monkeypatch.setattr(cli, "create_storage_handler", fail)
+        monkeypatch.setattr(LazyStorageHandler.__init__, "__defaults__", (fail,))
+
+        with pytest.raises(SystemExit) as e:
+            main(["students", "--help"])
+
+        assert e.value.code == 0
+
+    def test_lazy_storage_handler_creates_handler_on_first_use(self):
+        class Handler:
+            autocommit = True
+
+        created = []
+
+        def factory():
+            created.append(Handler())
+            return created[-1]
+
+        handler = LazyStorageHandler(factory)
+        assert created == []
+
+        handler.autocommit = False
+
+        assert len(created) == 1
+        assert created[0].autocommit is False
+        assert handler.autocommit is False
+        assert len(created) == 1
+
+    def test_moved_names_are_importable_from_old_modules(self):
+        from src.common.storage import db_storage
+        from src.modules import attendence_operations, students_operations
+        from src.server import dependencies
+
+        assert db_storage.SessionDep is dependencies.SessionDep
+        assert students_operations.StudentsOperationsDep is (
+            dependencies.StudentsOperationsDep
+        )
+        assert attendence_operations.AttendenceOperationsDep is (
+            dependencies.AttendenceOperationsDep
+        )
+
+    def test_classrooms_get_counts_students_without_loading_them(self, capsys):
+        # Given
+        engine = create_engine("sqlite:///:memory:")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            students = [
+                Student(name=name, surname="Daw", degree=DegreeName.bachelor, semester=4)
+                for name in ["John", "Joe"]
+            ]
+            session.add(Classroom(id=1, students=students, subject_id=1))
+            session.add(Classroom(id=2, students=students[:1], subject_id=1))
+            session.add(Classroom(id=3, subject_id=2))
+            session.commit()
+            session.expunge_all()
+
+            parser = setup_parsers(DBStorageHandler(session), commands={"classrooms"})
+            statements = []
+            event.listen(
+                engine,
+                "before_cursor_execute",
+                lambda conn, cursor, statement, *args: statements.append(statement),
+            )
+
+            # When
+            args = parser.parse_args(["classrooms", "get", "--output", "csv"])
+            status = args.func(args)
+
+        # Then
+        assert not status
+        assert capsys.readouterr().out.splitlines() == [
+            "id,subject_id,student_count",
+            "1,1,2",
+            "2,1,1",
+            "3,2,0",
+        ]
+        assert len(statements) == 2
+
+    def test_changes_prune_keeps_listing_changes_without_subcommand(self, capsys):
+        # Given
+        engine = create_engine("sqlite:///:memory:")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            storage_handler = DBStorageHandler(session)
+            for name in ["John", "Joe"]:
+                storage_handler.create(
+                    Student(
+                        name=name, surname="Daw", degree=DegreeName.bachelor, semester=4
+                    )
+                )
+            parser = setup_parsers(storage_handler, commands={"changes"})
+
+            # When
+            args = parser.parse_args(["changes", "prune", "--before-seq", "2"])
+            args.func(args)
+            args = parser.parse_args(["changes", "--since", "1", "--output", "csv"])
+            args.func(args)
+
+        # Then
+        out = capsys.readouterr().out.splitlines()
+        assert out[0] == "Pruned 1 changes before 2"
+        assert [line.split(",")[:4] for line in out[2:]] == [
+            ["2", "student", "created", "2"]
+        ]
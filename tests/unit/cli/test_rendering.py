@@ -0,0 +1,151 @@
+import io
+import json
+from datetime import datetime
+
+from rich.console import Console
+
+from src.cli.rendering import Column, RowsRenderer
+from src.common.models import AttendenceRecord, DegreeName, Student
+
+STUDENT_COLUMNS = [
+    Column("id", "ID"),
+    Column("name", "Name"),
+    Column("degree", "Degree"),
+]
+
+
+def renderer(columns, page_size=500, terminal=False):
+    file = io.StringIO()
+    console = Console(file=file, force_terminal=terminal, width=120)
+    return RowsRenderer(columns, console, page_size), file
+
+
+def students(count):
+    for i in range(1, count + 1):
+        yield Student(
+            id=i,
+            name=f"Anna\t{i}",
+            surname="Nowak",
+            degree=DegreeName.master,
+            semester=1,
+        )
+
+
+class TestRowsRenderer:
+    def test_auto_renders_tsv_when_not_a_terminal(self):
+        # Given
+        rows_renderer, file = renderer(STUDENT_COLUMNS)
+
+        # When
+        count = rows_renderer.render(students(2))
+
+        # Then
+        assert count == 2
+        assert file.getvalue().splitlines() == [
+            "id\tname\tdegree",
+            "1\tAnna 1\tMaster",
+            "2\tAnna 2\tMaster",
+        ]
+
+    def test_ndjson(self):
+        # Given
+        rows_renderer, file = renderer([Column("id", "ID"), Column("date", "Date")])
+        record = AttendenceRecord(
+            id=1, classroom_id=1, student_id=1, date=datetime(2024, 1, 1, 10, 0)
+        )
+
+        # When
+        rows_renderer.render([record], "ndjson")
+
+        # Then
+        assert json.loads(file.getvalue()) == {"id": 1, "date": "2024-01-01 10:00:00"}
+
+    def test_csv_from_raw_rows(self):
+        # Given
+        rows_renderer, file = renderer(STUDENT_COLUMNS)
+        rows = [(1, "Nowak, Anna", DegreeName.master), (2, "Jan", None)]
+
+        # When
+        count = rows_renderer.render_rows(rows, "csv")
+
+        # Then
+        assert count == 2
+        assert file.getvalue().splitlines() == [
+            "id,name,degree",
+            '1,"Nowak, Anna",Master',
+            "2,Jan,",
+        ]
+
+    def test_csv_renders_dicts_as_json(self):
+        # Given
+        rows_renderer, file = renderer([Column("seq", "Seq"), Column("data", "Data")])
+        rows = [(1, {"id": 1, "name": "Anna"})]
+
+        # When
+        rows_renderer.render_rows(rows, "csv")
+
+        # Then
+        assert file.getvalue().splitlines() == [
+            "seq,data",
+            '1,"{""id"": 1, ""name"": ""Anna""}"',
+        ]
+
+    def test_json(self):
+        # Given
+        rows_renderer, file = renderer(STUDENT_COLUMNS)
+
+        # When
+        rows_renderer.render(students(2), "json")
+
+        # Then
+        assert json.loads(file.getvalue()) == [
+            {"id": 1, "name": "Anna\t1", "degree": "Master"},
+            {"id": 2, "name": "Anna\t2", "degree": "Master"},
+        ]
+
+    def test_json_empty(self):
+        # Given
+        rows_renderer, file = renderer(STUDENT_COLUMNS)
+
+        # When
+        rows_renderer.render_rows([], "json")
+
+        # Then
+        assert json.loads(file.getvalue()) == []
+
+    def test_table_is_printed_page_by_page(self):
+        # Given
+        rows_renderer, file = renderer(STUDENT_COLUMNS, page_size=2)
+
+        # When
+        count = rows_renderer.render(students(5), "table")
+
+        # Then
+        assert count == 5
+        assert file.getvalue().count("Degree") == 3
+
+    def test_table_is_printed_before_next_page_is_fetched(self):
+        # Given
+        rows_renderer, file = renderer(STUDENT_COLUMNS, page_size=2)
+        printed_before_fetch = []
+
+        def models():
+            for student in students(4):
+                printed_before_fetch.append("Anna" in file.getvalue())
+                yield student
+
+        # When
+        rows_renderer.render(models(), "table")
+
+        # Then
+        assert printed_before_fetch == [False, False, True, True]
+
+    def test_empty(self):
+        # Given
+        rows_renderer, _ = renderer(STUDENT_COLUMNS)
+
+        # When
+        count = rows_renderer.render(iter([]), "table")
+
+        # Then
+        assert count == 0
@@ -0,0 +1,119 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.cli.cli import SESSION_COMMANDS, setup_parsers
+from src.cli.shell import Shell
+from src.common.models import DegreeName, Student
+from src.common.storage.cached_storage import CachedStorageHandler
+from src.common.storage.db_storage import DBStorageHandler
+from src.common.storage.invalidation import InvalidationBus, latest_seq
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            Student(name="Anna", surname="Nowak", degree=DegreeName.master, semester=2)
+        )
+        session.commit()
+        yield session
+
+
+@pytest.fixture
+def shell(session):
+    cache = CachedStorageHandler(DBStorageHandler(session))
+    parser = setup_parsers(cache, commands=SESSION_COMMANDS)
+    return Shell(parser=parser, session=session, cache=cache)
+
+
+class TestShell:
+    def test_repeated_lookup_hits_cache(self, shell, capsys):
+        # When
+        shell.onecmd("students get --id 1")
+        shell.onecmd("students get --id 1")
+
+        # Then
+        assert capsys.readouterr().out.count("Anna") == 2
+        assert shell.cache.hits == 1
+
+    def test_write_is_visible_to_next_command(self, shell, capsys):
+        # Given
+        shell.onecmd("students get")
+        shell.onecmd(
+            "students add --name Jan --surname Nowak --degree Bachelor --semester 1"
+        )
+        capsys.readouterr()
+
+        # When
+        shell.onecmd("students get")
+
+        # Then
+        assert "Jan" in capsys.readouterr().out
+
+    def test_invalid_command_keeps_shell_running(self, shell, capsys):
+        # When
+        stop = shell.onecmd("students unknown")
+
+        # Then
+        assert not stop
+        assert "invalid choice" in capsys.readouterr().err
+
+    def test_refresh_clears_cache(self, shell):
+        # Given
+        shell.onecmd("students get --id 1")
+
+        # When
+        shell.onecmd("refresh")
+        shell.onecmd("students get --id 1")
+
+        # Then
+        assert shell.cache.hits == 0
+        assert shell.cache.misses == 2
+
+    def test_exit(self, shell):
+        assert shell.onecmd("exit")
+        assert shell.onecmd("EOF")
+
+    def test_changes_of_other_sessions_are_seen(self, session, capsys):
+        # Given
+        cache = CachedStorageHandler(DBStorageHandler(session))
+        bus = InvalidationBus(latest_seq(cache.storage_handler))
+        bus.subscribe(cache.invalidate_changes)
+        shell = Shell(
+            parser=setup_parsers(cache, commands=SESSION_COMMANDS),
+            session=session,
+            cache=cache,
+            bus=bus,
+        )
+        shell.onecmd(shell.precmd("students get --id 1"))
+        with Session(session.get_bind()) as other_session:
+            DBStorageHandler(other_session).update(1, Student(name="Maria"))
+
+        # When
+        shell.onecmd(shell.precmd("students get --id 1"))
+
+        # Then
+        assert "Maria" in capsys.readouterr().out
+
+    def test_changes_without_row_id_expire_the_table(self, session, capsys):
+        # Given
+        session.expire_on_commit = False
+        bus = InvalidationBus(latest_seq(DBStorageHandler(session)))
+        shell = Shell(
+            parser=setup_parsers(DBStorageHandler(session), commands=SESSION_COMMANDS),
+            session=session,
+            bus=bus,
+        )
+        shell.onecmd(shell.precmd("students get --id 1"))
+        with Session(session.get_bind()) as other_session:
+            DBStorageHandler(other_session).update_where(
+                Student, [Student.semester == 2], {"name": "Maria"}
+            )
+
+        # When
+        shell.onecmd(shell.precmd("students get --id 1"))
+
+        # Then
+        assert "Maria" in capsys.readouterr().out
@@ -0,0 +1,243 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.common.models import (
+    AttendenceRecord,
+    ChangeLogEntry,
+    ChangeOperation,
+    DegreeName,
+    Student,
+)
+from src.common.storage.cached_storage import CachedStorageHandler
+from src.common.storage.db_storage import DBStorageHandler
+
+
+@pytest.fixture
+def test_db():
+    engine = create_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def student(i: int) -> Student:
+    return Student(
+        name=f"John {i}", surname=f"Doe {i}", degree=DegreeName.bachelor, semester=1
+    )
+
+
+class TestCachedStorageHandler:
+    def test_get_by_id_is_cached(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+
+        # When
+        first = storage_handler.get_by_id(1, Student)
+        second = storage_handler.get_by_id(1, Student)
+
+        # Then
+        assert first is second
+        assert storage_handler.hits == 1
+        assert storage_handler.misses == 1
+        assert storage_handler.hit_rate == 0.5
+
+    def test_get_all_where_is_cached_per_condition(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        for i in range(1, 4):
+            storage_handler.create(student(i))
+
+        # When
+        first = storage_handler.get_all_where(Student, [Student.name == "John 1"])
+        second = storage_handler.get_all_where(Student, [Student.name == "John 1"])
+        other = storage_handler.get_all_where(Student, [Student.name == "John 2"])
+
+        # Then
+        assert [s.name for s in first] == [s.name for s in second] == ["John 1"]
+        assert [s.name for s in other] == ["John 2"]
+        assert storage_handler.hits == 1
+        assert storage_handler.misses == 2
+
+    def test_get_all_by_is_cached_per_filter(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+
+        # When
+        storage_handler.get_all_by(Student, semester=1)
+        storage_handler.get_all_by(Student, semester=1)
+        got = storage_handler.get_all_by(Student, semester=2)
+
+        # Then
+        assert got == []
+        assert storage_handler.hits == 1
+        assert storage_handler.misses == 2
+
+    def test_write_invalidates_queries(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+        assert len(storage_handler.get_all(Student)) == 1
+
+        # When
+        storage_handler.create(student(2))
+
+        # Then
+        assert len(storage_handler.get_all(Student)) == 2
+
+    def test_delete_invalidates_model(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+        storage_handler.get_by_id(1, Student)
+
+        # When
+        storage_handler.delete(1, Student)
+
+        # Then
+        with pytest.raises(ValueError):
+            storage_handler.get_by_id(1, Student)
+
+    def test_delete_invalidates_models_it_cascades_to(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+        storage_handler.create(student(2))
+        storage_handler.create(
+            AttendenceRecord(student_id=2, classroom_id=1, date=datetime(2024, 1, 1))
+        )
+        storage_handler.get_by_id(1, AttendenceRecord)
+        storage_handler.get_by_id(2, Student)
+
+        # When
+        storage_handler.delete(1, Student)
+        storage_handler.get_by_id(1, AttendenceRecord)
+        storage_handler.get_by_id(2, Student)
+
+        # Then
+        assert (storage_handler.hits, storage_handler.misses) == (1, 3)
+
+    def test_invalidate_changes_drops_changed_models_and_queries(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+        storage_handler.create(student(2))
+        storage_handler.get_by_id(1, Student)
+        storage_handler.get_by_id(2, Student)
+        storage_handler.get_all(Student)
+
+        # When
+        storage_handler.invalidate_changes(
+            [
+                ChangeLogEntry(
+                    seq=3,
+                    table_name="student",
+                    row_id=2,
+                    operation=ChangeOperation.updated,
+                )
+            ]
+        )
+
+        # Then
+        storage_handler.get_by_id(1, Student)
+        storage_handler.get_by_id(2, Student)
+        storage_handler.get_all(Student)
+        assert storage_handler.hits == 1
+        assert storage_handler.misses == 5
+
+    def test_expired_entry_is_reloaded(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db), ttl=0)
+        storage_handler.create(student(1))
+
+        # When
+        storage_handler.get_by_id(1, Student)
+        storage_handler.get_by_id(1, Student)
+
+        # Then
+        assert storage_handler.hits == 0
+        assert storage_handler.misses == 2
+
+    def test_least_recently_used_entry_is_dropped(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db), max_size=2)
+        for i in range(1, 4):
+            storage_handler.create(student(i))
+
+        # When
+        storage_handler.get_by_id(1, Student)
+        storage_handler.get_by_id(2, Student)
+        storage_handler.get_by_id(1, Student)
+        storage_handler.get_by_id(3, Student)
+        storage_handler.get_by_id(2, Student)
+
+        # Then
+        assert storage_handler.hits == 1
+        assert storage_handler.misses == 4
+
+    def test_count_where_is_cached_until_write(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+
+        # When
+        first = storage_handler.count_where(Student, [Student.semester == 1])
+        second = storage_handler.count_where(Student, [Student.semester == 1])
+        exists = storage_handler.exists_where(Student, [Student.semester == 1])
+        storage_handler.create(student(2))
+        third = storage_handler.count_where(Student, [Student.semester == 1])
+
+        # Then
+        assert (first, second, exists, third) == (1, 1, True, 2)
+        assert (storage_handler.hits, storage_handler.misses) == (2, 2)
+
+    def test_count_by_where_is_cached_until_write(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        storage_handler.create(student(1))
+
+        # When
+        first = storage_handler.count_by_where(Student, "semester", [])
+        first[1] = 100
+        second = storage_handler.count_by_where(Student, "semester", [])
+        storage_handler.create(student(2))
+        third = storage_handler.count_by_where(Student, "semester", [])
+
+        # Then
+        assert (second, third) == ({1: 1}, {1: 2})
+        assert (storage_handler.hits, storage_handler.misses) == (1, 2)
+
+    def test_exists_where_is_cached(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+
+        # When
+        first = storage_handler.exists_where(Student, [Student.semester == 1])
+        second = storage_handler.exists_where(Student, [Student.semester == 1])
+        storage_handler.create(student(1))
+        third = storage_handler.exists_where(Student, [Student.semester == 1])
+
+        # Then
+        assert (first, second, third) == (False, False, True)
+        assert (storage_handler.hits, storage_handler.misses) == (1, 2)
+
+    def test_search_prefix_uses_index_until_write(self, test_db):
+        # Given
+        storage_handler = CachedStorageHandler(DBStorageHandler(test_db))
+        for i in range(1, 3):
+            storage_handler.create(student(i))
+
+        # When
+        first = storage_handler.search_prefix(Student, ["surname", "name"], "doe")
+        second = storage_handler.search_prefix(Student, ["surname", "name"], "j d")
+        storage_handler.create(student(3))
+        third = storage_handler.search_prefix(Student, ["surname", "name"], "doe")
+
+        # Then
+        assert [s.surname for s in first] == ["Doe 1", "Doe 2"]
+        assert [s.surname for s in second] == ["Doe 1", "Doe 2"]
+        assert [s.surname for s in third] == ["Doe 1", "Doe 2", "Doe 3"]
+        assert (storage_handler.hits, storage_handler.misses) == (1, 2)
@@ -123,3 +123,43 @@ class TestCSVStorageHandler:
             1, {"name": "Jane", "surname": "Smith", "degree": "Bachelor", "semester": 6}
         )
         assert csv_storage_handler.load() == []
+
+    def test_upsert_many(self, csv_storage_handler):
+        # Given
+        csv_storage_handler.save(
+            {
+                "id": 1,
+                "name": "John",
+                "surname": "Daw",
+                "degree": "Bachelor",
+                "semester": 4,
+            }
+        )
+
+        # When
+        got = csv_storage_handler.upsert_many(
+            [
+                {
+                    "id": 1,
+                    "name": "John",
+                    "surname": "Daw",
+                    "degree": "Bachelor",
+                    "semester": 5,
+                },
+                {
+                    "id": 2,
+                    "name": "Jane",
+                    "surname": "Daw",
+                    "degree": "Master",
+                    "semester": 1,
+                },
+            ],
+            key_fields=["id"],
+        )
+
+        # Then
+        assert got == 2
+        assert [(row["id"], row["semester"]) for row in csv_storage_handler.load()] == [
+            ("1", "5"),
+            ("2", "1"),
+        ]
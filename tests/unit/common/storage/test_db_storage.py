@@ -1,8 +1,29 @@
+from datetime import datetime
+
 import pytest
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import event, text
+from sqlmodel import Session, SQLModel, create_engine, select
 
-from src.common.models import DegreeName, Student
-from src.common.storage.db_storage import DBStorageHandler
+from src.common.models import (
+    AttendenceRecord,
+    ChangeLogEntry,
+    ChangeOperation,
+    Classroom,
+    DegreeName,
+    Lecture,
+    Student,
+    Subject,
+)
+from src.common.storage.db_storage import (
+    DBStorageHandler,
+    OutdatedSchemaError,
+    RoutingSession,
+    WriteMode,
+    check_schema,
+    enable_sqlite_foreign_keys,
+    upgrade_schema,
+)
+from src.common.storage.statement_cache import StatementCache
 
 
 @pytest.fixture
@@ -13,6 +34,16 @@ def test_db():
         yield session
 
 
+def executed_statements(session):
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
 class TestDBStorageHandler:
     def test_get_all(self, test_db):
         # Given
@@ -144,3 +175,854 @@ class TestDBStorageHandler:
                     semester=1,
                 ),
             )
+
+    def test_create_without_autocommit(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db, autocommit=False)
+
+        # When
+        got = storage_handler.create(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+        test_db.rollback()
+
+        # Then
+        assert got.id == 1
+        assert storage_handler.get_all(Student) == []
+
+    def test_iter_all_where(self, test_db):
+        # Given
+        for i in range(1, 6):
+            test_db.add(
+                Student(
+                    name=f"John {i}",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=i,
+                )
+            )
+        test_db.commit()
+        storage_handler = DBStorageHandler(session=test_db)
+
+        # When
+        got = storage_handler.iter_all_where(
+            Student, [Student.semester > 1], batch_size=2
+        )
+
+        # Then
+        assert not isinstance(got, list)
+        assert [student.semester for student in got] == [2, 3, 4, 5]
+
+    def test_iter_values_where(self, test_db):
+        # Given
+        for i in range(1, 4):
+            test_db.add(
+                Student(
+                    name=f"John {i}",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=i,
+                )
+            )
+        test_db.commit()
+        storage_handler = DBStorageHandler(session=test_db)
+
+        # When
+        got = storage_handler.iter_values_where(
+            Student, ["id", "name", "degree"], [Student.semester < 3], batch_size=1
+        )
+
+        # Then
+        assert list(got) == [
+            (1, "John 1", DegreeName.bachelor),
+            (2, "John 2", DegreeName.bachelor),
+        ]
+
+    def test_get_all_by(self, test_db):
+        # Given
+        for degree, semester in [
+            (DegreeName.bachelor, 1),
+            (DegreeName.master, 1),
+            (DegreeName.master, 2),
+        ]:
+            test_db.add(
+                Student(name="John", surname="Doe", degree=degree, semester=semester)
+            )
+        test_db.commit()
+        statement_cache = StatementCache()
+        storage_handler = DBStorageHandler(
+            session=test_db, statement_cache=statement_cache
+        )
+
+        # When
+        masters = storage_handler.get_all_by(Student, degree=DegreeName.master)
+        first_semester = storage_handler.get_all_by(
+            Student, degree=DegreeName.master, semester=1
+        )
+        second_semester = storage_handler.get_all_by(
+            Student, degree=DegreeName.master, semester=2
+        )
+
+        # Then
+        assert [student.id for student in masters] == [2, 3]
+        assert [student.id for student in first_semester] == [2]
+        assert [student.id for student in second_semester] == [3]
+        assert statement_cache.hits == 1
+
+    def test_create_with_returning_write_mode(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(
+            session=test_db, write_mode=WriteMode.returning, change_log=False
+        )
+        statements = executed_statements(test_db)
+
+        # When
+        got = storage_handler.create(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+
+        # Then
+        assert got.id == 1
+        assert got.name == "John"
+        assert [statement.split()[0] for statement in statements] == ["INSERT"]
+
+    def test_update_with_returning_write_mode(self, test_db):
+        # Given
+        test_db.add(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+        test_db.commit()
+        storage_handler = DBStorageHandler(
+            session=test_db, write_mode=WriteMode.returning, change_log=False
+        )
+        statements = executed_statements(test_db)
+
+        # When
+        got = storage_handler.update(1, Student(semester=2))
+
+        # Then
+        assert got.semester == 2
+        assert got.name == "John"
+        assert [statement.split()[0] for statement in statements] == [
+            "SELECT",
+            "UPDATE",
+        ]
+        assert test_db.expire_on_commit
+
+    def test_transaction_commits_once(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        commits = []
+        event.listen(test_db, "after_commit", lambda session: commits.append(session))
+
+        # When
+        with storage_handler.transaction():
+            for i in range(3):
+                storage_handler.create(
+                    Student(
+                        name=f"John {i}",
+                        surname="Doe",
+                        degree=DegreeName.bachelor,
+                        semester=1,
+                    )
+                )
+
+        # Then
+        assert len(commits) == 1
+        assert len(storage_handler.get_all(Student)) == 3
+        assert storage_handler.autocommit
+
+    def test_transaction_rolls_back_on_error(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+
+        # When
+        with pytest.raises(RuntimeError):
+            with storage_handler.transaction():
+                storage_handler.create(
+                    Student(
+                        name="John",
+                        surname="Doe",
+                        degree=DegreeName.bachelor,
+                        semester=1,
+                    )
+                )
+                raise RuntimeError("failed")
+
+        # Then
+        assert storage_handler.get_all(Student) == []
+        assert storage_handler.autocommit
+
+    def test_nested_transaction_rolls_back_alone(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+
+        # When
+        with storage_handler.transaction():
+            storage_handler.create(
+                Student(
+                    name="John", surname="Doe", degree=DegreeName.bachelor, semester=1
+                )
+            )
+            with pytest.raises(RuntimeError):
+                with storage_handler.transaction():
+                    storage_handler.create(
+                        Student(
+                            name="Jane",
+                            surname="Doe",
+                            degree=DegreeName.bachelor,
+                            semester=1,
+                        )
+                    )
+                    raise RuntimeError("failed")
+
+        # Then
+        assert [student.name for student in storage_handler.get_all(Student)] == [
+            "John"
+        ]
+
+    def test_upsert_many_by_primary_key(self, test_db):
+        # Given
+        test_db.add(
+            Student(
+                id=1, name="John", surname="Doe", degree=DegreeName.bachelor, semester=1
+            )
+        )
+        test_db.commit()
+        storage_handler = DBStorageHandler(session=test_db)
+
+        # When
+        got = storage_handler.upsert_many(
+            [
+                Student(
+                    id=1,
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=2,
+                ),
+                Student(
+                    id=2,
+                    name="Jane",
+                    surname="Doe",
+                    degree=DegreeName.master,
+                    semester=1,
+                ),
+            ],
+            chunk_size=1,
+        )
+
+        # Then
+        assert got == 2
+        assert [
+            (student.id, student.semester)
+            for student in storage_handler.get_all(Student)
+        ] == [(1, 2), (2, 1)]
+
+    def test_upsert_many_by_natural_key(self, test_db):
+        # Given
+        date = datetime(2024, 10, 1, 8, 0)
+        storage_handler = DBStorageHandler(session=test_db)
+        storage_handler.upsert_many(
+            [
+                AttendenceRecord(student_id=i, classroom_id=1, date=date)
+                for i in range(1, 3)
+            ],
+            conflict_fields=["student_id", "classroom_id", "date"],
+            update_fields=[],
+        )
+
+        # When
+        got = storage_handler.upsert_many(
+            [
+                AttendenceRecord(student_id=i, classroom_id=1, date=date)
+                for i in range(1, 4)
+            ],
+            conflict_fields=["student_id", "classroom_id", "date"],
+            update_fields=[],
+        )
+
+        # Then
+        assert got == 1
+        assert len(storage_handler.get_all(AttendenceRecord)) == 3
+
+    def test_delete_where(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        for semester in [1, 2, 3]:
+            storage_handler.create(
+                Student(
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=semester,
+                )
+            )
+
+        # When
+        got = storage_handler.delete_where(Student, [Student.semester < 3])
+
+        # Then
+        assert got == 2
+        assert [student.semester for student in storage_handler.get_all(Student)] == [3]
+        last_change = storage_handler.get_all(ChangeLogEntry)[-1]
+        assert (last_change.operation, last_change.row_id) == (
+            ChangeOperation.deleted,
+            None,
+        )
+
+    def test_update_where(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        for semester in [1, 2, 3]:
+            storage_handler.create(
+                Student(
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=semester,
+                )
+            )
+
+        # When
+        got = storage_handler.update_where(
+            Student, [Student.semester < 3], {"name": "Jane"}
+        )
+
+        # Then
+        assert got == 2
+        assert [student.name for student in storage_handler.get_all(Student)] == [
+            "Jane",
+            "Jane",
+            "John",
+        ]
+        last_change = storage_handler.get_all(ChangeLogEntry)[-1]
+        assert (last_change.operation, last_change.row_id) == (
+            ChangeOperation.updated,
+            None,
+        )
+
+    def test_count_where(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        for semester in [1, 3, 3]:
+            storage_handler.create(
+                Student(
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=semester,
+                )
+            )
+        statements = executed_statements(test_db)
+
+        # When
+        got = storage_handler.count_where(Student, [Student.semester == 3])
+        every = storage_handler.count_where(Student, [])
+
+        # Then
+        assert (got, every) == (2, 3)
+        assert all("count(*)" in statement for statement in statements)
+
+    def test_count_by_where(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        for semester in [1, 3, 3, 5]:
+            storage_handler.create(
+                Student(
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=semester,
+                )
+            )
+        statements = executed_statements(test_db)
+
+        # When
+        got = storage_handler.count_by_where(Student, "semester", [Student.id > 1])
+
+        # Then
+        assert got == {3: 2, 5: 1}
+        assert len(statements) == 1
+        assert "GROUP BY" in statements[0]
+
+    def test_exists_where(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        storage_handler.create(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=3)
+        )
+        statements = executed_statements(test_db)
+
+        # When
+        found = storage_handler.exists_where(Student, [Student.semester == 3])
+        missing = storage_handler.exists_where(Student, [Student.semester == 4])
+        any_subject = storage_handler.exists_where(Subject, [])
+
+        # Then
+        assert (found, missing, any_subject) == (True, False, False)
+        assert all("EXISTS" in statement for statement in statements)
+
+    def test_delete_where_cascades_to_dependent_rows(self):
+        # Given
+        engine = create_engine("sqlite:///:memory:")
+        enable_sqlite_foreign_keys(engine)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            storage_handler = DBStorageHandler(session=session)
+            student = storage_handler.create(
+                Student(
+                    name="John", surname="Doe", degree=DegreeName.bachelor, semester=1
+                )
+            )
+            classroom = storage_handler.create(Classroom(subject_id=1))
+            storage_handler.create(
+                AttendenceRecord(
+                    student_id=student.id,
+                    classroom_id=classroom.id,
+                    date=datetime(2024, 1, 1),
+                )
+            )
+
+            # When
+            got = storage_handler.delete_where(Student, [Student.id == student.id])
+
+            # Then
+            assert got == 1
+            assert storage_handler.count_where(AttendenceRecord, []) == 0
+            assert [
+                (entry.table_name, entry.row_id)
+                for entry in storage_handler.get_all(ChangeLogEntry)
+                if entry.operation == ChangeOperation.deleted
+            ] == [
+                ("student", None),
+                ("attendencerecord", None),
+                ("studentclassroomlink", None),
+            ]
+
+    def test_search_prefix(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        for name, surname in [("John", "Doe"), ("Mark", "Jones"), ("J_hn", "Smith")]:
+            storage_handler.create(
+                Student(
+                    name=name, surname=surname, degree=DegreeName.bachelor, semester=1
+                )
+            )
+
+        # When
+        got = storage_handler.search_prefix(Student, ["surname", "name"], "j")
+        escaped = storage_handler.search_prefix(Student, ["surname", "name"], "j_")
+
+        # Then
+        assert [student.surname for student in got] == ["Doe", "Jones", "Smith"]
+        assert [student.surname for student in escaped] == ["Smith"]
+
+    def test_search_prefix_uses_index(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        executed = []
+        event.listen(
+            test_db.get_bind(),
+            "before_cursor_execute",
+            lambda conn, cursor, statement, parameters, *args: executed.append(
+                (statement, parameters)
+            ),
+        )
+        storage_handler.search_prefix(Student, ["surname", "name"], "jo")
+        statement, parameters = executed[-1]
+
+        # When
+        got = (
+            test_db.connection()
+            .exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            .all()
+        )
+
+        # Then
+        assert any("ix_student_surname_nocase" in row[-1] for row in got)
+
+    def test_writes_are_logged_in_order(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+
+        # When
+        storage_handler.create(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+        storage_handler.update(1, Student(semester=2))
+        storage_handler.delete(1, Student)
+
+        # Then
+        got = storage_handler.get_all(ChangeLogEntry)
+        assert [
+            (entry.seq, entry.table_name, entry.operation, entry.row_id)
+            for entry in got
+        ] == [
+            (1, "student", ChangeOperation.created, 1),
+            (2, "student", ChangeOperation.updated, 1),
+            (3, "student", ChangeOperation.deleted, 1),
+            # Rows the delete cascaded to
+            (4, "attendencerecord", ChangeOperation.deleted, None),
+            (5, "studentclassroomlink", ChangeOperation.deleted, None),
+        ]
+        assert got[1].data["semester"] == 2
+        assert got[2].data["name"] == "John"
+
+    def test_links_of_collections_are_logged(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        student = storage_handler.create(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+        classroom = storage_handler.create(Classroom(subject_id=1))
+
+        # When
+        classroom.students.append(student)
+        storage_handler.update(classroom.id, classroom)
+        classroom.students = []
+        storage_handler.update(classroom.id, classroom)
+
+        # Then
+        got = [
+            (entry.operation, entry.row_id, entry.data)
+            for entry in storage_handler.get_all(ChangeLogEntry)
+            if entry.table_name == "studentclassroomlink"
+        ]
+        assert got == [
+            (ChangeOperation.created, None, {"classroom_id": 1, "student_id": 1}),
+            (ChangeOperation.deleted, None, {"classroom_id": 1, "student_id": 1}),
+        ]
+
+    def test_change_is_rolled_back_with_the_write(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+
+        # When
+        with pytest.raises(RuntimeError):
+            with storage_handler.transaction():
+                storage_handler.create(
+                    Student(
+                        name="John",
+                        surname="Doe",
+                        degree=DegreeName.bachelor,
+                        semester=1,
+                    )
+                )
+                raise RuntimeError("failed")
+
+        # Then
+        assert storage_handler.get_all(ChangeLogEntry) == []
+
+    def test_upsert_many_logs_written_rows(self, test_db):
+        # Given
+        date = datetime(2024, 10, 1, 8, 0)
+        storage_handler = DBStorageHandler(session=test_db)
+        conflict_fields = ["student_id", "classroom_id", "date"]
+        storage_handler.upsert_many(
+            [AttendenceRecord(student_id=1, classroom_id=1, date=date)],
+            conflict_fields=conflict_fields,
+            update_fields=[],
+        )
+
+        # When
+        storage_handler.upsert_many(
+            [
+                AttendenceRecord(student_id=i, classroom_id=1, date=date)
+                for i in range(1, 3)
+            ],
+            conflict_fields=conflict_fields,
+            update_fields=[],
+        )
+
+        # Then
+        got = storage_handler.get_all(ChangeLogEntry)
+        assert [
+            (entry.row_id, entry.operation, entry.data["student_id"]) for entry in got
+        ] == [
+            (1, ChangeOperation.created, 1),
+            (2, ChangeOperation.created, 2),
+        ]
+        assert got[1].data["date"] == "2024-10-01T08:00:00"
+
+    def test_upsert_many_logs_inserted_and_updated_rows_apart(self, test_db):
+        # Given
+        storage_handler = DBStorageHandler(session=test_db)
+        storage_handler.create(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+        statements = executed_statements(test_db)
+
+        # When
+        storage_handler.upsert_many(
+            [
+                Student(
+                    id=1, name="John", surname="Doe", degree=DegreeName.bachelor, semester=2
+                ),
+                Student(
+                    id=2, name="Jane", surname="Doe", degree=DegreeName.bachelor, semester=1
+                ),
+            ]
+        )
+
+        # Then
+        got = storage_handler.get_all(ChangeLogEntry)[1:]
+        assert [(entry.row_id, entry.operation) for entry in got] == [
+            (2, ChangeOperation.created),
+            (1, ChangeOperation.updated),
+        ]
+        # One lookup of the existing rows, one upsert and one insert per operation
+        assert len([s for s in statements if "changelogentry" not in s]) == 2
+
+
+def old_attendence_table(engine, unique: bool):
+    """Replace the attendance table by one as created by an older version."""
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE attendencerecord"))
+        connection.execute(
+            text(
+                "CREATE TABLE attendencerecord ("
+                "id INTEGER NOT NULL PRIMARY KEY, student_id INTEGER NOT NULL, "
+                "classroom_id INTEGER NOT NULL, date DATETIME NOT NULL, "
+                + ("UNIQUE (student_id, classroom_id, date), " if unique else "")
+                + "FOREIGN KEY(student_id) REFERENCES student (id) ON DELETE CASCADE, "
+                "FOREIGN KEY(classroom_id) REFERENCES classroom (id) "
+                "ON DELETE CASCADE)"
+            )
+        )
+
+
+class TestSchema:
+    def test_new_database_is_up_to_date(self):
+        engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(engine)
+
+        check_schema(engine)
+
+    def test_table_created_before_the_foreign_keys(self):
+        # Given
+        engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            # As created by an older version, without the cascade on classroom_id
+            connection.execute(text("DROP TABLE studentclassroomlink"))
+            connection.execute(
+                text(
+                    "CREATE TABLE studentclassroomlink ("
+                    "student_id INTEGER NOT NULL, classroom_id INTEGER NOT NULL, "
+                    "PRIMARY KEY (student_id, classroom_id), "
+                    "FOREIGN KEY(student_id) REFERENCES student (id) ON DELETE CASCADE, "
+                    "FOREIGN KEY(classroom_id) REFERENCES classroom (id))"
+                )
+            )
+
+        # When
+        upgrade_schema(engine)
+        with pytest.raises(OutdatedSchemaError) as error:
+            check_schema(engine)
+
+        # Then
+        assert error.value.missing == [
+            "studentclassroomlink (classroom_id) -> classroom (id) ON DELETE CASCADE"
+        ]
+        assert "deleting" not in str(error.value)
+
+    def test_upgrade_adds_the_lecture_column(self):
+        # Given
+        engine = create_engine("sqlite://")
+        enable_sqlite_foreign_keys(engine)
+        SQLModel.metadata.create_all(engine)
+        # As created before lectures existed
+        old_attendence_table(engine, unique=True)
+        with pytest.raises(OutdatedSchemaError) as error:
+            check_schema(engine)
+        assert "column attendencerecord.lecture_id" in error.value.missing
+
+        # When
+        upgrade_schema(engine)
+
+        # Then
+        check_schema(engine)
+        with Session(engine) as session:
+            storage_handler = DBStorageHandler(session)
+            storage_handler.create(Classroom(id=1, subject_id=1))
+            storage_handler.create(
+                Student(
+                    id=1, name="John", surname="Doe", degree=DegreeName.bachelor, semester=1
+                )
+            )
+            lecture = storage_handler.create(
+                Lecture(
+                    classroom_id=1,
+                    start=datetime(2024, 10, 1, 8),
+                    end=datetime(2024, 10, 1, 10),
+                )
+            )
+            record = storage_handler.create(
+                AttendenceRecord(
+                    student_id=1,
+                    classroom_id=1,
+                    date=datetime(2024, 10, 1, 9),
+                    lecture_id=lecture.id,
+                )
+            )
+            # The database unlinks the records of a deleted lecture itself
+            session.execute(text("DELETE FROM lecture"))
+            session.commit()
+            session.refresh(record)
+            assert record.lecture_id is None
+
+
+    def test_upgrade_adds_the_unique_constraint(self):
+        # Given
+        engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(engine)
+        # As created before records were synced by their natural key
+        old_attendence_table(engine, unique=False)
+        with pytest.raises(OutdatedSchemaError) as error:
+            check_schema(engine)
+        assert (
+            "unique attendencerecord (student_id, classroom_id, date), "
+            "delete the duplicate rows" in error.value.missing
+        )
+
+        # When
+        upgrade_schema(engine)
+        upgrade_schema(engine)
+
+        # Then
+        check_schema(engine)
+        record = AttendenceRecord(
+            student_id=1, classroom_id=1, date=datetime(2024, 10, 1, 8)
+        )
+        with Session(engine) as session:
+            storage_handler = DBStorageHandler(session)
+            written = [
+                storage_handler.upsert_many(
+                    [AttendenceRecord(**record.model_dump())],
+                    conflict_fields=["student_id", "classroom_id", "date"],
+                    update_fields=[],
+                )
+                for _ in range(2)
+            ]
+        assert written == [1, 0]
+
+    def test_upgrade_leaves_out_unique_constraints_with_duplicates(self):
+        # Given
+        engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(engine)
+        old_attendence_table(engine, unique=False)
+        with engine.begin() as connection:
+            for _ in range(2):
+                connection.execute(
+                    text(
+                        "INSERT INTO attendencerecord (student_id, classroom_id, date) "
+                        "VALUES (1, 1, '2024-10-01 08:00:00')"
+                    )
+                )
+
+        # When
+        upgrade_schema(engine)
+
+        # Then
+        with pytest.raises(OutdatedSchemaError) as error:
+            check_schema(engine)
+        assert error.value.missing == [
+            "unique attendencerecord (student_id, classroom_id, date), "
+            "delete the duplicate rows"
+        ]
+
+
+@pytest.fixture
+def routing_session(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, name in [(primary, "Primary"), (replica, "Replica")]:
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(
+                Student(
+                    name=name, surname="Doe", degree=DegreeName.bachelor, semester=1
+                )
+            )
+            session.commit()
+
+    with RoutingSession(primary, [replica]) as session:
+        yield session
+
+
+class TestRoutingSession:
+    def test_reads_go_to_replica(self, routing_session):
+        # Given
+        storage_handler = DBStorageHandler(session=routing_session)
+
+        # When
+        got = storage_handler.get_by_id(1, Student)
+
+        # Then
+        assert got.name == "Replica"
+        assert [student.name for student in storage_handler.get_all(Student)] == [
+            "Replica"
+        ]
+
+    def test_reads_stick_to_primary_after_write(self, routing_session):
+        # Given
+        storage_handler = DBStorageHandler(session=routing_session)
+        storage_handler.get_all(Student)
+
+        # When
+        storage_handler.create(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+
+        # Then
+        assert [student.name for student in storage_handler.get_all(Student)] == [
+            "Primary",
+            "John",
+        ]
+
+    def test_core_writes_stick_to_primary(self, routing_session):
+        # Given
+        storage_handler = DBStorageHandler(session=routing_session)
+
+        # When
+        storage_handler.upsert_many(
+            [
+                Student(
+                    id=2,
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=1,
+                )
+            ]
+        )
+
+        # Then
+        assert len(storage_handler.get_all_by(Student, surname="Doe")) == 2
+
+    def test_reads_in_writing_transaction_go_to_primary(self, routing_session):
+        # Given
+        routing_session.add(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+
+        # When the pending student is flushed before the query
+        got = routing_session.exec(select(Student)).all()
+
+        # Then
+        assert [student.name for student in got] == ["Primary", "John"]
+
+    def test_rolled_back_writes_do_not_stick(self, routing_session):
+        # Given
+        routing_session.add(
+            Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+        )
+        routing_session.flush()
+
+        # When
+        routing_session.rollback()
+
+        # Then
+        got = routing_session.exec(select(Student)).all()
+        assert [student.name for student in got] == ["Replica"]
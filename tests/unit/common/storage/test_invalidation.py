@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.common.models import ChangeLogEntry, ChangeOperation, DegreeName, Student
+from src.common.storage.db_storage import DBStorageHandler
+from src.common.storage.invalidation import InvalidationBus, latest_seq
+
+
+@pytest.fixture
+def storage_handler():
+    engine = create_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield DBStorageHandler(session)
+
+
+def add_student(storage_handler, name):
+    return storage_handler.create(
+        Student(name=name, surname="Doe", degree=DegreeName.bachelor, semester=1)
+    )
+
+
+class TestInvalidationBus:
+    def test_poll_passes_new_changes_to_listeners(self, storage_handler):
+        # Given
+        add_student(storage_handler, "John")
+        bus = InvalidationBus(latest_seq(storage_handler), batch_size=2)
+        received = []
+        bus.subscribe(received.append)
+        for name in ["Jane", "Anna", "Jan"]:
+            add_student(storage_handler, name)
+
+        # When
+        got = bus.poll(storage_handler)
+
+        # Then
+        assert [change.row_id for change in got] == [2, 3, 4]
+        assert received == [got]
+        assert bus.last_seq == 4
+
+    def test_poll_without_changes(self, storage_handler):
+        # Given
+        add_student(storage_handler, "John")
+        bus = InvalidationBus(latest_seq(storage_handler))
+        received = []
+        bus.subscribe(received.append)
+
+        # When
+        got = bus.poll(storage_handler)
+
+        # Then
+        assert got == []
+        assert received == []
+
+    def test_latest_seq_of_empty_log(self, storage_handler):
+        assert latest_seq(storage_handler) == 0
+
+    def test_poll_waits_for_a_recent_gap(self, storage_handler):
+        # Given a transaction holding seq 2 hasn't committed yet
+        bus = InvalidationBus()
+        log = DBStorageHandler(storage_handler.session, change_log=False)
+        log.create(change_log_entry(1, datetime.now()))
+        log.create(change_log_entry(3, datetime.now()))
+
+        # When
+        first = bus.poll(storage_handler)
+        log.create(change_log_entry(2, datetime.now()))
+        second = bus.poll(storage_handler)
+
+        # Then
+        assert [change.seq for change in first] == [1]
+        assert [change.seq for change in second] == [2, 3]
+        assert bus.last_seq == 3
+
+    def test_poll_skips_an_old_gap(self, storage_handler):
+        # Given seq 2 was rolled back long ago
+        bus = InvalidationBus()
+        log = DBStorageHandler(storage_handler.session, change_log=False)
+        for seq in [1, 3]:
+            log.create(change_log_entry(seq, datetime(2024, 10, 1)))
+
+        # When
+        got = bus.poll(storage_handler)
+
+        # Then
+        assert [change.seq for change in got] == [1, 3]
+
+
+def change_log_entry(seq, changed_at):
+    return ChangeLogEntry(
+        seq=seq,
+        table_name="student",
+        row_id=seq,
+        operation=ChangeOperation.created,
+        changed_at=changed_at,
+    )
@@ -0,0 +1,46 @@
+from src.common.models import AttendenceRecord, Student
+from src.common.storage.statement_cache import StatementCache
+
+
+class TestStatementCache:
+    def test_statement_is_reused(self):
+        # Given
+        statement_cache = StatementCache()
+
+        # When
+        first = statement_cache.select_where_equal(Student, ("degree", "semester"))
+        second = statement_cache.select_where_equal(Student, ("degree", "semester"))
+
+        # Then
+        assert first is second
+        assert statement_cache.hits == 1
+        assert statement_cache.misses == 1
+        assert statement_cache.hit_rate == 0.5
+
+    def test_statement_per_model_and_fields(self):
+        # Given
+        statement_cache = StatementCache()
+
+        # When
+        statements = [
+            statement_cache.select_where_equal(Student, ("degree",)),
+            statement_cache.select_where_equal(Student, ("degree", "semester")),
+            statement_cache.select_where_equal(AttendenceRecord, ("student_id",)),
+        ]
+
+        # Then
+        assert len({id(statement) for statement in statements}) == 3
+        assert len(statement_cache) == 3
+        assert "attendencerecord.student_id = :student_id" in str(statements[2])
+
+    def test_clear(self):
+        # Given
+        statement_cache = StatementCache()
+        statement_cache.select_where_equal(Student, ("degree",))
+
+        # When
+        statement_cache.clear()
+
+        # Then
+        assert len(statement_cache) == 0
+        assert statement_cache.hit_rate == 0.0
@@ -0,0 +1,38 @@
+from src.common.bitmap import RosterBitmap, union_roster
+
+
+class TestRosterBitmap:
+    def test_from_student_ids(self):
+        # When
+        got = RosterBitmap.from_student_ids([7, 3, 12], [3, 12])
+
+        # Then
+        assert got.roster == (3, 7, 12)
+        assert got.present == 0b101
+        assert got.student_ids() == {3, 12}
+        assert got.student_ids(got.absent) == {7}
+        assert got.count() == 2
+
+    def test_encode_round_trip(self):
+        # Given
+        bitmap = RosterBitmap.from_student_ids(range(1, 300, 7), [1, 64, 295])
+
+        # When
+        got = RosterBitmap.decode(*bitmap.encode())
+
+        # Then
+        assert got == bitmap
+        assert len(bitmap.encode()[1]) == 6
+
+    def test_with_roster_keeps_attendance(self):
+        # Given
+        bitmap = RosterBitmap.from_student_ids([2, 4], [4])
+        roster = union_roster([bitmap, RosterBitmap.from_student_ids([1, 2], [])])
+
+        # When
+        got = bitmap.with_roster(roster)
+
+        # Then
+        assert roster == (1, 2, 4)
+        assert got.student_ids() == {4}
+        assert RosterBitmap(roster).student_ids(bitmap.enrolled_in(roster)) == {2, 4}
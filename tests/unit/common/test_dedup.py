@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from src.common.dedup import DedupWindow
+
+NOW = datetime(2024, 10, 1, 8)
+
+
+class TestDedupWindow:
+    def test_repeat_within_window(self):
+        # Given
+        window = DedupWindow(window_seconds=60)
+        window.add("key", NOW, "first")
+
+        # When/Then
+        assert window.get("key", NOW + timedelta(seconds=59)) == "first"
+        assert window.get("key", NOW - timedelta(seconds=59)) == "first"
+        assert window.get("key", NOW + timedelta(seconds=60)) is None
+        assert window.get("other", NOW) is None
+        assert (window.checked, window.dropped) == (4, 2)
+        assert window.drop_rate == 0.5
+
+    def test_expired_entries_are_dropped(self):
+        # Given
+        window = DedupWindow(window_seconds=60)
+        window.add("old", NOW, "old")
+
+        # When
+        window.add("new", NOW + timedelta(minutes=5), "new")
+
+        # Then
+        assert len(window) == 1
+        assert window.get("old", NOW) is None
+
+    def test_max_size(self):
+        # Given
+        window = DedupWindow(max_size=2)
+
+        # When
+        for key in ["a", "b", "c"]:
+            window.add(key, NOW, key)
+
+        # Then
+        assert len(window) == 2
+        assert window.get("a", NOW) is None
+        assert window.get("c", NOW) == "c"
+
+    def test_discard(self):
+        # Given
+        window = DedupWindow()
+        window.add("key", NOW, "first")
+
+        # When
+        window.discard("key")
+
+        # Then
+        assert window.get("key", NOW) is None
@@ -0,0 +1,104 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.common.models import DegreeName, Student
+from src.common.query_spec import Filter, QuerySpec, QuerySpecError
+from src.common.storage.db_storage import DBStorageHandler
+
+FIELDS = ["id", "name", "degree", "semester"]
+
+
+@pytest.fixture
+def storage_handler():
+    engine = create_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        storage_handler = DBStorageHandler(session)
+        for name, degree, semester in [
+            ("Anna", DegreeName.master, 1),
+            ("John", DegreeName.master, 3),
+            ("Mark", DegreeName.bachelor, 5),
+            ("Lena", DegreeName.master, 2),
+        ]:
+            storage_handler.create(
+                Student(name=name, surname="Doe", degree=degree, semester=semester)
+            )
+        yield storage_handler
+
+
+class TestQuerySpec:
+    def test_parse(self):
+        # When
+        got = QuerySpec.parse(
+            ["degree=Master", "semester>=2", "name!=a=b"],
+            "-semester, name",
+            "id,name",
+            5,
+        )
+
+        # Then
+        assert got == QuerySpec(
+            filters=[
+                Filter("degree", "=", "Master"),
+                Filter("semester", ">=", "2"),
+                Filter("name", "!=", "a=b"),
+            ],
+            sort=["-semester", "name"],
+            fields=["id", "name"],
+            limit=5,
+        )
+
+    def test_parse_invalid_filter(self):
+        # When/Then
+        with pytest.raises(QuerySpecError):
+            QuerySpec.parse(["semester"])
+
+    def test_run(self, storage_handler):
+        # Given
+        spec = QuerySpec.parse(
+            ["degree=Master", "semester>=2"], sort="-semester", fields="name"
+        )
+
+        # When
+        got = spec.run(storage_handler, Student, FIELDS)
+
+        # Then
+        assert got.fields == ["name"]
+        assert list(got.rows) == [("John",), ("Lena",)]
+
+    def test_run_defaults_to_every_allowed_field(self, storage_handler):
+        # When
+        got = QuerySpec(sort=["name"], limit=2).run(storage_handler, Student, FIELDS)
+
+        # Then
+        assert got.fields == FIELDS
+        assert list(got.rows) == [
+            (1, "Anna", DegreeName.master, 1),
+            (2, "John", DegreeName.master, 3),
+        ]
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            QuerySpec(fields=["surname"]),
+            QuerySpec(sort=["-surname"]),
+            QuerySpec.parse(["surname=Doe"]),
+            QuerySpec.parse(["semester=two"]),
+            QuerySpec.parse(["degree=Doctor"]),
+            QuerySpec(limit=-1),
+        ],
+    )
+    def test_run_invalid_spec(self, storage_handler, spec):
+        # When/Then
+        with pytest.raises(QuerySpecError):
+            spec.run(storage_handler, Student, FIELDS)
+
+    def test_conditions_for_get_all_where(self, storage_handler):
+        # Given
+        spec = QuerySpec.parse(["semester<3"])
+
+        # When
+        got = storage_handler.get_all_where(Student, spec.conditions(Student, FIELDS))
+
+        # Then
+        assert sorted(student.name for student in got) == ["Anna", "Lena"]
@@ -0,0 +1,63 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.common.models import DegreeName, Student
+from src.common.search import PrefixIndex
+from src.common.storage.db_storage import DBStorageHandler
+
+NAMES = [
+    ("John", "Doe"),
+    ("Joanna", "Doyle"),
+    ("Mark", "Jones"),
+    ("Anna", "Johnson"),
+    ("Jo", "Do"),
+]
+
+
+def students():
+    return [
+        Student(
+            id=id, name=name, surname=surname, degree=DegreeName.bachelor, semester=1
+        )
+        for id, (name, surname) in enumerate(NAMES, 1)
+    ]
+
+
+class TestPrefixIndex:
+    def test_search(self):
+        # Given
+        index = PrefixIndex(students(), ["surname", "name"])
+
+        # When
+        got = index.search("JO do")
+
+        # Then
+        assert [student.id for student in got] == [5, 1, 2]
+
+    def test_search_limit_and_empty_query(self):
+        # Given
+        index = PrefixIndex(students(), ["surname", "name"])
+
+        # When/Then
+        assert [student.id for student in index.search("jo", limit=2)] == [5, 1]
+        assert index.search("  ") == []
+        assert index.search("jo x") == []
+
+    @pytest.mark.parametrize("query", ["jo", "do", "jo do", "ann", "j", "mark jones"])
+    def test_matches_database_search(self, query):
+        # Given
+        engine = create_engine("sqlite:///:memory:")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            storage_handler = DBStorageHandler(session)
+            for student in students():
+                storage_handler.create(student)
+
+            # When
+            expected = storage_handler.search_prefix(
+                Student, ["surname", "name"], query
+            )
+            got = PrefixIndex(students(), ["surname", "name"]).search(query)
+
+        # Then
+        assert [student.id for student in got] == [student.id for student in expected]
@@ -0,0 +1,97 @@
+import pytest
+
+from src.common.errors import SemesterError
+from src.common.models import DegreeName
+from src.common.validators import (
+    ValidationReport,
+    check_min_length,
+    check_semesters,
+    validate_semester,
+)
+
+
+class TestValidateSemester:
+    @pytest.mark.parametrize(
+        "degree, semester",
+        [(DegreeName.bachelor, 7), (DegreeName.master, 5), (DegreeName.master, 0)],
+    )
+    def test_invalid_semester(self, degree, semester):
+        # When/Then
+        with pytest.raises(SemesterError):
+            validate_semester(degree, semester)
+
+
+class TestCheckSemesters:
+    def test_matches_validate_semester(self):
+        # Given
+        rows = [
+            (degree, semester) for degree in DegreeName for semester in range(-1, 9)
+        ]
+        report = ValidationReport(len(rows))
+
+        # When
+        check_semesters(report, *zip(*rows))
+
+        # Then
+        for index, (degree, semester) in enumerate(rows):
+            try:
+                validate_semester(degree, semester)
+                expected = None
+            except SemesterError as e:
+                expected = [str(e)]
+            assert report.errors.get(index) == expected
+
+    def test_unknown_degree_and_missing_semester(self):
+        # Given
+        report = ValidationReport(3)
+
+        # When
+        check_semesters(report, ["Bachelor", "Doctor", "Master"], [2, 1, None])
+
+        # Then
+        assert report.errors == {
+            1: ["Unknown degree Doctor"],
+            2: ["Semester number is missing"],
+        }
+
+
+    def test_semester_of_wrong_type(self):
+        # Given
+        report = ValidationReport(4)
+
+        # When
+        check_semesters(
+            report, ["Bachelor", "Master", "Bachelor", "Master"], [2, "3", 9, 2.5]
+        )
+
+        # Then
+        assert report.errors == {
+            1: ["Semester number must be a whole number"],
+            2: ["Bachelor degree has only 6 semesters"],
+            3: ["Semester number must be a whole number"],
+        }
+
+
+class TestValidationReport:
+    def test_collects_every_error_of_every_row(self):
+        # Given
+        report = ValidationReport(4)
+
+        # When
+        check_min_length(report, ["Jo", "J", None, "Jane"], 2, "Name")
+        check_min_length(report, ["Doe", "D", "Doe", "Doe"], 2, "Surname")
+
+        # Then
+        assert not report.is_valid
+        assert report.errors == {
+            1: [
+                "Name must be at least 2 characters long",
+                "Surname must be at least 2 characters long",
+            ],
+            2: ["Name must be at least 2 characters long"],
+        }
+        assert report.valid_indices() == [0, 3]
+        assert report.summary(limit=1) == (
+            "2 of 4 rows are invalid: row 1: Name must be at least 2 characters "
+            "long, Surname must be at least 2 characters long; and 1 more"
+        )
@@ -0,0 +1,211 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from src.common.bitmap import RosterBitmap
+from src.common.models import AttendenceRecord, Lecture, StudentClassroomLink
+from src.common.storage.db_storage import DBStorageHandler
+from src.modules.attendence_bitmap_operations import AttendenceBitmapOperations
+from src.modules.lectures_operations import LecturesOperations
+
+LECTURES = [datetime(2024, 10, day, 8) for day in (1, 8, 15, 22)]
+
+
+@pytest.fixture
+def test_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def add_lectures(storage_handler, starts):
+    lectures_operations = LecturesOperations(storage_handler)
+    for start in starts:
+        lectures_operations.add_lecture(
+            Lecture(classroom_id=1, start=start, end=start + timedelta(minutes=90))
+        )
+
+
+@pytest.fixture
+def bitmap_operations(test_db):
+    for student_id in [1, 2, 3]:
+        test_db.add(StudentClassroomLink(student_id=student_id, classroom_id=1))
+    # Student 1 comes to every lecture, student 2 misses the last three and student
+    # 3 misses the second and the last one
+    present = [{1, 2, 3}, {1}, {1, 3}, {1}]
+    for date, student_ids in zip(LECTURES, present):
+        for student_id in student_ids:
+            # Students check in a few seconds apart
+            test_db.add(
+                AttendenceRecord(
+                    student_id=student_id,
+                    classroom_id=1,
+                    date=date + timedelta(seconds=7 * student_id),
+                )
+            )
+    test_db.commit()
+
+    storage_handler = DBStorageHandler(test_db)
+    add_lectures(storage_handler, LECTURES)
+    bitmap_operations = AttendenceBitmapOperations(storage_handler)
+    bitmap_operations.build_bitmaps(1)
+    return bitmap_operations
+
+
+class TestAttendenceBitmapOperations:
+    def test_build_bitmaps(self, bitmap_operations):
+        # When
+        got = bitmap_operations.get_bitmaps(1)
+
+        # Then
+        assert [date for date, _ in got] == LECTURES
+        assert [bitmap.student_ids() for _, bitmap in got] == [
+            {1, 2, 3},
+            {1},
+            {1, 3},
+            {1},
+        ]
+        assert got[0][1].roster == (1, 2, 3)
+
+    def test_build_bitmaps_replaces_existing(self, bitmap_operations, test_db):
+        # Given
+        test_db.add(
+            AttendenceRecord(
+                student_id=2, classroom_id=1, date=LECTURES[1], lecture_id=2
+            )
+        )
+        test_db.commit()
+
+        # When
+        got = bitmap_operations.build_bitmaps(1)
+
+        # Then
+        assert got == 4
+        assert bitmap_operations.get_bitmaps(1)[1][1].student_ids() == {1, 2}
+
+    def test_get_students_present_at_all(self, bitmap_operations):
+        # When
+        got = bitmap_operations.get_students_present_at_all(1)
+
+        # Then
+        assert got == {1}
+
+    def test_get_students_absent_in_a_row(self, bitmap_operations):
+        # When
+        got = bitmap_operations.get_students_absent_in_a_row(1, times=3)
+
+        # Then
+        assert got == {2}
+
+    def test_lectures_before_enrollment_are_not_missed(self, bitmap_operations):
+        # Given
+        late = datetime(2024, 10, 29, 8)
+        bitmap_operations.storage_handler.create(
+            bitmap_operations.to_attendence_bitmap(
+                1, late, RosterBitmap.from_student_ids([1, 2, 3, 4], [1])
+            )
+        )
+
+        # When
+        got = bitmap_operations.get_students_absent_in_a_row(1, times=2)
+
+        # Then
+        assert got == {2, 3}
+
+    def test_lecture_without_records_has_everybody_absent(self, bitmap_operations):
+        # Given
+        add_lectures(bitmap_operations.storage_handler, [datetime(2024, 10, 29, 8)])
+
+        # When
+        bitmap_operations.build_bitmaps(1)
+
+        # Then
+        date, bitmap = bitmap_operations.get_bitmaps(1)[-1]
+        assert date == datetime(2024, 10, 29, 8)
+        assert bitmap.student_ids() == set()
+        assert bitmap.roster == (1, 2, 3)
+
+    def test_mid_term_enrollment_keeps_earlier_rosters(self, test_db):
+        # Given student 3 enrolls after the second lecture
+        storage_handler = DBStorageHandler(test_db)
+        for student_id in [1, 2]:
+            storage_handler.create(
+                StudentClassroomLink(student_id=student_id, classroom_id=1)
+            )
+        present = [{1, 2}, {1, 2}, {1, 2, 3}, {1, 3}]
+        for index, (date, student_ids) in enumerate(zip(LECTURES, present)):
+            if index == 2:
+                storage_handler.create(StudentClassroomLink(student_id=3, classroom_id=1))
+            for student_id in student_ids:
+                storage_handler.create(
+                    AttendenceRecord(
+                        student_id=student_id,
+                        classroom_id=1,
+                        date=date + timedelta(seconds=3 * student_id),
+                    )
+                )
+            add_lectures(storage_handler, [date])
+        bitmap_operations = AttendenceBitmapOperations(storage_handler)
+
+        # When
+        assert bitmap_operations.build_bitmaps(1) == 4
+
+        # Then
+        got = bitmap_operations.get_bitmaps(1)
+        assert [bitmap.roster for _, bitmap in got] == [
+            (1, 2),
+            (1, 2),
+            (1, 2, 3),
+            (1, 2, 3),
+        ]
+        assert bitmap_operations.get_students_present_at_all(1) == {1}
+        assert bitmap_operations.get_students_present_at_all(1, since=LECTURES[2]) == {
+            1,
+            3,
+        }
+        assert bitmap_operations.get_students_absent_in_a_row(1, times=1) == {2}
+
+    def test_records_without_lectures_are_grouped_by_day(self, test_db):
+        # Given
+        test_db.add(StudentClassroomLink(student_id=1, classroom_id=1))
+        for seconds in [0, 5, 12]:
+            test_db.add(
+                AttendenceRecord(
+                    student_id=seconds + 1,
+                    classroom_id=1,
+                    date=LECTURES[0] + timedelta(seconds=seconds),
+                )
+            )
+        test_db.commit()
+        bitmap_operations = AttendenceBitmapOperations(DBStorageHandler(test_db))
+
+        # When
+        got = bitmap_operations.build_bitmaps(1)
+
+        # Then
+        assert got == 1
+        date, bitmap = bitmap_operations.get_bitmaps(1)[0]
+        assert date == datetime(2024, 10, 1)
+        assert bitmap.student_ids() == {1, 6, 13}
+
+    def test_to_attendence_records(self, bitmap_operations):
+        # Given
+        date, bitmap = bitmap_operations.get_bitmaps(1)[2]
+
+        # When
+        got = bitmap_operations.to_attendence_records(1, date, bitmap)
+
+        # Then the records are linked to the third lecture
+        assert [
+            (record.student_id, record.date, record.lecture_id) for record in got
+        ] == [
+            (1, LECTURES[2], 3),
+            (3, LECTURES[2], 3),
+        ]
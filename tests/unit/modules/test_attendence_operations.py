@@ -1,12 +1,24 @@
 from datetime import datetime
 
 import pytest
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
 
-from src.common.models import AttendenceRecord
-from src.common.storage.db_storage import DBStorageHandler
-from src.modules.attendence_operations import AttendenceOperations
+from src.common.dedup import DedupWindow
+from src.common.models import (
+    AttendenceRecord,
+    Classroom,
+    DegreeName,
+    Student,
+    StudentClassroomLink,
+)
+from src.common.storage.db_storage import DBStorageHandler, enable_sqlite_foreign_keys
+from src.modules.attendence_operations import (
+    AttendenceDataError,
+    AttendenceOperations,
+    DuplicateAttendenceError,
+)
 
 
 @pytest.fixture
@@ -23,6 +35,33 @@ def test_db():
         yield session
 
 
+@pytest.fixture
+def cascading_db():
+    engine = create_engine("sqlite://")
+    enable_sqlite_foreign_keys(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def enroll(session, classroom_id, student_ids):
+    session.merge(Classroom(id=classroom_id, subject_id=1))
+    for student_id in student_ids:
+        session.merge(
+            Student(
+                id=student_id,
+                name="John",
+                surname="Doe",
+                degree=DegreeName.bachelor,
+                semester=1,
+            )
+        )
+        session.add(
+            StudentClassroomLink(student_id=student_id, classroom_id=classroom_id)
+        )
+    session.commit()
+
+
 class TestAttendenceOperations:
     def test_get_attendence_records_for_classroom(self, test_db):
         # Given
@@ -97,20 +136,215 @@ class TestAttendenceOperations:
         # Then
         assert got == [want]
 
+    def test_iter_attendence_records(self, test_db):
+        # Given
+        attendence_records = [
+            AttendenceRecord(id=1, classroom_id=1, student_id=1, date=datetime.now()),
+            AttendenceRecord(id=2, classroom_id=1, student_id=2, date=datetime.now()),
+            AttendenceRecord(id=3, classroom_id=2, student_id=1, date=datetime.now()),
+        ]
+
+        for record in attendence_records:
+            test_db.add(record)
+        test_db.commit()
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+
+        # When
+        got = attendence_operations.iter_attendence_records(
+            classroom_id=1, batch_size=1
+        )
+
+        # Then
+        assert list(got) == attendence_records[:2]
+
     def test_add_attendence_record(self, test_db):
         # Given
+        enroll(test_db, 1, [1])
         attendence_record = AttendenceRecord(
             classroom_id=1, student_id=1, date=datetime.now()
         )
-        test_db.add(attendence_record)
-        test_db.commit()
         attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
 
         # When
         got = attendence_operations.add_attendence_record(attendence_record)
 
         # Then
-        assert got == attendence_record
+        assert got.id == 1
+        assert attendence_operations.get_attendence_records_by_student(1) == [got]
+
+    def test_add_attendence_record_of_missing_student(self, cascading_db):
+        # Given
+        enroll(cascading_db, 1, [1])
+        attendence_operations = AttendenceOperations(DBStorageHandler(cascading_db))
+
+        # When
+        with pytest.raises(AttendenceDataError) as error:
+            attendence_operations.add_attendence_record(
+                AttendenceRecord(classroom_id=9, student_id=2, date=datetime.now())
+            )
+
+        # Then
+        assert str(error.value) == (
+            "Student with ID 2 not found; Classroom with ID 9 not found"
+        )
+        assert not isinstance(error.value, DuplicateAttendenceError)
+        assert attendence_operations.count_attendence_records() == 0
+
+    def test_add_duplicate_attendence_record(self, cascading_db):
+        # Given
+        enroll(cascading_db, 1, [1])
+        attendence_operations = AttendenceOperations(DBStorageHandler(cascading_db))
+        attendence_operations.add_attendence_record(
+            AttendenceRecord(classroom_id=1, student_id=1, date=datetime(2024, 10, 1))
+        )
+
+        # When
+        with pytest.raises(DuplicateAttendenceError) as error:
+            attendence_operations.add_attendence_record(
+                AttendenceRecord(
+                    classroom_id=1, student_id=1, date=datetime(2024, 10, 1)
+                )
+            )
+
+        # Then
+        assert str(error.value) == (
+            "Attendance of student with ID 1 in classroom with ID 1 at "
+            "2024-10-01 00:00:00 already exists"
+        )
+        # The failed insert was rolled back, the session still works
+        assert attendence_operations.count_attendence_records() == 1
+
+    def test_add_attendence_records_reports_duplicates(self, test_db):
+        # Given
+        enroll(test_db, 1, [1, 2])
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+        attendence_operations.add_attendence_record(
+            AttendenceRecord(classroom_id=1, student_id=1, date=datetime(2024, 10, 1))
+        )
+        attendence_records = [
+            AttendenceRecord(classroom_id=1, student_id=2, date=datetime(2024, 10, 1)),
+            AttendenceRecord(classroom_id=1, student_id=1, date=datetime(2024, 10, 1)),
+            AttendenceRecord(classroom_id=1, student_id=2, date=datetime(2024, 10, 1)),
+        ]
+
+        # When
+        with pytest.raises(DuplicateAttendenceError) as error:
+            attendence_operations.add_attendence_records(attendence_records)
+
+        # Then
+        assert str(error.value) == "2 of 3 attendance records already exist"
+        assert [invalid.index for invalid in error.value.invalid_records] == [1, 2]
+        assert attendence_operations.count_attendence_records() == 1
+
+    def test_add_attendence_records(self, test_db):
+        # Given
+        enroll(test_db, 1, [1, 2, 3])
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+        attendence_records = [
+            AttendenceRecord(classroom_id=1, student_id=i, date=datetime.now())
+            for i in range(1, 4)
+        ]
+
+        # When
+        got = attendence_operations.add_attendence_records(attendence_records)
+
+        # Then
+        assert [record.id for record in got] == [1, 2, 3]
+
+    def test_add_attendence_records_adds_none_on_error(self, test_db):
+        # Given
+        enroll(test_db, 1, [1, 2])
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+        attendence_operations.add_attendence_record(
+            AttendenceRecord(id=1, classroom_id=1, student_id=1, date=datetime.now())
+        )
+        # Only the database knows the record, as for a record added by another process
+        test_db.expunge_all()
+        attendence_records = [
+            AttendenceRecord(classroom_id=1, student_id=2, date=datetime.now()),
+            AttendenceRecord(id=1, classroom_id=1, student_id=1, date=datetime.now()),
+        ]
+
+        # When
+        with pytest.raises(AttendenceDataError):
+            attendence_operations.add_attendence_records(attendence_records)
+
+        # Then
+        assert [
+            record.student_id
+            for record in attendence_operations.get_attendence_records_by_classroom(1)
+        ] == [1]
+
+    def test_add_attendence_records_reports_every_invalid_record(self, test_db):
+        # Given
+        enroll(test_db, 1, [1])
+        enroll(test_db, 2, [2])
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+        attendence_records = [
+            AttendenceRecord(classroom_id=1, student_id=1, date=datetime.now()),
+            AttendenceRecord(classroom_id=1, student_id=9, date=datetime.now()),
+            AttendenceRecord(classroom_id=9, student_id=9, date=datetime.now()),
+            AttendenceRecord(classroom_id=1, student_id=2, date=datetime.now()),
+        ]
+
+        # When
+        with pytest.raises(AttendenceDataError) as error:
+            attendence_operations.add_attendence_records(attendence_records)
+
+        # Then
+        assert [
+            (invalid.index, invalid.errors) for invalid in error.value.invalid_records
+        ] == [
+            (1, ["Student with ID 9 not found"]),
+            (2, ["Student with ID 9 not found", "Classroom with ID 9 not found"]),
+            (3, ["Student with ID 2 is not enrolled in classroom with ID 1"]),
+        ]
+        assert attendence_operations.get_attendence_records_by_classroom(1) == []
+
+    def test_validate_attendence_records_queries_per_chunk(self, test_db):
+        # Given
+        enroll(test_db, 1, range(1, 11))
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+        attendence_records = [
+            AttendenceRecord(classroom_id=1, student_id=i, date=datetime.now())
+            for i in range(1, 11)
+        ]
+        statements = []
+        event.listen(
+            test_db.get_bind(),
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        # When
+        got = attendence_operations.validate_attendence_records(
+            attendence_records, chunk_size=5
+        )
+
+        # Then
+        assert got == []
+        # Students, classrooms and enrollments for each of the two chunks
+        assert len(statements) == 6
+
+    def test_sync_attendence_records_is_idempotent(self, test_db):
+        # Given
+        enroll(test_db, 1, [1, 2, 3])
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+        date = datetime(2024, 10, 1, 8, 0)
+
+        def records():
+            return [
+                AttendenceRecord(classroom_id=1, student_id=i, date=date)
+                for i in range(1, 4)
+            ]
+
+        # When
+        first = attendence_operations.sync_attendence_records(records())
+        second = attendence_operations.sync_attendence_records(records())
+
+        # Then
+        assert (first, second) == (3, 0)
+        assert len(attendence_operations.get_attendence_records_by_classroom(1)) == 3
 
     def test_delete_attendence_record(self, test_db):
         # Given
@@ -122,7 +356,263 @@ class TestAttendenceOperations:
         attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
 
         # When
-        attendence_operations.delete_attendence_record(1)
+        got = attendence_operations.delete_attendence_record(1)
 
         # Then
         assert test_db.get(AttendenceRecord, 1) is None
+        assert got.classroom_id == 1
+
+    def test_count_attendence_records_by_classroom(self, test_db):
+        # Given
+        for student_id, classroom_id in [(1, 1), (2, 1), (1, 2)]:
+            test_db.add(
+                AttendenceRecord(
+                    classroom_id=classroom_id,
+                    student_id=student_id,
+                    date=datetime.now(),
+                )
+            )
+        test_db.commit()
+        attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+
+        # When
+        got = attendence_operations.count_attendence_records_by_classroom(1)
+
+        # Then
+        assert got == 2
+
+
+@pytest.fixture
+def archived_operations(test_db, tmp_path):
+    for student_id, date in [
+        (1, datetime(2024, 1, 15, 8)),
+        (2, datetime(2024, 1, 20, 8)),
+        (1, datetime(2024, 2, 3, 8)),
+        (1, datetime(2024, 3, 1, 8)),
+    ]:
+        test_db.add(AttendenceRecord(classroom_id=1, student_id=student_id, date=date))
+    test_db.commit()
+    attendence_operations = AttendenceOperations(DBStorageHandler(test_db))
+    attendence_operations.archive_attendence_records(
+        datetime(2024, 3, 10), str(tmp_path)
+    )
+    return attendence_operations
+
+
+class TestAttendenceArchives:
+    def test_archive_moves_whole_months_to_files(self, archived_operations, tmp_path):
+        # When
+        got = archived_operations.get_archives()
+
+        # Then
+        assert [(archive.period, archive.records) for archive in got] == [
+            ("2024-01", 2),
+            ("2024-02", 1),
+        ]
+        assert got[0].first_date == datetime(2024, 1, 15, 8)
+        assert got[0].last_date == datetime(2024, 1, 20, 8)
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "attendence-2024-01.ndjson.gz",
+            "attendence-2024-02.ndjson.gz",
+        ]
+        assert [
+            record.date for record in archived_operations.iter_attendence_records()
+        ] == [datetime(2024, 3, 1, 8)]
+
+    def test_date_lookups_read_archives(self, archived_operations):
+        # When
+        by_date = archived_operations.get_attendence_records_by_date(
+            datetime(2024, 1, 20, 8)
+        )
+        in_range = archived_operations.iter_attendence_record_values(
+            ["student_id", "date"],
+            student_id=1,
+            since=datetime(2024, 1, 1),
+            until=datetime(2024, 4, 1),
+        )
+
+        # Then
+        assert [(record.id, record.student_id) for record in by_date] == [(2, 2)]
+        assert sorted(in_range) == [
+            (1, datetime(2024, 1, 15, 8)),
+            (1, datetime(2024, 2, 3, 8)),
+            (1, datetime(2024, 3, 1, 8)),
+        ]
+
+    def test_count_uses_archive_record_counts(self, archived_operations, tmp_path):
+        # Given
+        for path in tmp_path.iterdir():
+            path.unlink()
+
+        # When
+        got = archived_operations.count_attendence_records(
+            since=datetime(2024, 1, 1), until=datetime(2024, 4, 1)
+        )
+
+        # Then
+        assert got == 4
+
+    def test_count_and_exists_read_archives_with_filters(self, archived_operations):
+        # When
+        got = archived_operations.count_attendence_records(
+            student_id=1, since=datetime(2024, 1, 1)
+        )
+        archived = archived_operations.attendence_records_exist(
+            student_id=2, since=datetime(2024, 1, 1)
+        )
+        stored = archived_operations.attendence_records_exist(student_id=2)
+
+        # Then
+        assert got == 3
+        assert archived
+        assert not stored
+
+    def test_late_records_go_to_another_archive(
+        self, archived_operations, test_db, tmp_path
+    ):
+        # Given
+        test_db.add(
+            AttendenceRecord(classroom_id=2, student_id=3, date=datetime(2024, 1, 2, 8))
+        )
+        test_db.commit()
+
+        # When
+        got = archived_operations.archive_attendence_records(
+            datetime(2024, 2, 1), str(tmp_path)
+        )
+
+        # Then
+        assert [archive.path.rsplit("/", 1)[1] for archive in got] == [
+            "attendence-2024-01.2.ndjson.gz"
+        ]
+        assert (
+            len(
+                list(
+                    archived_operations.iter_attendence_records(
+                        since=datetime(2024, 1, 1), until=datetime(2024, 2, 1)
+                    )
+                )
+            )
+            == 3
+        )
+
+
+class TestAttendenceDedup:
+    def test_add_attendence_record_drops_repeats(self, test_db):
+        # Given
+        enroll(test_db, 1, [1])
+        dedup_window = DedupWindow(window_seconds=60)
+        attendence_operations = AttendenceOperations(
+            DBStorageHandler(test_db), dedup_window
+        )
+        first = attendence_operations.add_attendence_record(
+            AttendenceRecord(
+                classroom_id=1, student_id=1, date=datetime(2024, 10, 1, 8)
+            )
+        )
+        statements = []
+        event.listen(
+            test_db.get_bind(),
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+
+        # When
+        got = attendence_operations.add_attendence_record(
+            AttendenceRecord(
+                classroom_id=1, student_id=1, date=datetime(2024, 10, 1, 8, 0, 2)
+            )
+        )
+
+        # Then
+        assert got.id == first.id
+        # Dropped before validation and the lecture lookup
+        assert statements == []
+        assert len(attendence_operations.get_attendence_records_by_student(1)) == 1
+        assert dedup_window.dropped == 1
+
+    def test_add_attendence_records_drops_repeats(self, test_db):
+        # Given
+        enroll(test_db, 1, [1, 2, 3])
+        dedup_window = DedupWindow(window_seconds=60)
+        attendence_operations = AttendenceOperations(
+            DBStorageHandler(test_db), dedup_window
+        )
+        attendence_operations.add_attendence_record(
+            AttendenceRecord(
+                classroom_id=1, student_id=1, date=datetime(2024, 10, 1, 8)
+            )
+        )
+
+        # When
+        got = attendence_operations.add_attendence_records(
+            [
+                AttendenceRecord(
+                    classroom_id=1, student_id=student_id, date=datetime(2024, 10, 1, 8)
+                )
+                for student_id in [1, 2, 2, 3]
+            ]
+        )
+
+        # Then
+        assert [record.student_id for record in got] == [2, 3]
+        assert len(attendence_operations.get_attendence_records_by_classroom(1)) == 3
+        assert (dedup_window.checked, dedup_window.dropped) == (5, 2)
+
+    def test_failed_add_attendence_records_are_not_remembered(self, test_db):
+        # Given
+        enroll(test_db, 1, [1, 2])
+        enroll(test_db, 2, [1])
+        dedup_window = DedupWindow(window_seconds=60)
+        attendence_operations = AttendenceOperations(
+            DBStorageHandler(test_db), dedup_window
+        )
+        attendence_operations.add_attendence_record(
+            AttendenceRecord(
+                id=1, classroom_id=1, student_id=1, date=datetime(2024, 10, 1, 8)
+            )
+        )
+
+        # When
+        with pytest.raises(AttendenceDataError):
+            attendence_operations.add_attendence_records(
+                [
+                    AttendenceRecord(
+                        classroom_id=1, student_id=2, date=datetime(2024, 10, 1, 8)
+                    ),
+                    AttendenceRecord(
+                        id=1,
+                        classroom_id=2,
+                        student_id=1,
+                        date=datetime(2024, 10, 1, 8),
+                    ),
+                ]
+            )
+
+        # Then
+        assert dedup_window.get((2, 1), datetime(2024, 10, 1, 8)) is None
+
+    def test_deleted_attendence_record_is_forgotten(self, test_db):
+        # Given
+        enroll(test_db, 1, [1])
+        dedup_window = DedupWindow(window_seconds=60)
+        attendence_operations = AttendenceOperations(
+            DBStorageHandler(test_db), dedup_window
+        )
+        first = attendence_operations.add_attendence_record(
+            AttendenceRecord(
+                classroom_id=1, student_id=1, date=datetime(2024, 10, 1, 8)
+            )
+        )
+        attendence_operations.delete_attendence_record(first.id)
+
+        # When
+        got = attendence_operations.add_attendence_record(
+            AttendenceRecord(
+                classroom_id=1, student_id=1, date=datetime(2024, 10, 1, 8)
+            )
+        )
+
+        # Then
+        assert dedup_window.dropped == 0
+        assert attendence_operations.get_attendence_records_by_student(1) == [got]
@@ -0,0 +1,154 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from src.common.models import (
+    ChangeLogEntry,
+    ChangeOperation,
+    DegreeName,
+    Student,
+    Subject,
+)
+from src.common.storage.db_storage import DBStorageHandler
+from src.modules.changes_operations import ChangesOperations
+
+
+@pytest.fixture
+def test_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def storage_handler(test_db):
+    storage_handler = DBStorageHandler(test_db)
+    storage_handler.create(
+        Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+    )
+    storage_handler.create(Subject(name="Math", degree=DegreeName.bachelor, semester=1))
+    storage_handler.update(1, Student(semester=2))
+    return storage_handler
+
+
+class TestChangesOperations:
+    def test_iter_changes_since(self, storage_handler):
+        # Given
+        changes_operations = ChangesOperations(storage_handler)
+
+        # When
+        got = list(changes_operations.iter_changes_since(1))
+
+        # Then
+        assert [(change.seq, change.table_name) for change in got] == [
+            (2, "subject"),
+            (3, "student"),
+        ]
+
+    def test_iter_changes_since_for_table(self, storage_handler):
+        # Given
+        changes_operations = ChangesOperations(storage_handler)
+
+        # When
+        got = list(changes_operations.iter_changes_since(0, table_name="student"))
+
+        # Then
+        assert [(change.seq, change.operation) for change in got] == [
+            (1, ChangeOperation.created),
+            (3, ChangeOperation.updated),
+        ]
+
+    def test_get_changes_since_limit(self, storage_handler):
+        # Given
+        changes_operations = ChangesOperations(storage_handler)
+
+        # When
+        got, next_since = changes_operations.get_changes_since(0, limit=2)
+
+        # Then
+        assert [change.seq for change in got] == [1, 2]
+        assert next_since == 2
+
+    def test_get_changes_since_moves_past_other_tables(self, storage_handler):
+        # Given
+        changes_operations = ChangesOperations(storage_handler)
+
+        # When
+        got, next_since = changes_operations.get_changes_since(
+            1, table_name="subject"
+        )
+
+        # Then
+        assert [change.seq for change in got] == [2]
+        assert next_since == 3
+
+    def test_changes_after_a_recent_gap_are_held_back(self, test_db):
+        # Given a transaction holding seq 2 hasn't committed yet
+        storage_handler = DBStorageHandler(test_db, change_log=False)
+        for seq in [1, 3]:
+            storage_handler.create(change_log_entry(seq, datetime.now()))
+        changes_operations = ChangesOperations(storage_handler)
+
+        # When
+        got, next_since = changes_operations.get_changes_since(0)
+
+        # Then
+        assert [change.seq for change in got] == [1]
+        assert next_since == 1
+        assert [change.seq for change in changes_operations.iter_changes_since(1)] == []
+
+    def test_old_gap_is_skipped(self, test_db):
+        # Given seq 2 was rolled back long ago
+        storage_handler = DBStorageHandler(test_db, change_log=False)
+        for seq in [1, 3]:
+            storage_handler.create(change_log_entry(seq, datetime(2024, 10, 1)))
+        changes_operations = ChangesOperations(storage_handler)
+
+        # When
+        got, next_since = changes_operations.get_changes_since(0)
+
+        # Then
+        assert [change.seq for change in got] == [1, 3]
+        assert next_since == 3
+
+    def test_prune_changes(self, storage_handler):
+        # Given
+        changes_operations = ChangesOperations(storage_handler)
+
+        # When
+        pruned = changes_operations.prune_changes(3)
+
+        # Then pruning isn't logged as a change itself
+        assert pruned == 2
+        assert [change.seq for change in storage_handler.get_all(ChangeLogEntry)] == [3]
+
+    def test_pruned_seqs_are_not_reused(self, storage_handler):
+        # Given
+        changes_operations = ChangesOperations(storage_handler)
+        changes_operations.prune_changes(4)
+
+        # When
+        storage_handler.create(
+            Subject(name="Physics", degree=DegreeName.bachelor, semester=1)
+        )
+
+        # Then
+        got, _ = changes_operations.get_changes_since(3)
+        assert [change.seq for change in got] == [4]
+
+
+def change_log_entry(seq, changed_at):
+    return ChangeLogEntry(
+        seq=seq,
+        table_name="student",
+        row_id=seq,
+        operation=ChangeOperation.created,
+        changed_at=changed_at,
+    )
@@ -1,10 +1,12 @@
+from datetime import datetime
+
 import pytest
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel, create_engine, select
 from sqlmodel.pool import StaticPool
 
 from src.common.errors import NotFoundError
-from src.common.models import Classroom, DegreeName, Student
-from src.common.storage.db_storage import DBStorageHandler
+from src.common.models import AttendenceRecord, Classroom, DegreeName, Lecture, Student
+from src.common.storage.db_storage import DBStorageHandler, enable_sqlite_foreign_keys
 from src.modules.classrooms_operations import ClassroomsOperations
 from src.modules.students_operations import StudentsOperations
 
@@ -29,6 +31,15 @@ def test_db():
         yield session
 
 
+@pytest.fixture
+def cascading_db():
+    engine = create_engine("sqlite://")
+    enable_sqlite_foreign_keys(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
 @pytest.fixture
 def test_students_operations(test_db) -> StudentsOperations:
     storage_handler = DBStorageHandler(test_db)
@@ -236,3 +247,121 @@ class TestClassroomsOperations:
             classrooms_operations.update_classroom(
                 1, Classroom(id=1, students=example_students, subject_id=2)
             )
+
+    def test_count_classrooms(self, test_db, test_students_operations):
+        # Given
+        student = Student(
+            name="John", surname="Daw", degree=DegreeName.bachelor, semester=4
+        )
+        test_db.add(Classroom(students=[student], subject_id=1))
+        test_db.add(Classroom(subject_id=1))
+        test_db.add(Classroom(subject_id=2))
+        test_db.commit()
+        classrooms_operations = ClassroomsOperations(
+            DBStorageHandler(test_db), test_students_operations
+        )
+
+        # When
+        of_subject = classrooms_operations.count_classrooms(subject_id=1)
+        of_student = classrooms_operations.count_classrooms(student_id=student.id)
+        every = classrooms_operations.count_classrooms()
+
+        # Then
+        assert (of_subject, of_student, every) == (2, 1, 3)
+        assert classrooms_operations.classrooms_exist(subject_id=2)
+        assert not classrooms_operations.classrooms_exist(subject_id=3)
+
+    def test_count_students_by_classroom(self, test_db, test_students_operations):
+        # Given
+        students = [
+            Student(name=name, surname="Daw", degree=DegreeName.bachelor, semester=4)
+            for name in ["John", "Joe"]
+        ]
+        test_db.add(Classroom(id=1, students=students, subject_id=1))
+        test_db.add(Classroom(id=2, students=students[:1], subject_id=2))
+        test_db.add(Classroom(id=3, subject_id=1))
+        test_db.commit()
+        classrooms_operations = ClassroomsOperations(
+            DBStorageHandler(test_db), test_students_operations
+        )
+
+        # When
+        every = classrooms_operations.count_students_by_classroom()
+        of_subject = classrooms_operations.count_students_by_classroom(subject_id=1)
+        of_student = classrooms_operations.count_students_by_classroom(
+            student_id=students[1].id
+        )
+
+        # Then
+        assert every == {1: 2, 2: 1}
+        assert of_subject == {1: 2}
+        assert of_student == {1: 2}
+
+    def test_iter_classroom_values(self, test_db, test_students_operations):
+        # Given
+        student = Student(
+            name="John", surname="Daw", degree=DegreeName.bachelor, semester=4
+        )
+        test_db.add(Classroom(id=2, students=[student], subject_id=1))
+        test_db.add(Classroom(id=1, subject_id=1))
+        test_db.add(Classroom(id=3, subject_id=2))
+        test_db.commit()
+        classrooms_operations = ClassroomsOperations(
+            DBStorageHandler(test_db), test_students_operations
+        )
+
+        # When
+        of_subject = list(
+            classrooms_operations.iter_classroom_values(["id"], subject_id=1)
+        )
+        of_student = list(
+            classrooms_operations.iter_classroom_values(
+                ["id", "subject_id"], student_id=student.id
+            )
+        )
+
+        # Then
+        assert of_subject == [(1,), (2,)]
+        assert of_student == [(2, 1)]
+
+    def test_purge_classrooms(self, cascading_db, test_students_operations):
+        # Given
+        student = Student(
+            name="John", surname="Daw", degree=DegreeName.bachelor, semester=4
+        )
+        cascading_db.add(Classroom(id=1, students=[student], subject_id=1))
+        cascading_db.add(Classroom(id=2, students=[student], subject_id=2))
+        cascading_db.commit()
+        cascading_db.add(
+            Lecture(
+                classroom_id=1,
+                start=datetime(2024, 10, 1, 8),
+                end=datetime(2024, 10, 1, 10),
+            )
+        )
+        for classroom_id, lecture_id in [(1, 1), (2, None)]:
+            cascading_db.add(
+                AttendenceRecord(
+                    student_id=student.id,
+                    classroom_id=classroom_id,
+                    date=datetime(2024, 10, 1, 8),
+                    lecture_id=lecture_id,
+                )
+            )
+        cascading_db.commit()
+        classrooms_operations = ClassroomsOperations(
+            DBStorageHandler(cascading_db), test_students_operations
+        )
+
+        # When
+        got = classrooms_operations.purge_classrooms(subject_id=1)
+
+        # Then
+        cascading_db.expire_all()
+        assert got == 1
+        assert [c.id for c in cascading_db.exec(select(Classroom))] == [2]
+        assert cascading_db.exec(select(Lecture)).all() == []
+        assert [
+            r.classroom_id for r in cascading_db.exec(select(AttendenceRecord))
+        ] == [2]
+        assert [c.id for c in cascading_db.get(Student, student.id).classrooms] == [2]
@@ -0,0 +1,229 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from src.common.errors import NotFoundError
+from src.common.models import (
+    AttendenceBitmap,
+    AttendenceRecord,
+    Classroom,
+    DegreeName,
+    Lecture,
+    Student,
+    StudentClassroomLink,
+)
+from src.common.storage.db_storage import DBStorageHandler
+from src.modules.attendence_operations import AttendenceOperations
+from src.modules.lectures_operations import LecturesOperations, LectureValidationError
+
+
+@pytest.fixture
+def storage_handler():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield DBStorageHandler(session)
+
+
+@pytest.fixture
+def lectures_operations(storage_handler):
+    return LecturesOperations(storage_handler)
+
+
+def lecture(day: int, classroom_id: int = 1) -> Lecture:
+    return Lecture(
+        classroom_id=classroom_id,
+        start=datetime(2024, 10, day, 8),
+        end=datetime(2024, 10, day, 10),
+    )
+
+
+class TestLecturesOperations:
+    def test_add_lecture_links_existing_records(
+        self, storage_handler, lectures_operations
+    ):
+        # Given
+        during = storage_handler.create(
+            AttendenceRecord(
+                student_id=1, classroom_id=1, date=datetime(2024, 10, 1, 8, 5)
+            )
+        )
+        after = storage_handler.create(
+            AttendenceRecord(
+                student_id=1, classroom_id=1, date=datetime(2024, 10, 1, 10)
+            )
+        )
+        other_classroom = storage_handler.create(
+            AttendenceRecord(
+                student_id=1, classroom_id=2, date=datetime(2024, 10, 1, 8, 5)
+            )
+        )
+
+        # When
+        got = lectures_operations.add_lecture(lecture(1))
+
+        # Then
+        assert got.id is not None
+        lecture_ids = {
+            record.id: record.lecture_id
+            for record in storage_handler.get_all(AttendenceRecord)
+        }
+        assert lecture_ids == {
+            during.id: got.id,
+            after.id: None,
+            other_classroom.id: None,
+        }
+
+    @pytest.mark.parametrize(
+        "start, end",
+        [
+            (datetime(2024, 10, 1, 10), datetime(2024, 10, 1, 8)),
+            (datetime(2024, 10, 1, 9), datetime(2024, 10, 1, 11)),
+            (datetime(2024, 10, 1, 7), datetime(2024, 10, 1, 12)),
+        ],
+    )
+    def test_add_lecture_invalid(self, lectures_operations, start, end):
+        # Given
+        lectures_operations.add_lecture(lecture(1))
+
+        # When/Then
+        with pytest.raises(LectureValidationError):
+            lectures_operations.add_lecture(
+                Lecture(classroom_id=1, start=start, end=end)
+            )
+
+    def test_add_lecture_right_after_another(self, lectures_operations):
+        # Given
+        lectures_operations.add_lecture(lecture(1))
+
+        # When
+        lectures_operations.add_lecture(
+            Lecture(
+                classroom_id=1,
+                start=datetime(2024, 10, 1, 10),
+                end=datetime(2024, 10, 1, 12),
+            )
+        )
+
+        # Then
+        assert len(lectures_operations.get_lectures_for_classroom(1)) == 2
+
+    def test_get_lectures_for_classroom(self, lectures_operations):
+        # Given
+        for day in [8, 1]:
+            lectures_operations.add_lecture(lecture(day))
+        lectures_operations.add_lecture(lecture(1, classroom_id=2))
+
+        # When
+        got = lectures_operations.get_lectures_for_classroom(1)
+
+        # Then
+        assert [lecture.start.day for lecture in got] == [1, 8]
+
+    def test_get_lecture_not_found(self, lectures_operations):
+        # When/Then
+        with pytest.raises(NotFoundError):
+            lectures_operations.get_lecture(1)
+
+    def test_find_lecture(self, lectures_operations):
+        # Given
+        added = lectures_operations.add_lecture(lecture(1))
+
+        # When/Then
+        assert lectures_operations.find_lecture(1, datetime(2024, 10, 1, 9)) == added
+        assert lectures_operations.find_lecture(1, datetime(2024, 10, 1, 10)) is None
+        assert lectures_operations.find_lecture(2, datetime(2024, 10, 1, 9)) is None
+
+    def test_delete_lecture_keeps_records(self, storage_handler, lectures_operations):
+        # Given
+        added = lectures_operations.add_lecture(lecture(1))
+        record = storage_handler.create(
+            AttendenceRecord(
+                student_id=1,
+                classroom_id=1,
+                date=datetime(2024, 10, 1, 8, 5),
+                lecture_id=added.id,
+            )
+        )
+
+        # When
+        lectures_operations.delete_lecture(added.id)
+
+        # Then
+        assert lectures_operations.get_lectures_for_classroom(1) == []
+        assert storage_handler.get_by_id(record.id, AttendenceRecord).lecture_id is None
+
+    def test_delete_lecture_deletes_its_bitmap(
+        self, storage_handler, lectures_operations
+    ):
+        # Given
+        first = lectures_operations.add_lecture(lecture(1))
+        second = lectures_operations.add_lecture(lecture(8))
+
+        # When
+        lectures_operations.delete_lecture(first.id)
+
+        # Then
+        assert [
+            bitmap.date for bitmap in storage_handler.get_all(AttendenceBitmap)
+        ] == [second.start]
+
+    def test_delete_lecture_not_found(self, lectures_operations):
+        # When/Then
+        with pytest.raises(NotFoundError):
+            lectures_operations.delete_lecture(1)
+
+    def test_added_records_are_linked(self, storage_handler, lectures_operations):
+        # Given
+        first = lectures_operations.add_lecture(lecture(1))
+        second = lectures_operations.add_lecture(lecture(8))
+        storage_handler.create(Classroom(id=1, subject_id=1))
+        for student_id in [1, 2]:
+            storage_handler.create(
+                Student(
+                    id=student_id,
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=1,
+                )
+            )
+            storage_handler.create(
+                StudentClassroomLink(student_id=student_id, classroom_id=1)
+            )
+        attendence_operations = AttendenceOperations(storage_handler)
+
+        # When
+        attendence_operations.add_attendence_records(
+            [
+                AttendenceRecord(
+                    student_id=student_id,
+                    classroom_id=1,
+                    date=datetime(2024, 10, day, 8),
+                )
+                for student_id in [1, 2]
+                for day in [1, 8, 15]
+            ]
+        )
+
+        # Then
+        assert {
+            record.student_id
+            for record in attendence_operations.get_attendence_records_by_lecture(
+                first.id
+            )
+        } == {1, 2}
+        assert (
+            len(attendence_operations.get_attendence_records_by_lecture(second.id)) == 2
+        )
+        assert {
+            record.lecture_id
+            for record in storage_handler.get_all(AttendenceRecord)
+            if record.date.day == 15
+        } == {None}
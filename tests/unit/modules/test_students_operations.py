@@ -1,9 +1,21 @@
+from datetime import datetime
+
 import pytest
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel, create_engine, select
 
 from src.common.errors import NotFoundError, SemesterError
-from src.common.models import DegreeName, Student
-from src.common.storage.db_storage import DBStorageHandler
+from src.common.models import (
+    AttendenceRecord,
+    Classroom,
+    DegreeName,
+    Student,
+    StudentClassroomLink,
+)
+from src.common.query_spec import QuerySpec, QuerySpecError
+from src.common.storage.db_storage import (
+    DBStorageHandler,
+    enable_sqlite_foreign_keys,
+)
 from src.modules.students_operations import (
     StudentsOperations,
     StudentValidationError,
@@ -18,6 +30,15 @@ def test_db():
         yield session
 
 
+@pytest.fixture
+def cascading_db():
+    engine = create_engine("sqlite:///:memory:")
+    enable_sqlite_foreign_keys(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
 class TestStudentsOperations:
     def test_get_students(self, test_db):
         # Given
@@ -134,6 +155,147 @@ class TestStudentsOperations:
         with pytest.raises(SemesterError):
             students_operations.get_students_in_degree(DegreeName.bachelor, 0)
 
+    def test_iter_students_with_invalid_semester(self, test_db):
+        students_storage = DBStorageHandler(session=test_db)
+        students_operations = StudentsOperations(students_storage)
+
+        # When/Then
+        with pytest.raises(SemesterError):
+            students_operations.iter_students(DegreeName.master, 5)
+
+    def test_iter_student_values(self, test_db):
+        # Given
+        students_storage = DBStorageHandler(session=test_db)
+        students_operations = StudentsOperations(students_storage)
+        for degree, semester in [(DegreeName.bachelor, 1), (DegreeName.master, 2)]:
+            test_db.add(
+                Student(name="John", surname="Doe", degree=degree, semester=semester)
+            )
+        test_db.commit()
+
+        # When
+        got = students_operations.iter_student_values(
+            ["id", "semester"], DegreeName.master, 2
+        )
+
+        # Then
+        assert list(got) == [(2, 2)]
+
+    def test_sync_students_with_invalid_semester(self, test_db):
+        # Given
+        students_operations = StudentsOperations(DBStorageHandler(session=test_db))
+
+        # When
+        with pytest.raises(StudentValidationError) as error:
+            students_operations.sync_students(
+                [
+                    Student(
+                        id=1,
+                        name="John",
+                        surname="Doe",
+                        degree=DegreeName.master,
+                        semester=5,
+                    ),
+                    Student(
+                        id=2,
+                        name="Jane",
+                        surname="Doe",
+                        degree=DegreeName.master,
+                        semester=2,
+                    ),
+                    Student(
+                        id=3,
+                        name="J",
+                        surname="Doe",
+                        degree=DegreeName.bachelor,
+                        semester=0,
+                    ),
+                ]
+            )
+
+        # Then
+        assert error.value.report.errors == {
+            0: ["Master degree has only 4 semesters"],
+            2: [
+                "Semester number must be greater than 0",
+                "Name must be at least 2 characters long",
+            ],
+        }
+        assert students_operations.get_students() == []
+
+    def test_query_students(self, test_db):
+        # Given
+        students_operations = StudentsOperations(DBStorageHandler(session=test_db))
+        for semester in [1, 2, 3]:
+            test_db.add(
+                Student(
+                    name="John",
+                    surname=f"Doe {semester}",
+                    degree=DegreeName.bachelor,
+                    semester=semester,
+                )
+            )
+        test_db.commit()
+
+        # When
+        got = students_operations.query_students(
+            QuerySpec.parse(["semester>1"], sort="-semester", fields="surname")
+        )
+
+        # Then
+        assert got.fields == ["surname"]
+        assert list(got.rows) == [("Doe 3",), ("Doe 2",)]
+
+    def test_count_students(self, test_db):
+        # Given
+        students_operations = StudentsOperations(DBStorageHandler(session=test_db))
+        for semester in [1, 3, 3]:
+            test_db.add(
+                Student(
+                    name="John",
+                    surname="Doe",
+                    degree=DegreeName.bachelor,
+                    semester=semester,
+                )
+            )
+        test_db.commit()
+
+        # When
+        in_semester = students_operations.count_students(
+            QuerySpec.parse(["semester=3"])
+        )
+        every = students_operations.count_students()
+
+        # Then
+        assert (in_semester, every) == (2, 3)
+        assert students_operations.students_exist(QuerySpec.parse(["semester=1"]))
+        assert not students_operations.students_exist(QuerySpec.parse(["semester=2"]))
+
+    def test_count_students_rejects_unknown_fields(self, test_db):
+        # Given
+        students_operations = StudentsOperations(DBStorageHandler(session=test_db))
+
+        # Then
+        with pytest.raises(QuerySpecError):
+            students_operations.count_students(QuerySpec.parse(["password=x"]))
+
+    def test_search_students(self, test_db):
+        # Given
+        students_operations = StudentsOperations(DBStorageHandler(session=test_db))
+        for name, surname in [("John", "Doe"), ("Mark", "Jones"), ("Anna", "Smith")]:
+            test_db.add(
+                Student(
+                    name=name, surname=surname, degree=DegreeName.bachelor, semester=1
+                )
+            )
+        test_db.commit()
+
+        # When
+        got = students_operations.search_students("jo")
+
+        # Then
+        assert [student.name for student in got] == ["John", "Mark"]
+
     def test_add_student(self, test_db):
         # Given
         student = Student(
@@ -212,6 +374,71 @@ class TestStudentsOperations:
         with pytest.raises(NotFoundError):
             students_operations.delete_student(1)
 
+    def test_delete_student_cascades_to_dependent_rows(self, cascading_db):
+        # Given
+        student = Student(
+            name="John", surname="Daw", degree=DegreeName.bachelor, semester=4
+        )
+        classroom = Classroom(subject_id=1, students=[student])
+        cascading_db.add(classroom)
+        cascading_db.commit()
+        cascading_db.add(
+            AttendenceRecord(
+                student_id=student.id, classroom_id=classroom.id, date=datetime.now()
+            )
+        )
+        cascading_db.commit()
+        students_operations = StudentsOperations(DBStorageHandler(cascading_db))
+
+        # When
+        students_operations.delete_student(student.id)
+
+        # Then
+        assert cascading_db.exec(select(StudentClassroomLink)).all() == []
+        assert cascading_db.exec(select(AttendenceRecord)).all() == []
+        assert cascading_db.get(Classroom, classroom.id) is not None
+
+    def test_purge_students(self, cascading_db):
+        # Given
+        students = [
+            Student(name="John", surname="Daw", degree=DegreeName.master, semester=4),
+            Student(name="Joe", surname="Daw", degree=DegreeName.master, semester=2),
+        ]
+        cascading_db.add(Classroom(subject_id=1, students=students))
+        cascading_db.commit()
+        for student in students:
+            cascading_db.add(
+                AttendenceRecord(
+                    student_id=student.id, classroom_id=1, date=datetime.now()
+                )
+            )
+        cascading_db.commit()
+        students_operations = StudentsOperations(DBStorageHandler(cascading_db))
+
+        # When
+        got = students_operations.purge_students(
+            QuerySpec.parse(["degree=Master", "semester>=4"])
+        )
+
+        # Then
+        assert got == 1
+        cascading_db.expire_all()
+        assert [s.name for s in cascading_db.exec(select(Student))] == ["Joe"]
+        assert [
+            link.student_id for link in cascading_db.exec(select(StudentClassroomLink))
+        ] == [students[1].id]
+        assert [
+            record.student_id for record in cascading_db.exec(select(AttendenceRecord))
+        ] == [students[1].id]
+
+    def test_purge_students_needs_a_filter(self, test_db):
+        # Given
+        students_operations = StudentsOperations(DBStorageHandler(test_db))
+
+        # Then
+        with pytest.raises(QuerySpecError):
+            students_operations.purge_students(QuerySpec())
+
     def test_update_student(self, test_db):
         # Given
         student = Student(
@@ -3,6 +3,7 @@ from sqlmodel import Session, SQLModel, create_engine, select
 
 from src.common.errors import NotFoundError, SemesterError
 from src.common.models import DegreeName, Subject
+from src.common.query_spec import QuerySpec, QuerySpecError
 from src.common.storage.db_storage import DBStorageHandler
 from src.modules.subjects_operations import SubjectsOperations, SubjectValidationError
 
@@ -180,3 +181,48 @@ class TestSubjectsOperations:
             subjects_operations.update_subject(
                 1, Subject(name="Physics", semester=4, degree=DegreeName.bachelor)
             )
+
+    def test_validate_subjects(self, test_db):
+        # Given
+        subjects_operations = SubjectsOperations(DBStorageHandler(session=test_db))
+        subjects = [
+            Subject(name="Physics", semester=4, degree=DegreeName.bachelor),
+            Subject(name="P", semester=5, degree=DegreeName.master),
+            Subject(name="Algebra", semester=1, degree=DegreeName.master),
+        ]
+
+        # When
+        got = subjects_operations.validate_subjects(subjects)
+
+        # Then
+        assert got.errors == {
+            1: [
+                "Master degree has only 4 semesters",
+                "Name must be at least 2 characters long",
+            ]
+        }
+        assert got.valid_indices() == [0, 2]
+
+    def test_query_subjects(self, test_db):
+        # Given
+        subjects_operations = SubjectsOperations(DBStorageHandler(session=test_db))
+        for name, semester in [("Physics", 2), ("Algebra", 1), ("Biology", 2)]:
+            subjects_operations.add_subject(
+                Subject(name=name, semester=semester, degree=DegreeName.bachelor)
+            )
+
+        # When
+        got = subjects_operations.query_subjects(
+            QuerySpec.parse(["semester=2"], sort="name", fields="name", limit=1)
+        )
+
+        # Then
+        assert list(got.rows) == [("Biology",)]
+
+    def test_query_subjects_unknown_field(self, test_db):
+        # Given
+        subjects_operations = SubjectsOperations(DBStorageHandler(session=test_db))
+
+        # When/Then
+        with pytest.raises(QuerySpecError):
+            subjects_operations.query_subjects(QuerySpec(fields=["surname"]))
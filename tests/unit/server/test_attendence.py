@@ -0,0 +1,266 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, StaticPool, create_engine
+
+from src.common.dedup import check_in_window
+from src.common.models import (
+    AttendenceRecord,
+    Classroom,
+    DegreeName,
+    Student,
+    StudentClassroomLink,
+)
+from src.common.storage.db_storage import get_session
+from src.server.server import app
+
+
+@pytest.fixture
+def test_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(test_db):
+    app.dependency_overrides[get_session] = lambda: test_db
+    check_in_window.clear()
+    test_client = TestClient(app)
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+def test_get_attendence_records_by_classroom(test_db, client):
+    # Given
+    records = [
+        AttendenceRecord(student_id=1, classroom_id=1, date=datetime(2024, 10, 1, 8)),
+        AttendenceRecord(student_id=2, classroom_id=2, date=datetime(2024, 10, 1, 8)),
+    ]
+    for record in records:
+        test_db.add(record)
+    test_db.commit()
+
+    # When
+    response = client.get("/attendance/classrooms/1")
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": 1,
+            "student_id": 1,
+            "classroom_id": 1,
+            "date": "2024-10-01T08:00:00",
+            "lecture_id": None,
+        }
+    ]
+
+
+def test_count_attendence_records_by_classroom(test_db, client):
+    # Given
+    for student_id, classroom_id in [(1, 1), (2, 1), (1, 2)]:
+        test_db.add(
+            AttendenceRecord(
+                student_id=student_id,
+                classroom_id=classroom_id,
+                date=datetime(2024, 10, 1, 8),
+            )
+        )
+    test_db.commit()
+
+    # When
+    response = client.get("/attendance/classrooms/1/count")
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == {"count": 2}
+
+
+def test_get_attendence_records_by_student(test_db, client):
+    # Given
+    records = [
+        AttendenceRecord(student_id=1, classroom_id=1, date=datetime(2024, 10, 1, 8)),
+        AttendenceRecord(student_id=2, classroom_id=1, date=datetime(2024, 10, 1, 8)),
+    ]
+    for record in records:
+        test_db.add(record)
+    test_db.commit()
+
+    # When
+    response = client.get("/attendance/students/2")
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": 2,
+            "student_id": 2,
+            "classroom_id": 1,
+            "date": "2024-10-01T08:00:00",
+            "lecture_id": None,
+        }
+    ]
+
+
+def enroll(session, classroom_id, student_id):
+    session.merge(Classroom(id=classroom_id, subject_id=1))
+    session.merge(
+        Student(
+            id=student_id,
+            name="John",
+            surname="Doe",
+            degree=DegreeName.bachelor,
+            semester=1,
+        )
+    )
+    session.add(StudentClassroomLink(student_id=student_id, classroom_id=classroom_id))
+    session.commit()
+
+
+def test_add_attendence_record(test_db, client):
+    enroll(test_db, 2, 1)
+
+    response = client.post(
+        "/attendance",
+        json={
+            "student_id": 1,
+            "classroom_id": 2,
+            "date": "2024-10-01T08:00:00",
+            "lecture_id": None,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": 1,
+        "student_id": 1,
+        "classroom_id": 2,
+        "date": "2024-10-01T08:00:00",
+        "lecture_id": None,
+    }
+
+
+def test_add_attendence_record_of_missing_student(test_db, client):
+    # Given
+    enroll(test_db, 2, 1)
+
+    # When
+    response = client.post(
+        "/attendance",
+        json={"student_id": 3, "classroom_id": 2, "date": "2024-10-01T08:00:00"},
+    )
+
+    # Then
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Student with ID 3 not found"}
+
+
+def test_add_duplicate_attendence_record(test_db, client):
+    # Given
+    enroll(test_db, 2, 1)
+    check_in = {"student_id": 1, "classroom_id": 2, "date": "2024-10-01T08:00:00"}
+    client.post("/attendance", json=check_in)
+    # Outside the dedup window, only the unique constraint catches the repeat
+    check_in_window.clear()
+
+    # When
+    response = client.post("/attendance", json=check_in)
+
+    # Then
+    assert response.status_code == 409
+    assert response.json() == {
+        "detail": "Attendance of student with ID 1 in classroom with ID 2 at "
+        "2024-10-01 08:00:00 already exists"
+    }
+    assert len(client.get("/attendance/classrooms/2").json()) == 1
+
+
+def test_repeated_check_in_is_dropped(test_db, client):
+    # Given
+    enroll(test_db, 2, 1)
+    check_in = {"student_id": 1, "classroom_id": 2, "date": "2024-10-01T08:00:00"}
+    first = client.post("/attendance", json=check_in)
+
+    # When
+    response = client.post(
+        "/attendance", json={**check_in, "date": "2024-10-01T08:00:03"}
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == first.json()
+    assert len(client.get("/attendance/classrooms/2").json()) == 1
+    assert client.get("/attendance/duplicates").json() == {
+        "checked": 2,
+        "dropped": 1,
+        "drop_rate": 0.5,
+    }
+
+
+def test_add_attendence_records_batch(test_db, client):
+    # Given
+    test_db.add(Classroom(id=1, subject_id=1))
+    test_db.add(
+        Student(
+            id=1, name="John", surname="Doe", degree=DegreeName.bachelor, semester=1
+        )
+    )
+    test_db.add(StudentClassroomLink(student_id=1, classroom_id=1))
+    test_db.commit()
+    date = "2024-10-01T08:00:00"
+
+    # When
+    rejected = client.post(
+        "/attendance/batch",
+        json=[
+            {"student_id": 1, "classroom_id": 1, "date": date},
+            {"student_id": 2, "classroom_id": 1, "date": date},
+            {"student_id": 1, "classroom_id": 3, "date": date},
+        ],
+    )
+    accepted = client.post(
+        "/attendance/batch", json=[{"student_id": 1, "classroom_id": 1, "date": date}]
+    )
+
+    # Then
+    assert rejected.status_code == 422
+    assert rejected.json() == {
+        "detail": [
+            {"index": 1, "errors": ["Student with ID 2 not found"]},
+            {"index": 2, "errors": ["Classroom with ID 3 not found"]},
+        ]
+    }
+    assert accepted.status_code == 200
+    assert [record["student_id"] for record in accepted.json()] == [1]
+
+    # When
+    check_in_window.clear()
+    repeated = client.post(
+        "/attendance/batch", json=[{"student_id": 1, "classroom_id": 1, "date": date}]
+    )
+
+    # Then
+    assert repeated.status_code == 409
+    assert [invalid["index"] for invalid in repeated.json()["detail"]] == [0]
+
+
+def test_delete_attendence_record(test_db, client):
+    test_db.add(
+        AttendenceRecord(student_id=1, classroom_id=1, date=datetime(2024, 10, 1, 8))
+    )
+    test_db.commit()
+
+    response = client.delete("/attendance/1")
+    assert response.status_code == 204
+
+
+def test_delete_not_existing_attendence_record(client):
+    response = client.delete("/attendance/1")
+    assert response.status_code == 404
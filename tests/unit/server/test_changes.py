@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, StaticPool, create_engine
+
+from src.common.models import AttendenceRecord
+from src.common.storage.db_storage import DBStorageHandler, get_session
+from src.server.server import app
+
+
+@pytest.fixture
+def test_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(test_db):
+    app.dependency_overrides[get_session] = lambda: test_db
+    test_client = TestClient(app)
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+def test_get_changes(test_db, client):
+    # Given
+    storage_handler = DBStorageHandler(test_db)
+    for student_id in range(1, 4):
+        storage_handler.create(
+            AttendenceRecord(
+                student_id=student_id, classroom_id=1, date=datetime(2024, 10, 1, 8)
+            )
+        )
+
+    # When
+    response = client.get("/changes/", params={"since": 1, "limit": 1})
+
+    # Then
+    assert response.status_code == 200
+    body = response.json()
+    assert body["next_since"] == 2
+    assert [
+        (change["seq"], change["table_name"], change["operation"], change["row_id"])
+        for change in body["changes"]
+    ] == [(2, "attendencerecord", "created", 2)]
+    assert body["changes"][0]["data"]["student_id"] == 2
+
+
+def test_get_changes_without_new_changes(client):
+    # When
+    response = client.get("/changes/", params={"since": 5})
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == {"changes": [], "next_since": 5}
@@ -0,0 +1,240 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from sqlmodel import Session, SQLModel, StaticPool, create_engine
+
+from src.common.models import AttendenceRecord, ChangeLogEntry, ChangeOperation
+from src.common.storage.db_storage import DBStorageHandler
+from src.common.storage.invalidation import InvalidationBus
+from src.server import server
+from src.server.live_counters import LiveCounters, classroom_events
+
+
+def check_in(
+    seq: int, classroom_id: int, operation: ChangeOperation = ChangeOperation.created
+) -> ChangeLogEntry:
+    return ChangeLogEntry(
+        seq=seq,
+        table_name="attendencerecord",
+        row_id=seq,
+        operation=operation,
+        data={"id": seq, "classroom_id": classroom_id},
+    )
+
+
+def no_count(classroom_id):
+    raise AssertionError(f"classroom {classroom_id} was counted")
+
+
+class TestLiveCounters:
+    def test_subscribe_loads_count_once_in_a_worker_thread(self):
+        # Given
+        live_counters = LiveCounters()
+        load_threads = []
+
+        def load():
+            load_threads.append(threading.get_ident())
+            return 3
+
+        async def subscribe_twice():
+            return [await live_counters.subscribe(1, load) for _ in range(2)]
+
+        # When
+        queues = asyncio.run(subscribe_twice())
+
+        # Then
+        assert len(load_threads) == 1
+        assert threading.get_ident() not in load_threads
+        assert [queue.get_nowait() for queue in queues] == [3, 3]
+
+    def test_refresh_applies_check_ins_without_counting(self):
+        # Given
+        live_counters = LiveCounters()
+
+        async def check_in_and_leave():
+            queue = await live_counters.subscribe(1, lambda: 5)
+            # The first poll resyncs the freshly loaded counter
+            live_counters.refresh([], lambda classroom_id: 5, last_seq=0)
+            queue.get_nowait()
+            live_counters.refresh(
+                [
+                    check_in(1, 1),
+                    check_in(2, 1),
+                    check_in(3, 2),
+                    check_in(4, 1, ChangeOperation.deleted),
+                ],
+                no_count,
+                last_seq=0,
+            )
+            return queue
+
+        # When
+        queue = asyncio.run(check_in_and_leave())
+
+        # Then
+        assert queue.get_nowait() == 6
+        assert queue.empty()
+        assert live_counters.count(1) == 6
+
+    def test_refresh_resyncs_fresh_counters(self):
+        # Given
+        live_counters = LiveCounters()
+        counted = []
+
+        def count(classroom_id):
+            counted.append(classroom_id)
+            return 2
+
+        async def check_in_after_subscribing():
+            queue = await live_counters.subscribe(1, lambda: 1)
+            # The check-in may be in the loaded count already
+            live_counters.refresh([check_in(1, 1)], count, last_seq=0)
+            live_counters.refresh([check_in(2, 1)], count, last_seq=1)
+            return queue
+
+        # When
+        queue = asyncio.run(check_in_after_subscribing())
+
+        # Then
+        assert counted == [1]
+        assert queue.get_nowait() == 3
+
+    def test_refresh_resyncs_after_a_gap(self):
+        # Given
+        live_counters = LiveCounters()
+        counted = []
+
+        def count(classroom_id):
+            counted.append(classroom_id)
+            return 7
+
+        async def skip_a_seq():
+            queue = await live_counters.subscribe(1, lambda: 5)
+            live_counters.refresh([], lambda classroom_id: 5, last_seq=0)
+            queue.get_nowait()
+            live_counters.refresh([check_in(1, 1), check_in(3, 1)], count, last_seq=0)
+            return queue
+
+        # When
+        queue = asyncio.run(skip_a_seq())
+
+        # Then
+        assert counted == [1]
+        assert queue.get_nowait() == 7
+
+    def test_refresh_resyncs_after_updates(self):
+        # Given
+        live_counters = LiveCounters()
+
+        async def move_a_record():
+            await live_counters.subscribe(1, lambda: 5)
+            await live_counters.subscribe(2, lambda: 5)
+            live_counters.refresh([], lambda classroom_id: 5, last_seq=0)
+            live_counters.refresh(
+                [check_in(1, 2, ChangeOperation.updated)],
+                lambda classroom_id: {1: 4, 2: 6}[classroom_id],
+                last_seq=0,
+            )
+
+        # When
+        asyncio.run(move_a_record())
+
+        # Then
+        assert (live_counters.count(1), live_counters.count(2)) == (4, 6)
+
+    def test_refresh_ignores_classrooms_without_subscribers(self):
+        # Given
+        live_counters = LiveCounters()
+
+        # When
+        live_counters.refresh([check_in(1, 1)], no_count, last_seq=0)
+
+        # Then
+        assert live_counters.count(1) is None
+
+    def test_unsubscribe_drops_counter_with_last_subscriber(self):
+        # Given
+        live_counters = LiveCounters()
+
+        async def subscribe_and_leave():
+            first = await live_counters.subscribe(1, lambda: 5)
+            second = await live_counters.subscribe(1, lambda: 5)
+            live_counters.unsubscribe(1, first)
+            tracked = live_counters.count(1)
+            live_counters.unsubscribe(1, second)
+            return tracked
+
+        # When
+        tracked = asyncio.run(subscribe_and_leave())
+
+        # Then
+        assert tracked == 5
+        assert live_counters.count(1) is None
+
+
+def test_classroom_events():
+    # Given
+    live_counters = LiveCounters()
+
+    async def follow():
+        queue = await live_counters.subscribe(1, lambda: 2)
+        events = classroom_events(live_counters, 1, queue, keepalive=0.01)
+        received = [await anext(events)]
+        received.append(await anext(events))
+        live_counters.refresh([check_in(1, 1)], lambda classroom_id: 3)
+        received.append(await anext(events))
+        await events.aclose()
+        return received
+
+    # When
+    got = asyncio.run(follow())
+
+    # Then
+    assert got == [
+        "event: count\ndata: 2\n\n",
+        ": keepalive\n\n",
+        "event: count\ndata: 3\n\n",
+    ]
+    assert live_counters.count(1) is None
+
+
+def test_follow_changes_reads_the_database_in_a_worker_thread(monkeypatch):
+    # Given
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(server, "get_engine", lambda: engine)
+    monkeypatch.setattr(server, "live_counters", LiveCounters())
+    poll_threads = []
+    poll = InvalidationBus.poll
+
+    def recording_poll(self, storage_handler):
+        poll_threads.append(threading.get_ident())
+        return poll(self, storage_handler)
+
+    monkeypatch.setattr(InvalidationBus, "poll", recording_poll)
+
+    async def follow():
+        queue = await server.live_counters.subscribe(1, lambda: 0)
+        await queue.get()
+        task = asyncio.create_task(server.follow_changes(interval=0.01))
+        # The bus starts after the existing changes, write once it polls
+        while not poll_threads:
+            await asyncio.sleep(0.01)
+        with Session(engine) as session:
+            DBStorageHandler(session).create(
+                AttendenceRecord(student_id=1, classroom_id=1, date=datetime.now())
+            )
+        count = await asyncio.wait_for(queue.get(), 1)
+        task.cancel()
+        return count
+
+    # When
+    got = asyncio.run(follow())
+
+    # Then
+    assert got == 1
+    assert poll_threads
+    assert threading.get_ident() not in poll_threads
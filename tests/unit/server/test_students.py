@@ -134,6 +134,120 @@ def test_get_students_in_degree_with_invalid_semester(client):
     assert response.json() == {"detail": "Master degree has only 4 semesters"}
 
 
+def test_get_students_with_query_spec(test_db, client):
+    # Given
+    for semester in [1, 2, 3]:
+        test_db.add(
+            Student(
+                name=f"John {semester}",
+                surname="Doe",
+                degree=DegreeName.bachelor,
+                semester=semester,
+            )
+        )
+    test_db.commit()
+
+    # When
+    response = client.get(
+        "/students/",
+        params={
+            "filter": ["degree=Bachelor", "semester>=2"],
+            "sort": "-semester",
+            "fields": "id,name",
+        },
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == [{"id": 3, "name": "John 3"}, {"id": 2, "name": "John 2"}]
+
+
+def test_get_students_with_invalid_query_spec(client):
+    response = client.get("/students/", params={"fields": "id,password"})
+    assert response.status_code == 400
+
+
+def test_count_students(test_db, client):
+    # Given
+    for semester in [1, 3, 3]:
+        test_db.add(
+            Student(
+                name="John",
+                surname="Doe",
+                degree=DegreeName.bachelor,
+                semester=semester,
+            )
+        )
+    test_db.commit()
+
+    # When
+    response = client.get("/students/count", params={"filter": ["semester=3"]})
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == {"count": 2}
+
+
+def test_students_exist(test_db, client):
+    # Given
+    test_db.add(
+        Student(name="John", surname="Doe", degree=DegreeName.bachelor, semester=1)
+    )
+    test_db.commit()
+
+    # When
+    found = client.get("/students/exists", params={"filter": ["semester=1"]})
+    missing = client.get("/students/exists", params={"filter": ["semester=2"]})
+    invalid = client.get("/students/exists", params={"filter": ["semester=x"]})
+
+    # Then
+    assert found.json() == {"exists": True}
+    assert missing.json() == {"exists": False}
+    assert invalid.status_code == 400
+
+
+def test_purge_students(test_db, client):
+    # Given
+    for semester in [2, 4]:
+        test_db.add(
+            Student(
+                name="John", surname="Doe", degree=DegreeName.master, semester=semester
+            )
+        )
+    test_db.commit()
+
+    # When
+    response = client.delete("/students/", params={"filter": ["semester>=4"]})
+    without_filter = client.delete("/students/")
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == {"deleted": 1}
+    assert without_filter.status_code == 422
+    assert client.get("/students/count").json() == {"count": 1}
+
+
+def test_search_students(test_db, client):
+    # Given
+    for name, surname in [("John", "Doe"), ("Mark", "Jones"), ("Anna", "Smith")]:
+        test_db.add(
+            Student(name=name, surname=surname, degree=DegreeName.bachelor, semester=1)
+        )
+    test_db.commit()
+
+    # When
+    response = client.get("/students/search", params={"q": "jo do", "limit": 5})
+
+    # Then
+    assert response.status_code == 200
+    assert [student["name"] for student in response.json()] == ["John"]
+
+
+def test_search_students_without_query(client):
+    response = client.get("/students/search")
+    assert response.status_code == 422
+
+
 def test_add_student(client):
     response = client.post(
         "/students",
@@ -177,3 +291,14 @@ def test_delete_student(test_db, client):
 
     response = client.delete("/students/1")
     assert response.status_code == 204
+
+
+def test_get_students_keeps_student_response_model(client):
+    # When
+    response = client.get("/openapi.json")
+
+    # Then
+    schema = response.json()["paths"]["/students/"]["get"]["responses"]["200"]
+    assert schema["content"]["application/json"]["schema"]["items"] == {
+        "$ref": "#/components/schemas/Student"
+    }